@@ -0,0 +1,87 @@
+"""Relatórios sobre o banco analítico (nunca tocam o banco dos caixas)"""
+from django.db.models import Count, Sum
+
+from .models import FatoCompra, FatoParcela, FatoVenda
+
+# fato -> (modelo, dimensões permitidas, medidas permitidas)
+FATOS = {
+    'vendas': (
+        FatoVenda,
+        {'ano': 'ano', 'mes': 'mes', 'dia_semana': 'dia_semana'},
+        {
+            'total': Sum('total'), 'pix': Sum('pix'), 'dinheiro': Sum('dinheiro'),
+            'debito': Sum('debito'), 'credito': Sum('credito'), 'quantidade': Count('id'),
+        },
+    ),
+    'compras': (
+        FatoCompra,
+        {
+            'ano': 'ano', 'mes': 'mes', 'fornecedor': 'fornecedor__nome',
+            'cartao': 'cartao__nome', 'forma_pagamento': 'forma_pagamento',
+        },
+        {'total': Sum('valor_total'), 'quantidade': Count('id')},
+    ),
+    'parcelas': (
+        FatoParcela,
+        {'ano': 'ano', 'mes': 'mes', 'cartao': 'cartao__nome', 'paga': 'paga'},
+        {'total': Sum('valor_parcela'), 'quantidade': Count('id')},
+    ),
+}
+
+
+def pivot(loja_id, fato, linhas, colunas=None, medida='total', ano_inicio=None, ano_fim=None):
+    """Tabela dinâmica: um GROUP BY por (linha, coluna) no banco analítico"""
+    if fato not in FATOS:
+        raise ValueError(f"Fato inválido: {fato}")
+    modelo, dimensoes, medidas = FATOS[fato]
+    for nome in filter(None, [linhas, colunas]):
+        if nome not in dimensoes:
+            raise ValueError(f"Dimensão inválida para {fato}: {nome}")
+    if medida not in medidas:
+        raise ValueError(f"Medida inválida para {fato}: {medida}")
+
+    qs = modelo.objects.filter(loja_id=loja_id)
+    if ano_inicio:
+        qs = qs.filter(ano__gte=ano_inicio)
+    if ano_fim:
+        qs = qs.filter(ano__lte=ano_fim)
+
+    campos = [dimensoes[linhas]] + ([dimensoes[colunas]] if colunas else [])
+    resultado = qs.values(*campos).annotate(valor=medidas[medida]).order_by(*campos)
+
+    valores, rotulos_colunas = {}, []
+    for linha in resultado:
+        chave_linha = linha[dimensoes[linhas]]
+        chave_coluna = linha[dimensoes[colunas]] if colunas else medida
+        valores.setdefault(chave_linha, {})[chave_coluna] = linha['valor']
+        if chave_coluna not in rotulos_colunas:
+            rotulos_colunas.append(chave_coluna)
+
+    return {
+        'linhas': list(valores),
+        'colunas': rotulos_colunas,
+        'valores': [[valores[l].get(c) for c in rotulos_colunas] for l in valores],
+    }
+
+
+def comparativo_anual(loja_id, ano):
+    """Vendas e compras mês a mês do ano contra o ano anterior"""
+    vendas = FatoVenda.objects.filter(loja_id=loja_id, ano__in=[ano - 1, ano]) \
+        .values('ano', 'mes').annotate(total=Sum('total'))
+    compras = FatoCompra.objects.filter(loja_id=loja_id, ano__in=[ano - 1, ano]) \
+        .values('ano', 'mes').annotate(total=Sum('valor_total'))
+
+    meses = {mes: {'mes': mes, 'vendas': 0, 'vendas_ano_anterior': 0,
+                   'compras': 0, 'compras_ano_anterior': 0} for mes in range(1, 13)}
+    for serie, linhas in (('vendas', vendas), ('compras', compras)):
+        for linha in linhas:
+            chave = serie if linha['ano'] == ano else f'{serie}_ano_anterior'
+            meses[linha['mes']][chave] = linha['total'] or 0
+
+    for mes in meses.values():
+        for serie in ('vendas', 'compras'):
+            anterior = mes[f'{serie}_ano_anterior']
+            mes[f'{serie}_variacao'] = (
+                round(float((mes[serie] - anterior) / anterior * 100), 1) if anterior else None
+            )
+    return list(meses.values())
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from analitico.services import atualizar_snapshot
+
+
+class Command(BaseCommand):
+    help = "Atualiza o banco analítico (analitico.sqlite3) com o que mudou desde a última carga"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo', action='store_true',
+            help="Recarrega todas as linhas, inclusive os anos arquivados"
+        )
+
+    def handle(self, *args, **options):
+        resultado = atualizar_snapshot(completo=options['completo'])
+        for tabela, contagem in resultado.items():
+            self.stdout.write(
+                f"{tabela}: {contagem['gravadas']} gravada(s), {contagem['removidas']} removida(s)"
+            )
+        self.stdout.write(self.style.SUCCESS("Banco analítico atualizado"))
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DimCartao',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField()),
+                ('nome', models.CharField(max_length=50)),
+                ('limite', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('ativo', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Cartão (analítico)',
+            },
+        ),
+        migrations.CreateModel(
+            name='DimFornecedor',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField()),
+                ('nome', models.CharField(max_length=100)),
+                ('ativo', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Fornecedor (analítico)',
+            },
+        ),
+        migrations.CreateModel(
+            name='EstadoCarga',
+            fields=[
+                ('tabela', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('ultimo_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('linhas', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Estado da carga',
+            },
+        ),
+        migrations.CreateModel(
+            name='FatoVenda',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField()),
+                ('data', models.DateField()),
+                ('ano', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('dia_semana', models.IntegerField(help_text='1 = segunda ... 7 = domingo')),
+                ('pix', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('dinheiro', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('debito', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('credito', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Venda (analítico)',
+                'indexes': [models.Index(fields=['loja_id', 'ano', 'mes'], name='fato_venda_loja_mes_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FatoCompra',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField()),
+                ('data', models.DateField()),
+                ('ano', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('forma_pagamento', models.CharField(max_length=10)),
+                ('parcelas', models.IntegerField()),
+                ('valor_total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('updated_at', models.DateTimeField()),
+                ('cartao', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='analitico.dimcartao')),
+                ('fornecedor', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='analitico.dimfornecedor')),
+            ],
+            options={
+                'verbose_name': 'Compra (analítico)',
+                'indexes': [models.Index(fields=['loja_id', 'ano', 'mes'], name='fato_compra_loja_mes_idx'), models.Index(fields=['loja_id', 'fornecedor'], name='fato_compra_loja_forn_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FatoParcela',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField()),
+                ('compra_id', models.BigIntegerField()),
+                ('numero_parcela', models.IntegerField()),
+                ('valor_parcela', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data_vencimento', models.DateField()),
+                ('ano', models.IntegerField(help_text='Ano do vencimento')),
+                ('mes', models.IntegerField(help_text='Mês do vencimento')),
+                ('paga', models.BooleanField()),
+                ('data_pagamento', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField()),
+                ('cartao', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='analitico.dimcartao')),
+            ],
+            options={
+                'verbose_name': 'Parcela (analítico)',
+                'indexes': [models.Index(fields=['loja_id', 'ano', 'mes'], name='fato_parcela_loja_mes_idx')],
+            },
+        ),
+    ]
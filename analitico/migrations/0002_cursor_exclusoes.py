@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analitico', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estadocarga',
+            name='cursor_exclusoes',
+            field=models.BigIntegerField(blank=True, help_text='Último RegistroAuditoria lido: as exclusões seguintes saem na próxima carga', null=True),
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.db import models
+
+# Cópia desnormalizada para relatórios, gravada apenas por analitico.services.
+# Os ids são os mesmos do banco principal; não há restrição de chave
+# estrangeira para que cada tabela possa ser atualizada isoladamente.
+
+
+class DimFornecedor(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField()
+    nome = models.CharField(max_length=100)
+    ativo = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Fornecedor (analítico)"
+
+
+class DimCartao(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField()
+    nome = models.CharField(max_length=50)
+    limite = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    ativo = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Cartão (analítico)"
+
+
+class FatoVenda(models.Model):
+    """Um lançamento diário, com as partes da data já separadas"""
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField()
+    data = models.DateField()
+    ano = models.IntegerField()
+    mes = models.IntegerField()
+    dia_semana = models.IntegerField(help_text="1 = segunda ... 7 = domingo")
+    pix = models.DecimalField(max_digits=10, decimal_places=2)
+    dinheiro = models.DecimalField(max_digits=10, decimal_places=2)
+    debito = models.DecimalField(max_digits=10, decimal_places=2)
+    credito = models.DecimalField(max_digits=10, decimal_places=2)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Venda (analítico)"
+        indexes = [
+            models.Index(fields=['loja_id', 'ano', 'mes'], name='fato_venda_loja_mes_idx'),
+        ]
+
+
+class FatoCompra(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField()
+    data = models.DateField()
+    ano = models.IntegerField()
+    mes = models.IntegerField()
+    fornecedor = models.ForeignKey(DimFornecedor, on_delete=models.DO_NOTHING, db_constraint=False, null=True)
+    cartao = models.ForeignKey(DimCartao, on_delete=models.DO_NOTHING, db_constraint=False, null=True)
+    forma_pagamento = models.CharField(max_length=10)
+    parcelas = models.IntegerField()
+    valor_total = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Compra (analítico)"
+        indexes = [
+            models.Index(fields=['loja_id', 'ano', 'mes'], name='fato_compra_loja_mes_idx'),
+            models.Index(fields=['loja_id', 'fornecedor'], name='fato_compra_loja_forn_idx'),
+        ]
+
+
+class FatoParcela(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField()
+    compra_id = models.BigIntegerField()
+    cartao = models.ForeignKey(DimCartao, on_delete=models.DO_NOTHING, db_constraint=False, null=True)
+    numero_parcela = models.IntegerField()
+    valor_parcela = models.DecimalField(max_digits=10, decimal_places=2)
+    data_vencimento = models.DateField()
+    ano = models.IntegerField(help_text="Ano do vencimento")
+    mes = models.IntegerField(help_text="Mês do vencimento")
+    paga = models.BooleanField()
+    data_pagamento = models.DateField(blank=True, null=True)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Parcela (analítico)"
+        indexes = [
+            models.Index(fields=['loja_id', 'ano', 'mes'], name='fato_parcela_loja_mes_idx'),
+        ]
+
+
+class EstadoCarga(models.Model):
+    """Marca d'água da última carga de cada tabela de origem"""
+    tabela = models.CharField(max_length=50, primary_key=True)
+    ultimo_updated_at = models.DateTimeField(blank=True, null=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+    linhas = models.IntegerField(default=0)
+    cursor_exclusoes = models.BigIntegerField(
+        blank=True, null=True,
+        help_text="Último RegistroAuditoria lido: as exclusões seguintes saem na próxima carga"
+    )
+
+    class Meta:
+        verbose_name = "Estado da carga"
@@ -0,0 +1,20 @@
+class RoteadorAnalitico:
+    """Todos os modelos do app analitico vivem em analitico.sqlite3 (cópia só de leitura)"""
+
+    def db_for_read(self, model, **hints):
+        return 'analitico' if model._meta.app_label == 'analitico' else None
+
+    def db_for_write(self, model, **hints):
+        return 'analitico' if model._meta.app_label == 'analitico' else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._meta.app_label == 'analitico' or obj2._meta.app_label == 'analitico':
+            return obj1._meta.app_label == obj2._meta.app_label
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'analitico':
+            return db == 'analitico'
+        if db == 'analitico':
+            return False
+        return None
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Max
+
+from arquivo.models import CompraArquivada, LancamentoArquivado, ParcelaArquivada
+from auditoria.models import RegistroAuditoria
+from compras.models import CartaoCredito, Compra, Fornecedor, ParcelaCompra
+from lancamentos.models import Lancamento
+
+from .models import DimCartao, DimFornecedor, EstadoCarga, FatoCompra, FatoParcela, FatoVenda
+
+TAMANHO_LOTE = 1000
+
+# Reprocessa um pouco antes da marca d'água: uma transação pode gravar
+# updated_at e só confirmar depois da carga anterior ter lido a tabela.
+MARGEM = timedelta(minutes=5)
+
+
+def _venda(l):
+    return FatoVenda(
+        id=l.pk, loja_id=l.loja_id, data=l.data,
+        ano=l.data.year, mes=l.data.month, dia_semana=l.data.isoweekday(),
+        pix=l.pix, dinheiro=l.dinheiro, debito=l.cartao_debito, credito=l.cartao_credito,
+        total=l.total_vendas, updated_at=l.updated_at,
+    )
+
+
+def _compra(c):
+    return FatoCompra(
+        id=c.pk, loja_id=c.loja_id, data=c.data_compra,
+        ano=c.data_compra.year, mes=c.data_compra.month,
+        fornecedor_id=c.fornecedor_id, cartao_id=c.cartao_credito_id,
+        forma_pagamento=c.forma_pagamento, parcelas=c.parcelas,
+        valor_total=c.valor_total, updated_at=c.updated_at,
+    )
+
+
+def _parcela(p):
+    return FatoParcela(
+        id=p.pk, loja_id=p.compra.loja_id, compra_id=p.compra_id,
+        cartao_id=p.compra.cartao_credito_id, numero_parcela=p.numero_parcela,
+        valor_parcela=p.valor_parcela, data_vencimento=p.data_vencimento,
+        ano=p.data_vencimento.year, mes=p.data_vencimento.month,
+        paga=p.paga, data_pagamento=p.data_pagamento,
+        # Parcelas arquivadas não têm updated_at próprio
+        updated_at=getattr(p, 'updated_at', None) or p.compra.updated_at,
+    )
+
+
+def _fornecedor(f):
+    return DimFornecedor(id=f.pk, loja_id=f.loja_id, nome=f.nome, ativo=f.ativo)
+
+
+def _cartao(c):
+    return DimCartao(id=c.pk, loja_id=c.loja_id, nome=c.nome, limite=c.limite, ativo=c.ativo)
+
+
+# tabela -> (origem, arquivo, modelo analítico, conversor, remove excluídos)
+CARGAS = {
+    'fornecedor': (lambda: Fornecedor.objects.all(), None, DimFornecedor, _fornecedor, True),
+    'cartao': (lambda: CartaoCredito.objects.all(), None, DimCartao, _cartao, True),
+    'lancamento': (lambda: Lancamento.objects.all(), lambda: LancamentoArquivado.objects.all(),
+                   FatoVenda, _venda, True),
+    'compra': (lambda: Compra.objects.all(), lambda: CompraArquivada.objects.all(),
+               FatoCompra, _compra, True),
+    'parcela': (lambda: ParcelaCompra.objects.select_related('compra'),
+                lambda: ParcelaArquivada.objects.select_related('compra'),
+                FatoParcela, _parcela, True),
+}
+
+
+def _gravar(modelo, objetos, conversor):
+    """Upsert em lotes no banco analítico; retorna (linhas, maior updated_at)"""
+    campos = [f.attname for f in modelo._meta.concrete_fields if not f.primary_key]
+    objetos = iter(objetos)
+    linhas, maior = 0, None
+    while True:
+        lote = [conversor(o) for o in islice(objetos, TAMANHO_LOTE)]
+        if not lote:
+            return linhas, maior
+        with transaction.atomic(using='analitico'):
+            modelo.objects.bulk_create(
+                lote, update_conflicts=True, unique_fields=['id'], update_fields=campos
+            )
+        linhas += len(lote)
+        if 'updated_at' in campos:
+            maior_lote = max(o.updated_at for o in lote)
+            maior = max(maior, maior_lote) if maior else maior_lote
+
+
+def _remover_ausentes(modelo, origem, arquivo):
+    """Apaga do analítico o que sumiu da origem e não foi para o arquivo (varre a tabela toda)"""
+    faltando = set(modelo.objects.values_list('id', flat=True)) - set(origem.values_list('pk', flat=True))
+    if faltando and arquivo is not None:
+        faltando -= set(arquivo.filter(pk__in=faltando).values_list('pk', flat=True))
+    return _apagar(modelo, faltando)
+
+
+def _remover_excluidos(modelo, rotulo, cursor, ate):
+    """Apaga do analítico o que a auditoria registrou como excluído entre os cursores.
+
+    Linhas arquivadas não entram: continuam no analítico, lidas do arquivo.
+    """
+    excluidos = RegistroAuditoria.objects.filter(
+        modelo=rotulo, acao='exclusao', pk__gt=cursor, pk__lte=ate
+    ).order_by().values_list('objeto_id', flat=True)
+    return _apagar(modelo, set(excluidos))
+
+
+def _apagar(modelo, ids):
+    ids = list(ids)
+    for i in range(0, len(ids), TAMANHO_LOTE):
+        modelo.objects.filter(pk__in=ids[i:i + TAMANHO_LOTE]).delete()
+    return len(ids)
+
+
+def atualizar_snapshot(completo=False, progresso=None):
+    """Atualiza o banco analítico com o que mudou desde a última carga.
+
+    Só lê linhas com updated_at acima da marca d'água de cada tabela; na
+    primeira carga (ou com completo=True) também copia os anos arquivados e
+    confere a tabela inteira contra a origem. Nas seguintes, as exclusões vêm
+    da trilha de auditoria, a partir do cursor guardado no EstadoCarga.
+    """
+    resultado = {}
+    for passo, (tabela, (origem, arquivo, modelo, conversor, remove)) in enumerate(CARGAS.items()):
+        if progresso:
+            progresso(passo * 100 // len(CARGAS), f"Atualizando {tabela}")
+
+        estado, _ = EstadoCarga.objects.get_or_create(tabela=tabela)
+        carga_inicial = completo or estado.ultimo_updated_at is None
+
+        alterados = origem()
+        if not carga_inicial:
+            alterados = alterados.filter(updated_at__gte=estado.ultimo_updated_at - MARGEM)
+        linhas, maior = _gravar(modelo, alterados.iterator(chunk_size=TAMANHO_LOTE), conversor)
+
+        if carga_inicial and arquivo is not None:
+            linhas += _gravar(modelo, arquivo().iterator(chunk_size=TAMANHO_LOTE), conversor)[0]
+
+        removidos = 0
+        if remove:
+            # Lido antes de procurar: exclusão gravada durante a carga fica para a próxima
+            ate = RegistroAuditoria.objects.aggregate(ultimo=Max('pk'))['ultimo'] or 0
+            if carga_inicial or estado.cursor_exclusoes is None:
+                removidos = _remover_ausentes(modelo, origem(), arquivo() if arquivo else None)
+            else:
+                removidos = _remover_excluidos(
+                    modelo, origem().model._meta.label_lower, estado.cursor_exclusoes, ate
+                )
+            estado.cursor_exclusoes = ate
+
+        if maior and (estado.ultimo_updated_at is None or maior > estado.ultimo_updated_at):
+            estado.ultimo_updated_at = maior
+        estado.linhas = modelo.objects.count()
+        estado.save()
+        resultado[tabela] = {'gravadas': linhas, 'removidas': removidos}
+    return resultado
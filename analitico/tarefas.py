@@ -0,0 +1,8 @@
+from fila.registro import tarefa
+
+from .services import atualizar_snapshot
+
+
+@tarefa('analitico.atualizar')
+def atualizar(tarefa, completo=False):
+    return atualizar_snapshot(completo=completo, progresso=tarefa.atualizar_progresso)
@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from arquivo.services import arquivar_ano
+from compras.duplicados import mesclar_fornecedores
+from compras.models import CartaoCredito, Fornecedor
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+
+from .models import DimCartao, DimFornecedor, FatoVenda
+from .services import atualizar_snapshot
+
+
+class AtualizarSnapshotTests(TestCase):
+    databases = {'default', 'arquivo', 'analitico'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.antigo = Lancamento.objects.create(loja=self.loja, data=date(2023, 3, 10), pix=Decimal('10'))
+        self.apagado = Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('5'))
+        atualizar_snapshot()
+
+    def test_exclusao_sai_pela_auditoria_sem_varrer_a_tabela(self):
+        apagado_id = self.apagado.pk
+        self.apagado.delete()
+
+        with CaptureQueriesContext(connections['analitico']) as consultas:
+            resultado = atualizar_snapshot()
+
+        self.assertEqual(resultado['lancamento']['removidas'], 1)
+        self.assertFalse(FatoVenda.objects.filter(pk=apagado_id).exists())
+        self.assertFalse(any(q['sql'].startswith('SELECT "analitico_fatovenda"."id"') for q in consultas))
+
+    def test_fornecedor_mesclado_e_cartao_excluido_saem_das_dimensoes(self):
+        destino = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        origem = Fornecedor.objects.create(loja=self.loja, nome='ATACADAO LTDA')
+        cartao = CartaoCredito.objects.create(loja=self.loja, nome='Nubank')
+        atualizar_snapshot()
+        self.assertEqual(DimFornecedor.objects.count(), 2)
+
+        mesclar_fornecedores(destino, [origem])
+        cartao_id = cartao.pk
+        cartao.delete()
+        resultado = atualizar_snapshot()
+
+        self.assertEqual((resultado['fornecedor']['removidas'], resultado['cartao']['removidas']), (1, 1))
+        self.assertEqual(list(DimFornecedor.objects.values_list('pk', flat=True)), [destino.pk])
+        self.assertFalse(DimCartao.objects.filter(pk=cartao_id).exists())
+
+    def test_arquivado_continua_no_analitico(self):
+        arquivar_ano(self.loja, 2023)
+
+        resultado = atualizar_snapshot()
+
+        self.assertEqual(resultado['lancamento']['removidas'], 0)
+        self.assertEqual(FatoVenda.objects.get(pk=self.antigo.pk).pix, Decimal('10.00'))
+
+    def test_carga_completa_confere_a_tabela_inteira(self):
+        FatoVenda.objects.filter(pk=self.apagado.pk).update(pix=0)
+        FatoVenda.objects.create(
+            id=999999, loja_id=self.loja.pk, data=date(2025, 1, 1), ano=2025, mes=1, dia_semana=3,
+            pix=0, dinheiro=0, debito=0, credito=0, total=0, updated_at=self.apagado.updated_at,
+        )
+
+        resultado = atualizar_snapshot(completo=True)
+
+        self.assertEqual(resultado['lancamento']['removidas'], 1)
+        self.assertEqual(FatoVenda.objects.get(pk=self.apagado.pk).pix, Decimal('5.00'))
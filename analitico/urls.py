@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('api/analitico/pivot/', views.api_analitico_pivot, name='api_analitico_pivot'),
+    path('api/analitico/comparativo/', views.api_analitico_comparativo, name='api_analitico_comparativo'),
+]
@@ -0,0 +1,45 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .consultas import comparativo_anual, pivot
+from .models import EstadoCarga
+
+
+def _atualizado_em():
+    estado = EstadoCarga.objects.order_by('atualizado_em').first()
+    return estado.atualizado_em.isoformat() if estado else None
+
+
+@login_required
+def api_analitico_pivot(request):
+    """Ex.: ?fato=compras&linhas=fornecedor&colunas=ano&medida=total"""
+    try:
+        dados = pivot(
+            request.loja.pk,
+            request.GET.get('fato', 'vendas'),
+            request.GET.get('linhas', 'ano'),
+            colunas=request.GET.get('colunas') or None,
+            medida=request.GET.get('medida', 'total'),
+            ano_inicio=request.GET.get('ano_inicio') or None,
+            ano_fim=request.GET.get('ano_fim') or None,
+        )
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    dados['atualizado_em'] = _atualizado_em()
+    return JsonResponse(dados)
+
+
+@login_required
+def api_analitico_comparativo(request):
+    try:
+        ano = int(request.GET.get('ano') or timezone.localdate().year)
+    except ValueError:
+        return JsonResponse({'erro': 'Ano inválido.'}, status=400)
+
+    return JsonResponse({
+        'ano': ano,
+        'meses': comparativo_anual(request.loja.pk, ano),
+        'atualizado_em': _atualizado_em(),
+    })
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import ResumoArquivado
+
+
+@admin.register(ResumoArquivado)
+class ResumoArquivadoAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'loja', 'total_pix', 'total_dinheiro', 'total_debito',
+                    'total_credito', 'total_compras', 'qtd_compras']
+    list_filter = ['loja', 'ano']
+    list_select_related = ['loja']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,135 @@
+"""Leitura transparente dos anos arquivados.
+
+As telas consultam o banco principal normalmente e usam estas funções para
+somar (ou listar) o que já foi movido para o arquivo no mesmo período.
+"""
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from .models import CompraArquivada, LancamentoArquivado, ParcelaArquivada, ResumoArquivado
+
+
+def _como_data(valor):
+    if not valor or isinstance(valor, date):
+        return valor or None
+    return parse_date(str(valor))
+
+
+def anos_arquivados(loja):
+    """Anos da loja que já foram para o arquivo (podem ter buracos: arquivar
+    2024 não arquiva 2022)"""
+    return set(ResumoArquivado.objects.filter(loja=loja).values_list('ano', flat=True).distinct())
+
+
+def dias_arquivados(loja, datas, anos=None):
+    """As datas (ordenadas) que caem num ano já arquivado da loja"""
+    if anos is None:
+        anos = anos_arquivados(loja)
+    return sorted(d for d in set(datas) if d.year in anos)
+
+
+def verificar_dias_abertos(loja, datas):
+    """Recusa gravar em dias já arquivados: o arquivo é só leitura e um
+    lançamento novo ali ficaria fora dos totais do ano"""
+    arquivados = dias_arquivados(loja, datas)
+    if arquivados:
+        raise ValidationError(
+            f"O dia {arquivados[0].strftime('%d/%m/%Y')} já está num ano arquivado e não pode ser alterado."
+        )
+
+
+def periodo_todo_arquivado(loja, data_inicio, data_fim):
+    """Todos os anos do período estão no arquivo (sem início, o período
+    alcança anos que nunca foram arquivados)"""
+    data_inicio, data_fim = _como_data(data_inicio), _como_data(data_fim)
+    if not data_inicio or not data_fim or data_inicio > data_fim:
+        return False
+    anos = anos_arquivados(loja)
+    return all(ano in anos for ano in range(data_inicio.year, data_fim.year + 1))
+
+
+def _alcanca_arquivo(loja, data_inicio):
+    anos = anos_arquivados(loja)
+    data_inicio = _como_data(data_inicio)
+    return bool(anos) and (data_inicio is None or max(anos) >= data_inicio.year)
+
+
+def lancamentos_arquivados(loja, data_inicio=None, data_fim=None):
+    """Lançamentos arquivados no período, ou None se o período não chega ao arquivo"""
+    if not _alcanca_arquivo(loja, data_inicio):
+        return None
+
+    lancamentos = LancamentoArquivado.objects.filter(loja_id=loja.pk)
+    if data_inicio:
+        lancamentos = lancamentos.filter(data__gte=_como_data(data_inicio))
+    if data_fim:
+        lancamentos = lancamentos.filter(data__lte=_como_data(data_fim))
+    return lancamentos
+
+
+def compras_arquivadas(loja, data_inicio=None, data_fim=None, fornecedor_id=None,
+                       forma_pagamento=None, search=None):
+    """Compras arquivadas com os mesmos filtros da lista de compras"""
+    if not _alcanca_arquivo(loja, data_inicio):
+        return None
+
+    compras = CompraArquivada.objects.filter(loja_id=loja.pk)
+    if fornecedor_id:
+        compras = compras.filter(fornecedor_id=fornecedor_id)
+    if forma_pagamento:
+        compras = compras.filter(forma_pagamento=forma_pagamento)
+    if data_inicio:
+        compras = compras.filter(data_compra__gte=_como_data(data_inicio))
+    if data_fim:
+        compras = compras.filter(data_compra__lte=_como_data(data_fim))
+    if search:
+        compras = compras.filter(
+            Q(descricao__icontains=search) |
+            Q(fornecedor_nome__icontains=search)
+        )
+    return compras
+
+
+def parcelas_arquivadas(loja, data_inicio=None, data_fim=None):
+    """Parcelas arquivadas com vencimento no período"""
+    if not _alcanca_arquivo(loja, data_inicio):
+        return None
+
+    parcelas = ParcelaArquivada.objects.filter(compra__loja_id=loja.pk)
+    if data_inicio:
+        parcelas = parcelas.filter(data_vencimento__gte=_como_data(data_inicio))
+    if data_fim:
+        parcelas = parcelas.filter(data_vencimento__lte=_como_data(data_fim))
+    return parcelas
+
+
+class Concatenadas:
+    """Linhas de vários querysets, um após o outro, paginável pelo Paginator.
+
+    Cada página consulta só os querysets que ela alcança, com LIMIT/OFFSET.
+    """
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self._tamanhos = None
+
+    def count(self):
+        if self._tamanhos is None:
+            self._tamanhos = [queryset.count() for queryset in self.querysets]
+        return sum(self._tamanhos)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, fatia):
+        self.count()
+        inicio, fim, linhas = fatia.start or 0, fatia.stop, []
+        for queryset, tamanho in zip(self.querysets, self._tamanhos):
+            if inicio < tamanho and fim > 0:
+                linhas += queryset[max(inicio, 0):min(fim, tamanho)]
+            inicio, fim = inicio - tamanho, fim - tamanho
+        return linhas
+
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from arquivo.services import arquivar_ano, arquivo_pronto
+from lojas.models import Loja
+
+
+class Command(BaseCommand):
+    help = "Move lançamentos, compras e parcelas de um ano encerrado para o banco de arquivo"
+
+    def add_arguments(self, parser):
+        parser.add_argument('ano', type=int, help="Ano a arquivar (ex: 2023)")
+        parser.add_argument('--loja', type=int, help="Id da loja (padrão: todas)")
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help="Compacta o banco principal depois de arquivar (VACUUM)"
+        )
+
+    def handle(self, *args, **options):
+        if not arquivo_pronto():
+            raise CommandError("Banco de arquivo sem tabelas. Rode: manage.py migrate --database arquivo")
+
+        lojas = Loja.objects.all()
+        if options['loja']:
+            lojas = lojas.filter(pk=options['loja'])
+
+        for loja in lojas:
+            try:
+                resultado = arquivar_ano(loja, options['ano'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{loja.nome}: {resultado['lancamentos']} lançamento(s) e "
+                f"{resultado['compras']} compra(s) arquivados ({resultado['meses']} mês(es) resumidos)"
+            ))
+            if resultado['compras_em_aberto']:
+                self.stdout.write(self.style.WARNING(
+                    f"  {resultado['compras_em_aberto']} compra(s) com parcelas em aberto ficaram no banco principal"
+                ))
+
+        if options['vacuum']:
+            self.stdout.write("Compactando banco principal...")
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:00
+
+import django.db.models.deletion
+import lancamentos.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompraArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField(verbose_name='Loja')),
+                ('fornecedor_id', models.BigIntegerField()),
+                ('fornecedor_nome', models.CharField(max_length=100, verbose_name='🏪 Fornecedor')),
+                ('descricao', models.CharField(max_length=200, verbose_name='📝 Descrição')),
+                ('valor_total', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='💰 Valor Total')),
+                ('data_compra', models.DateField(verbose_name='📅 Data da Compra')),
+                ('forma_pagamento', models.CharField(max_length=10, verbose_name='💳 Forma de Pagamento')),
+                ('cartao_credito_id', models.BigIntegerField(blank=True, null=True)),
+                ('cartao_nome', models.CharField(blank=True, max_length=50, verbose_name='💳 Cartão de Crédito')),
+                ('parcelas', models.IntegerField(default=1, verbose_name='🔄 Parcelas')),
+                ('observacoes', models.TextField(blank=True, verbose_name='📋 Observações')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': '🗄️ Compra Arquivada',
+                'verbose_name_plural': '🗄️ Compras Arquivadas',
+                'ordering': ['-data_compra', '-created_at'],
+                'indexes': [models.Index(fields=['loja_id', 'data_compra'], name='compra_arq_loja_data_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LancamentoArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('loja_id', models.BigIntegerField(verbose_name='Loja')),
+                ('data', models.DateField(verbose_name='📅 Data')),
+                ('pix', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='📱 PIX')),
+                ('dinheiro', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='💵 Dinheiro')),
+                ('cartao_debito', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='💳 Cartão Débito')),
+                ('cartao_credito', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='🔄 Cartão Crédito')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': '🗄️ Lançamento Arquivado',
+                'verbose_name_plural': '🗄️ Lançamentos Arquivados',
+                'ordering': ['-data'],
+                'constraints': [models.UniqueConstraint(fields=('loja_id', 'data'), name='lancamento_arq_loja_data_unico')],
+            },
+            bases=(lancamentos.models.TotaisVendasMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ParcelaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('numero_parcela', models.IntegerField(verbose_name='Nº Parcela')),
+                ('valor_parcela', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor da Parcela')),
+                ('data_vencimento', models.DateField(verbose_name='Data Vencimento')),
+                ('paga', models.BooleanField(default=False, verbose_name='Paga')),
+                ('data_pagamento', models.DateField(blank=True, null=True, verbose_name='Data Pagamento')),
+                ('compra', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parcelas_detalhadas', to='arquivo.compraarquivada')),
+            ],
+            options={
+                'verbose_name': '🗄️ Parcela Arquivada',
+                'verbose_name_plural': '🗄️ Parcelas Arquivadas',
+                'ordering': ['compra', 'numero_parcela'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumoArquivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField(verbose_name='Ano')),
+                ('mes', models.IntegerField(verbose_name='Mês')),
+                ('total_pix', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_dinheiro', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_debito', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_credito', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('dias_com_venda', models.IntegerField(default=0)),
+                ('total_compras', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_compras_vista', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_compras_credito', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('qtd_compras', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='resumos_arquivados', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '🗄️ Resumo Arquivado',
+                'verbose_name_plural': '🗄️ Resumos Arquivados',
+                'ordering': ['-ano', '-mes'],
+                'constraints': [models.UniqueConstraint(fields=('loja', 'ano', 'mes'), name='resumo_arq_loja_mes_unico')],
+            },
+        ),
+    ]
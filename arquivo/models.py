@@ -0,0 +1,131 @@
+from django.db import models
+
+from compras.models import Compra
+from lancamentos.models import TotaisVendasMixin
+from lojas.models import Loja
+
+# Os três primeiros modelos ficam em arquivo.sqlite3 (ver arquivo.roteador).
+# Como não há chave estrangeira entre bancos, loja/fornecedor/cartão são
+# guardados como ids, junto com o nome da época para exibição.
+
+
+class LancamentoArquivado(TotaisVendasMixin, models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField(verbose_name="Loja")
+    data = models.DateField(verbose_name="📅 Data")
+    pix = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="📱 PIX")
+    dinheiro = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="💵 Dinheiro")
+    cartao_debito = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="💳 Cartão Débito")
+    cartao_credito = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="🔄 Cartão Crédito")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "🗄️ Lançamento Arquivado"
+        verbose_name_plural = "🗄️ Lançamentos Arquivados"
+        ordering = ['-data']
+        constraints = [
+            models.UniqueConstraint(fields=['loja_id', 'data'], name='lancamento_arq_loja_data_unico'),
+        ]
+
+    def __str__(self):
+        return f"Vendas do dia {self.data.strftime('%d/%m/%Y')} (arquivado)"
+
+
+class CompraArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    loja_id = models.BigIntegerField(verbose_name="Loja")
+    fornecedor_id = models.BigIntegerField()
+    fornecedor_nome = models.CharField(max_length=100, verbose_name="🏪 Fornecedor")
+    descricao = models.CharField(max_length=200, verbose_name="📝 Descrição")
+    valor_total = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="💰 Valor Total")
+    data_compra = models.DateField(verbose_name="📅 Data da Compra")
+    forma_pagamento = models.CharField(max_length=10, verbose_name="💳 Forma de Pagamento")
+    cartao_credito_id = models.BigIntegerField(blank=True, null=True)
+    cartao_nome = models.CharField(max_length=50, blank=True, verbose_name="💳 Cartão de Crédito")
+    parcelas = models.IntegerField(default=1, verbose_name="🔄 Parcelas")
+    observacoes = models.TextField(blank=True, verbose_name="📋 Observações")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "🗄️ Compra Arquivada"
+        verbose_name_plural = "🗄️ Compras Arquivadas"
+        ordering = ['-data_compra', '-created_at']
+        indexes = [
+            models.Index(fields=['loja_id', 'data_compra'], name='compra_arq_loja_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fornecedor_nome} - {self.descricao[:50]} - R$ {self.valor_total} (arquivada)"
+
+    # Mesma interface da Compra usada pela lista de compras
+    arquivada = True
+
+    def get_forma_pagamento_display(self):
+        return dict(Compra.FORMA_PAGAMENTO_CHOICES).get(self.forma_pagamento, self.forma_pagamento)
+
+    def sai_saldo_imediato(self):
+        return self.forma_pagamento != 'credito'
+
+    @property
+    def valor_parcela(self):
+        if self.forma_pagamento == 'credito' and self.parcelas > 1:
+            return self.valor_total / self.parcelas
+        return self.valor_total
+
+
+class ParcelaArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    compra = models.ForeignKey(
+        CompraArquivada,
+        on_delete=models.CASCADE,
+        related_name='parcelas_detalhadas'
+    )
+    numero_parcela = models.IntegerField(verbose_name="Nº Parcela")
+    valor_parcela = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor da Parcela")
+    data_vencimento = models.DateField(verbose_name="Data Vencimento")
+    paga = models.BooleanField(default=False, verbose_name="Paga")
+    data_pagamento = models.DateField(blank=True, null=True, verbose_name="Data Pagamento")
+
+    class Meta:
+        verbose_name = "🗄️ Parcela Arquivada"
+        verbose_name_plural = "🗄️ Parcelas Arquivadas"
+        ordering = ['compra', 'numero_parcela']
+
+
+class ResumoArquivado(models.Model):
+    """Totais mensais dos períodos arquivados (fica no banco principal)"""
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.PROTECT,
+        related_name='resumos_arquivados',
+        verbose_name="🏬 Loja"
+    )
+    ano = models.IntegerField(verbose_name="Ano")
+    mes = models.IntegerField(verbose_name="Mês")
+    total_pix = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_dinheiro = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_debito = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_credito = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    dias_com_venda = models.IntegerField(default=0)
+    total_compras = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_compras_vista = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_compras_credito = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    qtd_compras = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "🗄️ Resumo Arquivado"
+        verbose_name_plural = "🗄️ Resumos Arquivados"
+        ordering = ['-ano', '-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['loja', 'ano', 'mes'], name='resumo_arq_loja_mes_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:02d}/{self.ano}"
+
+    @property
+    def total_vendas(self):
+        return self.total_pix + self.total_dinheiro + self.total_debito + self.total_credito
@@ -0,0 +1,30 @@
+# Modelos guardados no banco frio (settings.DATABASES['arquivo'])
+MODELOS_ARQUIVO = {'lancamentoarquivado', 'compraarquivada', 'parcelaarquivada'}
+
+
+def _no_arquivo(model):
+    return model._meta.app_label == 'arquivo' and model._meta.model_name in MODELOS_ARQUIVO
+
+
+class RoteadorArquivo:
+    """Envia os anos arquivados para arquivo.sqlite3; todo o resto fica no banco principal"""
+
+    def db_for_read(self, model, **hints):
+        return 'arquivo' if _no_arquivo(model) else None
+
+    def db_for_write(self, model, **hints):
+        return 'arquivo' if _no_arquivo(model) else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if _no_arquivo(obj1) and _no_arquivo(obj2):
+            return True
+        if _no_arquivo(obj1) or _no_arquivo(obj2):
+            return False
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'arquivo' and model_name in MODELOS_ARQUIVO:
+            return db == 'arquivo'
+        if db == 'arquivo':
+            return False
+        return None
@@ -0,0 +1,199 @@
+from datetime import date
+
+from django.db import connections, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth
+from django.utils import timezone
+
+from auditoria.registro import entrada, registrar
+from compras.models import Compra, ParcelaCompra
+from lancamentos.models import Lancamento
+from lancamentos.services import CAMPOS_VALOR, invalidar_resumo_mensal
+
+from .models import CompraArquivada, LancamentoArquivado, ParcelaArquivada, ResumoArquivado
+
+TAMANHO_LOTE = 500
+
+
+def arquivo_pronto():
+    """Verifica se as tabelas do banco de arquivo já foram criadas"""
+    tabelas = connections['arquivo'].introspection.table_names()
+    return LancamentoArquivado._meta.db_table in tabelas
+
+
+def _lotes(queryset):
+    """Percorre o queryset em lotes por pk (sem OFFSET, estável enquanto apagamos)"""
+    ultimo = 0
+    while True:
+        lote = list(queryset.filter(pk__gt=ultimo).order_by('pk')[:TAMANHO_LOTE])
+        if not lote:
+            return
+        yield lote
+        ultimo = lote[-1].pk
+
+
+def _arquivar_lancamentos(lancamentos):
+    """Copia os lançamentos para o arquivo e só então os apaga do banco principal.
+
+    Um dia que já estava no arquivo não é descartado: se é o mesmo registro
+    (arquivamento interrompido antes de apagar), a cópia é refeita; se é um
+    lançamento criado depois do arquivamento, os valores são somados ao dia.
+    """
+    total = 0
+    for lote in _lotes(lancamentos):
+        with transaction.atomic(using='arquivo'):
+            existentes = {
+                (a.loja_id, a.data): a
+                for a in LancamentoArquivado.objects.filter(
+                    loja_id__in={l.loja_id for l in lote}, data__in={l.data for l in lote}
+                )
+            }
+            novos, alterados = [], []
+            for l in lote:
+                arquivado = existentes.get((l.loja_id, l.data))
+                if arquivado is None:
+                    novos.append(LancamentoArquivado(
+                        id=l.pk, loja_id=l.loja_id, data=l.data,
+                        pix=l.pix, dinheiro=l.dinheiro,
+                        cartao_debito=l.cartao_debito, cartao_credito=l.cartao_credito,
+                        created_at=l.created_at, updated_at=l.updated_at,
+                    ))
+                    continue
+                for campo in CAMPOS_VALOR:
+                    valor = getattr(l, campo)
+                    setattr(arquivado, campo, valor if arquivado.pk == l.pk else getattr(arquivado, campo) + valor)
+                arquivado.updated_at = max(arquivado.updated_at, l.updated_at)
+                alterados.append(arquivado)
+            LancamentoArquivado.objects.bulk_create(novos)
+            LancamentoArquivado.objects.bulk_update(alterados, [*CAMPOS_VALOR, 'updated_at'])
+        # Só apaga do banco principal depois da cópia confirmada no arquivo
+        with transaction.atomic():
+            Lancamento.objects.filter(pk__in=[l.pk for l in lote]).delete()
+            registrar([entrada(Lancamento, l.pk, l.loja_id, 'arquivado', {}) for l in lote])
+        total += len(lote)
+    if total:
+        invalidar_resumo_mensal()
+    return total
+
+
+CAMPOS_COMPRA = [
+    'loja_id', 'fornecedor_id', 'fornecedor_nome', 'descricao', 'valor_total', 'data_compra',
+    'forma_pagamento', 'cartao_credito_id', 'cartao_nome', 'parcelas', 'observacoes',
+    'created_at', 'updated_at',
+]
+CAMPOS_PARCELA = ['compra_id', 'numero_parcela', 'valor_parcela', 'data_vencimento', 'paga', 'data_pagamento']
+
+
+def _arquivar_compras(compras):
+    """Copia as compras (com as parcelas) para o arquivo e as apaga do banco principal.
+
+    Uma compra já arquivada com o mesmo id (arquivamento interrompido antes
+    de apagar) é sobrescrita com a versão atual, junto com as parcelas.
+    """
+    compras = compras.select_related('fornecedor', 'cartao_credito').prefetch_related('parcelas_detalhadas')
+    total = 0
+    for lote in _lotes(compras):
+        with transaction.atomic(using='arquivo'):
+            CompraArquivada.objects.bulk_create([
+                CompraArquivada(
+                    id=c.pk, loja_id=c.loja_id,
+                    fornecedor_id=c.fornecedor_id, fornecedor_nome=c.fornecedor.nome,
+                    descricao=c.descricao, valor_total=c.valor_total,
+                    data_compra=c.data_compra, forma_pagamento=c.forma_pagamento,
+                    cartao_credito_id=c.cartao_credito_id,
+                    cartao_nome=c.cartao_credito.nome if c.cartao_credito else '',
+                    parcelas=c.parcelas, observacoes=c.observacoes,
+                    created_at=c.created_at, updated_at=c.updated_at,
+                )
+                for c in lote
+            ], update_conflicts=True, unique_fields=['id'], update_fields=CAMPOS_COMPRA)
+            parcelas = [
+                ParcelaArquivada(
+                    id=p.pk, compra_id=c.pk, numero_parcela=p.numero_parcela,
+                    valor_parcela=p.valor_parcela, data_vencimento=p.data_vencimento,
+                    paga=p.paga, data_pagamento=p.data_pagamento,
+                )
+                for c in lote for p in c.parcelas_detalhadas.all()
+            ]
+            # Parcelas refeitas desde a cópia anterior não podem ficar em dobro
+            ParcelaArquivada.objects.filter(compra_id__in=[c.pk for c in lote]).exclude(
+                pk__in=[p.pk for p in parcelas]
+            ).delete()
+            ParcelaArquivada.objects.bulk_create(
+                parcelas, update_conflicts=True, unique_fields=['id'], update_fields=CAMPOS_PARCELA
+            )
+        with transaction.atomic():
+            Compra.objects.filter(pk__in=[c.pk for c in lote]).delete()
+            registrar(
+                [entrada(Compra, c.pk, c.loja_id, 'arquivado', {}) for c in lote]
+                + [entrada(ParcelaCompra, p.pk, c.loja_id, 'arquivado', {})
+                   for c in lote for p in c.parcelas_detalhadas.all()]
+            )
+        total += len(lote)
+    return total
+
+
+def atualizar_resumo(loja, ano):
+    """Recalcula os totais mensais a partir do arquivo (pode ser repetido sem duplicar)"""
+    vendas = (
+        LancamentoArquivado.objects
+        .filter(loja_id=loja.pk, data__year=ano)
+        .annotate(mes=ExtractMonth('data'))
+        .values('mes')
+        .annotate(
+            total_pix=Sum('pix'),
+            total_dinheiro=Sum('dinheiro'),
+            total_debito=Sum('cartao_debito'),
+            total_credito=Sum('cartao_credito'),
+            dias_com_venda=Count('id'),
+        )
+    )
+    compras = (
+        CompraArquivada.objects
+        .filter(loja_id=loja.pk, data_compra__year=ano)
+        .annotate(mes=ExtractMonth('data_compra'))
+        .values('mes')
+        .annotate(
+            total_compras=Sum('valor_total'),
+            total_compras_vista=Sum('valor_total', filter=~Q(forma_pagamento='credito')),
+            total_compras_credito=Sum('valor_total', filter=Q(forma_pagamento='credito')),
+            qtd_compras=Count('id'),
+        )
+    )
+
+    por_mes = {}
+    for linha in list(vendas) + list(compras):
+        por_mes.setdefault(linha.pop('mes'), {}).update(
+            {campo: valor or 0 for campo, valor in linha.items()}
+        )
+
+    with transaction.atomic():
+        for mes, valores in por_mes.items():
+            ResumoArquivado.objects.update_or_create(loja=loja, ano=ano, mes=mes, defaults=valores)
+    return len(por_mes)
+
+
+def arquivar_ano(loja, ano):
+    """Move um ano encerrado da loja para o banco de arquivo.
+
+    Compras com parcelas ainda em aberto continuam no banco principal e são
+    arquivadas numa próxima execução, depois de quitadas.
+    """
+    if ano >= timezone.localdate().year:
+        raise ValueError("Só é possível arquivar anos já encerrados.")
+
+    inicio, fim = date(ano, 1, 1), date(ano, 12, 31)
+    lancamentos = Lancamento.objects.filter(loja=loja, data__range=(inicio, fim))
+    compras = Compra.objects.filter(loja=loja, data_compra__range=(inicio, fim)).exclude(
+        parcelas_detalhadas__paga=False
+    )
+
+    resultado = {
+        'lancamentos': _arquivar_lancamentos(lancamentos),
+        'compras': _arquivar_compras(compras),
+    }
+    resultado['meses'] = atualizar_resumo(loja, ano)
+    resultado['compras_em_aberto'] = Compra.objects.filter(
+        loja=loja, data_compra__range=(inicio, fim)
+    ).count()
+    return resultado
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from compras.models import CartaoCredito, Compra, Fornecedor, ParcelaCompra
+from lancamentos.models import Lancamento
+from lancamentos.services import registrar_vendas
+from lojas.models import loja_padrao
+
+from .consultas import anos_arquivados, dias_arquivados, periodo_todo_arquivado, verificar_dias_abertos
+from .models import CompraArquivada, LancamentoArquivado, ParcelaArquivada
+from .services import arquivar_ano
+
+
+class ArquivarAnoTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        self.cartao = CartaoCredito.objects.create(loja=self.loja, nome='Nubank')
+
+    def _compra_paga(self, valor='90'):
+        compra = Compra.objects.create(
+            loja=self.loja, fornecedor=self.fornecedor, descricao='Mercadoria', valor_total=Decimal(valor),
+            data_compra=date(2023, 5, 10), forma_pagamento='credito', cartao_credito=self.cartao, parcelas=3
+        )
+        compra.parcelas_detalhadas.update(paga=True, data_pagamento=date(2023, 8, 10))
+        return compra
+
+    def test_move_o_ano_para_o_arquivo(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2023, 5, 10), pix=Decimal('10'))
+        compra = self._compra_paga()
+
+        resultado = arquivar_ano(self.loja, 2023)
+
+        self.assertEqual((resultado['lancamentos'], resultado['compras']), (1, 1))
+        self.assertFalse(Lancamento.objects.exists())
+        self.assertFalse(Compra.objects.exists())
+        self.assertEqual(LancamentoArquivado.objects.get().pix, Decimal('10.00'))
+        self.assertEqual(ParcelaArquivada.objects.filter(compra_id=compra.pk).count(), 3)
+
+    def test_rearquivar_dia_soma_sem_perder_vendas(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2023, 5, 10), pix=Decimal('10'))
+        arquivar_ano(self.loja, 2023)
+        # Venda do mesmo dia lançada depois do arquivamento
+        Lancamento.objects.create(loja=self.loja, data=date(2023, 5, 10), pix=Decimal('5'), dinheiro=Decimal('3'))
+
+        resultado = arquivar_ano(self.loja, 2023)
+
+        arquivado = LancamentoArquivado.objects.get()
+        self.assertEqual(resultado['lancamentos'], 1)
+        self.assertEqual((arquivado.pix, arquivado.dinheiro), (Decimal('15.00'), Decimal('3.00')))
+        self.assertFalse(Lancamento.objects.exists())
+
+    def test_rearquivar_compra_interrompida_sobrescreve_a_copia(self):
+        compra = self._compra_paga()
+        parcelas = list(compra.parcelas_detalhadas.order_by('numero_parcela'))
+        # Cópia antiga deixada por um arquivamento que parou antes de apagar
+        agora = timezone.now() - timedelta(days=1)
+        CompraArquivada.objects.create(
+            id=compra.pk, loja_id=self.loja.pk, fornecedor_id=self.fornecedor.pk, fornecedor_nome='Antigo',
+            descricao='Antiga', valor_total=Decimal('50'), data_compra=compra.data_compra,
+            forma_pagamento='credito', parcelas=1, created_at=agora, updated_at=agora,
+        )
+        ParcelaArquivada.objects.create(
+            id=parcelas[-1].pk + 100, compra_id=compra.pk, numero_parcela=1, valor_parcela=Decimal('50'),
+            data_vencimento=date(2023, 6, 10), paga=True,
+        )
+
+        resultado = arquivar_ano(self.loja, 2023)
+
+        arquivada = CompraArquivada.objects.get()
+        self.assertEqual(resultado['compras'], 1)
+        self.assertEqual((arquivada.valor_total, arquivada.fornecedor_nome), (Decimal('90.00'), 'Atacadão'))
+        self.assertEqual(
+            sorted(ParcelaArquivada.objects.values_list('pk', flat=True)), [p.pk for p in parcelas]
+        )
+        self.assertFalse(ParcelaCompra.objects.exists())
+
+
+class AnosArquivadosTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def test_arquivar_um_ano_nao_fecha_os_anteriores(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2022, 5, 2), pix=Decimal('10'))
+        Lancamento.objects.create(loja=self.loja, data=date(2024, 5, 2), pix=Decimal('20'))
+
+        arquivar_ano(self.loja, 2024)
+
+        self.assertEqual(anos_arquivados(self.loja), {2024})
+        self.assertEqual(dias_arquivados(self.loja, [date(2022, 5, 2), date(2024, 5, 2)]), [date(2024, 5, 2)])
+        registrar_vendas(self.loja, [{'forma': 'pix', 'valor': '5', 'data': '2022-05-02'}])
+        self.assertEqual(Lancamento.objects.get(data=date(2022, 5, 2)).pix, Decimal('15.00'))
+        with self.assertRaises(ValidationError):
+            verificar_dias_abertos(self.loja, [date(2024, 5, 2)])
+
+    def test_periodo_so_e_todo_arquivado_se_todos_os_anos_estiverem_no_arquivo(self):
+        for ano in (2022, 2024):
+            Lancamento.objects.create(loja=self.loja, data=date(ano, 5, 2), pix=Decimal('10'))
+        arquivar_ano(self.loja, 2024)
+
+        self.assertTrue(periodo_todo_arquivado(self.loja, '2024-01-01', '2024-12-31'))
+        self.assertFalse(periodo_todo_arquivado(self.loja, '2022-01-01', '2022-12-31'))
+        self.assertFalse(periodo_todo_arquivado(self.loja, '2022-01-01', '2024-12-31'))
+        self.assertFalse(periodo_todo_arquivado(self.loja, None, '2024-12-31'))
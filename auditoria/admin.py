@@ -0,0 +1,41 @@
+from django.contrib import admin
+
+from .models import RegistroAuditoria
+from .registro import lote
+
+
+class ExclusaoAuditadaMixin:
+    """A ação "excluir selecionados" apaga um a um: o delete() do modelo
+    registra a auditoria (e ajusta o que depende do registro apagado).
+
+    `exclusao_select_related` traz junto o que o delete() lê de outra
+    tabela (a loja da parcela vem da compra), sem uma consulta por linha.
+    """
+    exclusao_select_related = ()
+
+    def delete_queryset(self, request, queryset):
+        if self.exclusao_select_related:
+            queryset = queryset.select_related(*self.exclusao_select_related)
+        with lote():
+            for obj in queryset:
+                obj.delete()
+
+
+@admin.register(RegistroAuditoria)
+class RegistroAuditoriaAdmin(admin.ModelAdmin):
+    list_display = ['criado_em', 'acao', 'modelo', 'objeto_id', 'usuario', 'loja']
+    list_filter = ['acao', 'modelo', 'loja']
+    list_select_related = ['usuario', 'loja']
+    search_fields = ['=objeto_id']
+    date_hierarchy = 'criado_em'
+    readonly_fields = [f.name for f in RegistroAuditoria._meta.fields]
+
+    # Trilha somente de inclusão
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
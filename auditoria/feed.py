@@ -0,0 +1,106 @@
+"""Feed de alterações para sincronizar a planilha da contabilidade e o BI.
+
+O cursor é o id do RegistroAuditoria: a trilha só recebe INSERT, então
+tudo o que mudou depois de um cursor tem id maior que ele. Cada página
+junta os registros de um mesmo objeto e entrega o estado atual dele (ou
+só a exclusão), lido com uma consulta por modelo.
+"""
+from collections import defaultdict
+
+from compras.models import Compra, ParcelaCompra
+from lancamentos.models import Lancamento
+
+from .models import RegistroAuditoria
+
+LIMITE_PADRAO = 1000
+LIMITE_MAXIMO = 5000
+
+# Ações depois das quais a linha não está mais no banco principal
+SAIDAS = {'exclusao', 'arquivado'}
+
+# modelo -> (classe, filtro da loja, campos entregues)
+FEED = {
+    'lancamentos.lancamento': (
+        Lancamento, 'loja_id',
+        ['id', 'data', 'pix', 'dinheiro', 'cartao_debito', 'cartao_credito', 'updated_at'],
+    ),
+    'compras.compra': (
+        Compra, 'loja_id',
+        ['id', 'fornecedor_id', 'fornecedor__nome', 'descricao', 'valor_total', 'data_compra',
+         'forma_pagamento', 'cartao_credito_id', 'parcelas', 'updated_at'],
+    ),
+    'compras.parcelacompra': (
+        ParcelaCompra, 'compra__loja_id',
+        ['id', 'compra_id', 'numero_parcela', 'valor_parcela', 'data_vencimento', 'paga',
+         'data_pagamento', 'updated_at'],
+    ),
+}
+
+
+def cursor_atual(loja):
+    """Cursor do último registro da loja (ponto de partida depois da carga inicial)"""
+    return RegistroAuditoria.objects.filter(loja=loja).order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def alteracoes(loja, cursor=0, limite=LIMITE_PADRAO):
+    """Uma página do feed: {'cursor': ..., 'mais': bool, 'alteracoes': [...]}.
+
+    Cada alteração é {'modelo', 'id', 'excluido', 'arquivado', 'dados'}; o
+    cliente grava `dados` por id (ou apaga, se excluído) e pede a próxima
+    página com o cursor devolvido. Linhas movidas para o banco de arquivo
+    chegam como excluídas, com 'arquivado': True.
+    """
+    if cursor < 0:
+        raise ValueError("O cursor não pode ser negativo.")
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f"O limite deve ficar entre 1 e {LIMITE_MAXIMO}.")
+
+    registros = list(
+        RegistroAuditoria.objects.filter(loja=loja, modelo__in=list(FEED), pk__gt=cursor)
+        .order_by('pk').values_list('pk', 'modelo', 'objeto_id', 'acao')[:limite + 1]
+    )
+    mais = len(registros) > limite
+    registros = registros[:limite]
+
+    # Último registro de cada objeto, na ordem em que aconteceu
+    ultimos = {}
+    for pk, modelo, objeto_id, acao in registros:
+        ultimos.pop((modelo, objeto_id), None)
+        ultimos[(modelo, objeto_id)] = acao
+
+    ids = defaultdict(list)
+    for (modelo, objeto_id), acao in ultimos.items():
+        if acao not in SAIDAS:
+            ids[modelo].append(objeto_id)
+    atuais = {}
+    for modelo, lista in ids.items():
+        classe, filtro_loja, campos = FEED[modelo]
+        for linha in classe.objects.filter(pk__in=lista, **{filtro_loja: loja.pk}).values(*campos):
+            atuais[(modelo, linha['id'])] = linha
+
+    itens = []
+    for (modelo, objeto_id), acao in ultimos.items():
+        if acao in SAIDAS:
+            itens.append({
+                'modelo': modelo, 'id': objeto_id, 'excluido': True, 'arquivado': acao == 'arquivado', 'dados': None
+            })
+        elif (modelo, objeto_id) in atuais:
+            itens.append({
+                'modelo': modelo, 'id': objeto_id, 'excluido': False, 'arquivado': False,
+                'dados': atuais[(modelo, objeto_id)],
+            })
+        # Sem a linha: saiu depois (a exclusão ou o arquivamento vem numa página seguinte)
+
+    return {
+        'cursor': registros[-1][0] if registros else cursor,
+        'mais': mais,
+        'alteracoes': itens,
+    }
+
+
+def carga_inicial(loja):
+    """(modelo, dados) de todas as linhas atuais da loja, sem carregar tudo na memória"""
+    for modelo, (classe, filtro_loja, campos) in FEED.items():
+        linhas = classe.objects.filter(**{filtro_loja: loja.pk}).order_by('pk').values(*campos)
+        for linha in linhas.iterator(chunk_size=2000):
+            yield modelo, linha
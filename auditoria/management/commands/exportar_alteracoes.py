@@ -0,0 +1,56 @@
+import gzip
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from auditoria.feed import LIMITE_MAXIMO, alteracoes, carga_inicial, cursor_atual
+from lojas.models import Loja
+
+
+class Command(BaseCommand):
+    help = ("Exporta em JSON Lines o que mudou em lançamentos, compras e parcelas depois de um "
+            "cursor (ou tudo, com --inicial) e informa o cursor para a próxima sincronização")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loja', type=int, required=True, help="Id da loja")
+        parser.add_argument('--cursor', type=int, default=0, help="Cursor da última sincronização (padrão: 0)")
+        parser.add_argument('--inicial', action='store_true',
+                            help="Exporta todas as linhas atuais em vez das alterações")
+        parser.add_argument('--saida', help="Arquivo de saída (comprimido se terminar em .gz; padrão: stdout)")
+
+    def handle(self, *args, **options):
+        loja = Loja.objects.get(pk=options['loja'])
+        saida = options['saida']
+        if saida is None:
+            arquivo = sys.stdout
+        elif saida.endswith('.gz'):
+            arquivo = gzip.open(saida, 'wt', encoding='utf-8')
+        else:
+            arquivo = open(saida, 'w', encoding='utf-8')
+
+        def escrever(item):
+            arquivo.write(json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+
+        linhas = 0
+        try:
+            if options['inicial']:
+                # Lido antes da carga: o que mudar durante ela volta na próxima sincronização
+                cursor = cursor_atual(loja)
+                for modelo, dados in carga_inicial(loja):
+                    escrever({'modelo': modelo, 'id': dados['id'], 'excluido': False, 'arquivado': False, 'dados': dados})
+                    linhas += 1
+            else:
+                cursor, mais = options['cursor'], True
+                while mais:
+                    pagina = alteracoes(loja, cursor, LIMITE_MAXIMO)
+                    for item in pagina['alteracoes']:
+                        escrever(item)
+                    linhas += len(pagina['alteracoes'])
+                    cursor, mais = pagina['cursor'], pagina['mais']
+        finally:
+            if arquivo is not sys.stdout:
+                arquivo.close()
+
+        self.stderr.write(self.style.SUCCESS(f"{linhas} linha(s); próximo cursor: {cursor}"))
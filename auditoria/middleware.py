@@ -0,0 +1,12 @@
+from .registro import usuario
+
+
+class AuditoriaMiddleware:
+    """Atribui ao usuário logado os registros de auditoria gravados na requisição"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with usuario(lambda: getattr(request, 'user', None)):
+            return self.get_response(request)
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:15
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('lojas', '0002_loja_principal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(help_text='Ex: compras.compra', max_length=50, verbose_name='Modelo')),
+                ('objeto_id', models.BigIntegerField(verbose_name='ID do registro')),
+                ('acao', models.CharField(choices=[('criacao', '➕ Criação'), ('alteracao', '✏️ Alteração'), ('exclusao', '🗑️ Exclusão')], max_length=10, verbose_name='Ação')),
+                ('alteracoes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='{campo: [antes, depois]}', verbose_name='Alterações')),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Quando')),
+                ('loja', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='lojas.loja', verbose_name='🏬 Loja')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='👤 Usuário')),
+            ],
+            options={
+                'verbose_name': '🕵️ Registro de Auditoria',
+                'verbose_name_plural': '🕵️ Auditoria',
+                'ordering': ['-criado_em', '-pk'],
+                'indexes': [models.Index(fields=['modelo', 'objeto_id', 'criado_em'], name='auditoria_objeto_idx'), models.Index(fields=['loja', 'criado_em'], name='auditoria_loja_idx')],
+            },
+        ),
+    ]
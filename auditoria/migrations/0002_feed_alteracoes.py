@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0001_initial'),
+        ('lojas', '0002_loja_principal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['loja', 'id'], name='auditoria_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0002_feed_alteracoes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registroauditoria',
+            name='acao',
+            field=models.CharField(choices=[('criacao', '➕ Criação'), ('alteracao', '✏️ Alteração'), ('exclusao', '🗑️ Exclusão'), ('arquivado', '🗄️ Arquivamento')], max_length=10, verbose_name='Ação'),
+        ),
+    ]
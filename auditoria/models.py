@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from lojas.models import Loja
+
+
+class RegistroAuditoria(models.Model):
+    """Criação, alteração ou exclusão de um registro auditado, com os campos que mudaram.
+
+    Só recebe INSERT, na mesma transação da alteração; nada aqui é editado
+    ou apagado. 'arquivado' marca a linha que saiu do banco principal para
+    o banco de arquivo (ver arquivo.services).
+    """
+    ACAO_CHOICES = [
+        ('criacao', '➕ Criação'),
+        ('alteracao', '✏️ Alteração'),
+        ('exclusao', '🗑️ Exclusão'),
+        ('arquivado', '🗄️ Arquivamento'),
+    ]
+
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="🏬 Loja"
+    )
+    modelo = models.CharField(max_length=50, verbose_name="Modelo", help_text="Ex: compras.compra")
+    objeto_id = models.BigIntegerField(verbose_name="ID do registro")
+    acao = models.CharField(max_length=10, choices=ACAO_CHOICES, verbose_name="Ação")
+    alteracoes = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        default=dict,
+        verbose_name="Alterações",
+        help_text="{campo: [antes, depois]}"
+    )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="👤 Usuário"
+    )
+    criado_em = models.DateTimeField(default=timezone.now, verbose_name="Quando")
+
+    class Meta:
+        verbose_name = "🕵️ Registro de Auditoria"
+        verbose_name_plural = "🕵️ Auditoria"
+        ordering = ['-criado_em', '-pk']
+        indexes = [
+            # Histórico de um registro
+            models.Index(fields=['modelo', 'objeto_id', 'criado_em'], name='auditoria_objeto_idx'),
+            models.Index(fields=['loja', 'criado_em'], name='auditoria_loja_idx'),
+            # Feed de alterações: registros da loja depois de um cursor
+            models.Index(fields=['loja', 'id'], name='auditoria_feed_idx'),
+            # Exclusões depois de um cursor (o analítico apaga só o que saiu)
+            models.Index(
+                fields=['modelo', 'id'], condition=models.Q(acao='exclusao'), name='auditoria_exclusoes_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_acao_display()} {self.modelo} #{self.objeto_id}"
@@ -0,0 +1,182 @@
+"""Registro de auditoria gravado na mesma transação da alteração.
+
+Cada criação, alteração ou exclusão vira um RegistroAuditoria, gravado
+com bulk_create dentro da transação que mudou os dados: se ela for
+desfeita (inclusive só um savepoint), o registro some junto; se confirmar,
+os dois chegam juntos ao banco. Dentro de `lote()`, os registros do bloco
+(e dos lotes abertos dentro dele) esperam o fim dele e saem num único
+INSERT, ainda antes do commit.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
+from .models import RegistroAuditoria
+
+# (registros pendentes, profundidade de savepoints do bloco)
+_lote = ContextVar('auditoria_lote', default=None)
+_usuario = ContextVar('auditoria_usuario', default=None)
+
+# Mantidos pelo próprio sistema: mudam sem ninguém ter alterado o registro
+IGNORADOS = {'id', 'created_at', 'updated_at', 'saldo_devedor', 'nome_normalizado'}
+
+
+def valores(instancia):
+    """Campos carregados da instância (os adiados ficam de fora, sem consulta extra)"""
+    dados = instancia.__dict__
+    return {
+        campo.attname: dados[campo.attname]
+        for campo in instancia._meta.concrete_fields
+        if campo.attname in dados and campo.attname not in IGNORADOS
+    }
+
+
+def diferencas(antes, depois):
+    """{campo: [antes, depois]} dos campos que mudaram"""
+    return {
+        campo: [antes.get(campo), valor]
+        for campo, valor in depois.items()
+        if campo not in antes or antes[campo] != valor
+    }
+
+
+def entrada(modelo, objeto_id, loja_id, acao, alteracoes):
+    """Registro ainda não gravado; `modelo` é a classe ou o rótulo ('compras.compra')"""
+    return RegistroAuditoria(
+        modelo=modelo if isinstance(modelo, str) else modelo._meta.label_lower,
+        objeto_id=objeto_id,
+        loja_id=loja_id,
+        acao=acao,
+        alteracoes=alteracoes,
+    )
+
+
+def criacao(instancia, loja_id):
+    return entrada(type(instancia), instancia.pk, loja_id, 'criacao', diferencas({}, valores(instancia)))
+
+
+def exclusao(instancia, loja_id):
+    return entrada(
+        type(instancia), instancia.pk, loja_id, 'exclusao',
+        {campo: [valor, None] for campo, valor in valores(instancia).items()}
+    )
+
+
+def registrar(entradas):
+    """Grava os registros na transação atual (ou os deixa para o fim do `lote()`)"""
+    entradas = [e for e in entradas if e.acao != 'alteracao' or e.alteracoes]
+    if not entradas:
+        return
+    bloco = _lote.get()
+    # Só espera o lote no nível dele: dentro de um savepoint mais interno, o
+    # registro precisa ser gravado ali para sumir junto se o savepoint for desfeito
+    if bloco is not None and transaction.get_connection().in_atomic_block and _savepoints() == bloco[1]:
+        bloco[0].extend(entradas)
+    else:
+        _gravar(entradas)
+
+
+def _savepoints():
+    # atomic(savepoint=False) empilha None: não cria um nível que possa ser desfeito sozinho
+    return sum(1 for sid in transaction.get_connection().savepoint_ids if sid)
+
+
+def _usuario_id():
+    usuario = _usuario.get()
+    if callable(usuario):
+        usuario = usuario()
+    return usuario.pk if usuario is not None and usuario.is_authenticated else None
+
+
+def _gravar(entradas):
+    usuario_id = _usuario_id()
+    for registro in entradas:
+        registro.usuario_id = usuario_id
+    RegistroAuditoria.objects.bulk_create(entradas, batch_size=1000)
+
+
+@contextmanager
+def lote():
+    """Bloco atômico cujos registros saem num único INSERT no fim, antes do commit.
+
+    Um lote aberto direto dentro de outro entra no buffer dele: o savepoint
+    interno, se desfeito, leva embora só os registros que criou, e tudo sai
+    no INSERT do lote de fora.
+    """
+    externo = _lote.get()
+    # Entre os dois lotes há um savepoint que este não controla: grava no próprio fim
+    if externo is not None and (
+        not transaction.get_connection().in_atomic_block or _savepoints() != externo[1]
+    ):
+        externo = None
+    with transaction.atomic():
+        pendentes = [] if externo is None else externo[0]
+        inicio = len(pendentes)
+        token = _lote.set((pendentes, _savepoints()))
+        try:
+            yield pendentes
+        except BaseException:
+            del pendentes[inicio:]
+            raise
+        finally:
+            _lote.reset(token)
+        if transaction.get_connection().needs_rollback:
+            # Erro engolido ou set_rollback(): o bloco vai ser desfeito
+            del pendentes[inicio:]
+        elif externo is None and pendentes:
+            _gravar(pendentes)
+
+
+@contextmanager
+def usuario(quem):
+    """Atribui a `quem` (um usuário ou uma função que o devolve) os registros do bloco"""
+    token = _usuario.set(quem)
+    try:
+        yield
+    finally:
+        _usuario.reset(token)
+
+
+def historico(instancia):
+    """Registros de auditoria da instância, do mais recente ao mais antigo"""
+    return RegistroAuditoria.objects.filter(
+        modelo=instancia._meta.label_lower, objeto_id=instancia.pk
+    ).select_related('usuario')
+
+
+class Auditado:
+    """Registra criação, alteração (só os campos que mudaram) e exclusão.
+
+    Os valores lidos do banco ficam guardados na instância; o save() compara
+    com eles, sem consulta extra. A loja vem de `loja_auditoria()`.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._auditoria_antes = valores(instancia)
+        return instancia
+
+    def loja_auditoria(self):
+        return self.loja_id
+
+    def save(self, *args, **kwargs):
+        criando = self._state.adding
+        # savepoint=False: dentro de um lote() o registro continua no nível dele
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            depois = valores(self)
+            if criando:
+                acao, antes = 'criacao', {}
+            else:
+                acao, antes = 'alteracao', getattr(self, '_auditoria_antes', {})
+            registrar([entrada(type(self), self.pk, self.loja_auditoria(), acao, diferencas(antes, depois))])
+        self._auditoria_antes = depois
+
+    def delete(self, *args, **kwargs):
+        registro = exclusao(self, self.loja_auditoria())
+        with transaction.atomic(savepoint=False):
+            resultado = super().delete(*args, **kwargs)
+            registrar([registro])
+        return resultado
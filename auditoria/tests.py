@@ -0,0 +1,154 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from arquivo.services import arquivar_ano
+from compras.models import CartaoCredito, Compra, Fornecedor, ParcelaCompra
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+
+from .feed import alteracoes, cursor_atual
+from .models import RegistroAuditoria
+from .registro import historico, lote
+
+
+class RegistroTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        self.cartao = CartaoCredito.objects.create(loja=self.loja, nome='Nubank')
+
+    def _compra(self, **campos):
+        return Compra(
+            loja=self.loja, fornecedor=self.fornecedor, descricao='Mercadoria', valor_total=Decimal('90'),
+            data_compra=date(2025, 3, 10), **campos
+        )
+
+    def test_registro_e_gravado_na_transacao_da_alteracao(self):
+        with transaction.atomic():
+            self.fornecedor.nome = 'Atacadão Centro'
+            self.fornecedor.save()
+            # Já está no banco antes do commit
+            self.assertEqual(historico(self.fornecedor).first().alteracoes, {'nome': ['Atacadão', 'Atacadão Centro']})
+
+    def test_transacao_desfeita_nao_deixa_registro(self):
+        antes = RegistroAuditoria.objects.count()
+        try:
+            with transaction.atomic():
+                self.fornecedor.nome = 'Outro'
+                self.fornecedor.save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(RegistroAuditoria.objects.count(), antes)
+
+    def test_savepoint_desfeito_dentro_do_lote_leva_o_registro(self):
+        with lote():
+            self.fornecedor.contato = 'Maria'
+            self.fornecedor.save()
+            try:
+                with transaction.atomic():
+                    self.cartao.nome = 'Itaú'
+                    self.cartao.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertTrue(historico(self.fornecedor).filter(acao='alteracao').exists())
+        self.assertFalse(historico(self.cartao).filter(acao='alteracao').exists())
+
+    def test_lote_interno_desfeito_leva_so_os_seus_registros(self):
+        with CaptureQueriesContext(connection) as consultas:
+            with lote():
+                self.fornecedor.contato = 'Maria'
+                self.fornecedor.save()
+                try:
+                    with lote():
+                        self.cartao.nome = 'Itaú'
+                        self.cartao.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                with lote():
+                    self._compra(forma_pagamento='pix').save()
+        inserts = [q['sql'] for q in consultas if q['sql'].startswith('INSERT INTO "auditoria_registroauditoria"')]
+
+        self.assertEqual(len(inserts), 1)
+        self.assertTrue(historico(self.fornecedor).filter(acao='alteracao').exists())
+        self.assertFalse(historico(self.cartao).filter(acao='alteracao').exists())
+        self.assertEqual(RegistroAuditoria.objects.filter(acao='criacao', modelo='compras.compra').count(), 1)
+
+    def test_compra_parcelada_grava_auditoria_num_insert(self):
+        compra = self._compra(forma_pagamento='credito', cartao_credito=self.cartao, parcelas=3)
+        with CaptureQueriesContext(connection) as consultas:
+            compra.save()
+        inserts = [q['sql'] for q in consultas if q['sql'].startswith('INSERT INTO "auditoria_registroauditoria"')]
+
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(RegistroAuditoria.objects.filter(acao='criacao', modelo='compras.parcelacompra').count(), 3)
+        self.assertTrue(historico(compra).filter(acao='criacao').exists())
+
+    def test_requisicao_atribui_usuario(self):
+        usuario = User.objects.create_user('auditor', password='senha')
+        self.client.force_login(usuario)
+        resposta = self.client.post(
+            reverse('api_lancamentos_registrar'),
+            data=json.dumps({'itens': [{'forma': 'pix', 'valor': '10', 'data': '2025-03-10'}]}),
+            content_type='application/json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+
+        registro = RegistroAuditoria.objects.get(modelo='lancamentos.lancamento')
+        self.assertEqual(registro.usuario, usuario)
+
+    def test_exclusao_pelo_admin_nao_consulta_a_compra_de_cada_parcela(self):
+        compra = self._compra(forma_pagamento='credito', cartao_credito=self.cartao, parcelas=3)
+        compra.save()
+        modelo_admin = site._registry[ParcelaCompra]
+        with CaptureQueriesContext(connection) as consultas:
+            modelo_admin.delete_queryset(None, ParcelaCompra.objects.filter(compra=compra))
+
+        selects = [q['sql'] for q in consultas if q['sql'].startswith('SELECT') and 'FROM "compras_compra"' in q['sql']]
+        self.assertEqual(selects, [])
+        self.assertEqual(RegistroAuditoria.objects.filter(acao='exclusao', modelo='compras.parcelacompra').count(), 3)
+        self.cartao.refresh_from_db()
+        self.assertEqual(self.cartao.saldo_devedor, 0)
+
+
+class FeedTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def test_alteracoes_entrega_estado_atual_e_exclusoes(self):
+        lancamento = Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('10'))
+        lancamento.pix = Decimal('12')
+        lancamento.save()
+        apagado = Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 11))
+        apagado_id = apagado.pk
+        apagado.delete()
+
+        pagina = alteracoes(self.loja)
+
+        itens = {item['id']: item for item in pagina['alteracoes']}
+        self.assertEqual(len(itens), 2)
+        self.assertEqual(itens[lancamento.pk]['dados']['pix'], Decimal('12.00'))
+        self.assertTrue(itens[apagado_id]['excluido'])
+        self.assertEqual(alteracoes(self.loja, pagina['cursor'])['alteracoes'], [])
+
+    def test_arquivamento_gera_lapide(self):
+        lancamento = Lancamento.objects.create(loja=self.loja, data=date(2023, 3, 10), pix=Decimal('10'))
+        cursor = cursor_atual(self.loja)
+
+        arquivar_ano(self.loja, 2023)
+
+        self.assertEqual(alteracoes(self.loja, cursor)['alteracoes'], [{
+            'modelo': 'lancamentos.lancamento', 'id': lancamento.pk, 'excluido': True, 'arquivado': True, 'dados': None,
+        }])
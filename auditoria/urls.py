@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('api/alteracoes/', views.api_alteracoes, name='api_alteracoes'),
+]
@@ -0,0 +1,21 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.gzip import gzip_page
+
+from .feed import LIMITE_PADRAO, alteracoes
+
+
+@login_required
+@gzip_page
+def api_alteracoes(request):
+    """Ex.: ?cursor=1234&limite=1000; a resposta vai comprimida se o cliente aceitar gzip"""
+    try:
+        cursor = int(request.GET.get('cursor') or 0)
+        limite = int(request.GET.get('limite') or LIMITE_PADRAO)
+    except ValueError:
+        return JsonResponse({'erro': 'Cursor ou limite inválido.'}, status=400)
+    try:
+        pagina = alteracoes(request.loja, cursor, limite)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+    return JsonResponse(pagina)
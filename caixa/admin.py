@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import OperacaoCaixa
+
+
+@admin.register(OperacaoCaixa)
+class OperacaoCaixaAdmin(admin.ModelAdmin):
+    list_display = ['chave', 'tipo', 'loja', 'recebida_em']
+    list_filter = ['tipo', 'loja']
+    list_select_related = ['loja']
+    search_fields = ['chave']
+    readonly_fields = ['loja', 'chave', 'tipo', 'resultado', 'recebida_em']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OperacaoCaixa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, verbose_name='Chave de idempotência')),
+                ('tipo', models.CharField(choices=[('venda', '💰 Venda'), ('compra', '🛒 Compra')], max_length=10, verbose_name='Tipo')),
+                ('resultado', models.JSONField(blank=True, default=dict, verbose_name='Resultado')),
+                ('recebida_em', models.DateTimeField(auto_now_add=True, verbose_name='Recebida em')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operacoes_caixa', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '🧾 Operação do Caixa',
+                'verbose_name_plural': '🧾 Operações do Caixa',
+                'ordering': ['-recebida_em'],
+                'constraints': [models.UniqueConstraint(fields=('loja', 'chave'), name='operacao_caixa_chave_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import models
+
+from lojas.models import Loja
+
+
+class OperacaoCaixa(models.Model):
+    """Operação do caixa offline já aplicada; a chave gerada no navegador torna o reenvio inofensivo"""
+    TIPO_CHOICES = [
+        ('venda', '💰 Venda'),
+        ('compra', '🛒 Compra'),
+    ]
+
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.CASCADE,
+        related_name='operacoes_caixa',
+        verbose_name="🏬 Loja"
+    )
+    chave = models.CharField(max_length=64, verbose_name="Chave de idempotência")
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES, verbose_name="Tipo")
+    resultado = models.JSONField(default=dict, blank=True, verbose_name="Resultado")
+    recebida_em = models.DateTimeField(auto_now_add=True, verbose_name="Recebida em")
+
+    class Meta:
+        verbose_name = "🧾 Operação do Caixa"
+        verbose_name_plural = "🧾 Operações do Caixa"
+        ordering = ['-recebida_em']
+        constraints = [
+            models.UniqueConstraint(fields=['loja', 'chave'], name='operacao_caixa_chave_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.chave}"
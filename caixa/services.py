@@ -0,0 +1,153 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from arquivo.consultas import anos_arquivados, dias_arquivados
+from auditoria.registro import lote
+from compras.models import CartaoCredito, Compra, Fornecedor
+from lancamentos.services import converter_item, registrar_vendas
+
+from .models import OperacaoCaixa
+
+LIMITE_LOTE = 200
+TAMANHO_CHAVE = (8, 64)
+
+FORMAS_COMPRA = {forma for forma, _ in Compra.FORMA_PAGAMENTO_CHOICES}
+PARCELAS_COMPRA = {parcelas for parcelas, _ in Compra.PARCELAS_CHOICES}
+
+
+def validar_lote(operacoes):
+    """Confere a estrutura do lote; erros aqui recusam o lote inteiro"""
+    if not isinstance(operacoes, list) or not operacoes:
+        raise ValidationError('Envie uma lista de operações.')
+    if len(operacoes) > LIMITE_LOTE:
+        raise ValidationError(f'No máximo {LIMITE_LOTE} operações por lote.')
+    for operacao in operacoes:
+        if not isinstance(operacao, dict) or not isinstance(operacao.get('dados'), dict):
+            raise ValidationError('Cada operação deve ter chave, tipo e dados.')
+        chave = operacao.get('chave')
+        if not isinstance(chave, str) or not TAMANHO_CHAVE[0] <= len(chave) <= TAMANHO_CHAVE[1]:
+            raise ValidationError(f'Chave de idempotência inválida: {chave!r}')
+        if operacao.get('tipo') not in ('venda', 'compra'):
+            raise ValidationError(f"Tipo de operação inválido: {operacao.get('tipo')!r}")
+
+
+def _data(valor, rotulo):
+    if not valor:
+        return timezone.localdate()
+    try:
+        return datetime.strptime(str(valor), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError(f'{rotulo} inválida: {valor!r}')
+
+
+def _montar_compra(loja, dados, fornecedores, cartoes):
+    """Compra da operação, ainda não gravada; ValidationError descreve o conflito"""
+    fornecedor = fornecedores.get(str(dados.get('fornecedor')))
+    if fornecedor is None:
+        raise ValidationError('Fornecedor inexistente ou inativo.')
+
+    try:
+        valor = Decimal(str(dados.get('valor_total'))).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        raise ValidationError(f"Valor inválido: {dados.get('valor_total')!r}")
+    if not valor.is_finite():
+        raise ValidationError(f"Valor inválido: {dados.get('valor_total')!r}")
+    if valor <= 0:
+        raise ValidationError('O valor deve ser maior que zero.')
+
+    forma = dados.get('forma_pagamento')
+    if forma not in FORMAS_COMPRA:
+        raise ValidationError(f'Forma de pagamento inválida: {forma!r}')
+
+    compra = Compra(
+        loja=loja,
+        fornecedor=fornecedor,
+        descricao=str(dados.get('descricao') or '')[:200],
+        valor_total=valor,
+        data_compra=_data(dados.get('data_compra'), 'Data da compra'),
+        forma_pagamento=forma,
+        observacoes=str(dados.get('observacoes') or ''),
+    )
+    if not compra.descricao:
+        raise ValidationError('Informe a descrição da compra.')
+
+    if forma == 'credito':
+        compra.cartao_credito = cartoes.get(str(dados.get('cartao_credito')))
+        if compra.cartao_credito is None:
+            raise ValidationError('Cartão inexistente ou inativo.')
+        try:
+            compra.parcelas = int(dados.get('parcelas') or 1)
+        except (TypeError, ValueError):
+            compra.parcelas = 0
+        if compra.parcelas not in PARCELAS_COMPRA:
+            raise ValidationError(f"Parcelas inválidas: {dados.get('parcelas')!r}")
+    return compra
+
+
+def sincronizar(loja, operacoes):
+    """Aplica um lote do caixa offline numa única transação.
+
+    Chaves já recebidas voltam como 'duplicada' sem reaplicar; operações
+    inválidas ou em conflito (dia arquivado, cadastro inativo, limite do
+    cartão) voltam como 'conflito' e não impedem as demais. As vendas do lote
+    entram juntas em registrar_vendas (um UPDATE por dia).
+    """
+    validar_lote(operacoes)
+
+    chaves = [operacao['chave'] for operacao in operacoes]
+    recebidas = {
+        op.chave: op.resultado
+        for op in OperacaoCaixa.objects.filter(loja=loja, chave__in=chaves)
+    }
+    fornecedores = {
+        str(f.pk): f for f in Fornecedor.objects.filter(loja=loja, ativo=True)
+    }
+    cartoes = {
+        str(c.pk): c for c in CartaoCredito.objects.filter(loja=loja, ativo=True)
+    }
+    anos_arquivo = anos_arquivados(loja)
+
+    resultados, vendas, aplicadas = [], [], []
+    # Os registros de auditoria do lote inteiro saem num INSERT só
+    with lote():
+        for operacao in operacoes:
+            chave, tipo, dados = operacao['chave'], operacao['tipo'], operacao['dados']
+            if chave in recebidas:
+                resultados.append({'chave': chave, 'status': 'duplicada', **recebidas[chave]})
+                continue
+
+            try:
+                if tipo == 'venda':
+                    data, campo, valor = converter_item(dados)
+                    if dias_arquivados(loja, [data], anos_arquivo):
+                        raise ValidationError('O dia já está num ano arquivado.')
+                    vendas.append({'data': data, 'forma': campo, 'valor': valor})
+                    resultado = {'data': data.isoformat()}
+                else:
+                    compra = _montar_compra(loja, dados, fornecedores, cartoes)
+                    excesso = compra.excesso_limite()
+                    if excesso and not dados.get('ultrapassar_limite'):
+                        raise ValidationError(
+                            f'Passa R$ {excesso:.2f} do limite disponível do cartão.'
+                        )
+                    # Savepoint: uma compra recusada pelo banco não desfaz o lote
+                    with lote():
+                        compra.save()
+                    resultado = {'compra': compra.pk}
+            except ValidationError as e:
+                resultados.append({'chave': chave, 'status': 'conflito', 'erro': ' '.join(e.messages)})
+                continue
+
+            recebidas[chave] = resultado
+            aplicadas.append(OperacaoCaixa(loja=loja, chave=chave, tipo=tipo, resultado=resultado))
+            resultados.append({'chave': chave, 'status': 'aplicada', **resultado})
+
+        registrar_vendas(loja, vendas)
+        # Uma chave repetida por outra sincronização simultânea estoura aqui
+        # e desfaz o lote; o caixa reenvia e recebe 'duplicada'
+        OperacaoCaixa.objects.bulk_create(aplicadas)
+
+    return resultados
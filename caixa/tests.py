@@ -0,0 +1,76 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from auditoria.models import RegistroAuditoria
+from compras.models import Compra, Fornecedor
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+
+from .models import OperacaoCaixa
+from .services import sincronizar
+
+
+class SincronizarTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+
+    def _compra(self, chave, valor):
+        return {'chave': chave, 'tipo': 'compra', 'dados': {
+            'fornecedor': self.fornecedor.pk, 'descricao': 'Mercadoria', 'valor_total': valor,
+            'data_compra': '2025-03-10', 'forma_pagamento': 'pix',
+        }}
+
+    def test_valor_nan_vira_conflito_sem_derrubar_o_lote(self):
+        resultados = sincronizar(self.loja, [
+            self._compra('compra-nan-1', 'NaN'),
+            {'chave': 'venda-nan-1', 'tipo': 'venda', 'dados': {'forma': 'pix', 'valor': 'NaN'}},
+            self._compra('compra-boa-1', '12.30'),
+        ])
+
+        self.assertEqual([r['status'] for r in resultados], ['conflito', 'conflito', 'aplicada'])
+        self.assertEqual(Compra.objects.get().valor_total, Decimal('12.30'))
+        self.assertEqual(OperacaoCaixa.objects.count(), 1)
+
+    def test_reenvio_nao_duplica(self):
+        operacoes = [
+            {'chave': 'venda-0001', 'tipo': 'venda', 'dados': {'forma': 'pix', 'valor': '5', 'data': '2025-03-10'}},
+            self._compra('compra-0001', '20'),
+        ]
+        sincronizar(self.loja, operacoes)
+        resultados = sincronizar(self.loja, operacoes)
+
+        self.assertEqual([r['status'] for r in resultados], ['duplicada', 'duplicada'])
+        self.assertEqual(Lancamento.objects.get(data=date(2025, 3, 10)).pix, Decimal('5.00'))
+        self.assertEqual(Compra.objects.count(), 1)
+
+    def test_lote_grava_a_auditoria_num_insert(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultados = sincronizar(self.loja, [
+                self._compra('compra-0002', '10'),
+                {'chave': 'venda-0002', 'tipo': 'venda', 'dados': {'forma': 'pix', 'valor': '5', 'data': '2025-03-10'}},
+                self._compra('compra-nan-3', 'NaN'),
+                self._compra('compra-0003', '20'),
+            ])
+        inserts = [q['sql'] for q in consultas if q['sql'].startswith('INSERT INTO "auditoria_registroauditoria"')]
+
+        self.assertEqual([r['status'] for r in resultados], ['aplicada', 'aplicada', 'conflito', 'aplicada'])
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(RegistroAuditoria.objects.filter(acao='criacao', modelo='compras.compra').count(), 2)
+
+    def test_endpoint_devolve_conflito_do_valor_nan(self):
+        self.client.force_login(User.objects.create_user('caixa', password='senha'))
+        resposta = self.client.post(
+            reverse('api_caixa_sincronizar'),
+            data=json.dumps({'loja': self.loja.pk, 'operacoes': [self._compra('compra-nan-2', 'NaN')]}),
+            content_type='application/json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['resultados'][0]['status'], 'conflito')
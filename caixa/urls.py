@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('caixa/', views.caixa, name='caixa'),
+    path('caixa/sw.js', views.caixa_service_worker, name='caixa_sw'),
+    path('api/caixa/sincronizar/', views.api_caixa_sincronizar, name='api_caixa_sincronizar'),
+]
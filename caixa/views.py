@@ -0,0 +1,64 @@
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+
+from compras.models import CartaoCredito, Compra, Fornecedor
+
+from .services import LIMITE_LOTE, sincronizar
+
+
+@login_required
+def caixa(request):
+    """Tela do caixa: funciona offline e guarda as operações até sincronizar"""
+    return render(request, 'caixa/caixa.html', {
+        'fornecedores': Fornecedor.objects.filter(loja=request.loja, ativo=True).order_by('nome'),
+        'cartoes': CartaoCredito.objects.filter(loja=request.loja, ativo=True).order_by('nome'),
+        'FORMA_PAGAMENTO_CHOICES': Compra.FORMA_PAGAMENTO_CHOICES,
+        'PARCELAS_CHOICES': Compra.PARCELAS_CHOICES,
+        'hoje': timezone.localdate(),
+        'limite_lote': LIMITE_LOTE,
+    })
+
+
+@never_cache
+def caixa_service_worker(request):
+    """Service worker do caixa (servido em /caixa/ para controlar a tela)"""
+    return render(request, 'caixa/sw.js', content_type='application/javascript')
+
+
+@login_required
+@require_POST
+def api_caixa_sincronizar(request):
+    """Recebe um lote {"loja": id, "operacoes": [{"chave", "tipo", "dados"}, ...]}.
+
+    Cada operação volta com status aplicada, duplicada (chave já recebida)
+    ou conflito (com o motivo); reenviar o mesmo lote não duplica nada.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+        if not isinstance(payload, dict):
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'erro': 'JSON inválido.'}, status=400)
+
+    if str(payload.get('loja')) != str(request.loja.pk):
+        return JsonResponse({'erro': 'As operações são de outra loja.', 'loja': request.loja.pk}, status=409)
+
+    try:
+        resultados = sincronizar(request.loja, payload.get('operacoes'))
+    except ValidationError as e:
+        return JsonResponse({'erro': ' '.join(e.messages)}, status=400)
+    except IntegrityError:
+        return JsonResponse({'erro': 'Sincronização simultânea; tente novamente.'}, status=409)
+
+    return JsonResponse({
+        'resultados': resultados,
+        'aplicadas': sum(1 for r in resultados if r['status'] == 'aplicada'),
+    })
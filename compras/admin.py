@@ -2,28 +2,68 @@ from django.contrib import admin
 
 # Register your models here.
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
 from django.utils.html import format_html
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Fornecedor, CartaoCredito, Compra, ParcelaCompra
+from auditoria.admin import ExclusaoAuditadaMixin
+from lojas.formatos import formatar_valor
+from .models import Fornecedor, CartaoCredito, Compra, CompraRecorrente, ParcelaCompra
+from .duplicados import mesclar_fornecedores, propor_mesclas
+from .services import parcelas_da_fatura, quitar_parcelas, reabrir_parcelas
 
 @admin.register(Fornecedor)
-class FornecedorAdmin(admin.ModelAdmin):
-    list_display = ['nome', 'contato', 'total_compras', 'ativo_status']
-    list_filter = ['ativo', 'created_at']
+class FornecedorAdmin(ExclusaoAuditadaMixin, admin.ModelAdmin):
+    list_display = ['nome', 'loja', 'contato', 'gasto_30', 'gasto_90', 'gasto_365',
+                    'frequencia', 'ticket_medio', 'ranking', 'total_compras', 'ativo_status']
+    list_filter = ['loja', 'ativo', 'created_at']
+    # O resumo vem no mesmo SELECT (OneToOne reverso): nada é somado por linha
+    list_select_related = ['loja', 'resumo']
     search_fields = ['nome', 'contato']
+    actions = ['procurar_duplicados', 'mesclar_selecionados']
     
-    def formatar_valor(self, valor):
-        if valor:
-            return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-        return "R$ 0,00"
+    def _resumo(self, obj, campo):
+        resumo = getattr(obj, 'resumo', None)
+        return getattr(resumo, campo) if resumo else None
 
     def total_compras(self, obj):
-        total = obj.compra_set.aggregate(total=Sum('valor_total'))['total']
-        return self.formatar_valor(total or 0)
+        return formatar_valor(self._resumo(obj, 'total_geral'))
     total_compras.short_description = "Total Compras"
+    total_compras.admin_order_field = 'resumo__total_geral'
+
+    def gasto_30(self, obj):
+        return formatar_valor(self._resumo(obj, 'gasto_30'))
+    gasto_30.short_description = "30 dias"
+    gasto_30.admin_order_field = 'resumo__gasto_30'
+
+    def gasto_90(self, obj):
+        return formatar_valor(self._resumo(obj, 'gasto_90'))
+    gasto_90.short_description = "90 dias"
+    gasto_90.admin_order_field = 'resumo__gasto_90'
+
+    def gasto_365(self, obj):
+        return formatar_valor(self._resumo(obj, 'gasto_365'))
+    gasto_365.short_description = "365 dias"
+    gasto_365.admin_order_field = 'resumo__gasto_365'
+
+    def frequencia(self, obj):
+        compras = self._resumo(obj, 'compras_por_mes')
+        return f"{compras}/mês" if compras else "-"
+    frequencia.short_description = "Frequência"
+    frequencia.admin_order_field = 'resumo__compras_365'
+
+    def ticket_medio(self, obj):
+        return formatar_valor(self._resumo(obj, 'ticket_medio'))
+    ticket_medio.short_description = "Ticket Médio"
+    ticket_medio.admin_order_field = 'resumo__ticket_medio'
+
+    def ranking(self, obj):
+        posicao = self._resumo(obj, 'ranking')
+        return f"#{posicao}" if posicao else "-"
+    ranking.short_description = "Ranking"
+    ranking.admin_order_field = 'resumo__ranking'
 
     def ativo_status(self, obj):
         if obj.ativo:
@@ -31,28 +71,75 @@ class FornecedorAdmin(admin.ModelAdmin):
         return format_html('<span style="color: #dc3545;">❌ Inativo</span>')
     ativo_status.short_description = "Status"
 
+    @admin.action(description="🔍 Procurar duplicados dos selecionados")
+    def procurar_duplicados(self, request, queryset):
+        propostas = []
+        for loja in {f.loja for f in queryset}:
+            propostas += propor_mesclas(loja, fornecedores=queryset.filter(loja=loja))
+        if not propostas:
+            self.message_user(request, "Nenhum nome parecido encontrado.")
+        for destino, origens in propostas:
+            self.message_user(
+                request,
+                f"{destino.nome} ({destino.quantidade} compras) ← "
+                f"{', '.join(f'{f.nome} ({f.quantidade})' for f in origens)}",
+                messages.WARNING
+            )
+
+    @admin.action(description="🔗 Mesclar selecionados (fica o que tem mais compras)")
+    def mesclar_selecionados(self, request, queryset):
+        fornecedores = sorted(
+            queryset.annotate(quantidade=Count('compra')), key=lambda f: (-f.quantidade, not f.ativo, f.pk)
+        )
+        if len(fornecedores) < 2:
+            self.message_user(request, "Selecione ao menos dois fornecedores.", messages.ERROR)
+            return
+        try:
+            movidas = mesclar_fornecedores(fornecedores[0], fornecedores[1:])
+        except ValidationError as e:
+            self.message_user(request, ' '.join(e.messages), messages.ERROR)
+            return
+        self.message_user(
+            request, f"{len(fornecedores) - 1} fornecedor(es) mesclado(s) em {fornecedores[0].nome}; "
+                     f"{movidas} compra(s) movida(s)."
+        )
+
 @admin.register(CartaoCredito)
-class CartaoCreditoAdmin(admin.ModelAdmin):
-    list_display = ['nome', 'limite_formatado', 'vencimento_fatura', 'total_usado', 'ativo_status']
-    list_filter = ['ativo', 'vencimento_fatura']
+class CartaoCreditoAdmin(ExclusaoAuditadaMixin, admin.ModelAdmin):
+    list_display = ['nome', 'loja', 'limite_formatado', 'saldo_formatado', 'disponivel_formatado',
+                    'vencimento_fatura', 'total_usado', 'ativo_status']
+    list_filter = ['loja', 'ativo', 'vencimento_fatura']
+    list_select_related = ['loja']
     
-    def formatar_valor(self, valor):
-        if valor:
-            return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-        return "R$ 0,00"
-
     def limite_formatado(self, obj):
-        return self.formatar_valor(obj.limite)
+        return formatar_valor(obj.limite)
     limite_formatado.short_description = "Limite"
 
-    def total_usado(self, obj):
-        # Total usado nos últimos 30 dias (aproximação do período da fatura)
+    def saldo_formatado(self, obj):
+        return formatar_valor(obj.saldo_devedor)
+    saldo_formatado.short_description = "Saldo Devedor"
+    saldo_formatado.admin_order_field = 'saldo_devedor'
+
+    def disponivel_formatado(self, obj):
+        disponivel = obj.limite_disponivel
+        if disponivel is None:
+            return "-"
+        cor = '#28a745' if disponivel >= 0 else '#dc3545'
+        return format_html('<span style="color: {};">{}</span>', cor, formatar_valor(disponivel))
+    disponivel_formatado.short_description = "Disponível"
+
+    def get_queryset(self, request):
+        # Total usado nos últimos 30 dias (aproximação do período da fatura),
+        # somado no mesmo SELECT da listagem em vez de uma consulta por cartão
         data_limite = timezone.now().date() - timedelta(days=30)
-        total = obj.compra_set.filter(
-            data_compra__gte=data_limite
-        ).aggregate(total=Sum('valor_total'))['total']
-        return self.formatar_valor(total or 0)
+        return super().get_queryset(request).annotate(
+            usado_30=Sum('compra__valor_total', filter=Q(compra__data_compra__gte=data_limite))
+        )
+
+    def total_usado(self, obj):
+        return formatar_valor(obj.usado_30)
     total_usado.short_description = "Usado (30 dias)"
+    total_usado.admin_order_field = 'usado_30'
 
     def ativo_status(self, obj):
         if obj.ativo:
@@ -61,7 +148,7 @@ class CartaoCreditoAdmin(admin.ModelAdmin):
     ativo_status.short_description = "Status"
 
 @admin.register(Compra)
-class CompraAdmin(admin.ModelAdmin):
+class CompraAdmin(ExclusaoAuditadaMixin, admin.ModelAdmin):
     list_display = [
         'data_formatada',
         'fornecedor',
@@ -71,25 +158,27 @@ class CompraAdmin(admin.ModelAdmin):
         'status_pagamento_display'
     ]
     list_filter = [
+        'loja',
         'forma_pagamento', 
         'data_compra', 
         'fornecedor',
         'cartao_credito'
     ]
     search_fields = ['fornecedor__nome', 'descricao']
+    list_select_related = ['fornecedor', 'cartao_credito']
     date_hierarchy = 'data_compra'
     ordering = ['-data_compra', '-created_at']
     
     fieldsets = (
         ('🛒 Informações da Compra', {
-            'fields': ('fornecedor', 'descricao', 'valor_total', 'data_compra')
+            'fields': ('loja', 'fornecedor', 'descricao', 'valor_total', 'data_compra')
         }),
         ('💳 Forma de Pagamento', {
             'fields': ('forma_pagamento', 'cartao_credito', 'parcelas'),
             'description': 'Para Dinheiro/PIX/Débito: sai do saldo imediatamente. Para Crédito: selecione cartão e parcelas.'
         }),
         ('📋 Informações Adicionais', {
-            'fields': ('observacoes',),
+            'fields': ('observacoes', 'recorrencia', 'competencia'),
             'classes': ('collapse',)
         }),
         ('📊 Resumo da Compra', {
@@ -98,11 +187,7 @@ class CompraAdmin(admin.ModelAdmin):
         })
     )
     
-    readonly_fields = ['get_resumo_display']
-
-    def formatar_valor(self, valor):
-        """Função auxiliar para formatar valores monetários"""
-        return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    readonly_fields = ['get_resumo_display', 'recorrencia', 'competencia']
 
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
@@ -118,12 +203,12 @@ class CompraAdmin(admin.ModelAdmin):
     def get_resumo_display(self, obj):
         if obj.pk:
             data_str = obj.data_compra.strftime('%d/%m/%Y')
-            valor_str = self.formatar_valor(obj.valor_total)
+            valor_str = formatar_valor(obj.valor_total)
             
             # Informações de pagamento
             pagamento_info = ""
             if obj.forma_pagamento == 'credito':
-                valor_parcela_str = self.formatar_valor(obj.valor_parcela)
+                valor_parcela_str = formatar_valor(obj.valor_parcela)
                 pagamento_info = f"""
                     💳 Cartão: {obj.cartao_credito.nome}<br>
                     🔄 Parcelas: {obj.parcelas}x de {valor_parcela_str}<br>
@@ -160,7 +245,7 @@ class CompraAdmin(admin.ModelAdmin):
     descricao_resumo.short_description = "Descrição"
 
     def valor_formatado(self, obj):
-        valor_str = self.formatar_valor(obj.valor_total)
+        valor_str = formatar_valor(obj.valor_total)
         return format_html('<strong style="color: #dc3545;">💰 {}</strong>', valor_str)
     valor_formatado.short_description = "Valor"
     valor_formatado.admin_order_field = 'valor_total'
@@ -192,6 +277,100 @@ class CompraAdmin(admin.ModelAdmin):
     class Media:
         js = ('admin/js/compras.js',)  # Para funcionalidades JS futuras
 
+@admin.register(ParcelaCompra)
+class ParcelaCompraAdmin(ExclusaoAuditadaMixin, admin.ModelAdmin):
+    list_display = ['compra_resumo', 'cartao', 'numero_display', 'valor_formatado',
+                    'data_vencimento', 'status_display', 'data_pagamento']
+    list_filter = ['paga', 'compra__loja', 'compra__cartao_credito', 'data_vencimento']
+    search_fields = ['compra__fornecedor__nome', 'compra__descricao']
+    # __str__ e as colunas leem compra, fornecedor e cartão: tudo no mesmo SELECT
+    list_select_related = ['compra__fornecedor', 'compra__cartao_credito']
+    # A auditoria e o saldo do cartão leem a compra de cada parcela apagada
+    exclusao_select_related = ['compra']
+    raw_id_fields = ['compra']
+    ordering = ['data_vencimento', 'compra', 'numero_parcela']
+    # Sem o COUNT(*) da tabela inteira a cada página
+    show_full_result_count = False
+    actions = ['quitar_selecionadas', 'quitar_faturas', 'reabrir_selecionadas']
+
+    def compra_resumo(self, obj):
+        return f"{obj.compra.fornecedor.nome} - {obj.compra.descricao[:40]}"
+    compra_resumo.short_description = "Compra"
+
+    def cartao(self, obj):
+        return obj.compra.cartao_credito.nome if obj.compra.cartao_credito else "-"
+    cartao.short_description = "Cartão"
+
+    def numero_display(self, obj):
+        return f"{obj.numero_parcela}/{obj.compra.parcelas}"
+    numero_display.short_description = "Parcela"
+    numero_display.admin_order_field = 'numero_parcela'
+
+    def valor_formatado(self, obj):
+        return formatar_valor(obj.valor_parcela)
+    valor_formatado.short_description = "Valor"
+    valor_formatado.admin_order_field = 'valor_parcela'
+
+    def status_display(self, obj):
+        if obj.paga:
+            return format_html('<span style="color: #28a745; font-weight: bold;">✅ Paga</span>')
+        if obj.data_vencimento < timezone.localdate():
+            return format_html('<span style="color: #dc3545; font-weight: bold;">⚠️ Vencida</span>')
+        return format_html('<span style="color: #ffc107; font-weight: bold;">⏳ Em aberto</span>')
+    status_display.short_description = "Status"
+    status_display.admin_order_field = 'paga'
+
+    def _informar(self, request, resultado, acao):
+        self.message_user(
+            request,
+            f"{resultado['parcelas']} parcela(s) {acao} ({formatar_valor(resultado['valor'])})."
+        )
+
+    @admin.action(description="✅ Marcar selecionadas como pagas")
+    def quitar_selecionadas(self, request, queryset):
+        self._informar(request, quitar_parcelas(queryset), "marcada(s) como paga(s)")
+
+    @admin.action(description="💳 Quitar faturas inteiras das selecionadas")
+    def quitar_faturas(self, request, queryset):
+        faturas = queryset.filter(compra__cartao_credito__isnull=False).values_list(
+            'compra__cartao_credito_id', 'data_vencimento__year', 'data_vencimento__month'
+        ).distinct()
+        filtro = Q(pk__in=[])
+        for cartao_id, ano, mes in faturas:
+            filtro |= Q(pk__in=parcelas_da_fatura(cartao_id, ano, mes).values('pk'))
+        self._informar(request, quitar_parcelas(ParcelaCompra.objects.filter(filtro)), "quitada(s)")
+
+    @admin.action(description="↩️ Reabrir selecionadas")
+    def reabrir_selecionadas(self, request, queryset):
+        self._informar(request, reabrir_parcelas(queryset), "reaberta(s)")
+
+@admin.register(CompraRecorrente)
+class CompraRecorrenteAdmin(admin.ModelAdmin):
+    list_display = ['descricao', 'fornecedor', 'valor_formatado', 'forma_pagamento', 'periodicidade',
+                    'proxima', 'fim', 'ativo']
+    list_filter = ['loja', 'ativo', 'periodicidade', 'forma_pagamento']
+    search_fields = ['fornecedor__nome', 'descricao']
+    list_select_related = ['fornecedor']
+    list_editable = ['ativo']
+    autocomplete_fields = ['fornecedor']
+    fieldsets = (
+        ('🛒 Compra', {
+            'fields': ('loja', 'fornecedor', 'descricao', 'valor_total', 'observacoes')
+        }),
+        ('💳 Forma de Pagamento', {
+            'fields': ('forma_pagamento', 'cartao_credito', 'parcelas')
+        }),
+        ('🔁 Agenda', {
+            'fields': ('periodicidade', 'inicio', 'fim', 'proxima', 'ativo'),
+            'description': 'As compras são geradas pela fila (ou manage.py gerar_compras_recorrentes) até a data de hoje.'
+        }),
+    )
+
+    def valor_formatado(self, obj):
+        return formatar_valor(obj.valor_total)
+    valor_formatado.short_description = "Valor"
+    valor_formatado.admin_order_field = 'valor_total'
+
 # Customizar títulos do admin (apenas se não foi feito antes)
 if not hasattr(admin.site, '_customizado'):
     admin.site.site_header = "💰 Sistema de Gestão Financeira"
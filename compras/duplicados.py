@@ -0,0 +1,227 @@
+"""Fornecedores cadastrados mais de uma vez ("Atacadão", "ATACADAO LTDA").
+
+Cada nome vira uma chave sem acento, pontuação nem sufixo societário e um
+conjunto de trigramas. Em vez de comparar todos os pares, um índice
+invertido guarda só os trigramas mais raros de cada nome (filtro de
+prefixo): dois nomes com similaridade (Jaccard ponderado) acima do limiar
+sempre dividem um deles, então só esses candidatos são comparados.
+"""
+import math
+import re
+from collections import Counter, defaultdict, deque
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from arquivo.models import CompraArquivada
+from auditoria.registro import entrada, exclusao, lote, registrar
+from lojas.painel import avisar_painel
+
+from .models import Compra, CompraRecorrente, Fornecedor, normalizar_nome
+from .services import atualizar_resumos_fornecedores
+
+LIMIAR = 0.6
+# Removidos do fim do nome (depois de tirar a pontuação: "S/A" vira "sa")
+SUFIXOS = {'ltda', 'me', 'epp', 'eireli', 'sa', 'mei', 'cia', 'e'}
+
+
+def chave_duplicidade(nome):
+    """Nome comparável: 'Atacadão S/A.' e 'ATACADAO' dão 'atacadao'"""
+    palavras = re.sub(r'[^a-z0-9 ]', '', normalizar_nome(nome)).split()
+    while len(palavras) > 1 and palavras[-1] in SUFIXOS:
+        palavras.pop()
+    return ' '.join(palavras)
+
+
+def trigramas(chave):
+    """Trigramas de cada palavra com as bordas marcadas (como o pg_trgm)"""
+    return frozenset(
+        palavra[i:i + 3]
+        for palavra in (f'  {p} ' for p in chave.split())
+        for i in range(len(palavra) - 2)
+    )
+
+
+def _similaridade(a, total_a, b, total_b, pesos):
+    """Jaccard ponderado dos trigramas (totais já somados)"""
+    comum = sum(pesos[t] for t in a & b)
+    return comum / (total_a + total_b - comum)
+
+
+def _preparar(nomes):
+    """Trigramas, pesos (IDF: trigrama comum pesa pouco) e peso total de cada nome"""
+    conjuntos = {pk: trigramas(chave_duplicidade(nome)) for pk, nome in nomes.items()}
+    conjuntos = {pk: conjunto for pk, conjunto in conjuntos.items() if conjunto}
+    frequencia = Counter(t for conjunto in conjuntos.values() for t in conjunto)
+    pesos = {t: math.log(1 + len(conjuntos) / quantidade) for t, quantidade in frequencia.items()}
+    totais = {pk: sum(pesos[t] for t in conjunto) for pk, conjunto in conjuntos.items()}
+    return conjuntos, pesos, totais
+
+
+def _prefixo(conjunto, total, pesos, limiar):
+    """Os trigramas mais raros até o que sobra pesar menos que o limiar,
+    cada um com o peso dele em diante"""
+    prefixo, resto = [], total
+    for trigrama in sorted(conjunto, key=lambda t: (-pesos[t], t)):
+        if resto < limiar * total:
+            break
+        prefixo.append((trigrama, resto))
+        resto -= pesos[trigrama]
+    return prefixo
+
+
+def agrupar_duplicados(nomes, limiar=LIMIAR):
+    """Grupos de ids (2 ou mais) com nomes parecidos; `nomes` é {id: nome}.
+
+    Os nomes são vistos do mais leve para o mais pesado; cada um entra no
+    grupo do líder mais parecido ou vira líder de um grupo novo, e só
+    líderes vão para o índice. Todo membro é parecido com o líder, então
+    "ab" ~ "abc" ~ "abcd" não encadeia nomes distantes num grupo só.
+    """
+    conjuntos, pesos, totais = _preparar(nomes)
+    # O índice guarda (líder, peso do líder deste trigrama em diante)
+    indice = defaultdict(deque)
+    grupos = {}
+    minimo = limiar / (1 + limiar)
+    for pk in sorted(conjuntos, key=lambda pk: (totais[pk], pk)):
+        conjunto, total = conjuntos[pk], totais[pk]
+        prefixo = _prefixo(conjunto, total, pesos, limiar)
+
+        vistos, candidatos = set(), []
+        for trigrama, resto in prefixo:
+            lideres = indice[trigrama]
+            # Líder leve demais não alcança o limiar com este nem com os próximos (mais pesados)
+            while lideres and totais[lideres[0][0]] < limiar * total:
+                lideres.popleft()
+            for lider, resto_lider in lideres:
+                if lider in vistos:
+                    continue
+                vistos.add(lider)
+                # Primeiro trigrama em comum: o que vem depois dele limita a interseção
+                if min(resto, resto_lider) >= minimo * (total + totais[lider]):
+                    candidatos.append(lider)
+
+        melhor, lider = limiar, None
+        for candidato in candidatos:
+            valor = _similaridade(conjunto, total, conjuntos[candidato], totais[candidato], pesos)
+            if valor >= melhor:
+                melhor, lider = valor, candidato
+        if lider is not None:
+            grupos[lider].append(pk)
+        else:
+            grupos[pk] = [pk]
+            for trigrama, resto in prefixo:
+                indice[trigrama].append((pk, resto))
+    return [grupo for grupo in grupos.values() if len(grupo) > 1]
+
+
+def parecidos(nomes, alvos, limiar=LIMIAR):
+    """{alvo: [ids com nome parecido]} só para os `alvos`, sem agrupar a loja toda.
+
+    Todos os trigramas de todos os nomes vão para o índice; cada alvo só
+    consulta o próprio prefixo (nome parecido sempre contém um deles).
+    """
+    conjuntos, pesos, totais = _preparar(nomes)
+    indice = defaultdict(list)
+    for pk, conjunto in conjuntos.items():
+        for trigrama in conjunto:
+            indice[trigrama].append(pk)
+
+    resultado = {}
+    for alvo in alvos:
+        if alvo not in conjuntos:
+            continue
+        conjunto, total = conjuntos[alvo], totais[alvo]
+        candidatos = {
+            pk for trigrama, _ in _prefixo(conjunto, total, pesos, limiar) for pk in indice[trigrama]
+        }
+        candidatos.discard(alvo)
+        resultado[alvo] = sorted(
+            pk for pk in candidatos
+            if _similaridade(conjunto, total, conjuntos[pk], totais[pk], pesos) >= limiar
+        )
+    return resultado
+
+
+def propor_mesclas(loja, limiar=LIMIAR, fornecedores=None):
+    """[(destino, [origens])] dos fornecedores duplicados da loja.
+
+    Fica o fornecedor com mais compras (depois o ativo, depois o mais
+    antigo). Com `fornecedores`, só procura os parecidos com eles.
+    """
+    todos = {
+        f.pk: f for f in Fornecedor.objects.filter(loja=loja).annotate(quantidade=Count('compra'))
+    }
+    nomes = {pk: f.nome for pk, f in todos.items()}
+    if fornecedores is None:
+        grupos = agrupar_duplicados(nomes, limiar)
+    else:
+        grupos, usados = [], set()
+        for alvo, similares in parecidos(nomes, [f.pk for f in fornecedores], limiar).items():
+            grupo = [pk for pk in [alvo, *similares] if pk not in usados]
+            if alvo in grupo and len(grupo) > 1:
+                grupos.append(grupo)
+                usados.update(grupo)
+
+    propostas = []
+    for grupo in grupos:
+        membros = sorted((todos[pk] for pk in grupo), key=lambda f: (-f.quantidade, not f.ativo, f.pk))
+        propostas.append((membros[0], membros[1:]))
+    return propostas
+
+
+def mesclar_fornecedores(destino, origens):
+    """Move compras e recorrências das origens para o destino e apaga as origens.
+
+    As compras mudam num único UPDATE (com updated_at, para o analítico
+    reprocessar); as arquivadas passam a apontar para o destino depois do
+    commit, em `mover_arquivadas`.
+    Retorna quantas compras foram movidas.
+    """
+    origens = [f for f in origens if f.pk != destino.pk]
+    if not origens:
+        return 0
+    if any(f.loja_id != destino.loja_id for f in origens):
+        raise ValidationError('Só é possível mesclar fornecedores da mesma loja.')
+    ids = [f.pk for f in origens]
+
+    with lote():
+        compras = list(Compra.objects.filter(fornecedor_id__in=ids).values_list('pk', 'fornecedor_id'))
+        movidas = Compra.objects.filter(fornecedor_id__in=ids).update(
+            fornecedor=destino, updated_at=timezone.now()
+        )
+        registrar([
+            entrada(Compra, pk, destino.loja_id, 'alteracao', {'fornecedor_id': [origem, destino.pk]})
+            for pk, origem in compras
+        ])
+        CompraRecorrente.objects.filter(fornecedor_id__in=ids).update(fornecedor=destino)
+
+        if not destino.contato:
+            destino.contato = next((f.contato for f in origens if f.contato), '')
+        destino.observacoes = '\n'.join(filter(None, [
+            destino.observacoes, f"Mesclado com: {', '.join(f.nome for f in origens)}"
+        ]))
+        destino.ativo = destino.ativo or any(f.ativo for f in origens)
+        destino.save()
+        # O resumo das origens sai junto (CASCADE)
+        Fornecedor.objects.filter(pk__in=ids).delete()
+        registrar([exclusao(f, f.loja_id) for f in origens])
+
+        loja_id, fornecedor_id = destino.loja_id, destino.pk
+        transaction.on_commit(lambda: atualizar_resumos_fornecedores(loja_id, {fornecedor_id}))
+        # O arquivo é outro banco: só muda depois que a mescla confirmou
+        transaction.on_commit(lambda: mover_arquivadas(ids, fornecedor_id))
+        avisar_painel(loja_id)
+    return movidas
+
+
+def mover_arquivadas(origens, destino_id):
+    """Aponta para o destino as compras arquivadas dos fornecedores `origens`.
+
+    Pode rodar de novo sem efeito colateral (só mexe no que ainda aponta
+    para uma origem).
+    """
+    with transaction.atomic(using='arquivo'):
+        return CompraArquivada.objects.filter(fornecedor_id__in=origens).update(fornecedor_id=destino_id)
@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from compras.services import gerar_compras_recorrentes
+from lojas.formatos import formatar_valor
+from lojas.models import Loja
+
+
+class Command(BaseCommand):
+    help = "Cria as compras devidas das compras recorrentes (rodar de novo não duplica)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loja', type=int, help="Id da loja (padrão: todas)")
+        parser.add_argument('--ate', type=date.fromisoformat, help="Gerar até esta data AAAA-MM-DD (padrão: hoje)")
+
+    def handle(self, *args, **options):
+        loja = Loja.objects.get(pk=options['loja']) if options['loja'] else None
+        resultado = gerar_compras_recorrentes(hoje=options['ate'], loja=loja)
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['compras']} compra(s) e {resultado['parcelas']} parcela(s) geradas "
+            f"({formatar_valor(resultado['valor'])})"
+        ))
+        for ignorada in resultado['ignoradas']:
+            competencia = ignorada['competencia']
+            self.stdout.write(self.style.WARNING(
+                f"Recorrência {ignorada['recorrencia']}"
+                f"{competencia.strftime(' em %d/%m/%Y') if competencia else ''}: {ignorada['motivo']}"
+            ))
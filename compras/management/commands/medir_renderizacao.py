@@ -0,0 +1,126 @@
+import statistics
+import time
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory
+from django.utils import timezone
+
+from compras.models import CartaoCredito, Compra, Fornecedor, ParcelaCompra
+from lancamentos.models import Lancamento
+from lojas.formatos import formatar_valor
+from lojas.models import Loja
+
+CHANGELISTS = [
+    ('Compras', Compra, '/admin/compras/compra/'),
+    ('Parcelas', ParcelaCompra, '/admin/compras/parcelacompra/'),
+    ('Lançamentos', Lancamento, '/admin/lancamentos/lancamento/'),
+]
+
+
+class Command(BaseCommand):
+    help = ("Mede a renderização de compras/list.html e das listagens do admin com muitas "
+            "linhas por página (dados gerados numa transação desfeita no fim)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=200, help="Linhas por página (padrão: 200)")
+        parser.add_argument('--repeticoes', type=int, default=20, help="Renderizações medidas (padrão: 20)")
+
+    def _medir(self, nome, funcao, repeticoes):
+        # execute_wrapper em vez de connection.queries: o Client zera o log a cada requisição
+        consultas = []
+
+        def contar(execute, sql, params, many, contexto):
+            consultas.append(sql)
+            return execute(sql, params, many, contexto)
+
+        with connection.execute_wrapper(contar):
+            funcao()  # aquece o cache de templates
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        self.stdout.write(
+            f"{nome:<28} mediana {statistics.median(tempos):8.2f} ms   "
+            f"mínimo {min(tempos):8.2f} ms   {len(consultas)} consulta(s)"
+        )
+
+    def handle(self, *args, **options):
+        linhas, repeticoes = options['linhas'], options['repeticoes']
+
+        valor = Decimal('12345.67')
+        antes = timeit.timeit(
+            lambda: f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), number=100000
+        )
+        depois = timeit.timeit(lambda: formatar_valor(valor), number=100000)
+        self.stdout.write(f"formatar_valor: {depois * 10:.2f} µs/chamada (três replace: {antes * 10:.2f} µs)")
+
+        with transaction.atomic():
+            loja = Loja.objects.create(nome='Medição de renderização')
+            usuario = User.objects.create_superuser('medir_renderizacao', password=None)
+            fornecedor = Fornecedor.objects.create(loja=loja, nome='Fornecedor da medição')
+            cartao = CartaoCredito.objects.create(loja=loja, nome='Cartão da medição', vencimento_fatura=10)
+            hoje = timezone.localdate()
+
+            compras = Compra.objects.bulk_create([
+                Compra(
+                    loja=loja, fornecedor=fornecedor, descricao=f'Compra {i}',
+                    valor_total=Decimal(1000 + i * 37) / 10, data_compra=hoje - timedelta(days=i),
+                    forma_pagamento='credito' if i % 3 == 0 else 'pix',
+                    cartao_credito=cartao if i % 3 == 0 else None, parcelas=3 if i % 3 == 0 else 1,
+                )
+                for i in range(linhas)
+            ])
+            ParcelaCompra.objects.bulk_create([
+                ParcelaCompra(
+                    compra=compra, numero_parcela=numero, valor_parcela=compra.valor_total / 3,
+                    data_vencimento=compra.data_compra + timedelta(days=30 * numero),
+                )
+                for compra in compras[:linhas // 3 + 1] for numero in (1, 2, 3)
+            ])
+            Lancamento.objects.bulk_create([
+                Lancamento(
+                    loja=loja, data=hoje - timedelta(days=i), pix=Decimal(i * 13) / 10,
+                    dinheiro=Decimal(i * 7) / 10, cartao_debito=Decimal(i * 11) / 10,
+                    cartao_credito=Decimal(i * 17) / 10,
+                )
+                for i in range(linhas)
+            ])
+
+            request = RequestFactory().get('/compras/')
+            request.user, request.loja = usuario, loja
+            contexto = {
+                'compras': Paginator(
+                    Compra.objects.filter(loja=loja).select_related('fornecedor', 'cartao_credito'), linhas
+                ).get_page(1),
+                'stats': {'total_compras': Decimal('123456.78'), 'total_vista': 0, 'total_credito': 0,
+                          'count': linhas, 'arquivadas': 0},
+                'filtros': {},
+                'FORMA_PAGAMENTO_CHOICES': Compra.FORMA_PAGAMENTO_CHOICES,
+            }
+            self._medir(
+                f'compras/list.html ({linhas})',
+                lambda: render_to_string('compras/list.html', contexto, request),
+                repeticoes
+            )
+
+            cliente = Client()
+            cliente.force_login(usuario)
+            for nome, modelo, url in CHANGELISTS:
+                model_admin = admin.site._registry[modelo]
+                por_pagina = model_admin.list_per_page
+                model_admin.list_per_page = linhas
+                try:
+                    self._medir(f'admin {nome} ({linhas})', lambda: cliente.get(url), repeticoes)
+                finally:
+                    model_admin.list_per_page = por_pagina
+
+            transaction.set_rollback(True)
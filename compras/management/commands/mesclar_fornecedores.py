@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from compras.duplicados import LIMIAR, mesclar_fornecedores, propor_mesclas
+from lojas.models import Loja
+
+
+class Command(BaseCommand):
+    help = ("Procura fornecedores cadastrados mais de uma vez (nomes parecidos por trigramas) "
+            "e, com --aplicar, mescla cada grupo no que tem mais compras")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loja', type=int, help="Id da loja (padrão: todas)")
+        parser.add_argument('--limiar', type=float, default=LIMIAR,
+                            help=f"Similaridade mínima entre 0 e 1 (padrão: {LIMIAR})")
+        parser.add_argument('--aplicar', action='store_true', help="Mescla de fato (sem isso só lista)")
+
+    def handle(self, *args, **options):
+        lojas = [Loja.objects.get(pk=options['loja'])] if options['loja'] else Loja.objects.all()
+        for loja in lojas:
+            inicio = time.perf_counter()
+            propostas = propor_mesclas(loja, options['limiar'])
+            self.stdout.write(
+                f"{loja.nome}: {len(propostas)} grupo(s) em {(time.perf_counter() - inicio) * 1000:.0f} ms"
+            )
+            for destino, origens in propostas:
+                self.stdout.write(
+                    f"  {destino.nome} ({destino.quantidade}) ← "
+                    + ', '.join(f"{f.nome} ({f.quantidade})" for f in origens)
+                )
+                if options['aplicar']:
+                    movidas = mesclar_fornecedores(destino, origens)
+                    self.stdout.write(self.style.SUCCESS(f"    {movidas} compra(s) movida(s)"))
+
+        if not options['aplicar']:
+            self.stdout.write(self.style.WARNING("Nada foi alterado; use --aplicar para mesclar"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from compras.services import reconciliar_saldos
+from lojas.models import Loja
+
+
+class Command(BaseCommand):
+    help = "Confere o saldo devedor dos cartões com as parcelas em aberto e corrige divergências"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loja', type=int, help="Id da loja (padrão: todas)")
+
+    def handle(self, *args, **options):
+        loja = Loja.objects.get(pk=options['loja']) if options['loja'] else None
+        resultado = reconciliar_saldos(loja)
+
+        if resultado['compras_parceladas']:
+            self.stdout.write(f"{resultado['compras_parceladas']} compra(s) no crédito ganharam parcelas")
+        for item in resultado['corrigidos']:
+            self.stdout.write(self.style.WARNING(
+                f"{item['cartao']}: saldo {item['saldo_anterior']} corrigido para {item['saldo_correto']}"
+            ))
+        self.stdout.write(self.style.SUCCESS("Saldos dos cartões conferidos"))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def atribuir_loja_principal(apps, schema_editor):
+    Loja = apps.get_model('lojas', 'Loja')
+    loja = Loja.objects.order_by('pk').first()
+    for nome in ['CartaoCredito', 'Compra', 'Fornecedor']:
+        apps.get_model('compras', nome).objects.filter(loja__isnull=True).update(loja=loja)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0001_initial'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartaocredito',
+            name='loja',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cartoes', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.AddField(
+            model_name='compra',
+            name='loja',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='compras', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.AddField(
+            model_name='fornecedor',
+            name='loja',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='fornecedores', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.RunPython(atribuir_loja_principal, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cartaocredito',
+            name='loja',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='cartoes', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.AlterField(
+            model_name='compra',
+            name='loja',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='compras', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.AlterField(
+            model_name='fornecedor',
+            name='loja',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='fornecedores', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.AddIndex(
+            model_name='cartaocredito',
+            index=models.Index(fields=['loja', 'nome'], name='cartao_loja_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['loja', 'data_compra'], name='compra_loja_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['loja', 'fornecedor', 'data_compra'], name='compra_loja_fornecedor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fornecedor',
+            index=models.Index(fields=['loja', 'nome'], name='fornecedor_loja_nome_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0002_loja'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartaocredito',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='fornecedor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='parcelacompra',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['updated_at'], name='compra_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parcelacompra',
+            index=models.Index(fields=['updated_at'], name='parcela_updated_idx'),
+        ),
+    ]
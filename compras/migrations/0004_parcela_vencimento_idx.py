@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parcelacompra',
+            index=models.Index(fields=['data_vencimento'], name='parcela_vencimento_idx'),
+        ),
+    ]
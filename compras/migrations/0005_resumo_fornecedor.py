@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0004_parcela_vencimento_idx'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoFornecedor',
+            fields=[
+                ('fornecedor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumo', serialize=False, to='compras.fornecedor')),
+                ('gasto_30', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Gasto 30 dias')),
+                ('gasto_90', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Gasto 90 dias')),
+                ('gasto_365', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Gasto 365 dias')),
+                ('compras_365', models.IntegerField(default=0, verbose_name='Compras em 365 dias')),
+                ('ticket_medio', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ticket médio')),
+                ('total_geral', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total geral')),
+                ('qtd_total', models.IntegerField(default=0, verbose_name='Compras no total')),
+                ('ultima_compra', models.DateField(blank=True, null=True, verbose_name='Última compra')),
+                ('ranking', models.IntegerField(blank=True, null=True, verbose_name='Ranking')),
+                ('atualizado_em', models.DateTimeField()),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='lojas.loja')),
+            ],
+            options={
+                'verbose_name': '📈 Resumo do Fornecedor',
+                'verbose_name_plural': '📈 Resumos dos Fornecedores',
+                'indexes': [models.Index(fields=['loja', '-gasto_365'], name='resumo_forn_gasto_idx'), models.Index(fields=['loja', 'ranking'], name='resumo_forn_ranking_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0005_resumo_fornecedor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartaocredito',
+            name='saldo_devedor',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Soma das parcelas em aberto (mantida a cada compra/parcela gravada)', max_digits=12, verbose_name='Saldo Devedor'),
+        ),
+    ]
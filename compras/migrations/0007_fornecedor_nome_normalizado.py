@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:29
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def preencher_nome_normalizado(apps, schema_editor):
+    Fornecedor = apps.get_model('compras', 'Fornecedor')
+    alterados = []
+    for fornecedor in Fornecedor.objects.only('nome').iterator(chunk_size=1000):
+        texto = unicodedata.normalize('NFKD', fornecedor.nome.lower())
+        fornecedor.nome_normalizado = ' '.join(
+            ''.join(c for c in texto if not unicodedata.combining(c)).split()
+        )
+        alterados.append(fornecedor)
+    Fornecedor.objects.bulk_update(alterados, ['nome_normalizado'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0006_saldo_devedor'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fornecedor',
+            name='nome_normalizado',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='fornecedor',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['loja', 'nome_normalizado'], name='fornecedor_busca_idx'),
+        ),
+        migrations.RunPython(preencher_nome_normalizado, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compras', '0007_fornecedor_nome_normalizado'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compra',
+            name='competencia',
+            field=models.DateField(blank=True, null=True, verbose_name='📅 Competência'),
+        ),
+        migrations.CreateModel(
+            name='CompraRecorrente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('descricao', models.CharField(max_length=200, verbose_name='📝 Descrição')),
+                ('valor_total', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='💰 Valor Total')),
+                ('forma_pagamento', models.CharField(choices=[('dinheiro', '💵 Dinheiro'), ('pix', '📱 PIX'), ('debito', '💳 Débito'), ('credito', '🔄 Crédito')], default='pix', max_length=10, verbose_name='💳 Forma de Pagamento')),
+                ('parcelas', models.IntegerField(choices=[(1, '1x à vista'), (2, '2x sem juros'), (3, '3x sem juros'), (4, '4x sem juros'), (5, '5x sem juros'), (6, '6x sem juros'), (7, '7x sem juros'), (8, '8x sem juros'), (9, '9x sem juros'), (10, '10x sem juros'), (11, '11x sem juros'), (12, '12x sem juros')], default=1, verbose_name='🔄 Parcelas')),
+                ('observacoes', models.TextField(blank=True, verbose_name='📋 Observações')),
+                ('periodicidade', models.CharField(choices=[('semanal', '📅 Semanal'), ('mensal', '🗓️ Mensal'), ('anual', '📆 Anual')], default='mensal', max_length=10, verbose_name='🔁 Periodicidade')),
+                ('inicio', models.DateField(help_text='No mensal e no anual, o dia desta data se repete (ajustado ao fim do mês)', verbose_name='📅 Primeira Compra')),
+                ('fim', models.DateField(blank=True, null=True, verbose_name='📅 Última Compra até')),
+                ('proxima', models.DateField(blank=True, help_text='Próxima data a gerar; adiante para pular competências (vazio = primeira compra)', null=True, verbose_name='⏭️ Próxima Compra')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cartao_credito', models.ForeignKey(blank=True, help_text='Obrigatório apenas para pagamento no crédito', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='compras_recorrentes', to='compras.cartaocredito', verbose_name='💳 Cartão de Crédito')),
+                ('fornecedor', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='compras_recorrentes', to='compras.fornecedor', verbose_name='🏪 Fornecedor')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='compras_recorrentes', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '🔁 Compra Recorrente',
+                'verbose_name_plural': '🔁 Compras Recorrentes',
+                'ordering': ['proxima', 'descricao'],
+            },
+        ),
+        migrations.AddField(
+            model_name='compra',
+            name='recorrencia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='compras', to='compras.comprarecorrente', verbose_name='🔁 Recorrência'),
+        ),
+        migrations.AddConstraint(
+            model_name='compra',
+            constraint=models.UniqueConstraint(fields=('recorrencia', 'competencia'), name='compra_recorrencia_unica'),
+        ),
+        migrations.AddIndex(
+            model_name='comprarecorrente',
+            index=models.Index(fields=['ativo', 'proxima'], name='recorrente_proxima_idx'),
+        ),
+    ]
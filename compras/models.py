@@ -2,16 +2,37 @@ from django.db import models
 
 # Create your models here.
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
-from decimal import Decimal
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_DOWN
+import calendar
+import unicodedata
+
+from auditoria.registro import Auditado, criacao, exclusao, lote, registrar
+from lojas.models import Loja
+from lojas.painel import avisar_painel
 
-class Fornecedor(models.Model):
+def normalizar_nome(texto):
+    """Minúsculas, sem acentos e com espaços simples: a forma indexada para a busca"""
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    return ' '.join(''.join(c for c in texto if not unicodedata.combining(c)).split())
+
+class Fornecedor(Auditado, models.Model):
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.PROTECT,
+        related_name='fornecedores',
+        verbose_name="🏬 Loja"
+    )
     nome = models.CharField(
         max_length=100,
         verbose_name="Nome do Fornecedor",
         help_text="Nome ou razão social do fornecedor"
     )
+    # Preenchido no save(); a busca por prefixo usa o índice parcial dos ativos
+    nome_normalizado = models.CharField(max_length=100, editable=False, default='')
     contato = models.CharField(
         max_length=100,
         blank=True,
@@ -29,16 +50,35 @@ class Fornecedor(models.Model):
         help_text="Fornecedor ativo para novas compras"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "🏪 Fornecedor"
         verbose_name_plural = "🏪 Fornecedores"
         ordering = ['nome']
+        indexes = [
+            models.Index(fields=['loja', 'nome'], name='fornecedor_loja_nome_idx'),
+            models.Index(
+                fields=['loja', 'nome_normalizado'], condition=models.Q(ativo=True), name='fornecedor_busca_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.nome
 
-class CartaoCredito(models.Model):
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome(self.nome)
+        if kwargs.get('update_fields') is not None and 'nome' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'nome_normalizado'}
+        super().save(*args, **kwargs)
+
+class CartaoCredito(Auditado, models.Model):
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.PROTECT,
+        related_name='cartoes',
+        verbose_name="🏬 Loja"
+    )
     nome = models.CharField(
         max_length=50,
         verbose_name="Nome do Cartão",
@@ -62,16 +102,45 @@ class CartaoCredito(models.Model):
         default=True,
         verbose_name="Ativo"
     )
+    saldo_devedor = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name="Saldo Devedor",
+        help_text="Soma das parcelas em aberto (mantida a cada compra/parcela gravada)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "💳 Cartão de Crédito"
         verbose_name_plural = "💳 Cartões de Crédito"
         ordering = ['nome']
+        indexes = [
+            models.Index(fields=['loja', 'nome'], name='cartao_loja_nome_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
-class Compra(models.Model):
+    @property
+    def limite_disponivel(self):
+        if self.limite is None:
+            return None
+        return self.limite - self.saldo_devedor
+
+def ajustar_saldo_devedor(cartao_id, valor):
+    """Soma `valor` ao saldo do cartão num UPDATE atômico (sem ler o saldo atual)"""
+    if cartao_id and valor:
+        # updated_at fica de fora: o saldo não aparece no analítico nem nos relatórios
+        CartaoCredito.objects.filter(pk=cartao_id).update(saldo_devedor=F('saldo_devedor') + valor)
+
+def _somar_meses(data, meses, dia):
+    ano, mes = divmod(data.month - 1 + meses, 12)
+    ano, mes = data.year + ano, mes + 1
+    return date(ano, mes, min(dia, calendar.monthrange(ano, mes)[1]))
+
+class Compra(Auditado, models.Model):
     FORMA_PAGAMENTO_CHOICES = [
         ('dinheiro', '💵 Dinheiro'),
         ('pix', '📱 PIX'),
@@ -94,6 +163,12 @@ class Compra(models.Model):
         (12, '12x sem juros'),
     ]
 
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.PROTECT,
+        related_name='compras',
+        verbose_name="🏬 Loja"
+    )
     fornecedor = models.ForeignKey(
         Fornecedor,
         on_delete=models.PROTECT,
@@ -143,6 +218,17 @@ class Compra(models.Model):
         verbose_name="📋 Observações",
         help_text="Informações adicionais sobre a compra"
     )
+
+    # Compras geradas por uma recorrência: uma por competência
+    recorrencia = models.ForeignKey(
+        'CompraRecorrente',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='compras',
+        verbose_name="🔁 Recorrência"
+    )
+    competencia = models.DateField(blank=True, null=True, verbose_name="📅 Competência")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -151,6 +237,15 @@ class Compra(models.Model):
         verbose_name = "🛒 Compra"
         verbose_name_plural = "🛒 Compras"
         ordering = ['-data_compra', '-created_at']
+        indexes = [
+            models.Index(fields=['loja', 'data_compra'], name='compra_loja_data_idx'),
+            models.Index(fields=['loja', 'fornecedor', 'data_compra'], name='compra_loja_fornecedor_idx'),
+            models.Index(fields=['updated_at'], name='compra_updated_idx'),
+        ]
+        constraints = [
+            # Rodar o gerador de novo nunca duplica a compra de uma competência
+            models.UniqueConstraint(fields=['recorrencia', 'competencia'], name='compra_recorrencia_unica'),
+        ]
 
     def __str__(self):
         return f"{self.fornecedor.nome} - {self.descricao[:50]} - R$ {self.valor_total}"
@@ -189,11 +284,113 @@ class Compra(models.Model):
             self.cartao_credito = None
             self.parcelas = 1
 
+        # Fornecedor e cartão precisam ser da mesma loja da compra
+        if self.loja_id and self.fornecedor_id and self.fornecedor.loja_id != self.loja_id:
+            raise ValidationError({'fornecedor': 'Fornecedor não pertence a esta loja.'})
+        if self.loja_id and self.cartao_credito_id and self.cartao_credito.loja_id != self.loja_id:
+            raise ValidationError({'cartao_credito': 'Cartão não pertence a esta loja.'})
+
+    # Campos que, se mudarem, exigem refazer as parcelas
+    CAMPOS_PARCELAMENTO = ['forma_pagamento', 'cartao_credito_id', 'valor_total', 'parcelas', 'data_compra']
+
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        anterior = None
+        if self.pk:
+            anterior = Compra.objects.filter(pk=self.pk).values('fornecedor_id', *self.CAMPOS_PARCELAMENTO).first()
+        # Trocar o fornecedor de uma compra também altera o resumo do anterior
+        fornecedores = {self.fornecedor_id, anterior and anterior['fornecedor_id']}
 
-class ParcelaCompra(models.Model):
+        # Compra, parcelas e auditoria de tudo num INSERT só, na mesma transação
+        with lote():
+            super().save(*args, **kwargs)
+            if anterior is None or any(anterior[c] != getattr(self, c) for c in self.CAMPOS_PARCELAMENTO):
+                self.gerar_parcelas(cartao_anterior_id=anterior and anterior['cartao_credito_id'])
+        self._atualizar_resumos(fornecedores)
+
+    def delete(self, *args, **kwargs):
+        fornecedor_id = self.fornecedor_id
+        with lote():
+            # As parcelas saem junto (CASCADE) e também ficam na auditoria
+            parcelas = list(self.parcelas_detalhadas.all())
+            ajustar_saldo_devedor(self.cartao_credito_id, -sum(p.valor_em_aberto for p in parcelas))
+            registrar([exclusao(p, self.loja_id) for p in parcelas])
+            resultado = super().delete(*args, **kwargs)
+        self._atualizar_resumos({fornecedor_id})
+        return resultado
+
+    def saldo_em_aberto(self):
+        return self.parcelas_detalhadas.filter(paga=False).aggregate(
+            total=models.Sum('valor_parcela')
+        )['total'] or 0
+
+    def gerar_parcelas(self, cartao_anterior_id=None, quitar_ate=None):
+        """Refaz as parcelas do crédito e move o saldo devedor dos cartões.
+
+        Parcelas já pagas continuam pagas pelo número; com `quitar_ate`, as
+        que vencem antes dessa data nascem pagas (carga de compras antigas).
+        """
+        existentes = list(self.parcelas_detalhadas.all())
+        pagas = {p.numero_parcela: p.data_pagamento for p in existentes if p.paga}
+        ajustar_saldo_devedor(
+            cartao_anterior_id or self.cartao_credito_id,
+            -sum(p.valor_parcela for p in existentes if not p.paga)
+        )
+        self.parcelas_detalhadas.all().delete()
+        registrar([exclusao(p, self.loja_id) for p in existentes])
+        if self.forma_pagamento != 'credito':
+            return []
+
+        parcelas = self.montar_parcelas(pagas, quitar_ate)
+        ParcelaCompra.objects.bulk_create(parcelas)
+        registrar([criacao(p, self.loja_id) for p in parcelas])
+        ajustar_saldo_devedor(self.cartao_credito_id, sum(p.valor_parcela for p in parcelas if not p.paga))
+        return parcelas
+
+    def montar_parcelas(self, pagas=None, quitar_ate=None):
+        """Parcelas do crédito ainda não gravadas (sem mexer no saldo do cartão)"""
+        pagas = pagas or {}
+        # Centavos que sobram da divisão vão para a última parcela
+        valor = Decimal(self.valor_total)
+        valor_parcela = (valor / self.parcelas).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        dia = self.cartao_credito.vencimento_fatura
+        parcelas = []
+        for numero in range(1, self.parcelas + 1):
+            vencimento = _somar_meses(self.data_compra, numero, dia)
+            paga = numero in pagas or bool(quitar_ate and vencimento < quitar_ate)
+            parcelas.append(ParcelaCompra(
+                compra=self,
+                numero_parcela=numero,
+                valor_parcela=valor_parcela if numero < self.parcelas else valor - valor_parcela * (self.parcelas - 1),
+                data_vencimento=vencimento,
+                paga=paga,
+                data_pagamento=pagas.get(numero) or vencimento if paga else None,
+            ))
+        return parcelas
+
+    def excesso_limite(self):
+        """Quanto a compra passa do limite disponível do cartão (0 se couber).
+
+        Lê o saldo mantido no cartão em vez de somar as parcelas em aberto.
+        """
+        if self.forma_pagamento != 'credito' or not self.cartao_credito_id:
+            return 0
+        cartao = CartaoCredito.objects.filter(pk=self.cartao_credito_id).only('limite', 'saldo_devedor').first()
+        if cartao is None or cartao.limite is None:
+            return 0
+        # Na edição, o que a compra já ocupa neste cartão volta a ficar disponível
+        ocupado = 0
+        if self.pk and Compra.objects.filter(pk=self.pk, cartao_credito_id=cartao.pk).exists():
+            ocupado = self.saldo_em_aberto()
+        return max(cartao.saldo_devedor - ocupado + Decimal(str(self.valor_total)) - cartao.limite, 0)
+
+    def _atualizar_resumos(self, fornecedores):
+        from .services import atualizar_resumos_fornecedores
+        loja_id = self.loja_id
+        transaction.on_commit(lambda: atualizar_resumos_fornecedores(loja_id, fornecedores))
+        avisar_painel(loja_id)
+
+class ParcelaCompra(Auditado, models.Model):
     """Model para controlar parcelas de compras no crédito"""
     compra = models.ForeignKey(
         Compra,
@@ -209,13 +406,206 @@ class ParcelaCompra(models.Model):
     data_vencimento = models.DateField(verbose_name="Data Vencimento")
     paga = models.BooleanField(default=False, verbose_name="Paga")
     data_pagamento = models.DateField(blank=True, null=True, verbose_name="Data Pagamento")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "📅 Parcela"
         verbose_name_plural = "📅 Parcelas"
         ordering = ['compra', 'numero_parcela']
         unique_together = ['compra', 'numero_parcela']
+        indexes = [
+            models.Index(fields=['updated_at'], name='parcela_updated_idx'),
+            models.Index(fields=['data_vencimento'], name='parcela_vencimento_idx'),
+        ]
 
     def __str__(self):
         status = "✅" if self.paga else "⏳"
-        return f"{status} {self.compra.fornecedor.nome} - Parcela {self.numero_parcela}/{self.compra.parcelas}"
\ No newline at end of file
+        return f"{status} {self.compra.fornecedor.nome} - Parcela {self.numero_parcela}/{self.compra.parcelas}"
+
+    @property
+    def valor_em_aberto(self):
+        return 0 if self.paga else self.valor_parcela
+
+    def loja_auditoria(self):
+        return self.compra.loja_id
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            anterior = ParcelaCompra.objects.filter(pk=self.pk).first() if self.pk else None
+            super().save(*args, **kwargs)
+            ajustar_saldo_devedor(
+                self.compra.cartao_credito_id,
+                self.valor_em_aberto - (anterior.valor_em_aberto if anterior else 0)
+            )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ajustar_saldo_devedor(self.compra.cartao_credito_id, -self.valor_em_aberto)
+            return super().delete(*args, **kwargs)
+
+class CompraRecorrente(models.Model):
+    """Modelo de compra que se repete (aluguel, assinaturas, pedidos fixos).
+
+    O gerador (manage.py gerar_compras_recorrentes ou a tarefa da fila) cria
+    as compras de cada data devida até hoje e avança a `proxima`.
+    """
+    PERIODICIDADE_CHOICES = [
+        ('semanal', '📅 Semanal'),
+        ('mensal', '🗓️ Mensal'),
+        ('anual', '📆 Anual'),
+    ]
+
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.PROTECT,
+        related_name='compras_recorrentes',
+        verbose_name="🏬 Loja"
+    )
+    fornecedor = models.ForeignKey(
+        Fornecedor,
+        on_delete=models.PROTECT,
+        related_name='compras_recorrentes',
+        verbose_name="🏪 Fornecedor"
+    )
+    descricao = models.CharField(max_length=200, verbose_name="📝 Descrição")
+    valor_total = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="💰 Valor Total")
+    forma_pagamento = models.CharField(
+        max_length=10,
+        choices=Compra.FORMA_PAGAMENTO_CHOICES,
+        default='pix',
+        verbose_name="💳 Forma de Pagamento"
+    )
+    cartao_credito = models.ForeignKey(
+        CartaoCredito,
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+        related_name='compras_recorrentes',
+        verbose_name="💳 Cartão de Crédito",
+        help_text="Obrigatório apenas para pagamento no crédito"
+    )
+    parcelas = models.IntegerField(choices=Compra.PARCELAS_CHOICES, default=1, verbose_name="🔄 Parcelas")
+    observacoes = models.TextField(blank=True, verbose_name="📋 Observações")
+
+    periodicidade = models.CharField(
+        max_length=10,
+        choices=PERIODICIDADE_CHOICES,
+        default='mensal',
+        verbose_name="🔁 Periodicidade"
+    )
+    inicio = models.DateField(
+        verbose_name="📅 Primeira Compra",
+        help_text="No mensal e no anual, o dia desta data se repete (ajustado ao fim do mês)"
+    )
+    fim = models.DateField(blank=True, null=True, verbose_name="📅 Última Compra até")
+    proxima = models.DateField(
+        blank=True,
+        null=True,
+        verbose_name="⏭️ Próxima Compra",
+        help_text="Próxima data a gerar; adiante para pular competências (vazio = primeira compra)"
+    )
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "🔁 Compra Recorrente"
+        verbose_name_plural = "🔁 Compras Recorrentes"
+        ordering = ['proxima', 'descricao']
+        indexes = [
+            models.Index(fields=['ativo', 'proxima'], name='recorrente_proxima_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fornecedor.nome} - {self.descricao[:50]} ({self.get_periodicidade_display()})"
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        if self.forma_pagamento == 'credito' and not self.cartao_credito:
+            raise ValidationError({
+                'cartao_credito': 'Cartão de crédito é obrigatório para pagamento no crédito.'
+            })
+        if self.forma_pagamento != 'credito':
+            self.cartao_credito = None
+            self.parcelas = 1
+        if self.fim and self.inicio and self.fim < self.inicio:
+            raise ValidationError({'fim': 'A última compra não pode ser antes da primeira.'})
+
+        if self.loja_id and self.fornecedor_id and self.fornecedor.loja_id != self.loja_id:
+            raise ValidationError({'fornecedor': 'Fornecedor não pertence a esta loja.'})
+        if self.loja_id and self.cartao_credito_id and self.cartao_credito.loja_id != self.loja_id:
+            raise ValidationError({'cartao_credito': 'Cartão não pertence a esta loja.'})
+
+    def save(self, *args, **kwargs):
+        self.full_clean()
+        if self.proxima is None:
+            self.proxima = self.inicio
+        super().save(*args, **kwargs)
+
+    def seguinte(self, data):
+        """Data da ocorrência depois de `data`"""
+        if self.periodicidade == 'semanal':
+            return data + timedelta(days=7)
+        return _somar_meses(data, 12 if self.periodicidade == 'anual' else 1, self.inicio.day)
+
+    def datas_devidas(self, ate):
+        """Datas a gerar da `proxima` até `ate` (respeitando o fim)"""
+        if self.fim and self.fim < ate:
+            ate = self.fim
+        data = self.proxima or self.inicio
+        while data <= ate:
+            yield data
+            data = self.seguinte(data)
+
+    def nova_compra(self, data):
+        """Compra (ainda não gravada) da competência `data`"""
+        return Compra(
+            loja_id=self.loja_id,
+            fornecedor_id=self.fornecedor_id,
+            descricao=self.descricao,
+            valor_total=self.valor_total,
+            data_compra=data,
+            forma_pagamento=self.forma_pagamento,
+            cartao_credito=self.cartao_credito,
+            parcelas=self.parcelas,
+            observacoes=self.observacoes,
+            recorrencia=self,
+            competencia=data,
+        )
+
+class ResumoFornecedor(models.Model):
+    """Gastos do fornecedor em janelas móveis, mantidos a cada compra gravada
+    e recalculados periodicamente (as janelas andam com o calendário)"""
+    fornecedor = models.OneToOneField(
+        Fornecedor,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='resumo'
+    )
+    loja = models.ForeignKey(Loja, on_delete=models.CASCADE, related_name='+')
+    gasto_30 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Gasto 30 dias")
+    gasto_90 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Gasto 90 dias")
+    gasto_365 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Gasto 365 dias")
+    compras_365 = models.IntegerField(default=0, verbose_name="Compras em 365 dias")
+    ticket_medio = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Ticket médio")
+    total_geral = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Total geral")
+    qtd_total = models.IntegerField(default=0, verbose_name="Compras no total")
+    ultima_compra = models.DateField(blank=True, null=True, verbose_name="Última compra")
+    ranking = models.IntegerField(blank=True, null=True, verbose_name="Ranking")
+    atualizado_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "📈 Resumo do Fornecedor"
+        verbose_name_plural = "📈 Resumos dos Fornecedores"
+        indexes = [
+            models.Index(fields=['loja', '-gasto_365'], name='resumo_forn_gasto_idx'),
+            models.Index(fields=['loja', 'ranking'], name='resumo_forn_ranking_idx'),
+        ]
+
+    def __str__(self):
+        return f"Resumo de {self.fornecedor_id}"
+
+    @property
+    def compras_por_mes(self):
+        """Frequência média de compras nos últimos 12 meses"""
+        return round(self.compras_365 / 12, 1)
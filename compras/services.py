@@ -0,0 +1,358 @@
+"""Resumos de fornecedores (janelas de 30/90/365 dias e ranking), saldo dos cartões,
+baixa de parcelas em lote, compras recorrentes e dados do painel ao vivo"""
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from arquivo.consultas import anos_arquivados, compras_arquivadas
+from auditoria.registro import criacao, entrada, registrar
+from lancamentos.models import Lancamento
+from lancamentos.services import totais_vendas
+from lojas.models import Loja
+from lojas.painel import avisar_painel
+
+from .models import (
+    CartaoCredito, Compra, CompraRecorrente, ParcelaCompra, ResumoFornecedor, ajustar_saldo_devedor
+)
+
+JANELAS = (30, 90, 365)
+TAMANHO_LOTE = 1000
+
+
+def _agregar(compras, hoje):
+    """Um GROUP BY por fornecedor com todas as janelas como somas filtradas"""
+    somas = {
+        f'gasto_{dias}': Sum('valor_total', filter=Q(data_compra__gt=hoje - timedelta(days=dias)))
+        for dias in JANELAS
+    }
+    return (
+        compras
+        .values('fornecedor_id')
+        .annotate(
+            **somas,
+            compras_365=Count('pk', filter=Q(data_compra__gt=hoje - timedelta(days=365))),
+            total_geral=Sum('valor_total'),
+            qtd_total=Count('pk'),
+            ultima_compra=Max('data_compra'),
+        )
+        .order_by()
+    )
+
+
+def _calcular(loja, fornecedores=None):
+    """fornecedor_id -> valores do resumo, somando o banco principal e o arquivo"""
+    hoje = timezone.localdate()
+    compras = Compra.objects.filter(loja=loja)
+    arquivadas = compras_arquivadas(loja)
+    if fornecedores is not None:
+        compras = compras.filter(fornecedor_id__in=fornecedores)
+        if arquivadas is not None:
+            arquivadas = arquivadas.filter(fornecedor_id__in=fornecedores)
+
+    resumos = {}
+    for queryset in filter(lambda qs: qs is not None, [compras, arquivadas]):
+        for linha in _agregar(queryset, hoje):
+            resumo = resumos.setdefault(linha.pop('fornecedor_id'), {})
+            for campo, valor in linha.items():
+                if campo == 'ultima_compra':
+                    resumo[campo] = max(filter(None, [resumo.get(campo), valor]), default=None)
+                else:
+                    resumo[campo] = resumo.get(campo, 0) + (valor or 0)
+
+    for resumo in resumos.values():
+        resumo['ticket_medio'] = (
+            resumo['gasto_365'] / resumo['compras_365'] if resumo['compras_365'] else 0
+        )
+    return resumos
+
+
+def _gravar(loja, resumos, agora, campos_extras=()):
+    objetos = iter(
+        ResumoFornecedor(fornecedor_id=fornecedor_id, loja=loja, atualizado_em=agora, **valores)
+        for fornecedor_id, valores in resumos.items()
+    )
+    campos = ['gasto_30', 'gasto_90', 'gasto_365', 'compras_365', 'ticket_medio',
+              'total_geral', 'qtd_total', 'ultima_compra', 'atualizado_em', *campos_extras]
+    while lote := list(islice(objetos, TAMANHO_LOTE)):
+        ResumoFornecedor.objects.bulk_create(
+            lote, update_conflicts=True, unique_fields=['fornecedor'], update_fields=campos
+        )
+
+
+def _classificar(resumos):
+    """Ranking por gasto em 365 dias (empates dividem a posição, como RANK)"""
+    ordenados = sorted(resumos.values(), key=lambda resumo: -resumo['gasto_365'])
+    for posicao, resumo in enumerate(ordenados, 1):
+        anterior = ordenados[posicao - 2] if posicao > 1 else None
+        empatado = anterior is not None and anterior['gasto_365'] == resumo['gasto_365']
+        resumo['ranking'] = anterior['ranking'] if empatado else posicao
+
+
+def atualizar_resumos_fornecedores(loja_id, fornecedores):
+    """Atualiza só os fornecedores de uma compra gravada ou excluída.
+
+    O ranking só é refeito na recalculação periódica.
+    """
+    fornecedores = set(fornecedores) - {None}
+    loja = Loja(pk=loja_id)
+    resumos = _calcular(loja, fornecedores)
+    with transaction.atomic():
+        _gravar(loja, resumos, timezone.now())
+        # Fornecedor sem nenhuma compra restante
+        ResumoFornecedor.objects.filter(fornecedor_id__in=fornecedores - set(resumos)).delete()
+
+
+def recalcular_resumos_fornecedores(loja):
+    """Reconstrói os resumos da loja inteira (janelas avançam com o dia)"""
+    agora = timezone.now()
+    resumos = _calcular(loja)
+    _classificar(resumos)
+    with transaction.atomic():
+        _gravar(loja, resumos, agora, campos_extras=['ranking'])
+        ResumoFornecedor.objects.filter(loja=loja, atualizado_em__lt=agora).delete()
+    return len(resumos)
+
+
+def reconciliar_saldos(loja=None):
+    """Confere o saldo devedor mantido em cada cartão com as parcelas em aberto.
+
+    Compras no crédito ainda sem parcelas (gravadas antes do controle de
+    saldo) ganham parcelas primeiro, com as já vencidas marcadas como pagas.
+    """
+    cartoes = CartaoCredito.objects.all()
+    sem_parcelas = Compra.objects.filter(forma_pagamento='credito', parcelas_detalhadas__isnull=True)
+    if loja is not None:
+        cartoes = cartoes.filter(loja=loja)
+        sem_parcelas = sem_parcelas.filter(loja=loja)
+
+    hoje = timezone.localdate()
+    geradas = 0
+    for compra in list(sem_parcelas.select_related('cartao_credito')):
+        with transaction.atomic():
+            compra.gerar_parcelas(quitar_ate=hoje)
+        geradas += 1
+
+    corrigidos = []
+    # IMMEDIATE: nenhuma compra grava no meio da conferência
+    with transaction.atomic():
+        em_aberto = dict(
+            ParcelaCompra.objects.filter(paga=False, compra__cartao_credito__in=cartoes)
+            .values('compra__cartao_credito_id')
+            .annotate(total=Sum('valor_parcela'))
+            .values_list('compra__cartao_credito_id', 'total')
+        )
+        for cartao in cartoes.only('nome', 'saldo_devedor'):
+            esperado = em_aberto.get(cartao.pk, 0)
+            if cartao.saldo_devedor != esperado:
+                CartaoCredito.objects.filter(pk=cartao.pk).update(saldo_devedor=esperado)
+                corrigidos.append({
+                    'cartao': cartao.nome,
+                    'saldo_anterior': str(cartao.saldo_devedor),
+                    'saldo_correto': str(esperado),
+                })
+    return {'compras_parceladas': geradas, 'corrigidos': corrigidos}
+
+
+def _competencias(modelos, hoje, geradas):
+    """[(modelo, data)] a gerar e as competências puladas com o motivo.
+
+    Fornecedor ou cartão inativo segura o modelo inteiro (a `proxima` não
+    anda); ano arquivado é pulado de vez, porque a compra ficaria fora dos
+    totais do arquivo; limite do cartão estourado para o modelo naquela
+    competência, que volta na próxima execução.
+    """
+    anos = {}
+    usado = defaultdict(int)
+    devidas, ignoradas, paradas = [], [], {}
+    for modelo in modelos:
+        cartao = modelo.cartao_credito
+        if not modelo.fornecedor.ativo or (cartao is not None and not cartao.ativo):
+            motivo = 'Fornecedor inativo.' if not modelo.fornecedor.ativo else 'Cartão inativo.'
+            ignoradas.append({'recorrencia': modelo.pk, 'competencia': None, 'motivo': motivo})
+            paradas[modelo.pk] = modelo.proxima
+            continue
+        if modelo.loja_id not in anos:
+            anos[modelo.loja_id] = anos_arquivados(Loja(pk=modelo.loja_id))
+        for data in modelo.datas_devidas(hoje):
+            if (modelo.pk, data) in geradas:
+                continue
+            if data.year in anos[modelo.loja_id]:
+                ignoradas.append({'recorrencia': modelo.pk, 'competencia': data, 'motivo': 'Ano arquivado.'})
+                continue
+            if cartao is not None and cartao.limite is not None:
+                excesso = cartao.saldo_devedor + usado[cartao.pk] + modelo.valor_total - cartao.limite
+                if excesso > 0:
+                    ignoradas.append({
+                        'recorrencia': modelo.pk, 'competencia': data,
+                        'motivo': f'Passa R$ {excesso:.2f} do limite disponível do cartão.',
+                    })
+                    paradas[modelo.pk] = data
+                    break
+                usado[cartao.pk] += modelo.valor_total
+            devidas.append((modelo, data))
+    return devidas, ignoradas, paradas
+
+
+def gerar_compras_recorrentes(hoje=None, loja=None):
+    """Cria as compras devidas de todas as recorrências ativas numa transação.
+
+    Compras e parcelas entram em bulk_create; a `proxima` de cada modelo
+    avança na mesma transação, então rodar de novo não gera nada. A
+    restrição (recorrencia, competencia) barra duplicatas mesmo se a
+    `proxima` for recuada à mão. As competências puladas (ver
+    `_competencias`) voltam em 'ignoradas'.
+    """
+    hoje = hoje or timezone.localdate()
+    modelos = CompraRecorrente.objects.filter(ativo=True, proxima__lte=hoje) \
+        .select_related('fornecedor', 'cartao_credito').order_by('pk')
+    if loja is not None:
+        modelos = modelos.filter(loja=loja)
+
+    with transaction.atomic():
+        modelos = list(modelos.select_for_update(of=('self',)))
+        candidatas = {data for modelo in modelos for data in modelo.datas_devidas(hoje)}
+        geradas = set(
+            Compra.objects.filter(recorrencia__in=modelos, competencia__in=candidatas)
+            .values_list('recorrencia_id', 'competencia')
+        )
+        devidas, ignoradas, paradas = _competencias(modelos, hoje, geradas)
+        compras = Compra.objects.bulk_create(
+            [modelo.nova_compra(data) for modelo, data in devidas], batch_size=TAMANHO_LOTE
+        )
+        parcelas = [
+            parcela for compra in compras if compra.forma_pagamento == 'credito'
+            for parcela in compra.montar_parcelas()
+        ]
+        ParcelaCompra.objects.bulk_create(parcelas, batch_size=TAMANHO_LOTE)
+        registrar(
+            [criacao(compra, compra.loja_id) for compra in compras]
+            + [criacao(parcela, parcela.compra.loja_id) for parcela in parcelas]
+        )
+
+        por_cartao = defaultdict(int)
+        for parcela in parcelas:
+            por_cartao[parcela.compra.cartao_credito_id] += parcela.valor_parcela
+        for cartao_id, valor in por_cartao.items():
+            ajustar_saldo_devedor(cartao_id, valor)
+
+        for modelo in modelos:
+            if modelo.pk in paradas:
+                modelo.proxima = paradas[modelo.pk]
+                continue
+            while modelo.proxima <= hoje:
+                modelo.proxima = modelo.seguinte(modelo.proxima)
+        CompraRecorrente.objects.bulk_update(modelos, ['proxima'])
+
+        por_loja = defaultdict(set)
+        for compra in compras:
+            por_loja[compra.loja_id].add(compra.fornecedor_id)
+        for loja_id, fornecedores in por_loja.items():
+            transaction.on_commit(lambda l=loja_id, f=fornecedores: atualizar_resumos_fornecedores(l, f))
+            avisar_painel(loja_id)
+
+    return {
+        'compras': len(compras),
+        'parcelas': len(parcelas),
+        'valor': sum((compra.valor_total for compra in compras), 0),
+        'ignoradas': ignoradas,
+    }
+
+
+def _marcar_parcelas(parcelas, paga, data_pagamento):
+    """Um único UPDATE nas parcelas que mudam de situação, seguido do ajuste
+    do saldo de cada cartão envolvido (tudo na mesma transação)"""
+    with transaction.atomic():
+        alvo = parcelas.filter(paga=not paga)
+        # Uma leitura serve para o saldo dos cartões e para a auditoria
+        linhas = list(alvo.values_list(
+            'pk', 'valor_parcela', 'data_pagamento', 'compra__cartao_credito_id', 'compra__loja_id'
+        ).order_by())
+        # update() não passa pelo auto_now: updated_at alimenta o analítico e o DRE
+        alvo.update(paga=paga, data_pagamento=data_pagamento, updated_at=timezone.now())
+
+        por_cartao = defaultdict(int)
+        for _, valor, _, cartao_id, _ in linhas:
+            por_cartao[cartao_id] += valor
+        sinal = -1 if paga else 1
+        for cartao_id, total in por_cartao.items():
+            ajustar_saldo_devedor(cartao_id, sinal * total)
+        registrar([
+            entrada(ParcelaCompra, pk, loja_id, 'alteracao', {
+                'paga': [not paga, paga],
+                **({'data_pagamento': [antes, data_pagamento]} if antes != data_pagamento else {}),
+            })
+            for pk, _, antes, _, loja_id in linhas
+        ])
+
+    return {
+        'parcelas': len(linhas),
+        'valor': sum((valor for _, valor, _, _, _ in linhas), 0),
+    }
+
+
+def quitar_parcelas(parcelas, data_pagamento=None):
+    """Marca como pagas as parcelas em aberto do queryset"""
+    return _marcar_parcelas(parcelas, True, data_pagamento or timezone.localdate())
+
+
+def reabrir_parcelas(parcelas):
+    """Desfaz a baixa das parcelas pagas do queryset"""
+    return _marcar_parcelas(parcelas, False, None)
+
+
+def parcelas_da_fatura(cartao_id, ano, mes):
+    """Parcelas que vencem na fatura do mês (o vencimento segue o dia da fatura do cartão)"""
+    inicio = date(ano, mes, 1)
+    fim = date(ano, mes, calendar.monthrange(ano, mes)[1])
+    return ParcelaCompra.objects.filter(compra__cartao_credito_id=cartao_id, data_vencimento__range=(inicio, fim))
+
+
+def _valor(quantia):
+    return f"{quantia or 0:.2f}"
+
+
+def dados_painel(loja):
+    """Totais do mês e últimas movimentações, no formato enviado ao painel"""
+    mes_atual = timezone.localdate().replace(day=1)
+
+    vendas = Lancamento.objects.filter(loja=loja, data__gte=mes_atual).aggregate(**totais_vendas())
+    total_credito = vendas['total_credito'] or 0
+    total_vista = (vendas['total_pix'] or 0) + (vendas['total_dinheiro'] or 0) + (vendas['total_debito'] or 0)
+    total_compras = Compra.objects.filter(loja=loja, data_compra__gte=mes_atual).aggregate(
+        total=Sum('valor_total')
+    )['total'] or 0
+
+    return {
+        'mes_atual': mes_atual.strftime('%B %Y'),
+        'totais': {
+            'total_vendas_mes': _valor(total_vista + total_credito),
+            'total_vista_mes': _valor(total_vista),
+            'total_credito_mes': _valor(total_credito),
+            'total_compras_mes': _valor(total_compras),
+            'saldo': _valor(total_vista + total_credito - total_compras),
+        },
+        'ultimos_lancamentos': [
+            {
+                'data': l.data.strftime('%d/%m/%Y'),
+                'pix': _valor(l.pix),
+                'dinheiro': _valor(l.dinheiro),
+                'total': _valor(l.total_vendas),
+            }
+            for l in Lancamento.objects.filter(loja=loja)[:5]
+        ],
+        'ultimas_compras': [
+            {
+                'fornecedor': c.fornecedor.nome,
+                'data': c.data_compra.strftime('%d/%m/%Y'),
+                'forma': c.get_forma_pagamento_display(),
+                'valor': _valor(c.valor_total),
+                'parcelas': c.parcelas if c.forma_pagamento == 'credito' and c.parcelas > 1 else None,
+            }
+            for c in Compra.objects.filter(loja=loja).select_related('fornecedor')[:5]
+        ],
+    }
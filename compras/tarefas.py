@@ -0,0 +1,29 @@
+from fila.registro import tarefa
+from lojas.models import Loja
+
+from .services import gerar_compras_recorrentes, reconciliar_saldos, recalcular_resumos_fornecedores
+
+
+@tarefa('compras.resumo_fornecedores')
+def resumo_fornecedores(tarefa):
+    lojas = list(Loja.objects.all())
+    resultado = {}
+    for indice, loja in enumerate(lojas):
+        tarefa.atualizar_progresso(indice * 100 // len(lojas), f"Recalculando {loja.nome}")
+        resultado[loja.nome] = recalcular_resumos_fornecedores(loja)
+    return resultado
+
+
+@tarefa('compras.reconciliar_cartoes')
+def reconciliar_cartoes(tarefa):
+    return reconciliar_saldos()
+
+
+@tarefa('compras.gerar_recorrentes')
+def gerar_recorrentes(tarefa):
+    resultado = gerar_compras_recorrentes()
+    resultado['valor'] = str(resultado['valor'])
+    for ignorada in resultado['ignoradas']:
+        if ignorada['competencia']:
+            ignorada['competencia'] = ignorada['competencia'].isoformat()
+    return resultado
@@ -1,3 +1,470 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from arquivo.models import CompraArquivada
+from arquivo.services import arquivar_ano
+from auditoria.models import RegistroAuditoria
+from auditoria.registro import historico
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+from lojas.painel import marca_painel
+
+from .duplicados import (
+    agrupar_duplicados, chave_duplicidade, mesclar_fornecedores, mover_arquivadas, parecidos, propor_mesclas
+)
+from .models import (
+    CartaoCredito, Compra, CompraRecorrente, Fornecedor, ParcelaCompra, ResumoFornecedor, normalizar_nome
+)
+from .services import (
+    gerar_compras_recorrentes, quitar_parcelas, reabrir_parcelas, recalcular_resumos_fornecedores
+)
+from .views import _diferenca, _eventos_painel
+
+
+class ComprasListArquivoTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        self.cartao = CartaoCredito.objects.create(loja=self.loja, nome='Nubank')
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def _compra(self, descricao, **campos):
+        return Compra.objects.create(
+            loja=self.loja, fornecedor=self.fornecedor, descricao=descricao, valor_total=Decimal('30'),
+            data_compra=date(2023, 5, 10), **campos
+        )
+
+    def test_periodo_arquivado_lista_do_arquivo_e_as_em_aberto(self):
+        self._compra('Paga no pix', forma_pagamento='pix')
+        em_aberto = self._compra('Parcelada', forma_pagamento='credito', cartao_credito=self.cartao, parcelas=3)
+        arquivar_ano(self.loja, 2023)
+
+        resposta = self.client.get(reverse('compras_list'), {'data_inicio': '2023-01-01', 'data_fim': '2023-12-31'})
+
+        compras = list(resposta.context['compras'])
+        self.assertEqual([c.descricao for c in compras], ['Parcelada', 'Paga no pix'])
+        self.assertEqual(compras[0].pk, em_aberto.pk)
+        self.assertTrue(compras[1].arquivada)
+        self.assertEqual(resposta.context['stats']['count'], 2)
+        self.assertContains(resposta, '🗄️ Arquivada')
+
+
+class LimiteCartaoConcorrenciaTests(TransactionTestCase):
+    THREADS = 8
+
+    def test_compras_simultaneas_nao_passam_do_limite(self):
+        loja = loja_padrao()
+        fornecedor = Fornecedor.objects.create(loja=loja, nome='Atacadão')
+        cartao = CartaoCredito.objects.create(loja=loja, nome='Nubank', limite=Decimal('100'))
+        usuario = User.objects.create_user('gerente', password='senha')
+        inicio = threading.Barrier(self.THREADS)
+        erros = []
+
+        def comprar():
+            try:
+                cliente = Client()
+                cliente.force_login(usuario)
+                inicio.wait()
+                cliente.post(reverse('compra_create'), {
+                    'fornecedor': fornecedor.pk, 'descricao': 'Mercadoria', 'valor_total': '60',
+                    'data_compra': '2025-03-10', 'forma_pagamento': 'credito',
+                    'cartao_credito': cartao.pk, 'parcelas': '1',
+                })
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=comprar) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(erros, [])
+        self.assertEqual(Compra.objects.count(), 1)
+        cartao.refresh_from_db()
+        self.assertEqual(cartao.saldo_devedor, Decimal('60.00'))
+
+
+class MesclarFornecedoresTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.destino = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        self.origem = Fornecedor.objects.create(loja=self.loja, nome='ATACADAO LTDA')
+        Compra.objects.create(
+            loja=self.loja, fornecedor=self.origem, descricao='Antiga', valor_total=Decimal('40'),
+            data_compra=date(2023, 5, 10), forma_pagamento='pix'
+        )
+        arquivar_ano(self.loja, 2023)
+        self.compra = Compra.objects.create(
+            loja=self.loja, fornecedor=self.origem, descricao='Nova', valor_total=Decimal('25'),
+            data_compra=date(2025, 3, 10), forma_pagamento='pix'
+        )
+
+    def test_arquivo_so_muda_depois_do_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mesclar_fornecedores(self.destino, [self.origem]), 1)
+            self.assertEqual(CompraArquivada.objects.get().fornecedor_id, self.origem.pk)
+
+        self.assertEqual(CompraArquivada.objects.get().fornecedor_id, self.destino.pk)
+        self.compra.refresh_from_db()
+        self.assertEqual(self.compra.fornecedor, self.destino)
+        self.assertFalse(Fornecedor.objects.filter(pk=self.origem.pk).exists())
+
+    def test_mescla_desfeita_nao_mexe_no_arquivo(self):
+        try:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                mesclar_fornecedores(self.destino, [self.origem])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(CompraArquivada.objects.get().fornecedor_id, self.origem.pk)
+        self.assertTrue(Fornecedor.objects.filter(pk=self.origem.pk).exists())
+
+    def test_mover_arquivadas_pode_repetir(self):
+        self.assertEqual(mover_arquivadas([self.origem.pk], self.destino.pk), 1)
+        self.assertEqual(mover_arquivadas([self.origem.pk], self.destino.pk), 0)
+        self.assertEqual(CompraArquivada.objects.get().fornecedor_id, self.destino.pk)
+
+
+class DuplicadosTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def _fornecedor(self, nome, compras=0, ativo=True):
+        fornecedor = Fornecedor.objects.create(loja=self.loja, nome=nome, ativo=ativo)
+        for _ in range(compras):
+            Compra.objects.create(
+                loja=self.loja, fornecedor=fornecedor, descricao='Mercadoria', valor_total=Decimal('10'),
+                data_compra=date(2025, 3, 10), forma_pagamento='pix'
+            )
+        return fornecedor
+
+    def test_chave_tira_acento_pontuacao_e_sufixo(self):
+        self.assertEqual(chave_duplicidade('Atacadão'), 'atacadao')
+        self.assertEqual(chave_duplicidade('ATACADAO LTDA'), 'atacadao')
+        self.assertEqual(chave_duplicidade('Padaria Pão & Cia S/A.'), 'padaria pao')
+        # Nome que é só sufixo não some
+        self.assertEqual(chave_duplicidade('ME'), 'me')
+
+    def test_agrupa_pelo_lider_sem_encadear(self):
+        self.assertEqual(agrupar_duplicados({1: 'Atacadão', 2: 'ATACADAO LTDA', 3: 'Feira do Bairro'}), [[1, 2]])
+        # "Casa Bahia Norte" parece com os outros dois, mas eles não parecem entre si
+        grupos = agrupar_duplicados({1: 'Casa Bahia', 2: 'Casa Bahia Norte', 3: 'Casa Norte'})
+
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual(sorted(grupos[0]), [2, 3])
+
+    def test_limiar(self):
+        nomes = {1: 'Padaria Real', 2: 'Padaria Sul', 3: 'Feira do Bairro'}
+
+        self.assertEqual(parecidos(nomes, [1]), {1: []})
+        self.assertEqual(parecidos(nomes, [1], limiar=0.3), {1: [2]})
+        self.assertEqual(agrupar_duplicados(nomes), [])
+        self.assertEqual(sorted(map(sorted, agrupar_duplicados(nomes, limiar=0.3))), [[1, 2]])
+
+    def test_destino_tem_mais_compras(self):
+        antigo = self._fornecedor('Atacadão')
+        usado = self._fornecedor('ATACADAO LTDA', compras=2)
+
+        self.assertEqual(propor_mesclas(self.loja), [(usado, [antigo])])
+
+    def test_destino_ativo_e_depois_o_mais_antigo(self):
+        inativo = self._fornecedor('Atacadão', ativo=False)
+        antigo = self._fornecedor('ATACADAO LTDA')
+        novo = self._fornecedor('Atacadao S/A')
+
+        destino, origens = propor_mesclas(self.loja)[0]
+
+        self.assertEqual(destino, antigo)
+        self.assertEqual(set(origens), {inativo, novo})
+
+    def test_so_os_parecidos_com_os_fornecedores_pedidos(self):
+        atacadao = self._fornecedor('Atacadão')
+        repetido = self._fornecedor('ATACADAO LTDA')
+        self._fornecedor('Feira do Bairro')
+        self._fornecedor('Feira do Bairro ME')
+
+        self.assertEqual(propor_mesclas(self.loja, fornecedores=[repetido]), [(atacadao, [repetido])])
+
+
+class ResumoFornecedorTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.hoje = timezone.localdate()
+        self.atacadao = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        self.feira = Fornecedor.objects.create(loja=self.loja, nome='Feira')
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def _compra(self, fornecedor, valor, dias_atras):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Compra.objects.create(
+                loja=self.loja, fornecedor=fornecedor, descricao='Mercadoria', valor_total=Decimal(valor),
+                data_compra=self.hoje - timedelta(days=dias_atras), forma_pagamento='pix'
+            )
+
+    def test_compra_gravada_atualiza_as_janelas(self):
+        self._compra(self.atacadao, '10', 5)
+        self._compra(self.atacadao, '20', 60)
+        self._compra(self.atacadao, '40', 400)
+
+        resumo = ResumoFornecedor.objects.get(fornecedor=self.atacadao)
+
+        self.assertEqual((resumo.gasto_30, resumo.gasto_90, resumo.gasto_365), (10, 30, 30))
+        self.assertEqual((resumo.compras_365, resumo.ticket_medio), (2, 15))
+        self.assertEqual((resumo.total_geral, resumo.qtd_total), (70, 3))
+        self.assertEqual(resumo.ultima_compra, self.hoje - timedelta(days=5))
+
+    def test_exclusao_da_ultima_compra_remove_o_resumo(self):
+        compra = self._compra(self.feira, '10', 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            compra.delete()
+        self.assertFalse(ResumoFornecedor.objects.filter(fornecedor=self.feira).exists())
+
+    def test_recalculo_classifica_com_empates(self):
+        terceiro = Fornecedor.objects.create(loja=self.loja, nome='Distribuidora')
+        self._compra(self.atacadao, '50', 1)
+        self._compra(self.feira, '50', 2)
+        self._compra(terceiro, '10', 3)
+
+        self.assertEqual(recalcular_resumos_fornecedores(self.loja), 3)
+
+        rankings = dict(ResumoFornecedor.objects.values_list('fornecedor_id', 'ranking'))
+        self.assertEqual(rankings, {self.atacadao.pk: 1, self.feira.pk: 1, terceiro.pk: 3})
+
+    def test_api_ordena_pelo_resumo(self):
+        self._compra(self.atacadao, '50', 100)
+        self._compra(self.feira, '20', 1)
+
+        resposta = self.client.get(reverse('api_fornecedores_ranking'), {'ordem': 'gasto_30'})
+
+        self.assertEqual([f['nome'] for f in resposta.json()['fornecedores']], ['Feira', 'Atacadão'])
+        self.assertEqual(self.client.get(reverse('api_fornecedores_ranking'), {'ordem': 'nome'}).status_code, 400)
+
+
+class QuitarParcelasTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+        fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        self.cartao = CartaoCredito.objects.create(loja=self.loja, nome='Nubank')
+        self.compra = Compra.objects.create(
+            loja=self.loja, fornecedor=fornecedor, descricao='Mercadoria', valor_total=Decimal('90'),
+            data_compra=date(2025, 3, 10), forma_pagamento='credito', cartao_credito=self.cartao, parcelas=3
+        )
+        self.parcelas = list(self.compra.parcelas_detalhadas.order_by('numero_parcela'))
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def _quitar(self, **payload):
+        return self.client.post(reverse('api_parcelas_quitar'), data=json.dumps(payload), content_type='application/json')
+
+    def _saldo(self):
+        self.cartao.refresh_from_db()
+        return self.cartao.saldo_devedor
+
+    def test_fatura_quita_so_as_parcelas_do_mes(self):
+        primeira = self.parcelas[0]
+        fatura = primeira.data_vencimento.strftime('%Y-%m')
+
+        resposta = self._quitar(cartao=self.cartao.pk, fatura=fatura, data_pagamento='2025-04-10')
+
+        self.assertEqual(resposta.json(), {'parcelas': 1, 'valor': '30.00'})
+        primeira.refresh_from_db()
+        self.assertEqual((primeira.paga, primeira.data_pagamento), (True, date(2025, 4, 10)))
+        self.assertEqual(self._saldo(), Decimal('60.00'))
+        self.assertEqual(historico(primeira).get(acao='alteracao').alteracoes['paga'], [False, True])
+
+    def test_quitar_de_novo_nao_mexe_no_saldo(self):
+        ids = [p.pk for p in self.parcelas]
+        self._quitar(ids=ids)
+
+        self.assertEqual(self._quitar(ids=ids).json(), {'parcelas': 0, 'valor': '0'})
+        self.assertEqual(self._saldo(), 0)
+
+    def test_reabrir_devolve_o_saldo(self):
+        parcelas = ParcelaCompra.objects.filter(compra=self.compra)
+        quitar_parcelas(parcelas)
+
+        self.assertEqual(reabrir_parcelas(parcelas)['parcelas'], 3)
+        self.assertEqual(self._saldo(), Decimal('90.00'))
+        self.assertFalse(parcelas.filter(data_pagamento__isnull=False).exists())
+
+    def test_parametros_invalidos(self):
+        for payload in ({}, {'fatura': '2025-13', 'cartao': self.cartao.pk}, {'ids': ['x']}):
+            with self.subTest(**payload):
+                self.assertEqual(self._quitar(**payload).status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PainelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loja = loja_padrao()
+
+    def test_gravacao_troca_a_marca_depois_do_commit(self):
+        marca = marca_painel(self.loja.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Lancamento.objects.create(loja=self.loja, data=timezone.localdate(), pix=Decimal('10'))
+            self.assertEqual(marca_painel(self.loja.pk), marca)
+        self.assertNotEqual(marca_painel(self.loja.pk), marca)
+
+    def test_diferenca_so_leva_o_que_mudou(self):
+        antigo = {'totais': {'saldo': '10.00', 'total_compras_mes': '0.00'}, 'ultimas_compras': []}
+        novo = {'totais': {'saldo': '5.00', 'total_compras_mes': '0.00'}, 'ultimas_compras': []}
+
+        self.assertEqual(_diferenca(novo, antigo), {'totais': {'saldo': '5.00'}})
+        self.assertEqual(_diferenca(novo, None), novo)
+
+    def test_fluxo_envia_o_painel_com_a_marca(self):
+        Lancamento.objects.create(loja=self.loja, data=timezone.localdate(), pix=Decimal('12.5'))
+        marca = marca_painel(self.loja.pk)
+
+        eventos = _eventos_painel(self.loja, '')
+        next(eventos)  # retry
+        evento = next(eventos)
+        eventos.close()
+
+        cabecalho, dados = evento.split('data: ')
+        self.assertEqual(cabecalho, f'id: {marca}\nevent: painel\n')
+        self.assertEqual(json.loads(dados)['totais']['total_vista_mes'], '12.50')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BuscaFornecedorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loja = loja_padrao()
+        for nome in ['Atacadão São Luiz', 'Distribuidora Atacadista', 'Feira do Bairro', 'ATACADO Central']:
+            Fornecedor.objects.create(loja=self.loja, nome=nome)
+        Fornecedor.objects.create(loja=self.loja, nome='Atacado Antigo', ativo=False)
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def _buscar(self, **parametros):
+        resposta = self.client.get(reverse('api_fornecedores_buscar'), parametros)
+        return [r['nome'] for r in resposta.json()['resultados']]
+
+    def test_normaliza_nome(self):
+        self.assertEqual(normalizar_nome('  Atacadão   SÃO  Luiz '), 'atacadao sao luiz')
+
+    def test_prefixo_ignora_acento_e_caixa_e_completa_com_palavras_do_meio(self):
+        self.assertEqual(self._buscar(q='ATACAD'), ['Atacadão São Luiz', 'ATACADO Central', 'Distribuidora Atacadista'])
+        # Palavra do meio só a partir de 3 letras
+        self.assertEqual(self._buscar(q='sa'), [])
+        self.assertEqual(self._buscar(q='sao'), ['Atacadão São Luiz'])
+
+    def test_limite(self):
+        self.assertEqual(len(self._buscar(q='a', limite=1)), 1)
+        self.assertEqual(len(self._buscar(q='', limite='x')), 4)
+
+
+class CompraRecorrenteTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Imobiliária')
+        self.cartao = CartaoCredito.objects.create(loja=self.loja, nome='Nubank')
+
+    def _recorrente(self, **campos):
+        return CompraRecorrente.objects.create(
+            loja=self.loja, fornecedor=self.fornecedor, descricao='Aluguel', valor_total=Decimal('100'), **campos
+        )
+
+    def test_mensal_repete_o_dia_ajustado_ao_fim_do_mes(self):
+        recorrente = self._recorrente(inicio=date(2025, 1, 31))
+
+        resultado = gerar_compras_recorrentes(hoje=date(2025, 4, 15))
+
+        self.assertEqual((resultado['compras'], resultado['valor']), (3, Decimal('300')))
+        self.assertEqual(
+            list(Compra.objects.order_by('data_compra').values_list('data_compra', flat=True)),
+            [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31)],
+        )
+        recorrente.refresh_from_db()
+        self.assertEqual(recorrente.proxima, date(2025, 4, 30))
+
+    def test_rodar_de_novo_nao_duplica(self):
+        recorrente = self._recorrente(inicio=date(2025, 3, 1), periodicidade='semanal')
+        gerar_compras_recorrentes(hoje=date(2025, 3, 10))
+        # Próxima recuada à mão: a competência já gerada não se repete
+        CompraRecorrente.objects.filter(pk=recorrente.pk).update(proxima=date(2025, 3, 1))
+
+        self.assertEqual(gerar_compras_recorrentes(hoje=date(2025, 3, 10))['compras'], 0)
+        self.assertEqual(Compra.objects.count(), 2)
+
+    def test_credito_gera_parcelas_e_ajusta_o_saldo(self):
+        self._recorrente(inicio=date(2025, 3, 5), fim=date(2025, 4, 30), forma_pagamento='credito',
+                         cartao_credito=self.cartao, parcelas=2)
+
+        resultado = gerar_compras_recorrentes(hoje=date(2025, 12, 1))
+
+        self.assertEqual((resultado['compras'], resultado['parcelas']), (2, 4))
+        self.cartao.refresh_from_db()
+        self.assertEqual(self.cartao.saldo_devedor, Decimal('200'))
+        self.assertEqual(RegistroAuditoria.objects.filter(acao='criacao', modelo='compras.compra').count(), 2)
+
+    def test_pula_competencias_de_ano_arquivado(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2024, 3, 1), pix=Decimal('10'))
+        arquivar_ano(self.loja, 2024)
+        recorrente = self._recorrente(inicio=date(2024, 11, 5))
+
+        resultado = gerar_compras_recorrentes(hoje=date(2025, 1, 10))
+
+        self.assertEqual(list(Compra.objects.values_list('data_compra', flat=True)), [date(2025, 1, 5)])
+        self.assertEqual(
+            [(i['competencia'], i['motivo']) for i in resultado['ignoradas']],
+            [(date(2024, 11, 5), 'Ano arquivado.'), (date(2024, 12, 5), 'Ano arquivado.')],
+        )
+        recorrente.refresh_from_db()
+        self.assertEqual(recorrente.proxima, date(2025, 2, 5))
+
+    def test_fornecedor_ou_cartao_inativo_segura_o_modelo(self):
+        recorrente = self._recorrente(inicio=date(2025, 1, 5))
+        com_cartao = self._recorrente(
+            inicio=date(2025, 1, 5), forma_pagamento='credito', cartao_credito=self.cartao
+        )
+        Fornecedor.objects.filter(pk=self.fornecedor.pk).update(ativo=False)
+        CartaoCredito.objects.filter(pk=self.cartao.pk).update(ativo=False)
+
+        resultado = gerar_compras_recorrentes(hoje=date(2025, 3, 10))
+
+        self.assertFalse(Compra.objects.exists())
+        self.assertEqual({i['recorrencia'] for i in resultado['ignoradas']}, {recorrente.pk, com_cartao.pk})
+        recorrente.refresh_from_db()
+        self.assertEqual(recorrente.proxima, date(2025, 1, 5))
+
+        outro = Fornecedor.objects.create(loja=self.loja, nome='Papelaria')
+        CompraRecorrente.objects.filter(pk=com_cartao.pk).update(fornecedor=outro)
+        resultado = gerar_compras_recorrentes(hoje=date(2025, 3, 10))
+        self.assertEqual([i['motivo'] for i in resultado['ignoradas']], ['Fornecedor inativo.', 'Cartão inativo.'])
+
+    def test_limite_do_cartao_para_na_competencia_que_nao_cabe(self):
+        CartaoCredito.objects.filter(pk=self.cartao.pk).update(limite=Decimal('250'))
+        recorrente = self._recorrente(inicio=date(2025, 1, 5), forma_pagamento='credito', cartao_credito=self.cartao)
+
+        resultado = gerar_compras_recorrentes(hoje=date(2025, 4, 10))
+
+        self.assertEqual(resultado['compras'], 2)
+        ignorada, = resultado['ignoradas']
+        self.assertEqual(ignorada['competencia'], date(2025, 3, 5))
+        self.assertIn('limite', ignorada['motivo'])
+        recorrente.refresh_from_db()
+        self.assertEqual(recorrente.proxima, date(2025, 3, 5))
+        self.cartao.refresh_from_db()
+        self.assertEqual(self.cartao.saldo_devedor, Decimal('200'))
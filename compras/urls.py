@@ -10,10 +10,12 @@ urlpatterns = [
     
     # Dashboard
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('api/painel/eventos/', views.api_painel_eventos, name='api_painel_eventos'),
     
     # Lançamentos
     path('lancamentos/', views.lancamentos_list, name='lancamentos_list'),
     path('lancamentos/novo/', views.lancamento_create, name='lancamento_create'),
+    path('lancamentos/grade/', views.lancamentos_grade, name='lancamentos_grade'),
     path('lancamentos/<int:pk>/editar/', views.lancamento_edit, name='lancamento_edit'),
     path('lancamentos/<int:pk>/excluir/', views.lancamento_delete, name='lancamento_delete'),
     
@@ -26,4 +28,8 @@ urlpatterns = [
     
     # APIs
     path('api/cartoes/', views.api_cartoes, name='api_cartoes'),
+    path('api/fornecedores/buscar/', views.api_fornecedores_buscar, name='api_fornecedores_buscar'),
+    path('api/parcelas/quitar/', views.api_parcelas_quitar, name='api_parcelas_quitar'),
+    path('api/fornecedores/ranking/', views.api_fornecedores_ranking, name='api_fornecedores_ranking'),
+    path('api/lancamentos/registrar/', views.api_lancamentos_registrar, name='api_lancamentos_registrar'),
 ]
\ No newline at end of file
@@ -4,18 +4,34 @@ from django.shortcuts import render
 
 # compras/views.py
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import Q, Sum, Count
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.utils.dateparse import parse_datetime
+from datetime import date, datetime, timedelta
+import calendar
+import hashlib
 import json
+import time
 
-from .models import Fornecedor, CartaoCredito, Compra
+from .models import Fornecedor, CartaoCredito, Compra, ParcelaCompra, ResumoFornecedor, normalizar_nome
+from .services import dados_painel, parcelas_da_fatura, quitar_parcelas
 from lancamentos.models import Lancamento
+from lancamentos.services import gravar_grade, registrar_vendas, CAMPOS_VALOR
+from lojas.middleware import get_loja
+from lojas.painel import marca_painel
+from arquivo.consultas import (
+    Concatenadas, compras_arquivadas, lancamentos_arquivados, periodo_todo_arquivado, verificar_dias_abertos
+)
 
 def login_view(request):
     if request.user.is_authenticated:
@@ -40,39 +56,81 @@ def logout_view(request):
 
 @login_required
 def dashboard(request):
-    # Estatísticas gerais
-    hoje = timezone.now().date()
-    mes_atual = hoje.replace(day=1)
-    
-    # Lançamentos do mês
-    lancamentos_mes = Lancamento.objects.filter(data__gte=mes_atual)
-    total_vendas_mes = sum(l.total_vendas for l in lancamentos_mes)
-    total_vista_mes = sum(l.total_a_vista for l in lancamentos_mes)
-    total_credito_mes = sum(l.total_credito for l in lancamentos_mes)
-    
-    # Compras do mês
-    compras_mes = Compra.objects.filter(data_compra__gte=mes_atual)
-    total_compras_mes = compras_mes.aggregate(total=Sum('valor_total'))['total'] or 0
-    
-    # Últimas movimentações
-    ultimos_lancamentos = Lancamento.objects.all()[:5]
-    ultimas_compras = Compra.objects.all()[:5]
-    
+    # A marca é lida antes dos dados: uma gravação no meio do cálculo
+    # ainda chega ao painel pelo fluxo de eventos
+    marca = marca_painel(request.loja.pk)
+    painel = dados_painel(request.loja)
+
     context = {
-        'total_vendas_mes': total_vendas_mes,
-        'total_vista_mes': total_vista_mes,
-        'total_credito_mes': total_credito_mes,
-        'total_compras_mes': total_compras_mes,
-        'ultimos_lancamentos': ultimos_lancamentos,
-        'ultimas_compras': ultimas_compras,
-        'mes_atual': mes_atual.strftime('%B %Y'),
+        **painel['totais'],
+        'ultimos_lancamentos': painel['ultimos_lancamentos'],
+        'ultimas_compras': painel['ultimas_compras'],
+        'mes_atual': painel['mes_atual'],
+        'marca_painel': marca,
     }
-    
+
     return render(request, 'dashboard.html', context)
 
+# Painel ao vivo (Server-Sent Events). O projeto roda em WSGI: o fluxo é um
+# gerador síncrono e cada painel aberto ocupa uma thread do servidor enquanto
+# a conexão durar, por isso ela é curta e o navegador reconecta sozinho.
+INTERVALO_PAINEL = 1           # segundos entre leituras da marca no cache
+PING_PAINEL = 15               # comentário para manter a conexão aberta em proxies
+DURACAO_CONEXAO_PAINEL = 300   # depois disso o navegador reconecta sozinho
+
+
+def _diferenca(novo, antigo):
+    """Só as chaves que mudaram (os totais são comparados um a um)"""
+    if antigo is None:
+        return novo
+    delta = {}
+    for chave, valor in novo.items():
+        if isinstance(valor, dict):
+            alterados = {k: v for k, v in valor.items() if antigo[chave].get(k) != v}
+            if alterados:
+                delta[chave] = alterados
+        elif antigo[chave] != valor:
+            delta[chave] = valor
+    return delta
+
+
+def _eventos_painel(loja, marca):
+    yield "retry: 3000\n\n"
+    enviado = None
+    inicio = ultimo_envio = time.monotonic()
+    while time.monotonic() - inicio < DURACAO_CONEXAO_PAINEL:
+        atual = marca_painel(loja.pk)
+        if atual != marca:
+            dados = dados_painel(loja)
+            delta = _diferenca(dados, enviado)
+            enviado, marca = dados, atual
+            if delta:
+                yield f"id: {atual}\nevent: painel\ndata: {json.dumps(delta)}\n\n"
+                ultimo_envio = time.monotonic()
+        if time.monotonic() - ultimo_envio >= PING_PAINEL:
+            yield ": ping\n\n"
+            ultimo_envio = time.monotonic()
+        time.sleep(INTERVALO_PAINEL)
+
+
+@login_required
+def api_painel_eventos(request):
+    """Fluxo de eventos do dashboard: envia só os totais e listas que mudaram.
+
+    Parado, cada painel custa uma leitura de cache por segundo; o banco só é
+    consultado quando uma gravação troca a marca da loja.
+    """
+    loja = get_loja(request)
+    marca = request.headers.get('Last-Event-ID') or request.GET.get('marca', '')
+    return StreamingHttpResponse(
+        _eventos_painel(loja, marca),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
 @login_required
 def lancamentos_list(request):
-    lancamentos = Lancamento.objects.all()
+    lancamentos = Lancamento.objects.filter(loja=request.loja)
     
     # Filtros
     data_inicio = request.GET.get('data_inicio')
@@ -83,24 +141,34 @@ def lancamentos_list(request):
     if data_fim:
         lancamentos = lancamentos.filter(data__lte=data_fim)
     
-    # Estatísticas
-    stats = lancamentos.aggregate(
-        total_pix=Sum('pix'),
-        total_dinheiro=Sum('dinheiro'),
-        total_debito=Sum('cartao_debito'),
-        total_credito=Sum('cartao_credito')
-    )
+    # Estatísticas (somando os anos arquivados que caem no período)
+    agregados = {
+        'total_pix': Sum('pix'),
+        'total_dinheiro': Sum('dinheiro'),
+        'total_debito': Sum('cartao_debito'),
+        'total_credito': Sum('cartao_credito'),
+        'count': Count('id'),
+    }
+    stats = lancamentos.aggregate(**agregados)
+    arquivados = lancamentos_arquivados(request.loja, data_inicio, data_fim)
+    if arquivados is not None:
+        for campo, valor in arquivados.aggregate(**agregados).items():
+            stats[campo] = (stats[campo] or 0) + (valor or 0)
     
     total_geral = (stats['total_pix'] or 0) + (stats['total_dinheiro'] or 0) + (stats['total_debito'] or 0) + (stats['total_credito'] or 0)
     total_vista = (stats['total_pix'] or 0) + (stats['total_dinheiro'] or 0) + (stats['total_debito'] or 0)
     
+    # Período todo arquivado: lista direto do arquivo (somente leitura)
+    somente_arquivo = arquivados is not None and periodo_todo_arquivado(request.loja, data_inicio, data_fim)
+    
     # Paginação
-    paginator = Paginator(lancamentos, 15)
+    paginator = Paginator(arquivados if somente_arquivo else lancamentos, 15)
     page = request.GET.get('page')
     lancamentos_page = paginator.get_page(page)
     
     context = {
         'lancamentos': lancamentos_page,
+        'arquivado': somente_arquivo,
         'stats': {
             'total_pix': stats['total_pix'] or 0,
             'total_dinheiro': stats['total_dinheiro'] or 0,
@@ -108,7 +176,7 @@ def lancamentos_list(request):
             'total_credito': stats['total_credito'] or 0,
             'total_geral': total_geral,
             'total_vista': total_vista,
-            'count': lancamentos.count()
+            'count': stats['count']
         },
         'filtros': {
             'data_inicio': data_inicio,
@@ -127,8 +195,10 @@ def lancamento_create(request):
                 data = datetime.strptime(data, '%Y-%m-%d').date()
             else:
                 data = timezone.now().date()
+            verificar_dias_abertos(request.loja, [data])
             
             lancamento = Lancamento.objects.create(
+                loja=request.loja,
                 data=data,
                 pix=float(request.POST.get('pix', 0) or 0),
                 dinheiro=float(request.POST.get('dinheiro', 0) or 0),
@@ -139,6 +209,8 @@ def lancamento_create(request):
             messages.success(request, 'Lançamento criado com sucesso!')
             return redirect('lancamentos_list')
             
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
         except Exception as e:
             messages.error(request, f'Erro ao criar lançamento: {str(e)}')
     
@@ -149,13 +221,15 @@ def lancamento_create(request):
 
 @login_required
 def lancamento_edit(request, pk):
-    lancamento = get_object_or_404(Lancamento, pk=pk)
+    lancamento = get_object_or_404(Lancamento, pk=pk, loja=request.loja)
     
     if request.method == 'POST':
         try:
+            data_original = lancamento.data
             data = request.POST.get('data')
             if data:
                 lancamento.data = datetime.strptime(data, '%Y-%m-%d').date()
+            verificar_dias_abertos(request.loja, [data_original, lancamento.data])
             
             lancamento.pix = float(request.POST.get('pix', 0) or 0)
             lancamento.dinheiro = float(request.POST.get('dinheiro', 0) or 0)
@@ -166,6 +240,8 @@ def lancamento_edit(request, pk):
             messages.success(request, 'Lançamento atualizado com sucesso!')
             return redirect('lancamentos_list')
             
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
         except Exception as e:
             messages.error(request, f'Erro ao atualizar lançamento: {str(e)}')
     
@@ -178,15 +254,99 @@ def lancamento_edit(request, pk):
 @login_required
 def lancamento_delete(request, pk):
     if request.method == 'POST':
-        lancamento = get_object_or_404(Lancamento, pk=pk)
+        lancamento = get_object_or_404(Lancamento, pk=pk, loja=request.loja)
         lancamento.delete()
         messages.success(request, 'Lançamento excluído com sucesso!')
     
     return redirect('lancamentos_list')
 
+def _ler_versao(texto):
+    try:
+        return parse_datetime(texto)
+    except ValueError:
+        return None
+
+@login_required
+def lancamentos_grade(request):
+    """Semana ou mês de lançamentos numa grade, gravada de uma vez só"""
+    periodo = 'mes' if request.GET.get('periodo') == 'mes' else 'semana'
+    try:
+        referencia = datetime.strptime(request.GET.get('inicio', ''), '%Y-%m-%d').date()
+    except ValueError:
+        referencia = timezone.localdate()
+    # Longe dos limites de date: anterior/próximo somam e subtraem dias
+    if not date.min + timedelta(days=31) <= referencia <= date.max - timedelta(days=62):
+        referencia = timezone.localdate()
+
+    if periodo == 'mes':
+        inicio = referencia.replace(day=1)
+        fim = inicio.replace(day=calendar.monthrange(inicio.year, inicio.month)[1])
+        anterior = (inicio - timedelta(days=1)).replace(day=1)
+    else:
+        inicio = referencia - timedelta(days=referencia.weekday())
+        fim = inicio + timedelta(days=6)
+        anterior = inicio - timedelta(days=7)
+    dias = [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+    erros = {}
+    if request.method == 'POST':
+        celulas = {
+            (dia, campo): request.POST.get(f'{campo}_{dia.isoformat()}', '')
+            for dia in dias for campo in CAMPOS_VALOR
+        }
+        # Versão (updated_at) de cada dia quando a grade foi aberta
+        versoes = {dia: _ler_versao(request.POST.get(f'versao_{dia.isoformat()}', '')) for dia in dias}
+        try:
+            gravados = gravar_grade(request.loja, celulas, versoes)
+        except ValidationError as e:
+            erros = e.message_dict
+            messages.error(request, f'{len(erros)} célula(s) com erro. Nada foi gravado.')
+        else:
+            if gravados:
+                messages.success(request, f'{len(gravados)} dia(s) gravado(s) com sucesso!')
+            else:
+                messages.info(request, 'Nenhuma alteração para gravar.')
+            return redirect(f"{reverse('lancamentos_grade')}?periodo={periodo}&inicio={inicio.isoformat()}")
+
+    existentes = {l.data: l for l in Lancamento.objects.filter(loja=request.loja, data__range=(inicio, fim))}
+    linhas = []
+    for dia in dias:
+        lancamento = existentes.get(dia)
+        versao = lancamento.updated_at if lancamento else None
+        # Depois de um erro, o que foi digitado volta na tela; o dia que outra
+        # pessoa alterou nesse meio-tempo volta com os valores (e a versão) atuais
+        digitado = request.method == 'POST' and versoes[dia] == versao
+        celulas = []
+        for campo in CAMPOS_VALOR:
+            nome = f'{campo}_{dia.isoformat()}'
+            if digitado:
+                valor = request.POST.get(nome, '')
+            else:
+                valor = getattr(lancamento, campo) if lancamento else ''
+            celulas.append({'nome': nome, 'valor': valor, 'erro': erros.get(nome, [''])[0]})
+        linhas.append({
+            'data': dia, 'lancamento': lancamento, 'celulas': celulas,
+            'versao': versao.isoformat() if versao else '',
+        })
+
+    return render(request, 'Lancamentos/grade.html', {
+        'linhas': linhas,
+        'periodo': periodo,
+        'inicio': inicio,
+        'fim': fim,
+        'anterior': anterior,
+        'proximo': fim + timedelta(days=1),
+    })
+
+def _fornecedor_selecionado(request, fornecedor_id):
+    """Só o fornecedor já escolhido vai para a página; os demais vêm da busca"""
+    if not str(fornecedor_id or '').isdigit():
+        return None
+    return Fornecedor.objects.filter(loja=request.loja, pk=fornecedor_id).first()
+
 @login_required
 def compras_list(request):
-    compras = Compra.objects.select_related('fornecedor', 'cartao_credito').all()
+    compras = Compra.objects.filter(loja=request.loja).select_related('fornecedor', 'cartao_credito')
     
     # Filtros
     fornecedor_id = request.GET.get('fornecedor')
@@ -209,27 +369,43 @@ def compras_list(request):
             Q(fornecedor__nome__icontains=search)
         )
     
-    # Estatísticas
-    total_compras = compras.aggregate(total=Sum('valor_total'))['total'] or 0
-    total_vista = compras.filter(forma_pagamento__in=['dinheiro', 'pix', 'debito']).aggregate(total=Sum('valor_total'))['total'] or 0
-    total_credito = compras.filter(forma_pagamento='credito').aggregate(total=Sum('valor_total'))['total'] or 0
+    # Estatísticas (uma única consulta, somando as compras arquivadas do período)
+    agregados = {
+        'total_compras': Sum('valor_total'),
+        'total_vista': Sum('valor_total', filter=Q(forma_pagamento__in=['dinheiro', 'pix', 'debito'])),
+        'total_credito': Sum('valor_total', filter=Q(forma_pagamento='credito')),
+        'count': Count('id'),
+    }
+    stats = compras.aggregate(**agregados)
+    arquivadas = compras_arquivadas(
+        request.loja, data_inicio, data_fim,
+        fornecedor_id=fornecedor_id, forma_pagamento=forma_pagamento, search=search
+    )
+    stats['arquivadas'] = 0
+    if arquivadas is not None:
+        stats_arquivo = arquivadas.aggregate(**agregados)
+        for campo, valor in stats_arquivo.items():
+            stats[campo] = (stats[campo] or 0) + (valor or 0)
+        stats['arquivadas'] = stats_arquivo['count']
+    
+    # Período todo arquivado: lista também do arquivo (somente leitura). As
+    # compras com parcelas em aberto continuam no principal e vêm primeiro
+    somente_arquivo = arquivadas is not None and periodo_todo_arquivado(request.loja, data_inicio, data_fim)
     
     # Paginação
-    paginator = Paginator(compras, 15)
+    paginator = Paginator(Concatenadas(compras, arquivadas) if somente_arquivo else compras, 15)
     page = request.GET.get('page')
     compras_page = paginator.get_page(page)
     
-    # Dados para filtros
-    fornecedores = Fornecedor.objects.filter(ativo=True).order_by('nome')
-    
     context = {
         'compras': compras_page,
-        'fornecedores': fornecedores,
+        'fornecedor_selecionado': _fornecedor_selecionado(request, fornecedor_id),
         'stats': {
-            'total_compras': total_compras,
-            'total_vista': total_vista,
-            'total_credito': total_credito,
-            'count': compras.count()
+            'total_compras': stats['total_compras'] or 0,
+            'total_vista': stats['total_vista'] or 0,
+            'total_credito': stats['total_credito'] or 0,
+            'count': stats['count'],
+            'arquivadas': stats['arquivadas']
         },
         'filtros': {
             'fornecedor_id': int(fornecedor_id) if fornecedor_id else None,
@@ -243,6 +419,16 @@ def compras_list(request):
     
     return render(request, 'compras/list.html', context)
 
+def _verificar_limite(request, compra):
+    """Barra compra acima do limite do cartão, salvo se o usuário confirmou"""
+    excesso = compra.excesso_limite()
+    if excesso and not request.POST.get('ultrapassar_limite'):
+        raise ValueError(
+            f'passa R$ {excesso:.2f} do limite disponível do cartão. '
+            f'Marque "Gravar acima do limite" para confirmar.'
+        )
+    return excesso
+
 @login_required
 def compra_create(request):
     if request.method == 'POST':
@@ -254,6 +440,7 @@ def compra_create(request):
                 data_compra = timezone.now().date()
             
             compra = Compra(
+                loja=request.loja,
                 fornecedor_id=request.POST.get('fornecedor'),
                 descricao=request.POST.get('descricao'),
                 valor_total=float(request.POST.get('valor_total')),
@@ -266,21 +453,25 @@ def compra_create(request):
                 compra.cartao_credito_id = request.POST.get('cartao_credito')
                 compra.parcelas = int(request.POST.get('parcelas', 1))
             
-            compra.save()
+            # BEGIN IMMEDIATE: nenhuma outra compra no cartão entre a conferência e a gravação
+            with transaction.atomic():
+                excesso = _verificar_limite(request, compra)
+                compra.save()
             
             messages.success(request, 'Compra criada com sucesso!')
+            if excesso:
+                messages.warning(request, f'Compra gravada R$ {excesso:.2f} acima do limite do cartão.')
             return redirect('compras_list')
             
         except Exception as e:
             messages.error(request, f'Erro ao criar compra: {str(e)}')
     
-    fornecedores = Fornecedor.objects.filter(ativo=True).order_by('nome')
-    cartoes = CartaoCredito.objects.filter(ativo=True).order_by('nome')
+    cartoes = CartaoCredito.objects.filter(loja=request.loja, ativo=True).order_by('nome')
     
     context = {
         'title': 'Nova Compra',
         'action': 'create',
-        'fornecedores': fornecedores,
+        'fornecedor_selecionado': _fornecedor_selecionado(request, request.POST.get('fornecedor')),
         'cartoes': cartoes,
         'FORMA_PAGAMENTO_CHOICES': Compra.FORMA_PAGAMENTO_CHOICES,
         'PARCELAS_CHOICES': Compra.PARCELAS_CHOICES
@@ -290,7 +481,7 @@ def compra_create(request):
 
 @login_required
 def compra_edit(request, pk):
-    compra = get_object_or_404(Compra, pk=pk)
+    compra = get_object_or_404(Compra, pk=pk, loja=request.loja)
     
     if request.method == 'POST':
         try:
@@ -311,22 +502,26 @@ def compra_edit(request, pk):
                 compra.cartao_credito = None
                 compra.parcelas = 1
             
-            compra.save()
+            # BEGIN IMMEDIATE: nenhuma outra compra no cartão entre a conferência e a gravação
+            with transaction.atomic():
+                excesso = _verificar_limite(request, compra)
+                compra.save()
             
             messages.success(request, 'Compra atualizada com sucesso!')
+            if excesso:
+                messages.warning(request, f'Compra gravada R$ {excesso:.2f} acima do limite do cartão.')
             return redirect('compras_list')
             
         except Exception as e:
             messages.error(request, f'Erro ao atualizar compra: {str(e)}')
     
-    fornecedores = Fornecedor.objects.filter(ativo=True).order_by('nome')
-    cartoes = CartaoCredito.objects.filter(ativo=True).order_by('nome')
+    cartoes = CartaoCredito.objects.filter(loja=request.loja, ativo=True).order_by('nome')
     
     context = {
         'title': 'Editar Compra',
         'action': 'edit',
         'compra': compra,
-        'fornecedores': fornecedores,
+        'fornecedor_selecionado': compra.fornecedor,
         'cartoes': cartoes,
         'FORMA_PAGAMENTO_CHOICES': Compra.FORMA_PAGAMENTO_CHOICES,
         'PARCELAS_CHOICES': Compra.PARCELAS_CHOICES
@@ -337,7 +532,7 @@ def compra_edit(request, pk):
 @login_required
 def compra_delete(request, pk):
     if request.method == 'POST':
-        compra = get_object_or_404(Compra, pk=pk)
+        compra = get_object_or_404(Compra, pk=pk, loja=request.loja)
         compra.delete()
         messages.success(request, 'Compra excluída com sucesso!')
     
@@ -345,11 +540,154 @@ def compra_delete(request, pk):
 
 @login_required
 def compra_detail(request, pk):
-    compra = get_object_or_404(Compra, pk=pk)
+    compra = get_object_or_404(Compra, pk=pk, loja=request.loja)
     return render(request, 'compras/detail.html', {'compra': compra})
 
 # APIs para dados dinâmicos
+# Busca de fornecedores (autocomplete dos formulários)
+BUSCA_LIMITE = 20
+BUSCA_LIMITE_MAXIMO = 50
+BUSCA_CACHE = 60  # segundos; fornecedor novo aparece na busca em até 1 minuto
+
+@login_required
+def api_fornecedores_buscar(request):
+    """Fornecedores ativos cujo nome começa com ?q= (sem acento nem caixa).
+
+    O prefixo é um intervalo no índice parcial (loja, nome_normalizado); com 3+
+    letras completa com nomes em que o termo começa uma palavra do meio.
+    """
+    termo = normalizar_nome(request.GET.get('q', ''))
+    try:
+        limite = max(1, min(int(request.GET.get('limite') or BUSCA_LIMITE), BUSCA_LIMITE_MAXIMO))
+    except ValueError:
+        limite = BUSCA_LIMITE
+
+    chave = 'fornecedores:busca:{}:{}:{}'.format(
+        request.loja.pk, limite, hashlib.md5(termo.encode()).hexdigest()
+    )
+    resultados = cache.get(chave)
+    if resultados is None:
+        ativos = Fornecedor.objects.filter(loja=request.loja, ativo=True).order_by('nome_normalizado')
+        campos = ('id', 'nome', 'contato')
+        resultados = list(ativos.filter(
+            nome_normalizado__gte=termo, nome_normalizado__lt=termo + '\U0010ffff'
+        ).values(*campos)[:limite])
+        if len(termo) >= 3 and len(resultados) < limite:
+            resultados += ativos.filter(nome_normalizado__contains=' ' + termo).exclude(
+                pk__in=[r['id'] for r in resultados]
+            ).values(*campos)[:limite - len(resultados)]
+        cache.set(chave, resultados, BUSCA_CACHE)
+
+    return JsonResponse({'resultados': resultados})
+
 @login_required
 def api_cartoes(request):
-    cartoes = CartaoCredito.objects.filter(ativo=True).values('id', 'nome')
-    return JsonResponse(list(cartoes), safe=False)
\ No newline at end of file
+    cartoes = CartaoCredito.objects.filter(loja=request.loja, ativo=True).values('id', 'nome')
+    return JsonResponse(list(cartoes), safe=False)
+
+@login_required
+@require_POST
+def api_parcelas_quitar(request):
+    """Dá baixa em lote: {"cartao": 1, "fatura": "2025-03"}, {"data_inicio", "data_fim"}
+    (com "cartao" opcional) ou {"ids": [...]}; "data_pagamento" é opcional"""
+    try:
+        payload = json.loads(request.body or b'{}')
+        if not isinstance(payload, dict):
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'erro': 'JSON inválido.'}, status=400)
+
+    parcelas = ParcelaCompra.objects.filter(compra__loja=request.loja)
+    try:
+        if payload.get('ids'):
+            parcelas = parcelas.filter(pk__in=[int(pk) for pk in payload['ids']])
+        elif payload.get('fatura'):
+            ano, mes = (int(parte) for parte in str(payload['fatura']).split('-'))
+            parcelas = parcelas & parcelas_da_fatura(int(payload['cartao']), ano, mes)
+        elif payload.get('data_inicio') and payload.get('data_fim'):
+            parcelas = parcelas.filter(data_vencimento__range=(
+                datetime.strptime(payload['data_inicio'], '%Y-%m-%d').date(),
+                datetime.strptime(payload['data_fim'], '%Y-%m-%d').date(),
+            ))
+            if payload.get('cartao'):
+                parcelas = parcelas.filter(compra__cartao_credito_id=int(payload['cartao']))
+        else:
+            return JsonResponse({'erro': 'Informe ids, fatura (com cartao) ou data_inicio e data_fim.'}, status=400)
+
+        data_pagamento = None
+        if payload.get('data_pagamento'):
+            data_pagamento = datetime.strptime(payload['data_pagamento'], '%Y-%m-%d').date()
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({'erro': 'Parâmetros inválidos.'}, status=400)
+
+    resultado = quitar_parcelas(parcelas, data_pagamento)
+    return JsonResponse({'parcelas': resultado['parcelas'], 'valor': str(resultado['valor'])})
+
+# Ordenações aceitas no ranking de fornecedores
+ORDENS_RANKING = ['gasto_30', 'gasto_90', 'gasto_365', 'compras_365', 'ticket_medio', 'total_geral']
+
+@login_required
+def api_fornecedores_ranking(request):
+    """Fornecedores por gasto, lidos do resumo pré-calculado (?ordem=gasto_90&page=2)"""
+    ordem = request.GET.get('ordem', 'gasto_365')
+    if ordem not in ORDENS_RANKING:
+        return JsonResponse({'erro': f'Ordem inválida: {ordem}'}, status=400)
+
+    resumos = ResumoFornecedor.objects.filter(loja=request.loja).select_related('fornecedor') \
+        .order_by(f'-{ordem}', 'pk')
+    paginator = Paginator(resumos, 50)
+    pagina = paginator.get_page(request.GET.get('page'))
+
+    return JsonResponse({
+        'pagina': pagina.number,
+        'paginas': paginator.num_pages,
+        'fornecedores': [
+            {
+                'id': r.fornecedor_id,
+                'nome': r.fornecedor.nome,
+                'ranking': r.ranking,
+                'gasto_30': str(r.gasto_30),
+                'gasto_90': str(r.gasto_90),
+                'gasto_365': str(r.gasto_365),
+                'compras_365': r.compras_365,
+                'compras_por_mes': r.compras_por_mes,
+                'ticket_medio': str(r.ticket_medio),
+                'total_geral': str(r.total_geral),
+                'ultima_compra': r.ultima_compra.isoformat() if r.ultima_compra else None,
+            }
+            for r in pagina
+        ],
+    })
+
+@login_required
+@require_POST
+def api_lancamentos_registrar(request):
+    """Soma valores aos totais do dia (um item ou lote de itens)"""
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'erro': 'JSON inválido.'}, status=400)
+
+    if isinstance(payload, dict):
+        itens = payload.get('itens', [payload])
+    else:
+        itens = payload
+    if not isinstance(itens, list):
+        return JsonResponse({'erro': 'Envie um item ou uma lista de itens.'}, status=400)
+
+    try:
+        lancamentos = registrar_vendas(request.loja, itens)
+    except ValidationError as e:
+        return JsonResponse({'erro': ' '.join(e.messages)}, status=400)
+
+    return JsonResponse({
+        'lancamentos': [
+            {
+                'id': l.pk,
+                'data': l.data.isoformat(),
+                **{campo: str(getattr(l, campo)) for campo in CAMPOS_VALOR},
+                'total_vendas': str(l.total_vendas),
+            }
+            for l in lancamentos
+        ]
+    })
@@ -0,0 +1,85 @@
+from django.contrib import admin, messages
+from django.db.models import Count, Q
+
+from lojas.models import Loja
+
+from .models import Extrato, LinhaExtrato
+from .services import conciliar
+
+
+@admin.register(Extrato)
+class ExtratoAdmin(admin.ModelAdmin):
+    list_display = ['arquivo', 'loja', 'inicio', 'fim', 'total_linhas', 'pendentes', 'importado_em']
+    list_filter = ['loja']
+    readonly_fields = ['loja', 'arquivo', 'inicio', 'fim', 'importado_em']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('loja').annotate(
+            _linhas=Count('linhas'),
+            _pendentes=Count('linhas', filter=Q(linhas__status='pendente')),
+        )
+
+    def total_linhas(self, obj):
+        return obj._linhas
+    total_linhas.short_description = "Linhas"
+
+    def pendentes(self, obj):
+        return obj._pendentes
+    pendentes.short_description = "⏳ Em revisão"
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(LinhaExtrato)
+class LinhaExtratoAdmin(admin.ModelAdmin):
+    """Fila de revisão: filtre por 'Em revisão' e case à mão o que a conciliação não achou"""
+    list_display = ['data', 'descricao', 'valor', 'status', 'explicacao', 'diferenca', 'loja']
+    list_filter = ['status', 'loja', 'extrato']
+    list_select_related = ['loja', 'lancamento', 'compra__fornecedor', 'fatura_cartao']
+    search_fields = ['descricao', 'documento']
+    date_hierarchy = 'data'
+    raw_id_fields = ['lancamento', 'compra', 'fatura_cartao']
+    readonly_fields = ['extrato', 'loja', 'documento', 'data', 'descricao', 'valor']
+    actions = ['conciliar_novamente', 'ignorar', 'reabrir']
+
+    def explicacao(self, obj):
+        if obj.lancamento_id:
+            return f"{obj.get_forma_display()} de {obj.lancamento.data:%d/%m/%Y}"
+        if obj.compra_id:
+            return f"Compra: {obj.compra}"
+        if obj.fatura_cartao_id:
+            return f"Fatura {obj.fatura_cartao} ({obj.fatura_vencimento:%d/%m/%Y})"
+        return "-"
+    explicacao.short_description = "Casada com"
+
+    def save_model(self, request, obj, form, change):
+        # Vínculo escolhido à mão concilia a linha; sem vínculo ela volta para a revisão
+        if obj.lancamento_id or obj.compra_id or obj.fatura_cartao_id:
+            if obj.status == 'pendente':
+                obj.status = 'conciliada'
+        elif obj.status == 'conciliada':
+            obj.status = 'pendente'
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="🔁 Conciliar novamente as linhas em revisão")
+    def conciliar_novamente(self, request, queryset):
+        conciliadas = 0
+        for loja in Loja.objects.filter(pk__in=queryset.values('loja')):
+            conciliadas += conciliar(loja, queryset.filter(loja=loja))['conciliadas']
+        self.message_user(request, f"{conciliadas} linha(s) conciliada(s).", messages.SUCCESS)
+
+    @admin.action(description="🚫 Ignorar (sem correspondência no sistema)")
+    def ignorar(self, request, queryset):
+        total = queryset.exclude(status='conciliada').update(status='ignorada')
+        self.message_user(request, f"{total} linha(s) ignorada(s).", messages.SUCCESS)
+
+    @admin.action(description="⏳ Voltar para a revisão")
+    def reabrir(self, request, queryset):
+        linhas = list(queryset)
+        for linha in linhas:
+            linha.desfazer()
+        LinhaExtrato.objects.bulk_update(
+            linhas, ['status', 'lancamento', 'forma', 'compra', 'fatura_cartao', 'fatura_vencimento', 'diferenca']
+        )
+        self.message_user(request, f"{len(linhas)} linha(s) de volta para a revisão.", messages.SUCCESS)
@@ -0,0 +1,30 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from conciliacao.services import importar_extrato
+from lojas.models import Loja, loja_padrao
+
+
+class Command(BaseCommand):
+    help = "Importa um extrato bancário (OFX ou CSV) e concilia com vendas, compras e faturas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo .ofx ou .csv")
+        parser.add_argument('--loja', type=int, help="Id da loja (padrão: a loja principal)")
+
+    def handle(self, *args, **options):
+        loja = Loja.objects.get(pk=options['loja']) if options['loja'] else loja_padrao()
+        with open(options['arquivo'], 'rb') as arquivo:
+            conteudo = arquivo.read()
+        try:
+            resultado = importar_extrato(loja, options['arquivo'], conteudo)
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        self.stdout.write(
+            f"{resultado['movimentos']} movimento(s), {resultado['novas']} novo(s); "
+            f"{resultado['conciliadas']} conciliado(s)"
+        )
+        if resultado['pendentes']:
+            self.stdout.write(self.style.WARNING(f"{resultado['pendentes']} em revisão no admin"))
+        self.stdout.write(self.style.SUCCESS("Extrato importado"))
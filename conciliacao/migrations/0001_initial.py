@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('compras', '0007_fornecedor_nome_normalizado'),
+        ('lancamentos', '0004_updated_at'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Extrato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.CharField(max_length=200, verbose_name='Arquivo')),
+                ('inicio', models.DateField(blank=True, null=True, verbose_name='📅 Início')),
+                ('fim', models.DateField(blank=True, null=True, verbose_name='📅 Fim')),
+                ('importado_em', models.DateTimeField(auto_now_add=True, verbose_name='Importado em')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='extratos', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '🏦 Extrato Bancário',
+                'verbose_name_plural': '🏦 Extratos Bancários',
+                'ordering': ['-importado_em'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LinhaExtrato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documento', models.CharField(help_text='Identificador do movimento no banco (reimportar não duplica)', max_length=64, verbose_name='Documento')),
+                ('data', models.DateField(verbose_name='📅 Data')),
+                ('descricao', models.CharField(blank=True, max_length=255, verbose_name='📝 Descrição')),
+                ('valor', models.DecimalField(decimal_places=2, help_text='Positivo para entradas, negativo para saídas', max_digits=12, verbose_name='💰 Valor')),
+                ('status', models.CharField(choices=[('pendente', '⏳ Em revisão'), ('conciliada', '✅ Conciliada'), ('ignorada', '🚫 Ignorada')], default='pendente', max_length=10, verbose_name='Status')),
+                ('forma', models.CharField(blank=True, choices=[('pix', '📱 PIX'), ('cartao_debito', '💳 Débito')], max_length=20, verbose_name='Forma')),
+                ('fatura_vencimento', models.DateField(blank=True, null=True, verbose_name='📅 Vencimento da Fatura')),
+                ('diferenca', models.DecimalField(decimal_places=2, default=0, help_text='Extrato menos o valor casado (taxas e arredondamentos)', max_digits=12, verbose_name='Diferença')),
+                ('compra', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='linhas_extrato', to='compras.compra', verbose_name='🛒 Compra')),
+                ('extrato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='linhas', to='conciliacao.extrato', verbose_name='🏦 Extrato')),
+                ('fatura_cartao', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='linhas_extrato', to='compras.cartaocredito', verbose_name='💳 Fatura do Cartão')),
+                ('lancamento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='linhas_extrato', to='lancamentos.lancamento', verbose_name='💰 Lançamento')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='linhas_extrato', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '🧾 Linha do Extrato',
+                'verbose_name_plural': '🧾 Linhas do Extrato',
+                'ordering': ['data', 'pk'],
+                'indexes': [models.Index(fields=['loja', 'status', 'data'], name='linha_extrato_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('loja', 'documento'), name='linha_extrato_documento_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+from django.db import models
+
+from compras.models import CartaoCredito, Compra
+from lancamentos.models import Lancamento
+from lojas.models import Loja
+
+
+class Extrato(models.Model):
+    """Arquivo de extrato bancário importado (OFX ou CSV)"""
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.CASCADE,
+        related_name='extratos',
+        verbose_name="🏬 Loja"
+    )
+    arquivo = models.CharField(max_length=200, verbose_name="Arquivo")
+    inicio = models.DateField(null=True, blank=True, verbose_name="📅 Início")
+    fim = models.DateField(null=True, blank=True, verbose_name="📅 Fim")
+    importado_em = models.DateTimeField(auto_now_add=True, verbose_name="Importado em")
+
+    class Meta:
+        verbose_name = "🏦 Extrato Bancário"
+        verbose_name_plural = "🏦 Extratos Bancários"
+        ordering = ['-importado_em']
+
+    def __str__(self):
+        return self.arquivo
+
+
+class LinhaExtrato(models.Model):
+    """Movimento do extrato e o que ele explica no sistema.
+
+    Créditos casam com o PIX ou o débito do lançamento do dia; débitos com
+    uma compra (PIX/débito) ou com a fatura do cartão (as parcelas do cartão
+    que vencem no dia). O que não casa fica 'pendente' para revisão.
+    """
+    STATUS_CHOICES = [
+        ('pendente', '⏳ Em revisão'),
+        ('conciliada', '✅ Conciliada'),
+        ('ignorada', '🚫 Ignorada'),
+    ]
+    FORMA_CHOICES = [
+        ('pix', '📱 PIX'),
+        ('cartao_debito', '💳 Débito'),
+    ]
+
+    extrato = models.ForeignKey(
+        Extrato,
+        on_delete=models.CASCADE,
+        related_name='linhas',
+        verbose_name="🏦 Extrato"
+    )
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.CASCADE,
+        related_name='linhas_extrato',
+        verbose_name="🏬 Loja"
+    )
+    documento = models.CharField(
+        max_length=64,
+        verbose_name="Documento",
+        help_text="Identificador do movimento no banco (reimportar não duplica)"
+    )
+    data = models.DateField(verbose_name="📅 Data")
+    descricao = models.CharField(max_length=255, blank=True, verbose_name="📝 Descrição")
+    valor = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="💰 Valor",
+        help_text="Positivo para entradas, negativo para saídas"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pendente', verbose_name="Status")
+
+    lancamento = models.ForeignKey(
+        Lancamento,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='linhas_extrato',
+        verbose_name="💰 Lançamento"
+    )
+    forma = models.CharField(max_length=20, choices=FORMA_CHOICES, blank=True, verbose_name="Forma")
+    compra = models.ForeignKey(
+        Compra,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='linhas_extrato',
+        verbose_name="🛒 Compra"
+    )
+    fatura_cartao = models.ForeignKey(
+        CartaoCredito,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='linhas_extrato',
+        verbose_name="💳 Fatura do Cartão"
+    )
+    fatura_vencimento = models.DateField(null=True, blank=True, verbose_name="📅 Vencimento da Fatura")
+    diferenca = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name="Diferença",
+        help_text="Extrato menos o valor casado (taxas e arredondamentos)"
+    )
+
+    class Meta:
+        verbose_name = "🧾 Linha do Extrato"
+        verbose_name_plural = "🧾 Linhas do Extrato"
+        ordering = ['data', 'pk']
+        constraints = [
+            models.UniqueConstraint(fields=['loja', 'documento'], name='linha_extrato_documento_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['loja', 'status', 'data'], name='linha_extrato_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.data:%d/%m/%Y} {self.descricao} R$ {self.valor}"
+
+    def desfazer(self):
+        """Volta a linha para a revisão, sem vínculo"""
+        self.status = 'pendente'
+        self.lancamento = self.compra = self.fatura_cartao = None
+        self.forma = ''
+        self.fatura_vencimento = None
+        self.diferenca = 0
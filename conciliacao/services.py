@@ -0,0 +1,328 @@
+import csv
+import hashlib
+import io
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from compras.models import Compra, ParcelaCompra, normalizar_nome
+from lancamentos.models import Lancamento
+
+from .models import Extrato, LinhaExtrato
+
+# Quanto a data do extrato pode ficar antes/depois do que ela explica, e
+# quanto do valor pode ter ficado de taxa (fração) ou arredondamento (folga)
+TOLERANCIAS = {
+    # PIX cai na hora: a soma dos PIX do dia bate com o PIX do lançamento
+    'pix': {'antes': 0, 'depois': 0, 'taxa': Decimal('0'), 'folga': Decimal('0')},
+    # A adquirente repassa o débito em D+1 (ou depois do fim de semana) sem o MDR
+    'cartao_debito': {'antes': 0, 'depois': 4, 'taxa': Decimal('0.05'), 'folga': Decimal('0.05')},
+    'compra': {'antes': 2, 'depois': 2, 'taxa': Decimal('0'), 'folga': Decimal('0')},
+    # Fatura paga antes do vencimento ou no dia útil seguinte
+    'fatura': {'antes': 5, 'depois': 3, 'taxa': Decimal('0'), 'folga': Decimal('0')},
+}
+
+PIX = re.compile(r'\bpix\b', re.IGNORECASE)
+CENTAVO = Decimal('0.01')
+
+
+# Importação
+
+def _valor(texto):
+    """Aceita 1.234,56 / -1234.56 / 1234,56"""
+    texto = str(texto).strip().replace('R$', '').replace(' ', '')
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    try:
+        return Decimal(texto).quantize(CENTAVO)
+    except (InvalidOperation, ValueError):
+        raise ValidationError(f'Valor inválido no extrato: {texto!r}')
+
+
+def _data(texto):
+    texto = str(texto).strip()
+    # DTPOSTED do OFX vem como 20250105120000[-3:BRT]; só o dia interessa
+    for formato, tamanho in (('%d/%m/%Y', 10), ('%Y-%m-%d', 10), ('%Y%m%d', 8)):
+        try:
+            return datetime.strptime(texto[:tamanho], formato).date()
+        except ValueError:
+            continue
+    raise ValidationError(f'Data inválida no extrato: {texto!r}')
+
+
+def _ler_ofx(texto):
+    movimentos = []
+    for bloco in re.findall(r'<STMTTRN>(.*?)(?=</STMTTRN>|<STMTTRN>|</BANKTRANLIST>)', texto, re.S | re.I):
+        campos = dict(
+            (nome.upper(), valor.strip())
+            for nome, valor in re.findall(r'<(\w+)>([^<\r\n]*)', bloco)
+        )
+        if 'DTPOSTED' not in campos or 'TRNAMT' not in campos:
+            continue
+        movimentos.append({
+            'data': _data(campos['DTPOSTED']),
+            'valor': _valor(campos['TRNAMT']),
+            'descricao': campos.get('MEMO') or campos.get('NAME', ''),
+            'documento': campos.get('FITID', ''),
+        })
+    return movimentos
+
+
+# Cabeçalhos aceitos no CSV (já normalizados: minúsculos, sem acento)
+COLUNAS_CSV = {
+    'data': 'data',
+    'descricao': 'descricao', 'historico': 'descricao', 'lancamento': 'descricao',
+    'valor': 'valor',
+    'documento': 'documento', 'id': 'documento',
+}
+
+
+def _ler_csv(texto):
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:2048], delimiters=';,\t')
+    except csv.Error:
+        raise ValidationError('Arquivo não reconhecido: envie um OFX ou um CSV com cabeçalho.')
+    leitor = csv.reader(io.StringIO(texto), dialeto)
+    cabecalho = [COLUNAS_CSV.get(normalizar_nome(coluna)) for coluna in next(leitor, [])]
+    if 'data' not in cabecalho or 'valor' not in cabecalho:
+        raise ValidationError('O CSV precisa das colunas data e valor.')
+
+    movimentos = []
+    for linha in leitor:
+        if not any(linha):
+            continue
+        campos = {nome: valor for nome, valor in zip(cabecalho, linha) if nome}
+        movimentos.append({
+            'data': _data(campos.get('data', '')),
+            'valor': _valor(campos.get('valor', '')),
+            'descricao': campos.get('descricao', '').strip(),
+            'documento': campos.get('documento', '').strip(),
+        })
+    return movimentos
+
+
+def ler_extrato(conteudo):
+    """Movimentos {data, valor, descricao, documento} de um OFX ou CSV"""
+    try:
+        texto = conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        # OFX de banco brasileiro costuma vir em latin-1
+        texto = conteudo.decode('latin-1')
+    movimentos = _ler_ofx(texto) if '<OFX>' in texto.upper() else _ler_csv(texto)
+
+    # Sem FITID, o documento vem do próprio movimento (e da repetição no arquivo)
+    ocorrencias = defaultdict(int)
+    for movimento in movimentos:
+        if not movimento['documento']:
+            base = f"{movimento['data']}|{movimento['valor']}|{movimento['descricao']}"
+            ocorrencias[base] += 1
+            movimento['documento'] = hashlib.sha1(f"{base}|{ocorrencias[base]}".encode()).hexdigest()
+        movimento['documento'] = movimento['documento'][:64]
+        movimento['descricao'] = movimento['descricao'][:255]
+    return movimentos
+
+
+def importar_extrato(loja, arquivo, conteudo):
+    """Grava as linhas novas do extrato e já tenta conciliá-las"""
+    movimentos = ler_extrato(conteudo)
+    if not movimentos:
+        raise ValidationError('Nenhum movimento encontrado no arquivo.')
+
+    with transaction.atomic():
+        extrato = Extrato.objects.create(
+            loja=loja,
+            arquivo=arquivo[:200],
+            inicio=min(m['data'] for m in movimentos),
+            fim=max(m['data'] for m in movimentos),
+        )
+        existentes = set(
+            LinhaExtrato.objects.filter(loja=loja, documento__in=[m['documento'] for m in movimentos])
+            .values_list('documento', flat=True)
+        )
+        novas = LinhaExtrato.objects.bulk_create([
+            LinhaExtrato(extrato=extrato, loja=loja, **movimento)
+            for movimento in movimentos if movimento['documento'] not in existentes
+        ])
+        # Inclui linhas de importações anteriores do mesmo período ainda pendentes
+        resultado = conciliar(loja, LinhaExtrato.objects.filter(loja=loja, data__range=(extrato.inicio, extrato.fim)))
+
+    return {
+        'extrato': extrato,
+        'movimentos': len(movimentos),
+        'novas': len(novas),
+        **resultado,
+    }
+
+
+# Conciliação
+
+def _centavos(valor):
+    return int(valor * 100)
+
+
+def _janela(tolerancia):
+    """Deslocamentos (data do extrato - data do alvo), do mais próximo ao mais distante"""
+    return [timedelta(days=dias) for dias in sorted(range(-tolerancia['antes'], tolerancia['depois'] + 1), key=abs)]
+
+
+def casar(movimentos, alvos, tolerancia):
+    """Casa movimentos e alvos um a um; retorna [(movimento, alvo)].
+
+    Movimentos e alvos são dicts com 'data' e 'valor' (positivo). Os alvos
+    ficam em dois índices de hash, (data, centavos) e data, de modo que cada
+    movimento olha só os poucos alvos da sua janela de datas: primeiro valor
+    exato, depois dentro da taxa/folga tolerada (o valor mais próximo vence).
+    """
+    exatos = defaultdict(list)
+    por_data = defaultdict(list)
+    for alvo in alvos:
+        exatos[(alvo['data'], _centavos(alvo['valor']))].append(alvo)
+        por_data[alvo['data']].append(alvo)
+
+    janela = _janela(tolerancia)
+    usados = set()
+    pares, sobra = [], []
+    for movimento in movimentos:
+        centavos = _centavos(movimento['valor'])
+        alvo = next((
+            alvo
+            for deslocamento in janela
+            for alvo in exatos.get((movimento['data'] - deslocamento, centavos), ())
+            if id(alvo) not in usados
+        ), None)
+        if alvo is None:
+            sobra.append(movimento)
+        else:
+            usados.add(id(alvo))
+            pares.append((movimento, alvo))
+
+    if tolerancia['taxa'] or tolerancia['folga']:
+        for movimento in sobra:
+            valor = movimento['valor']
+            candidatos = [
+                alvo
+                for deslocamento in janela
+                for alvo in por_data.get(movimento['data'] - deslocamento, ())
+                if id(alvo) not in usados
+                and alvo['valor'] * (1 - tolerancia['taxa']) - tolerancia['folga'] <= valor <= alvo['valor'] + tolerancia['folga']
+            ]
+            if candidatos:
+                alvo = min(candidatos, key=lambda alvo: abs(alvo['valor'] - valor))
+                usados.add(id(alvo))
+                pares.append((movimento, alvo))
+    return pares
+
+
+def _ja_conciliados(loja, alvos, inicio, fim):
+    """Alvos que outras linhas já explicam (não casam de novo).
+
+    Só olha as linhas conciliadas com os alvos do período, não o histórico
+    inteiro da loja.
+    """
+    lancamentos = {alvo['campos']['lancamento_id'] for forma in ('pix', 'cartao_debito') for alvo in alvos[forma]}
+    compras = {alvo['campos']['compra_id'] for alvo in alvos['compra']}
+    usados = set()
+    for lancamento, forma, compra, cartao, vencimento in LinhaExtrato.objects.filter(
+        Q(lancamento_id__in=lancamentos) | Q(compra_id__in=compras) | Q(fatura_vencimento__range=(inicio, fim)),
+        loja=loja, status='conciliada'
+    ).values_list('lancamento_id', 'forma', 'compra_id', 'fatura_cartao_id', 'fatura_vencimento'):
+        if lancamento:
+            usados.add((forma, lancamento))
+        if compra:
+            usados.add(('compra', compra))
+        if cartao:
+            usados.add(('fatura', cartao, vencimento))
+    return usados
+
+
+def _alvos(loja, inicio, fim):
+    """Vendas, compras e faturas do período que podem aparecer no extrato"""
+    alvos = defaultdict(list)
+    for pk, data, pix, cartao_debito in Lancamento.objects.filter(
+        loja=loja, data__range=(inicio, fim)
+    ).values_list('pk', 'data', 'pix', 'cartao_debito'):
+        for forma, valor in (('pix', pix), ('cartao_debito', cartao_debito)):
+            if valor > 0:
+                alvos[forma].append({
+                    'data': data, 'valor': valor, 'chave': (forma, pk),
+                    'campos': {'lancamento_id': pk, 'forma': forma},
+                })
+
+    for pk, data, valor in Compra.objects.filter(
+        loja=loja, data_compra__range=(inicio, fim), forma_pagamento__in=['pix', 'debito']
+    ).values_list('pk', 'data_compra', 'valor_total'):
+        alvos['compra'].append({
+            'data': data, 'valor': valor, 'chave': ('compra', pk), 'campos': {'compra_id': pk},
+        })
+
+    for fatura in ParcelaCompra.objects.filter(
+        compra__loja=loja, data_vencimento__range=(inicio, fim)
+    ).values('compra__cartao_credito_id', 'data_vencimento').annotate(total=Sum('valor_parcela')).order_by():
+        cartao, vencimento = fatura['compra__cartao_credito_id'], fatura['data_vencimento']
+        alvos['fatura'].append({
+            'data': vencimento, 'valor': fatura['total'].quantize(CENTAVO),
+            'chave': ('fatura', cartao, vencimento),
+            'campos': {'fatura_cartao_id': cartao, 'fatura_vencimento': vencimento},
+        })
+
+    usados = _ja_conciliados(loja, alvos, inicio, fim)
+    for forma, lista in alvos.items():
+        alvos[forma] = [alvo for alvo in lista if alvo['chave'] not in usados]
+    return alvos
+
+
+def conciliar(loja, linhas=None):
+    """Casa as linhas pendentes (todas da loja ou as do queryset) numa passada.
+
+    Entradas: a soma dos PIX de cada dia contra o PIX do lançamento, e as
+    demais contra o débito do dia (já sem a taxa). Saídas: compras pagas
+    em PIX/débito e faturas de cartão. O resto continua 'pendente'.
+    """
+    if linhas is None:
+        linhas = LinhaExtrato.objects.filter(loja=loja)
+    linhas = list(linhas.filter(status='pendente').order_by('data', 'pk'))
+    if not linhas:
+        return {'conciliadas': 0, 'pendentes': 0}
+
+    margem = timedelta(days=max(max(t['antes'], t['depois']) for t in TOLERANCIAS.values()))
+    alvos = _alvos(loja, linhas[0].data - margem, linhas[-1].data + margem)
+
+    entradas = [linha for linha in linhas if linha.valor > 0]
+    saidas = [{'data': l.data, 'valor': -l.valor, 'linhas': [l]} for l in linhas if l.valor < 0]
+
+    pix_por_dia = defaultdict(list)
+    for linha in entradas:
+        if PIX.search(linha.descricao):
+            pix_por_dia[linha.data].append(linha)
+    pares = casar(
+        [{'data': data, 'valor': sum(l.valor for l in grupo), 'linhas': grupo} for data, grupo in pix_por_dia.items()],
+        alvos['pix'], TOLERANCIAS['pix']
+    )
+    casadas = {id(linha) for movimento, _ in pares for linha in movimento['linhas']}
+    pares += casar(
+        [{'data': l.data, 'valor': l.valor, 'linhas': [l]} for l in entradas if id(l) not in casadas],
+        alvos['cartao_debito'], TOLERANCIAS['cartao_debito']
+    )
+
+    compras = casar(saidas, alvos['compra'], TOLERANCIAS['compra'])
+    pares += compras
+    casadas = {id(movimento) for movimento, _ in compras}
+    pares += casar([s for s in saidas if id(s) not in casadas], alvos['fatura'], TOLERANCIAS['fatura'])
+
+    # Um UPDATE por alvo (as linhas de um grupo de PIX vão juntas); o
+    # bulk_update montaria um CASE por linha, lento para um ano de extrato
+    conciliadas = 0
+    for movimento, alvo in pares:
+        pks = [linha.pk for linha in movimento['linhas']]
+        LinhaExtrato.objects.filter(pk__in=pks).update(status='conciliada', diferenca=0, **alvo['campos'])
+        diferenca = movimento['valor'] - alvo['valor']
+        if diferenca:
+            # Num grupo de PIX a diferença fica toda na primeira linha
+            LinhaExtrato.objects.filter(pk=pks[0]).update(diferenca=diferenca)
+        conciliadas += len(pks)
+    return {'conciliadas': conciliadas, 'pendentes': len(linhas) - conciliadas}
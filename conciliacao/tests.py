@@ -0,0 +1,113 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from compras.models import Compra, Fornecedor
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+
+from .models import Extrato, LinhaExtrato
+from .services import TOLERANCIAS, casar, importar_extrato, ler_extrato
+
+OFX = b"""OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250310120000[-3:BRT]<TRNAMT>30.00<FITID>A1<MEMO>PIX RECEBIDO
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250311<TRNAMT>-12.50<FITID>A2<NAME>Feira
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+CSV = """Data;Histórico;Valor
+10/03/2025;Pix recebido Maria;20,00
+10/03/2025;Pix recebido João;30,00
+11/03/2025;Repasse débito;97,50
+11/03/2025;Pix enviado Atacadão;-1.234,56
+""".encode()
+
+
+class LerExtratoTests(TestCase):
+    def test_ofx(self):
+        self.assertEqual(ler_extrato(OFX), [
+            {'data': date(2025, 3, 10), 'valor': Decimal('30.00'), 'descricao': 'PIX RECEBIDO', 'documento': 'A1'},
+            {'data': date(2025, 3, 11), 'valor': Decimal('-12.50'), 'descricao': 'Feira', 'documento': 'A2'},
+        ])
+
+    def test_csv_com_valores_brasileiros_e_documento_pelo_conteudo(self):
+        movimentos = ler_extrato(CSV)
+
+        self.assertEqual([m['valor'] for m in movimentos], [Decimal('20'), Decimal('30'), Decimal('97.5'), Decimal('-1234.56')])
+        self.assertEqual(len({m['documento'] for m in movimentos}), 4)
+        self.assertEqual(ler_extrato(CSV), movimentos)
+
+    def test_csv_sem_valor(self):
+        with self.assertRaises(ValidationError):
+            ler_extrato(b'Data;Descricao\n10/03/2025;Pix\n')
+
+
+class ConciliarTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def test_casar_prefere_o_valor_exato(self):
+        alvos = [
+            {'data': date(2025, 3, 10), 'valor': Decimal('100.00')},
+            {'data': date(2025, 3, 11), 'valor': Decimal('98.00')},
+        ]
+        pares = casar([{'data': date(2025, 3, 12), 'valor': Decimal('98.00')}], alvos, TOLERANCIAS['cartao_debito'])
+        self.assertEqual([alvo for _, alvo in pares], [alvos[1]])
+
+    def test_importar_concilia_pix_debito_e_compra(self):
+        lancamento = Lancamento.objects.create(
+            loja=self.loja, data=date(2025, 3, 10), pix=Decimal('50'), cartao_debito=Decimal('100')
+        )
+        fornecedor = Fornecedor.objects.create(loja=self.loja, nome='Atacadão')
+        compra = Compra.objects.create(
+            loja=self.loja, fornecedor=fornecedor, descricao='Mercadoria', valor_total=Decimal('1234.56'),
+            data_compra=date(2025, 3, 10), forma_pagamento='pix'
+        )
+
+        resultado = importar_extrato(self.loja, 'extrato.csv', CSV)
+
+        self.assertEqual((resultado['novas'], resultado['conciliadas'], resultado['pendentes']), (4, 4, 0))
+        pix = LinhaExtrato.objects.filter(forma='pix')
+        self.assertEqual(set(pix.values_list('lancamento_id', flat=True)), {lancamento.pk})
+        debito = LinhaExtrato.objects.get(forma='cartao_debito')
+        self.assertEqual(debito.diferenca, Decimal('-2.50'))
+        self.assertEqual(LinhaExtrato.objects.get(valor__lt=0).compra, compra)
+
+    def test_reimportar_nao_duplica_nem_reconcilia(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('50'))
+        importar_extrato(self.loja, 'extrato.csv', CSV)
+
+        resultado = importar_extrato(self.loja, 'extrato.csv', CSV)
+
+        self.assertEqual((resultado['novas'], resultado['conciliadas']), (0, 0))
+        self.assertEqual(LinhaExtrato.objects.count(), 4)
+
+    def test_alvo_ja_conciliado_fora_da_janela_nao_casa_de_novo(self):
+        lancamento = Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('50'))
+        # Conciliada à mão, com a data bem longe da do lançamento
+        LinhaExtrato.objects.create(
+            extrato=Extrato.objects.create(loja=self.loja, arquivo='antigo.csv'), loja=self.loja, documento='manual', data=date(2024, 1, 5), valor=Decimal('50'),
+            status='conciliada', lancamento=lancamento, forma='pix'
+        )
+
+        importar_extrato(self.loja, 'extrato.csv', CSV)
+
+        self.assertEqual(LinhaExtrato.objects.filter(lancamento=lancamento).count(), 1)
+
+    def test_api(self):
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+        url = reverse('api_conciliacao_importar')
+
+        resposta = self.client.post(url, {'arquivo': SimpleUploadedFile('extrato.ofx', OFX)})
+
+        self.assertEqual((resposta.json()['movimentos'], resposta.json()['pendentes']), (2, 2))
+        resposta = self.client.post(url, {'arquivo': SimpleUploadedFile('vazio.csv', b'nada')})
+        self.assertEqual(resposta.status_code, 400)
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('api/conciliacao/importar/', views.api_conciliacao_importar, name='api_conciliacao_importar'),
+]
@@ -0,0 +1,35 @@
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from .services import importar_extrato
+
+TAMANHO_MAXIMO = 10 * 1024 * 1024
+
+
+@login_required
+@require_POST
+def api_conciliacao_importar(request):
+    """Importa um extrato (campo "arquivo", OFX ou CSV) e concilia o período"""
+    arquivo = request.FILES.get('arquivo')
+    if arquivo is None:
+        return JsonResponse({'erro': 'Envie o extrato no campo "arquivo".'}, status=400)
+    if arquivo.size > TAMANHO_MAXIMO:
+        return JsonResponse({'erro': 'Arquivo maior que 10 MB.'}, status=400)
+
+    try:
+        resultado = importar_extrato(request.loja, arquivo.name, arquivo.read())
+    except ValidationError as e:
+        return JsonResponse({'erro': ' '.join(e.messages)}, status=400)
+
+    extrato = resultado['extrato']
+    return JsonResponse({
+        'extrato': extrato.pk,
+        'inicio': extrato.inicio.isoformat(),
+        'fim': extrato.fim.isoformat(),
+        'movimentos': resultado['movimentos'],
+        'novas': resultado['novas'],
+        'conciliadas': resultado['conciliadas'],
+        'pendentes': resultado['pendentes'],
+    })
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from copias.services import bancos, copiar_banco, pasta_copias, restaurar, testar_restauracao
+
+
+class Command(BaseCommand):
+    help = ("Copia os bancos SQLite sem bloquear os caixas (backup online em passos), comprimida "
+            "e com rotação; também restaura ou testa a restauração de uma cópia")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--banco', action='append', choices=bancos(),
+                            help="Alias do banco (pode repetir; padrão: todos)")
+        modo = parser.add_mutually_exclusive_group()
+        modo.add_argument('--completa', action='store_true', help="Força uma cópia completa")
+        modo.add_argument('--incremental', action='store_true',
+                          help="Só as páginas alteradas desde a cópia anterior (completa se não houver base)")
+        parser.add_argument('--paginas', type=int, help="Páginas por passo (padrão: COPIAS_PAGINAS_POR_PASSO)")
+        parser.add_argument('--pausa', type=float, help="Segundos entre os passos (padrão: COPIAS_PAUSA)")
+        parser.add_argument('--testar', action='store_true',
+                            help="Depois de copiar, restaura num arquivo temporário e confere a integridade")
+        parser.add_argument('--restaurar', metavar='ARQUIVO',
+                            help="Em vez de copiar, monta o banco da cópia ARQUIVO em --destino")
+        parser.add_argument('--destino', help="Arquivo onde restaurar (nunca o banco em uso)")
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            return self._restaurar(options['restaurar'], options['destino'])
+
+        incremental = True if options['incremental'] else False if options['completa'] else None
+        for alias in options['banco'] or bancos():
+            copia = copiar_banco(alias, incremental, options['paginas'], options['pausa'])
+            if copia['arquivo'] is None:
+                self.stdout.write(f"{alias}: nenhuma página alterada ({copia['segundos']} s)")
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"{alias}: {copia['tipo']} {copia['arquivo']} — {copia['paginas']} página(s), "
+                f"{copia['bytes'] / 1024:.0f} KiB em {copia['segundos']} s "
+                f"(leitura do banco: {copia['segundos_copia']} s)"
+            ))
+            for nome in copia['removidas']:
+                self.stdout.write(f"  removida {nome}")
+
+            if options['testar']:
+                teste = testar_restauracao(pasta_copias() / copia['arquivo'])
+                estilo = self.style.SUCCESS if teste['ok'] else self.style.ERROR
+                self.stdout.write(estilo(
+                    f"  restauração: {teste['integridade']}, {teste['tabelas']} tabela(s), "
+                    f"{teste['segundos_restauracao']} s para montar, {teste['segundos']} s no total"
+                ))
+
+    def _restaurar(self, arquivo, destino):
+        arquivo = Path(arquivo)
+        if not arquivo.exists():
+            arquivo = pasta_copias() / arquivo
+        if not arquivo.exists():
+            raise CommandError(f"Cópia não encontrada: {arquivo}")
+        if not destino:
+            raise CommandError("Informe --destino.")
+        destino = Path(destino)
+        if destino.exists():
+            raise CommandError(f"{destino} já existe; escolha outro arquivo.")
+        try:
+            restaurar(arquivo, destino)
+        except (FileNotFoundError, ValueError) as e:
+            destino.unlink(missing_ok=True)
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"{arquivo.name} restaurada em {destino}"))
@@ -0,0 +1,290 @@
+"""Cópias de segurança dos bancos SQLite com os caixas gravando.
+
+A cópia usa a API de backup do SQLite em passos de poucas páginas, com
+uma pausa entre eles. Antes do primeiro passo a conexão de origem abre
+uma transação de leitura: no modo WAL ela enxerga um retrato fixo do
+banco sem bloquear quem grava, e o backup não recomeça a cada gravação
+de outra conexão (sem isso, num banco movimentado, a cópia não termina).
+
+Completa: o banco inteiro em <banco>-<AAAAMMDD-HHMMSS>.sqlite3.gz.
+Incremental: só as páginas que mudaram desde a cópia anterior (achadas
+pelos hashes de página guardados em <banco>.paginas), em
+<banco>-<AAAAMMDD-HHMMSS>.incremental.gz. Restaurar descompacta a
+completa e aplica, em ordem, as incrementais seguintes.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+EXTENSAO_COMPLETA = '.sqlite3.gz'
+EXTENSAO_INCREMENTAL = '.incremental.gz'
+TAMANHO_HASH = 8
+BLOCO = 1024 * 1024
+# Número da página antes do conteúdo dela, na incremental
+PAGINA = struct.Struct('>I')
+
+
+def bancos():
+    """Aliases dos bancos SQLite configurados"""
+    return [
+        alias for alias, configuracao in settings.DATABASES.items()
+        if configuracao['ENGINE'] == 'django.db.backends.sqlite3'
+    ]
+
+
+def pasta_copias():
+    pasta = Path(settings.COPIAS_DIR)
+    pasta.mkdir(parents=True, exist_ok=True)
+    return pasta
+
+
+def _ordem(caminho):
+    """Pela data do nome; no mesmo segundo, a completa vem antes da incremental"""
+    carimbo, _, extensao = caminho.name.partition('.')
+    return carimbo, not extensao.startswith('sqlite3')
+
+
+def copias(alias):
+    """Arquivos de cópia do banco, do mais antigo ao mais recente"""
+    padrao = re.compile(rf'^{re.escape(alias)}-\d{{8}}-\d{{6}}(\.sqlite3|\.incremental)\.gz$')
+    return sorted((p for p in pasta_copias().iterdir() if padrao.match(p.name)), key=_ordem)
+
+
+def _copiar_online(alias, destino, paginas, pausa):
+    """Copia o banco `alias` para `destino` (sem compressão) em passos de `paginas`"""
+    configuracao = connections[alias].settings_dict
+    origem = sqlite3.connect(
+        configuracao['NAME'], timeout=configuracao['OPTIONS'].get('timeout', 20), isolation_level=None
+    )
+    copia = sqlite3.connect(destino)
+    try:
+        # Transação de leitura: todos os passos copiam o mesmo retrato
+        origem.execute('BEGIN')
+        origem.execute('SELECT count(*) FROM sqlite_master').fetchone()
+        origem.backup(copia, pages=paginas, progress=lambda *_: pausa and time.sleep(pausa))
+        origem.execute('COMMIT')
+        # A cópia fica num arquivo só (sem -wal), igual byte a byte entre cópias sem mudança
+        copia.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        copia.close()
+        origem.close()
+
+
+def _tamanho_pagina(caminho):
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(16)
+        tamanho = int.from_bytes(arquivo.read(2), 'big')
+    return 65536 if tamanho == 1 else tamanho
+
+
+def _hashes(caminho, tamanho_pagina):
+    """Hash curto de cada página, concatenados"""
+    hashes = bytearray()
+    with open(caminho, 'rb') as arquivo:
+        for pagina in iter(lambda: arquivo.read(tamanho_pagina), b''):
+            hashes += hashlib.blake2b(pagina, digest_size=TAMANHO_HASH).digest()
+    return bytes(hashes)
+
+
+def _gravar_atomico(destino, escrever):
+    """Escreve num .parcial e renomeia: um arquivo de cópia nunca fica pela metade"""
+    if destino.name.endswith('.gz') and destino.exists():
+        raise FileExistsError(f"Já existe a cópia {destino.name}.")
+    parcial = destino.with_name(destino.name + '.parcial')
+    try:
+        escrever(parcial)
+        os.replace(parcial, destino)
+    finally:
+        parcial.unlink(missing_ok=True)
+
+
+def _comprimir(origem, destino):
+    def escrever(parcial):
+        with open(origem, 'rb') as entrada, gzip.open(parcial, 'wb', compresslevel=6) as saida:
+            shutil.copyfileobj(entrada, saida, BLOCO)
+    _gravar_atomico(destino, escrever)
+
+
+def _ler_estado(alias):
+    pasta = pasta_copias()
+    try:
+        estado = json.loads((pasta / f'{alias}.estado.json').read_text())
+        hashes = (pasta / f'{alias}.paginas').read_bytes()
+    except FileNotFoundError:
+        return None
+    if not (pasta / estado['base']).exists() or not (pasta / estado['ultima']).exists():
+        return None
+    estado['hashes'] = hashes
+    return estado
+
+
+def _gravar_estado(alias, base, ultima, tamanho_pagina, hashes):
+    pasta = pasta_copias()
+    _gravar_atomico(pasta / f'{alias}.paginas', lambda parcial: parcial.write_bytes(hashes))
+    estado = {'base': base, 'ultima': ultima, 'tamanho_pagina': tamanho_pagina}
+    _gravar_atomico(pasta / f'{alias}.estado.json', lambda parcial: parcial.write_text(json.dumps(estado)))
+
+
+def _precisa_completa(estado):
+    if estado is None:
+        return True
+    base = pasta_copias() / estado['base']
+    return time.time() - base.stat().st_mtime >= settings.COPIAS_COMPLETA_A_CADA.total_seconds()
+
+
+def copiar_banco(alias='default', incremental=None, paginas=None, pausa=None):
+    """Grava uma cópia do banco e apaga as antigas além de COPIAS_MANTER completas.
+
+    `incremental=None` decide sozinho: completa quando não há base ou ela
+    passou de COPIAS_COMPLETA_A_CADA, incremental no resto. Incremental sem
+    página alterada não gera arquivo.
+    """
+    paginas = paginas or settings.COPIAS_PAGINAS_POR_PASSO
+    pausa = settings.COPIAS_PAUSA if pausa is None else pausa
+    pasta = pasta_copias()
+    estado = _ler_estado(alias)
+    if incremental is None:
+        incremental = not _precisa_completa(estado)
+    carimbo = f'{alias}-{timezone.localtime():%Y%m%d-%H%M%S}'
+
+    inicio = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=pasta) as temporaria:
+        bruto = Path(temporaria) / f'{alias}.sqlite3'
+        _copiar_online(alias, bruto, paginas, pausa)
+        copiado_em = time.perf_counter() - inicio
+        tamanho_pagina = _tamanho_pagina(bruto)
+        hashes = _hashes(bruto, tamanho_pagina)
+        total = len(hashes) // TAMANHO_HASH
+
+        if incremental and estado and estado['tamanho_pagina'] == tamanho_pagina:
+            anteriores = estado['hashes']
+            alteradas = [
+                numero for numero in range(total)
+                if hashes[numero * TAMANHO_HASH:(numero + 1) * TAMANHO_HASH]
+                != anteriores[numero * TAMANHO_HASH:(numero + 1) * TAMANHO_HASH]
+            ]
+            if not alteradas and len(anteriores) == len(hashes):
+                return {'banco': alias, 'tipo': 'sem_alteracoes', 'arquivo': None, 'paginas': 0,
+                        'bytes': 0, 'segundos_copia': round(copiado_em, 2),
+                        'segundos': round(time.perf_counter() - inicio, 2), 'removidas': []}
+            tipo, base = 'incremental', estado['base']
+            arquivo = pasta / f'{carimbo}{EXTENSAO_INCREMENTAL}'
+            cabecalho = {'base': base, 'anterior': estado['ultima'], 'tamanho_pagina': tamanho_pagina,
+                         'paginas': total, 'alteradas': len(alteradas)}
+
+            def escrever(parcial):
+                with open(bruto, 'rb') as entrada, gzip.open(parcial, 'wb', compresslevel=6) as saida:
+                    saida.write(json.dumps(cabecalho).encode() + b'\n')
+                    for numero in alteradas:
+                        entrada.seek(numero * tamanho_pagina)
+                        saida.write(PAGINA.pack(numero) + entrada.read(tamanho_pagina))
+            _gravar_atomico(arquivo, escrever)
+        else:
+            tipo, alteradas = 'completa', range(total)
+            arquivo = pasta / f'{carimbo}{EXTENSAO_COMPLETA}'
+            base = arquivo.name
+            _comprimir(bruto, arquivo)
+
+    _gravar_estado(alias, base, arquivo.name, tamanho_pagina, hashes)
+    return {
+        'banco': alias,
+        'tipo': tipo,
+        'arquivo': arquivo.name,
+        'paginas': len(alteradas),
+        'bytes': arquivo.stat().st_size,
+        'segundos_copia': round(copiado_em, 2),
+        'segundos': round(time.perf_counter() - inicio, 2),
+        'removidas': rotacionar(alias),
+    }
+
+
+def rotacionar(alias, manter=None):
+    """Apaga as completas além das `manter` mais recentes e as incrementais delas"""
+    manter = manter or settings.COPIAS_MANTER
+    completas = [p for p in copias(alias) if p.name.endswith(EXTENSAO_COMPLETA)]
+    if len(completas) <= manter:
+        return []
+    # Tudo antes da completa mais antiga mantida sai
+    limite = _ordem(completas[-manter])
+    removidas = []
+    for caminho in copias(alias):
+        if _ordem(caminho) < limite:
+            caminho.unlink()
+            removidas.append(caminho.name)
+    return removidas
+
+
+def _cabecalho(arquivo):
+    with gzip.open(arquivo, 'rb') as entrada:
+        return json.loads(entrada.readline())
+
+
+def restaurar(arquivo, destino):
+    """Monta em `destino` o banco da cópia `arquivo`: a completa, ou a base
+    dela mais as incrementais até ela"""
+    arquivo = Path(arquivo)
+    if arquivo.name.endswith(EXTENSAO_COMPLETA):
+        base, cadeia = arquivo, []
+    else:
+        cabecalho = _cabecalho(arquivo)
+        base = arquivo.with_name(cabecalho['base'])
+        cadeia = [
+            caminho for caminho in sorted(arquivo.parent.glob(f'*{EXTENSAO_INCREMENTAL}'), key=_ordem)
+            if _ordem(base) < _ordem(caminho) <= _ordem(arquivo) and _cabecalho(caminho)['base'] == base.name
+        ]
+    if not base.exists():
+        raise FileNotFoundError(f"Cópia completa não encontrada: {base.name}")
+
+    with gzip.open(base, 'rb') as entrada, open(destino, 'wb') as saida:
+        shutil.copyfileobj(entrada, saida, BLOCO)
+
+    anterior = base.name
+    with open(destino, 'r+b') as saida:
+        for caminho in cadeia:
+            with gzip.open(caminho, 'rb') as entrada:
+                cabecalho = json.loads(entrada.readline())
+                if cabecalho['anterior'] != anterior:
+                    raise ValueError(f"Falta a cópia {cabecalho['anterior']} antes de {caminho.name}.")
+                tamanho = cabecalho['tamanho_pagina']
+                while registro := entrada.read(PAGINA.size + tamanho):
+                    numero, = PAGINA.unpack_from(registro)
+                    saida.seek(numero * tamanho)
+                    saida.write(registro[PAGINA.size:])
+                saida.truncate(cabecalho['paginas'] * tamanho)
+            anterior = caminho.name
+    return destino
+
+
+def testar_restauracao(arquivo):
+    """Restaura a cópia num diretório temporário e roda o integrity_check, cronometrando"""
+    arquivo = Path(arquivo)
+    inicio = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=pasta_copias()) as temporaria:
+        destino = restaurar(arquivo, Path(temporaria) / 'restaurado.sqlite3')
+        restaurado_em = time.perf_counter() - inicio
+        conexao = sqlite3.connect(destino)
+        try:
+            integridade = conexao.execute('PRAGMA integrity_check').fetchone()[0]
+            tabelas = conexao.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+        finally:
+            conexao.close()
+    return {
+        'arquivo': arquivo.name,
+        'ok': integridade == 'ok',
+        'integridade': integridade,
+        'tabelas': tabelas,
+        'segundos_restauracao': round(restaurado_em, 2),
+        'segundos': round(time.perf_counter() - inicio, 2),
+    }
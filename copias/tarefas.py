@@ -0,0 +1,18 @@
+from fila.registro import tarefa
+
+from .services import bancos, copiar_banco, pasta_copias, testar_restauracao
+
+
+@tarefa('copias.copiar')
+def copiar(tarefa):
+    """Copia todos os bancos (completa ou incremental, conforme COPIAS_COMPLETA_A_CADA)
+    e testa a restauração de cada completa nova"""
+    aliases = bancos()
+    resultado = {}
+    for indice, alias in enumerate(aliases):
+        tarefa.atualizar_progresso(indice * 100 // len(aliases), f"Copiando {alias}")
+        copia = copiar_banco(alias)
+        if copia['tipo'] == 'completa':
+            copia['restauracao'] = testar_restauracao(pasta_copias() / copia['arquivo'])
+        resultado[alias] = copia
+    return resultado
@@ -0,0 +1,89 @@
+import sqlite3
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+
+from .services import copiar_banco, copias, restaurar, rotacionar, testar_restauracao
+
+
+class CopiasTests(TransactionTestCase):
+    """O backup lê o banco por outra conexão: os dados precisam estar confirmados"""
+
+    def setUp(self):
+        temporaria = tempfile.TemporaryDirectory()
+        self.addCleanup(temporaria.cleanup)
+        self.pasta = Path(temporaria.name)
+        configuracao = override_settings(COPIAS_DIR=self.pasta, COPIAS_PAUSA=0)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        # Um carimbo novo a cada cópia (o nome do arquivo tem resolução de segundos)
+        horarios = (datetime(2025, 3, 10, 12) + timedelta(minutes=i) for i in range(100))
+        relogio = mock.patch('copias.services.timezone.localtime', side_effect=lambda: next(horarios))
+        relogio.start()
+        self.addCleanup(relogio.stop)
+        self.loja = loja_padrao()
+
+    def _dias(self, caminho):
+        conexao = sqlite3.connect(caminho)
+        try:
+            return [linha[0] for linha in conexao.execute('SELECT data FROM lancamentos_lancamento ORDER BY data')]
+        finally:
+            conexao.close()
+
+    def test_completa_restaura_integra(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('10'))
+
+        copia = copiar_banco(incremental=False)
+        teste = testar_restauracao(self.pasta / copia['arquivo'])
+
+        self.assertEqual(copia['tipo'], 'completa')
+        self.assertTrue(teste['ok'])
+        self.assertEqual(self._dias(restaurar(self.pasta / copia['arquivo'], self.pasta / 'r.sqlite3')), ['2025-03-10'])
+
+    def test_incremental_leva_so_o_que_mudou(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('10'))
+        completa = copiar_banco(incremental=False)
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 11), pix=Decimal('20'))
+
+        incremental = copiar_banco(incremental=True)
+
+        self.assertEqual(incremental['tipo'], 'incremental')
+        self.assertLess(incremental['paginas'], completa['paginas'])
+        restaurado = restaurar(self.pasta / incremental['arquivo'], self.pasta / 'r.sqlite3')
+        self.assertEqual(self._dias(restaurado), ['2025-03-10', '2025-03-11'])
+        self.assertTrue(testar_restauracao(self.pasta / incremental['arquivo'])['ok'])
+
+        self.assertEqual(copiar_banco(incremental=True)['tipo'], 'sem_alteracoes')
+
+    def test_incremental_sem_a_anterior_nao_restaura(self):
+        copiar_banco(incremental=False)
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('10'))
+        primeira = copiar_banco(incremental=True)
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 11), pix=Decimal('20'))
+        segunda = copiar_banco(incremental=True)
+
+        (self.pasta / primeira['arquivo']).unlink()
+
+        with self.assertRaises(ValueError):
+            restaurar(self.pasta / segunda['arquivo'], self.pasta / 'r.sqlite3')
+
+    def test_rotacao_apaga_completas_antigas_e_suas_incrementais(self):
+        nomes = [
+            'default-20250301-000000.sqlite3.gz', 'default-20250301-010000.incremental.gz',
+            'default-20250302-000000.sqlite3.gz', 'default-20250302-010000.incremental.gz',
+            'default-20250303-000000.sqlite3.gz',
+        ]
+        for nome in nomes:
+            (self.pasta / nome).touch()
+
+        removidas = rotacionar('default', manter=2)
+
+        self.assertEqual(removidas, nomes[:2])
+        self.assertEqual([p.name for p in copias('default')], nomes[2:])
@@ -11,6 +11,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,15 +41,29 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'lancamentos',  # ← Adicionar
     'compras',  # ← Adicionar
+    'lojas',
+    'fila',
+    'arquivo',
+    'analitico',
+    'relatorios',
+    'caixa',
+    'estaticos',
+    'recebiveis',
+    'conciliacao',
+    'auditoria',
+    'copias',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'estaticos.middleware.EstaticosMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'auditoria.middleware.AuditoriaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'lojas.middleware.LojaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -58,12 +73,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],  # ← ALTERADO
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'lojas.context_processors.lojas',
+            ],
+            # Compila cada template uma vez por processo (o autoreload do
+            # runserver limpa o cache quando um template muda)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
@@ -79,9 +102,63 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Vários caixas gravando ao mesmo tempo: WAL deixa leituras livres,
+            # IMMEDIATE pega o lock de escrita no BEGIN (sem "database is locked"
+            # ao promover o lock) e o timeout faz os escritores aguardarem a vez.
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # Banco de testes em arquivo: o modo em memória compartilhada do SQLite
+        # não respeita o timeout e quebra os testes com várias threads.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    # Anos encerrados (manage.py arquivar_ano): mantém o banco principal pequeno
+    'arquivo': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'arquivo.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_arquivo.sqlite3',
+        },
+    },
+    # Cópia para relatórios (manage.py atualizar_analitico): GROUP BYs pesados
+    # rodam aqui e não competem com as gravações dos caixas
+    'analitico': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'analitico.sqlite3',
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL;',
+            'timeout': 20,
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_analitico.sqlite3',
+        },
+    },
 }
 
+# Cache em arquivo: compartilhado entre os processos do servidor e o worker
+# da fila (o painel ao vivo e o resumo do admin dependem de ver as mesmas chaves)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+}
+
+# Os testes trocam esse cache por um em memória (domcorleone/testes.py)
+TEST_RUNNER = 'domcorleone.testes.ExecutorTestes'
+
+DATABASE_ROUTERS = [
+    'arquivo.roteador.RoteadorArquivo',
+    'analitico.roteador.RoteadorAnalitico',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,6 +200,18 @@ STATIC_URL = 'static/'
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic grava nomes com hash e cópias .gz/.br; o EstaticosMiddleware serve
+# direto do STATIC_ROOT com cache de um ano (manage.py baixar_estaticos traz as
+# bibliotecas que antes vinham da CDN)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'estaticos.storage.ArmazenamentoEstaticos',
+    },
+}
+
 # REMOVA OU COMENTE ESTAS LINHAS:
 # STATICFILES_DIRS = [
 #     os.path.join(BASE_DIR, 'static'),
@@ -137,3 +226,25 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
+
+# Fila de tarefas (manage.py processar_fila)
+# Tarefas periódicas: {'nome_da_tarefa': timedelta(...)}
+FILA_AGENDA = {
+    'analitico.atualizar': timedelta(minutes=15),
+    'compras.resumo_fornecedores': timedelta(hours=1),
+    'compras.reconciliar_cartoes': timedelta(days=1),
+    'compras.gerar_recorrentes': timedelta(hours=6),
+    'copias.copiar': timedelta(hours=1),
+}
+# Tarefa 'executando' há mais tempo que isso é considerada travada
+FILA_TEMPO_MAXIMO = timedelta(hours=1)
+
+# Cópias de segurança dos bancos SQLite (manage.py copiar_banco e a tarefa copias.copiar)
+COPIAS_DIR = BASE_DIR / 'copias_seguranca'
+# Completas mantidas por banco; as incrementais de uma completa apagada saem junto
+COPIAS_MANTER = 7
+# Entre uma completa e outra, a tarefa grava só as páginas alteradas
+COPIAS_COMPLETA_A_CADA = timedelta(days=1)
+# Páginas copiadas por passo e pausa entre os passos (em segundos)
+COPIAS_PAGINAS_POR_PASSO = 1024
+COPIAS_PAUSA = 0.01
@@ -7,6 +7,14 @@ from django.conf.urls.static import static
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('compras.urls')),
+    path('', include('lojas.urls')),
+    path('', include('fila.urls')),
+    path('', include('analitico.urls')),
+    path('', include('relatorios.urls')),
+    path('', include('caixa.urls')),
+    path('', include('recebiveis.urls')),
+    path('', include('conciliacao.urls')),
+    path('', include('auditoria.urls')),
 ]
 
 # Servir arquivos estáticos em desenvolvimento
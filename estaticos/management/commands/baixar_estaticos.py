@@ -0,0 +1,33 @@
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from estaticos.vendor import ARQUIVOS, caminho_local, url_cdn
+
+PASTA_STATIC = Path(__file__).resolve().parents[2] / 'static'
+
+
+class Command(BaseCommand):
+    help = "Baixa Bootstrap e Font Awesome para estaticos/static/vendor (depois, rode collectstatic)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forcar', action='store_true', help="Baixa de novo arquivos já existentes")
+
+    def handle(self, *args, **options):
+        baixados = 0
+        for arquivo in ARQUIVOS:
+            destino = PASTA_STATIC / caminho_local(arquivo)
+            if destino.exists() and not options['forcar']:
+                continue
+            try:
+                with urlopen(url_cdn(arquivo), timeout=30) as resposta:
+                    conteudo = resposta.read()
+            except OSError as e:
+                raise CommandError(f"Falha ao baixar {arquivo}: {e}")
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            destino.write_bytes(conteudo)
+            baixados += 1
+            self.stdout.write(f"{arquivo} ({len(conteudo) // 1024} KB)")
+
+        self.stdout.write(self.style.SUCCESS(f"{baixados} arquivo(s) baixado(s) para {PASTA_STATIC / 'vendor'}"))
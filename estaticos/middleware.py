@@ -0,0 +1,67 @@
+import mimetypes
+import os
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+
+# Nome gerado pelo manifesto: base.3f2a9c0d1b7e.css
+NOME_COM_HASH = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_CURTO = 'public, max-age=60'
+
+CODIFICACOES = (('br', '.br'), ('gzip', '.gz'))
+
+
+class EstaticosMiddleware:
+    """Serve o STATIC_ROOT direto do processo, antes de sessão e banco (à moda do WhiteNoise).
+
+    Escolhe a cópia .br/.gz gerada no collectstatic conforme o Accept-Encoding,
+    responde 304 pelo ETag e marca os nomes com hash como imutáveis por um ano.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixo = urlsplit(settings.STATIC_URL).path
+        self.raiz = settings.STATIC_ROOT
+
+    def __call__(self, request):
+        if self.raiz and request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefixo):
+            resposta = self._servir(request, request.path_info[len(self.prefixo):])
+            if resposta is not None:
+                return resposta
+        return self.get_response(request)
+
+    def _servir(self, request, nome):
+        try:
+            caminho = safe_join(self.raiz, nome)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(caminho):
+            return None
+
+        servido, codificacao = caminho, None
+        aceitas = request.headers.get('Accept-Encoding', '')
+        for candidata, sufixo in CODIFICACOES:
+            if candidata in aceitas and os.path.isfile(caminho + sufixo):
+                servido, codificacao = caminho + sufixo, candidata
+                break
+
+        estado = os.stat(servido)
+        etag = f'"{int(estado.st_mtime):x}-{estado.st_size:x}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            resposta = HttpResponseNotModified()
+        else:
+            tipo, _ = mimetypes.guess_type(caminho)
+            resposta = FileResponse(open(servido, 'rb'), content_type=tipo or 'application/octet-stream')
+            if codificacao:
+                resposta['Content-Encoding'] = codificacao
+
+        resposta['ETag'] = etag
+        resposta['Vary'] = 'Accept-Encoding'
+        resposta['Cache-Control'] = CACHE_IMUTAVEL if NOME_COM_HASH.search(nome) else CACHE_CURTO
+        return resposta
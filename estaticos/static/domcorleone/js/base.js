@@ -0,0 +1,39 @@
+// Toggle sidebar on mobile
+function toggleSidebar() {
+    document.getElementById('sidebar').classList.toggle('show');
+}
+
+// Close sidebar when clicking outside on mobile
+document.addEventListener('click', function(e) {
+    const sidebar = document.getElementById('sidebar');
+    const toggleBtn = document.querySelector('.btn[onclick="toggleSidebar()"]');
+    
+    if (window.innerWidth <= 768 && 
+        !sidebar.contains(e.target) && 
+        !toggleBtn.contains(e.target)) {
+        sidebar.classList.remove('show');
+    }
+});
+
+// Format currency inputs
+function formatCurrency(input) {
+    let value = input.value.replace(/[^\d]/g, '');
+    value = (parseFloat(value) / 100).toFixed(2);
+    input.value = value;
+}
+
+// Confirm delete actions
+function confirmDelete(message = 'Tem certeza que deseja excluir?') {
+    return confirm(message);
+}
+
+// Auto-hide alerts
+setTimeout(function() {
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(alert => {
+        if (alert.classList.contains('alert-success')) {
+            const bsAlert = new bootstrap.Alert(alert);
+            bsAlert.close();
+        }
+    });
+}, 5000);
@@ -0,0 +1,57 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele só são geradas as cópias .gz
+    brotli = None
+
+# Formatos que ainda ganham com compressão (woff2, png, jpg já vêm comprimidos)
+EXTENSOES_COMPRIMIVEIS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.ttf', '.eot', '.xml')
+TAMANHO_MINIMO = 1024
+
+
+def comprimir(caminho):
+    """Grava caminho.gz (e caminho.br) quando a compressão reduz o arquivo; retorna os sufixos"""
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    if len(conteudo) < TAMANHO_MINIMO:
+        return []
+
+    variantes = [('.gz', gzip.compress(conteudo, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variantes.append(('.br', brotli.compress(conteudo)))
+
+    gravados = []
+    for sufixo, comprimido in variantes:
+        if len(comprimido) < len(conteudo) * 0.95:
+            with open(caminho + sufixo, 'wb') as arquivo:
+                arquivo.write(comprimido)
+            gravados.append(sufixo)
+    return gravados
+
+
+class ArmazenamentoEstaticos(ManifestStaticFilesStorage):
+    """Nomes com hash do conteúdo (manifesto) e cópias .gz/.br prontas no collectstatic.
+
+    Sem manifesto (desenvolvimento, testes, deploy antes do collectstatic) ou
+    com um arquivo fora dele, cai no nome original em vez de falhar.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Fora do manifesto o Django calcula o hash lendo o arquivo no
+            # STATIC_ROOT; sem ele ali, serve o nome sem hash
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for nome in {*paths, *self.hashed_files.values()}:
+            if nome.endswith(EXTENSOES_COMPRIMIVEIS) and self.exists(nome):
+                comprimir(self.path(nome))
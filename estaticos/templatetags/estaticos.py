@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+from ..vendor import caminho_local, url_cdn
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _vendorizado(arquivo):
+    return finders.find(caminho_local(arquivo)) is not None
+
+
+@register.simple_tag
+def vendor(arquivo):
+    """URL local (com hash do manifesto) de uma biblioteca; a CDN se ainda não foi baixada"""
+    if _vendorizado(arquivo):
+        return static(caminho_local(arquivo))
+    return url_cdn(arquivo)
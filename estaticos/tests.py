@@ -0,0 +1,10 @@
+import tempfile
+
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+
+
+class ArmazenamentoEstaticosTests(SimpleTestCase):
+    def test_sem_collectstatic_usa_o_nome_original(self):
+        with tempfile.TemporaryDirectory() as vazio, override_settings(DEBUG=False, STATIC_ROOT=vazio):
+            self.assertEqual(static('domcorleone/css/base.css'), '/static/domcorleone/css/base.css')
@@ -0,0 +1,32 @@
+"""Bibliotecas de terceiros servidas pela própria aplicação.
+
+Cada arquivo fica em estaticos/static/vendor/<caminho> (baixado uma vez com
+manage.py baixar_estaticos); enquanto não estiver lá, as páginas continuam
+usando a CDN de origem.
+"""
+CDN = 'https://cdnjs.cloudflare.com/ajax/libs/'
+
+BOOTSTRAP = 'bootstrap/5.3.0/'
+FONT_AWESOME = 'font-awesome/6.4.0/'
+
+ARQUIVOS = [
+    BOOTSTRAP + 'css/bootstrap.min.css',
+    BOOTSTRAP + 'css/bootstrap.min.css.map',
+    BOOTSTRAP + 'js/bootstrap.bundle.min.js',
+    BOOTSTRAP + 'js/bootstrap.bundle.min.js.map',
+    FONT_AWESOME + 'css/all.min.css',
+    # Fontes referenciadas pelo all.min.css (o manifesto reescreve os url())
+    *(
+        f'{FONT_AWESOME}webfonts/{fonte}.{extensao}'
+        for fonte in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility')
+        for extensao in ('woff2', 'ttf')
+    ),
+]
+
+
+def caminho_local(arquivo):
+    return f'vendor/{arquivo}'
+
+
+def url_cdn(arquivo):
+    return CDN + arquivo
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Tarefa
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'status', 'progresso', 'tentativas', 'executar_apos', 'created_at', 'concluida_em']
+    list_filter = ['status', 'nome']
+    search_fields = ['nome', 'mensagem']
+    readonly_fields = ['tentativas', 'progresso', 'mensagem', 'resultado', 'erro', 'iniciada_em', 'concluida_em']
+    actions = ['reenfileirar']
+
+    @admin.action(description="🔁 Reenfileirar tarefas selecionadas")
+    def reenfileirar(self, request, queryset):
+        total = queryset.exclude(status='executando').update(
+            status='pendente', tentativas=0, erro='', executar_apos=timezone.now()
+        )
+        self.message_user(request, f"{total} tarefa(s) devolvida(s) à fila.")
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class FilaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'fila'
+
+    def ready(self):
+        # Cada app declara suas tarefas em <app>/tarefas.py
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tarefas')
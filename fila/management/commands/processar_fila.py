@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fila import processo
+from fila.registro import agendar_periodicas, recuperar_travadas, registrar_falha, reivindicar
+
+
+class Command(BaseCommand):
+    help = "Executa as tarefas da fila em um pool de processos (sem broker externo)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processos', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+            help="Quantidade de processos do pool"
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=1.0,
+            help="Segundos entre consultas à fila quando não há tarefas"
+        )
+        parser.add_argument(
+            '--agenda', type=float, default=60.0,
+            help="Segundos entre verificações das tarefas periódicas (FILA_AGENDA)"
+        )
+        parser.add_argument(
+            '--recuperacao', type=float, default=300.0,
+            help="Segundos entre buscas por tarefas travadas de workers que morreram"
+        )
+        parser.add_argument(
+            '--uma-vez', action='store_true',
+            help="Processa as tarefas disponíveis e encerra"
+        )
+
+    def handle(self, *args, **options):
+        processos = options['processos']
+        intervalo = options['intervalo']
+
+        self.stdout.write(f"Worker iniciado com {processos} processo(s)")
+        em_execucao = {}
+        # Agenda e recuperação rodam no próprio relógio, não a cada volta do laço
+        proxima_agenda = proxima_recuperacao = time.monotonic()
+        # spawn: nenhum processo herda conexões abertas do SQLite
+        contexto = multiprocessing.get_context('spawn')
+
+        with ProcessPoolExecutor(processos, mp_context=contexto, initializer=processo.inicializar) as pool:
+            try:
+                while True:
+                    agora = time.monotonic()
+                    if agora >= proxima_recuperacao:
+                        recuperadas = recuperar_travadas(exceto=list(em_execucao.values()))
+                        if recuperadas:
+                            self.stdout.write(self.style.WARNING(
+                                f"{recuperadas} tarefa(s) travada(s) devolvida(s) à fila"
+                            ))
+                        proxima_recuperacao = agora + options['recuperacao']
+                    if agora >= proxima_agenda:
+                        agendar_periodicas()
+                        proxima_agenda = agora + options['agenda']
+
+                    livres = processos - len(em_execucao)
+                    if livres > 0:
+                        for pk in reivindicar(livres):
+                            em_execucao[pool.submit(processo.executar, pk)] = pk
+
+                    if not em_execucao:
+                        if options['uma_vez']:
+                            break
+                        time.sleep(intervalo)
+                        continue
+
+                    concluidas, _ = wait(em_execucao, timeout=intervalo, return_when=FIRST_COMPLETED)
+                    for futuro in concluidas:
+                        self._finalizar(em_execucao.pop(futuro), futuro)
+            except BrokenProcessPool as e:
+                # Um processo morreu (ex.: falta de memória): tudo que estava
+                # em execução volta para a fila antes de encerrar
+                for pk in em_execucao.values():
+                    registrar_falha(pk, repr(e))
+                raise CommandError("Pool de processos interrompido; reinicie o worker.")
+            except KeyboardInterrupt:
+                self.stdout.write("Encerrando worker...")
+
+    def _finalizar(self, pk, futuro):
+        try:
+            status = futuro.result()
+        except BrokenProcessPool:
+            registrar_falha(pk, "Processo do pool interrompido")
+            raise
+        except Exception as e:
+            status = registrar_falha(pk, repr(e))
+
+        estilo = self.style.SUCCESS if status == 'concluida' else self.style.WARNING
+        self.stdout.write(estilo(f"Tarefa #{pk}: {status}"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(help_text='Nome registrado com @tarefa', max_length=100, verbose_name='Tarefa')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Parâmetros')),
+                ('status', models.CharField(choices=[('pendente', '⏳ Pendente'), ('executando', '⚙️ Executando'), ('concluida', '✅ Concluída'), ('falhou', '❌ Falhou')], default='pendente', max_length=12, verbose_name='Status')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('max_tentativas', models.PositiveIntegerField(default=3, verbose_name='Máx. Tentativas')),
+                ('progresso', models.PositiveSmallIntegerField(default=0, verbose_name='Progresso (%)')),
+                ('mensagem', models.CharField(blank=True, max_length=200, verbose_name='Mensagem')),
+                ('resultado', models.JSONField(blank=True, null=True, verbose_name='Resultado')),
+                ('erro', models.TextField(blank=True, verbose_name='Erro')),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar após')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criada em')),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')),
+                ('concluida_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')),
+            ],
+            options={
+                'verbose_name': '⚙️ Tarefa',
+                'verbose_name_plural': '⚙️ Tarefas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'executar_apos'], name='tarefa_status_idx'), models.Index(fields=['nome', '-created_at'], name='tarefa_nome_idx')],
+            },
+        ),
+    ]
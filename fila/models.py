@@ -0,0 +1,58 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarefa(models.Model):
+    """Tarefa pesada executada fora da requisição pelo processar_fila"""
+    STATUS_CHOICES = [
+        ('pendente', '⏳ Pendente'),
+        ('executando', '⚙️ Executando'),
+        ('concluida', '✅ Concluída'),
+        ('falhou', '❌ Falhou'),
+    ]
+
+    nome = models.CharField(
+        max_length=100,
+        verbose_name="Tarefa",
+        help_text="Nome registrado com @tarefa"
+    )
+    parametros = models.JSONField(default=dict, blank=True, verbose_name="Parâmetros")
+    status = models.CharField(
+        max_length=12,
+        choices=STATUS_CHOICES,
+        default='pendente',
+        verbose_name="Status"
+    )
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    max_tentativas = models.PositiveIntegerField(default=3, verbose_name="Máx. Tentativas")
+    progresso = models.PositiveSmallIntegerField(default=0, verbose_name="Progresso (%)")
+    mensagem = models.CharField(max_length=200, blank=True, verbose_name="Mensagem")
+    resultado = models.JSONField(blank=True, null=True, verbose_name="Resultado")
+    erro = models.TextField(blank=True, verbose_name="Erro")
+    executar_apos = models.DateTimeField(default=timezone.now, verbose_name="Executar após")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criada em")
+    iniciada_em = models.DateTimeField(blank=True, null=True, verbose_name="Iniciada em")
+    concluida_em = models.DateTimeField(blank=True, null=True, verbose_name="Concluída em")
+
+    class Meta:
+        verbose_name = "⚙️ Tarefa"
+        verbose_name_plural = "⚙️ Tarefas"
+        ordering = ['-created_at']
+        indexes = [
+            # Busca do worker: pendentes cujo horário já chegou
+            models.Index(fields=['status', 'executar_apos'], name='tarefa_status_idx'),
+            models.Index(fields=['nome', '-created_at'], name='tarefa_nome_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nome} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def finalizada(self):
+        return self.status in ('concluida', 'falhou')
+
+    def atualizar_progresso(self, progresso, mensagem=''):
+        """Grava o andamento sem tocar nos demais campos (chamado de dentro da tarefa)"""
+        self.progresso = max(0, min(100, int(progresso)))
+        self.mensagem = mensagem[:200]
+        Tarefa.objects.filter(pk=self.pk).update(progresso=self.progresso, mensagem=self.mensagem)
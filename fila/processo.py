@@ -0,0 +1,15 @@
+"""Pontos de entrada dos processos do pool.
+
+Os processos são criados com spawn, então este módulo não pode importar
+models no topo: ele é carregado antes de django.setup().
+"""
+import django
+
+
+def inicializar():
+    django.setup()
+
+
+def executar(pk):
+    from .registro import executar as executar_tarefa
+    return executar_tarefa(pk)
@@ -0,0 +1,132 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Tarefa
+
+_registro = {}
+
+# Espera antes de cada nova tentativa: 30s, 60s, 120s...
+ESPERA_RETENTATIVA = timedelta(seconds=30)
+
+
+def tarefa(nome=None, max_tentativas=3):
+    """Registra uma função como tarefa da fila.
+
+    A função recebe a Tarefa em execução (para reportar progresso) e os
+    parâmetros enfileirados; o retorno precisa ser serializável em JSON.
+    """
+    def decorador(func):
+        chave = nome or f"{func.__module__}.{func.__name__}"
+        _registro[chave] = func
+        func.nome_tarefa = chave
+        func.max_tentativas = max_tentativas
+        func.enfileirar = lambda **parametros: enfileirar(chave, **parametros)
+        return func
+    return decorador
+
+
+def obter(nome):
+    try:
+        return _registro[nome]
+    except KeyError:
+        raise LookupError(f"Tarefa não registrada: {nome}")
+
+
+def registradas():
+    return sorted(_registro)
+
+
+def enfileirar(nome, executar_apos=None, **parametros):
+    """Cria a tarefa pendente; o worker a executa assim que houver processo livre"""
+    func = obter(nome)
+    return Tarefa.objects.create(
+        nome=nome,
+        parametros=parametros,
+        max_tentativas=func.max_tentativas,
+        executar_apos=executar_apos or timezone.now(),
+    )
+
+
+def reivindicar(limite):
+    """Marca até `limite` tarefas vencidas como em execução e retorna seus ids.
+
+    O UPDATE condicional garante que dois workers nunca peguem a mesma tarefa.
+    """
+    agora = timezone.now()
+    candidatas = Tarefa.objects.filter(
+        status='pendente', executar_apos__lte=agora
+    ).order_by('executar_apos', 'pk').values_list('pk', flat=True)[:limite]
+
+    ids = []
+    for pk in candidatas:
+        ok = Tarefa.objects.filter(pk=pk, status='pendente').update(
+            status='executando',
+            iniciada_em=agora,
+            tentativas=F('tentativas') + 1,
+            progresso=0,
+        )
+        if ok:
+            ids.append(pk)
+    return ids
+
+
+def registrar_falha(pk, erro):
+    """Reagenda com espera crescente ou marca como falha após a última tentativa"""
+    tarefa = Tarefa.objects.get(pk=pk)
+    if tarefa.tentativas < tarefa.max_tentativas:
+        espera = ESPERA_RETENTATIVA * 2 ** (tarefa.tentativas - 1)
+        Tarefa.objects.filter(pk=pk).update(
+            status='pendente',
+            erro=erro,
+            executar_apos=timezone.now() + espera,
+        )
+        return 'reagendada'
+
+    Tarefa.objects.filter(pk=pk).update(
+        status='falhou', erro=erro, concluida_em=timezone.now()
+    )
+    return 'falhou'
+
+
+def executar(pk):
+    """Executa uma tarefa já reivindicada (roda dentro do processo do pool)"""
+    tarefa = Tarefa.objects.get(pk=pk)
+    try:
+        resultado = obter(tarefa.nome)(tarefa, **tarefa.parametros)
+    except Exception:
+        return registrar_falha(pk, traceback.format_exc())
+
+    Tarefa.objects.filter(pk=pk).update(
+        status='concluida',
+        progresso=100,
+        resultado=resultado,
+        erro='',
+        concluida_em=timezone.now(),
+    )
+    return 'concluida'
+
+
+def recuperar_travadas(exceto=()):
+    """Devolve à fila tarefas 'executando' de um worker que morreu no meio.
+
+    `exceto`: ids que o próprio worker ainda está executando.
+    """
+    limite = timezone.now() - getattr(settings, 'FILA_TEMPO_MAXIMO', timedelta(hours=1))
+    return Tarefa.objects.filter(status='executando', iniciada_em__lt=limite).exclude(pk__in=exceto).update(
+        status='pendente', executar_apos=timezone.now()
+    )
+
+
+def agendar_periodicas():
+    """Enfileira as tarefas de settings.FILA_AGENDA cujo intervalo já passou"""
+    agora = timezone.now()
+    criadas = []
+    for nome, intervalo in getattr(settings, 'FILA_AGENDA', {}).items():
+        ultima = Tarefa.objects.filter(nome=nome).order_by('-created_at').first()
+        if ultima is None or (ultima.finalizada and ultima.created_at <= agora - intervalo):
+            criadas.append(enfileirar(nome))
+    return criadas
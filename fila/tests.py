@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Tarefa
+from .registro import enfileirar, executar, recuperar_travadas, reivindicar, tarefa
+
+
+@tarefa('fila.teste_somar', max_tentativas=2)
+def somar(tarefa, a, b):
+    tarefa.atualizar_progresso(50, 'Somando')
+    return {'soma': a + b}
+
+
+@tarefa('fila.teste_falhar', max_tentativas=2)
+def falhar(tarefa):
+    raise RuntimeError('sem conexão')
+
+
+class FilaTests(TestCase):
+    def test_tarefa_e_reivindicada_uma_vez(self):
+        criada = somar.enfileirar(a=1, b=2)
+
+        self.assertEqual(reivindicar(10), [criada.pk])
+        self.assertEqual(reivindicar(10), [])
+        criada.refresh_from_db()
+        self.assertEqual((criada.status, criada.tentativas), ('executando', 1))
+
+    def test_tarefa_agendada_espera_o_horario(self):
+        enfileirar('fila.teste_somar', executar_apos=timezone.now() + timedelta(minutes=5), a=1, b=2)
+        self.assertEqual(reivindicar(10), [])
+
+    def test_executar_grava_resultado(self):
+        criada = somar.enfileirar(a=1, b=2)
+        reivindicar(1)
+
+        self.assertEqual(executar(criada.pk), 'concluida')
+        criada.refresh_from_db()
+        self.assertEqual((criada.status, criada.progresso, criada.resultado), ('concluida', 100, {'soma': 3}))
+
+    def test_falha_reagenda_e_depois_desiste(self):
+        criada = falhar.enfileirar()
+        reivindicar(1)
+        self.assertEqual(executar(criada.pk), 'reagendada')
+        criada.refresh_from_db()
+        self.assertEqual(criada.status, 'pendente')
+        self.assertGreater(criada.executar_apos, timezone.now())
+        self.assertIn('sem conexão', criada.erro)
+
+        Tarefa.objects.filter(pk=criada.pk).update(executar_apos=timezone.now())
+        reivindicar(1)
+        self.assertEqual(executar(criada.pk), 'falhou')
+        criada.refresh_from_db()
+        self.assertTrue(criada.finalizada)
+
+    def test_tarefa_de_worker_morto_volta_para_a_fila(self):
+        criada = somar.enfileirar(a=1, b=2)
+        reivindicar(1)
+        Tarefa.objects.filter(pk=criada.pk).update(iniciada_em=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(recuperar_travadas(), 1)
+        self.assertEqual(reivindicar(1), [criada.pk])
+
+    def test_recuperacao_poupa_as_do_proprio_worker(self):
+        criada = somar.enfileirar(a=1, b=2)
+        reivindicar(1)
+        Tarefa.objects.filter(pk=criada.pk).update(iniciada_em=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(recuperar_travadas(exceto=[criada.pk]), 0)
+        self.assertEqual(recuperar_travadas(), 1)
+
+    def test_tarefa_nao_registrada(self):
+        with self.assertRaises(LookupError):
+            enfileirar('fila.nao_existe')
+
+    def test_api_devolve_andamento(self):
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+        criada = somar.enfileirar(a=1, b=2)
+
+        resposta = self.client.get(reverse('api_tarefa', args=[criada.pk]))
+
+        self.assertEqual(resposta.json()['status'], 'pendente')
+        self.assertEqual([t['id'] for t in self.client.get(reverse('api_tarefas_ativas')).json()], [criada.pk])
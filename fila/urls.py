@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('tarefas/', views.tarefas_list, name='tarefas_list'),
+    path('api/tarefas/ativas/', views.api_tarefas_ativas, name='api_tarefas_ativas'),
+    path('api/tarefas/<int:pk>/', views.api_tarefa, name='api_tarefa'),
+]
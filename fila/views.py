@@ -0,0 +1,51 @@
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+
+from .models import Tarefa
+
+
+def _tarefa_json(tarefa):
+    return {
+        'id': tarefa.pk,
+        'nome': tarefa.nome,
+        'status': tarefa.status,
+        'status_display': tarefa.get_status_display(),
+        'progresso': tarefa.progresso,
+        'mensagem': tarefa.mensagem,
+        'tentativas': tarefa.tentativas,
+        'resultado': tarefa.resultado,
+        'finalizada': tarefa.finalizada,
+    }
+
+
+@login_required
+def tarefas_list(request):
+    tarefas = Tarefa.objects.defer('erro', 'resultado')
+
+    status = request.GET.get('status')
+    if status:
+        tarefas = tarefas.filter(status=status)
+
+    paginator = Paginator(tarefas, 25)
+    tarefas_page = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'fila/list.html', {
+        'tarefas': tarefas_page,
+        'filtros': {'status': status},
+        'STATUS_CHOICES': Tarefa.STATUS_CHOICES,
+    })
+
+
+@login_required
+def api_tarefa(request, pk):
+    tarefa = get_object_or_404(Tarefa, pk=pk)
+    return JsonResponse(_tarefa_json(tarefa))
+
+
+@login_required
+def api_tarefas_ativas(request):
+    """Andamento das tarefas pendentes/em execução (consultado pela página de status)"""
+    tarefas = Tarefa.objects.filter(status__in=['pendente', 'executando']).defer('erro')[:50]
+    return JsonResponse([_tarefa_json(t) for t in tarefas], safe=False)
@@ -1,10 +1,46 @@
+from datetime import date
+
 from django.contrib import admin
+from django.contrib.admin.views.main import (
+    ALL_VAR, ERROR_FLAG, IS_FACETS_VAR, IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, SEARCH_VAR, TO_FIELD_VAR,
+)
+from django.core.paginator import Paginator
+from django.utils import formats
+from django.utils.functional import cached_property
 from django.utils.html import format_html
-from django.db.models import Sum
+from django.utils.text import capfirst
+from auditoria.admin import ExclusaoAuditadaMixin
+from lojas.formatos import formatar_valor
 from .models import Lancamento
+from .services import resumo_mensal, totais_vendas
+
+# Parâmetros da listagem que não mudam quais lançamentos entram no resumo
+PARAMETROS_NEUTROS = {ALL_VAR, ERROR_FLAG, IS_FACETS_VAR, IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, TO_FIELD_VAR}
+
+# Filtros que o resumo mensal consegue responder -> coluna do resumo
+FILTROS_MENSAIS = {'loja__id__exact': 'loja_id', 'data__year': 'ano', 'data__month': 'mes'}
+
+
+class PaginadorComResumo(Paginator):
+    """Paginador que tira a contagem dos totais do resumo.
+
+    Com `totais` já calculados (resumo mensal em cache) não consulta o banco;
+    sem eles, soma e conta na mesma consulta agregada.
+    """
+
+    def __init__(self, *args, totais=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.totais = totais
+
+    @cached_property
+    def count(self):
+        if self.totais is None:
+            self.totais = self.object_list.order_by().aggregate(**totais_vendas())
+        return self.totais['dias']
+
 
 @admin.register(Lancamento)
-class LancamentoAdmin(admin.ModelAdmin):
+class LancamentoAdmin(ExclusaoAuditadaMixin, admin.ModelAdmin):
     list_display = [
         'data_formatada', 
         'pix_formatado', 
@@ -14,14 +50,15 @@ class LancamentoAdmin(admin.ModelAdmin):
         'total_vendas_formatado',
         'status_pagamento'
     ]
-    list_filter = ['data', 'created_at']
+    list_filter = ['loja', 'data', 'created_at']
     search_fields = ['data']
     date_hierarchy = 'data'
     ordering = ['-data']
+    show_full_result_count = False
     
     fieldsets = (
         ('📅 Informações da Data', {
-            'fields': ('data',)
+            'fields': ('loja', 'data')
         }),
         ('💰 Vendas do Dia', {
             'fields': ('pix', 'dinheiro', 'cartao_debito', 'cartao_credito'),
@@ -35,19 +72,15 @@ class LancamentoAdmin(admin.ModelAdmin):
     
     readonly_fields = ['get_resumo_display', 'created_at', 'updated_at']
 
-    def formatar_valor(self, valor):
-        """Função auxiliar para formatar valores monetários"""
-        return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
     def get_resumo_display(self, obj):
         if obj.pk:
             data_str = obj.data.strftime('%d/%m/%Y')
-            pix_str = self.formatar_valor(obj.pix)
-            dinheiro_str = self.formatar_valor(obj.dinheiro)
-            debito_str = self.formatar_valor(obj.cartao_debito)
-            credito_str = self.formatar_valor(obj.cartao_credito)
-            total_str = self.formatar_valor(obj.total_vendas)
-            vista_str = self.formatar_valor(obj.total_a_vista)
+            pix_str = formatar_valor(obj.pix)
+            dinheiro_str = formatar_valor(obj.dinheiro)
+            debito_str = formatar_valor(obj.cartao_debito)
+            credito_str = formatar_valor(obj.cartao_credito)
+            total_str = formatar_valor(obj.total_vendas)
+            vista_str = formatar_valor(obj.total_a_vista)
             
             html = f"""
                 <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; font-family: monospace;">
@@ -76,31 +109,31 @@ class LancamentoAdmin(admin.ModelAdmin):
     data_formatada.admin_order_field = 'data'
 
     def pix_formatado(self, obj):
-        valor_str = self.formatar_valor(obj.pix)
+        valor_str = formatar_valor(obj.pix)
         return format_html('<span style="color: #28a745;">📱 {}</span>', valor_str)
     pix_formatado.short_description = "PIX"
     pix_formatado.admin_order_field = 'pix'
 
     def dinheiro_formatado(self, obj):
-        valor_str = self.formatar_valor(obj.dinheiro)
+        valor_str = formatar_valor(obj.dinheiro)
         return format_html('<span style="color: #17a2b8;">💵 {}</span>', valor_str)
     dinheiro_formatado.short_description = "Dinheiro"
     dinheiro_formatado.admin_order_field = 'dinheiro'
 
     def debito_formatado(self, obj):
-        valor_str = self.formatar_valor(obj.cartao_debito)
+        valor_str = formatar_valor(obj.cartao_debito)
         return format_html('<span style="color: #6f42c1;">💳 {}</span>', valor_str)
     debito_formatado.short_description = "Débito"
     debito_formatado.admin_order_field = 'cartao_debito'
 
     def credito_formatado(self, obj):
-        valor_str = self.formatar_valor(obj.cartao_credito)
+        valor_str = formatar_valor(obj.cartao_credito)
         return format_html('<span style="color: #fd7e14;">🔄 {}</span>', valor_str)
     credito_formatado.short_description = "Crédito"
     credito_formatado.admin_order_field = 'cartao_credito'
 
     def total_vendas_formatado(self, obj):
-        valor_str = self.formatar_valor(obj.total_vendas)
+        valor_str = formatar_valor(obj.total_vendas)
         return format_html('<strong style="color: #dc3545;">🔢 {}</strong>', valor_str)
     total_vendas_formatado.short_description = "Total Vendas"
 
@@ -119,34 +152,96 @@ class LancamentoAdmin(admin.ModelAdmin):
             )
     status_pagamento.short_description = "Status"
 
+    def _filtro_mensal(self, request):
+        """Filtros ativos no formato do resumo mensal, ou None se ele não responde"""
+        filtro = {}
+        for chave, valor in request.GET.items():
+            if chave in PARAMETROS_NEUTROS or (chave == SEARCH_VAR and not valor):
+                continue
+            if chave not in FILTROS_MENSAIS:
+                return None
+            try:
+                filtro[FILTROS_MENSAIS[chave]] = int(valor)
+            except ValueError:
+                return None
+        return filtro
+
+    def _meses(self, filtro):
+        return [
+            linha for linha in resumo_mensal()
+            if all(linha[coluna] == valor for coluna, valor in filtro.items())
+        ]
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        totais = None
+        filtro = self._filtro_mensal(request)
+        if filtro is not None:
+            totais = {campo: 0 for campo in totais_vendas()}
+            for linha in self._meses(filtro):
+                for campo in totais:
+                    totais[campo] += linha[campo]
+        return PaginadorComResumo(
+            queryset, per_page, orphans, allow_empty_first_page, totais=totais
+        )
+
+    def _hierarquia(self, cl, filtro):
+        """Navegação por ano/mês montada a partir do resumo mensal.
+
+        Só cobre os níveis que o Django resolveria com Min/Max e DISTINCT sobre
+        a tabela inteira; com o mês escolhido os dias vêm da consulta padrão.
+        """
+        if 'mes' in filtro:
+            return None
+
+        def link(filtros):
+            return cl.get_query_string(filtros, ['data__'])
+
+        meses = self._meses({c: v for c, v in filtro.items() if c != 'ano'})
+        anos = sorted({linha['ano'] for linha in meses})
+        ano = filtro.get('ano') or (anos[0] if len(anos) == 1 else None)
+        if ano is None:
+            return {
+                'show': True,
+                'back': None,
+                'choices': [{'link': link({'data__year': str(a)}), 'title': str(a)} for a in anos],
+            }
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': 'Todas as datas'},
+            'choices': [
+                {
+                    'link': link({'data__year': ano, 'data__month': mes}),
+                    'title': capfirst(formats.date_format(date(ano, mes, 1), 'YEAR_MONTH_FORMAT')),
+                }
+                for mes in sorted({linha['mes'] for linha in meses if linha['ano'] == ano})
+            ],
+        }
+
     def changelist_view(self, request, extra_context=None):
         # Adicionar estatísticas ao topo da lista
         response = super().changelist_view(request, extra_context=extra_context)
-        
-        try:
-            qs = response.context_data['cl'].queryset
-            stats = qs.aggregate(
-                total_pix=Sum('pix'),
-                total_dinheiro=Sum('dinheiro'),
-                total_debito=Sum('cartao_debito'),
-                total_credito=Sum('cartao_credito')
-            )
-            
-            total_geral = (stats['total_pix'] or 0) + (stats['total_dinheiro'] or 0) + (stats['total_debito'] or 0) + (stats['total_credito'] or 0)
-            total_a_vista = (stats['total_pix'] or 0) + (stats['total_dinheiro'] or 0) + (stats['total_debito'] or 0)
-            
-            response.context_data['summary'] = {
-                'total_pix': stats['total_pix'] or 0,
-                'total_dinheiro': stats['total_dinheiro'] or 0,
-                'total_debito': stats['total_debito'] or 0,
-                'total_credito': stats['total_credito'] or 0,
-                'total_geral': total_geral,
-                'total_a_vista': total_a_vista,
-                'count': qs.count()
-            }
-        except:
-            pass
-            
+
+        # Redirecionamentos e erros de filtro não têm a listagem
+        cl = getattr(response, 'context_data', {}).get('cl')
+        if cl is None:
+            return response
+
+        # O paginador já agregou os totais ao contar (ou os leu do cache)
+        totais = {campo: valor or 0 for campo, valor in cl.paginator.totais.items()}
+        total_a_vista = totais['total_pix'] + totais['total_dinheiro'] + totais['total_debito']
+        response.context_data['summary'] = {
+            'total_pix': totais['total_pix'],
+            'total_dinheiro': totais['total_dinheiro'],
+            'total_debito': totais['total_debito'],
+            'total_credito': totais['total_credito'],
+            'total_geral': total_a_vista + totais['total_credito'],
+            'total_a_vista': total_a_vista,
+            'count': totais['dias'],
+        }
+
+        filtro = self._filtro_mensal(request)
+        if filtro is not None:
+            response.context_data['hierarquia'] = self._hierarquia(cl, filtro)
         return response
 
 # Customizar o título do admin
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def atribuir_loja_principal(apps, schema_editor):
+    Loja = apps.get_model('lojas', 'Loja')
+    loja = Loja.objects.order_by('pk').first()
+    for nome in ['Lancamento']:
+        apps.get_model('lancamentos', nome).objects.filter(loja__isnull=True).update(loja=loja)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lancamentos', '0002_remove_lancamento_cartao_lancamento_cartao_credito_and_more'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lancamento',
+            name='loja',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='lancamentos', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.RunPython(atribuir_loja_principal, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='lancamento',
+            name='loja',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lancamentos', to='lojas.loja', verbose_name='🏬 Loja'),
+        ),
+        migrations.AlterField(
+            model_name='lancamento',
+            name='data',
+            field=models.DateField(default=django.utils.timezone.now, help_text='Data do lançamento (apenas um por dia em cada loja)', verbose_name='📅 Data'),
+        ),
+        migrations.AddConstraint(
+            model_name='lancamento',
+            constraint=models.UniqueConstraint(fields=('loja', 'data'), name='lancamento_loja_data_unico'),
+        ),
+    ]
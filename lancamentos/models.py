@@ -1,13 +1,45 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from decimal import Decimal
 
-class Lancamento(models.Model):
+from auditoria.registro import Auditado
+from lojas.models import Loja
+from lojas.painel import avisar_painel
+
+class TotaisVendasMixin:
+    """Totais derivados de pix, dinheiro, cartao_debito e cartao_credito"""
+
+    @property
+    def total_vendas(self):
+        """Total geral das vendas"""
+        return self.pix + self.dinheiro + self.cartao_debito + self.cartao_credito
+
+    @property
+    def total_a_vista(self):
+        """Crédito imediato (PIX + Dinheiro + Débito)"""
+        return self.pix + self.dinheiro + self.cartao_debito
+
+    @property
+    def total_cartao(self):
+        """Total dos cartões (Débito + Crédito)"""
+        return self.cartao_debito + self.cartao_credito
+
+    @property
+    def total_credito(self):
+        """Apenas cartão de crédito"""
+        return self.cartao_credito
+
+class Lancamento(TotaisVendasMixin, Auditado, models.Model):
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.PROTECT,
+        related_name='lancamentos',
+        verbose_name="🏬 Loja"
+    )
     data = models.DateField(
         default=timezone.now,
         verbose_name="📅 Data",
-        unique=True,
-        help_text="Data do lançamento (apenas um por dia)"
+        help_text="Data do lançamento (apenas um por dia em cada loja)"
     )
     pix = models.DecimalField(
         max_digits=10, 
@@ -44,29 +76,33 @@ class Lancamento(models.Model):
         verbose_name = "💰 Lançamento"
         verbose_name_plural = "💰 Lançamentos"
         ordering = ['-data']
+        constraints = [
+            # Também serve de índice para as consultas por loja e período
+            models.UniqueConstraint(fields=['loja', 'data'], name='lancamento_loja_data_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['updated_at'], name='lancamento_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Vendas do dia {self.data.strftime('%d/%m/%Y')} - Total: R$ {self.total_vendas:,.2f}"
 
-    @property
-    def total_vendas(self):
-        """Total geral das vendas"""
-        return self.pix + self.dinheiro + self.cartao_debito + self.cartao_credito
-
-    @property
-    def total_a_vista(self):
-        """Crédito imediato (PIX + Dinheiro + Débito)"""
-        return self.pix + self.dinheiro + self.cartao_debito
+    def save(self, *args, **kwargs):
+        from recebiveis.services import atualizar_lancamentos
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            atualizar_lancamentos([self.pk])
+        self._avisar_alteracao()
 
-    @property
-    def total_cartao(self):
-        """Total dos cartões (Débito + Crédito)"""
-        return self.cartao_debito + self.cartao_credito
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        self._avisar_alteracao()
+        return resultado
 
-    @property
-    def total_credito(self):
-        """Apenas cartão de crédito"""
-        return self.cartao_credito
+    def _avisar_alteracao(self):
+        from .services import invalidar_resumo_mensal
+        transaction.on_commit(invalidar_resumo_mensal)
+        avisar_painel(self.loja_id)
 
     def get_resumo(self):
         """Retorna resumo formatado"""
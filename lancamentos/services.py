@@ -0,0 +1,244 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from arquivo.consultas import dias_arquivados, verificar_dias_abertos
+from auditoria.registro import criacao, diferencas, entrada, lote, registrar, valores
+from lojas.painel import avisar_painel
+from recebiveis.services import atualizar_lancamentos
+
+from .models import Lancamento
+
+# Formas de pagamento aceitas -> campo do Lancamento
+CAMPOS_FORMA = {
+    'pix': 'pix',
+    'dinheiro': 'dinheiro',
+    'debito': 'cartao_debito',
+    'cartao_debito': 'cartao_debito',
+    'credito': 'cartao_credito',
+    'cartao_credito': 'cartao_credito',
+}
+
+CAMPOS_VALOR = ['pix', 'dinheiro', 'cartao_debito', 'cartao_credito']
+
+CHAVE_VERSAO_RESUMO = 'lancamentos:resumo_mensal:versao'
+TEMPO_RESUMO = 60 * 60
+
+
+def totais_vendas():
+    """Agregações do resumo de vendas (somas por forma e quantidade de dias)"""
+    return {
+        'total_pix': Sum('pix'),
+        'total_dinheiro': Sum('dinheiro'),
+        'total_debito': Sum('cartao_debito'),
+        'total_credito': Sum('cartao_credito'),
+        'dias': Count('id'),
+    }
+
+
+def invalidar_resumo_mensal():
+    """Troca a versão da chave do resumo mensal; o cache antigo expira sozinho"""
+    try:
+        cache.incr(CHAVE_VERSAO_RESUMO)
+    except ValueError:
+        cache.set(CHAVE_VERSAO_RESUMO, 1, None)
+
+
+def resumo_mensal():
+    """Totais de vendas por loja e mês, numa consulta agrupada guardada em cache.
+
+    Vale até a próxima gravação de lançamento (ver invalidar_resumo_mensal).
+    """
+    versao = cache.get_or_set(CHAVE_VERSAO_RESUMO, 1, None)
+    chave = f'lancamentos:resumo_mensal:{versao}'
+    linhas = cache.get(chave)
+    if linhas is None:
+        linhas = list(
+            Lancamento.objects.order_by()
+            .values('loja_id', ano=ExtractYear('data'), mes=ExtractMonth('data'))
+            .annotate(**totais_vendas())
+        )
+        cache.set(chave, linhas, TEMPO_RESUMO)
+    return linhas
+
+
+def converter_item(item):
+    """Valida um item {'forma', 'valor', 'data'} e retorna (data, campo, valor)"""
+    if not isinstance(item, dict):
+        raise ValidationError('Cada item deve ser um objeto com forma e valor.')
+
+    campo = CAMPOS_FORMA.get(str(item.get('forma', '')).lower())
+    if campo is None:
+        raise ValidationError(f"Forma de pagamento inválida: {item.get('forma')!r}")
+
+    try:
+        valor = Decimal(str(item.get('valor'))).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        raise ValidationError(f"Valor inválido: {item.get('valor')!r}")
+    # NaN e Infinity passam pelo quantize, mas não podem ser comparados nem gravados
+    if not valor.is_finite():
+        raise ValidationError(f"Valor inválido: {item.get('valor')!r}")
+    if valor <= 0:
+        raise ValidationError('O valor deve ser maior que zero.')
+
+    data = item.get('data')
+    if not data:
+        data = timezone.localdate()
+    elif not isinstance(data, date):
+        try:
+            data = datetime.strptime(str(data), '%Y-%m-%d').date()
+        except ValueError:
+            raise ValidationError(f'Data inválida: {data!r}')
+
+    return data, campo, valor
+
+
+def registrar_vendas(loja, itens):
+    """Soma valores aos totais diários da loja sem perder atualizações concorrentes.
+
+    Os itens são agrupados por dia e aplicados na mesma transação: um
+    INSERT que ignora dias já existentes e um UPDATE com F() por dia, de
+    modo que o incremento acontece no banco e nunca sobre um valor lido
+    antes. Retorna os lançamentos afetados.
+    """
+    por_dia = defaultdict(lambda: defaultdict(Decimal))
+    for item in itens:
+        data, campo, valor = converter_item(item)
+        por_dia[data][campo] += valor
+
+    if not por_dia:
+        return []
+    verificar_dias_abertos(loja, por_dia)
+
+    agora = timezone.now()
+    with lote():
+        Lancamento.objects.bulk_create(
+            [Lancamento(loja=loja, data=data) for data in por_dia],
+            ignore_conflicts=True
+        )
+        for data, valores in por_dia.items():
+            Lancamento.objects.filter(loja=loja, data=data).update(
+                updated_at=agora,
+                **{campo: F(campo) + valor for campo, valor in valores.items()}
+            )
+        lancamentos = list(Lancamento.objects.filter(loja=loja, data__in=list(por_dia)))
+        # Quem o bulk_create inseriu tem created_at posterior a `agora`
+        registrar([
+            criacao(l, loja.pk) if l.created_at >= agora else entrada(
+                Lancamento, l.pk, loja.pk, 'alteracao',
+                {campo: [getattr(l, campo) - valor, getattr(l, campo)] for campo, valor in por_dia[l.data].items()}
+            )
+            for l in lancamentos
+        ])
+        atualizar_lancamentos(l.pk for l in lancamentos)
+        transaction.on_commit(invalidar_resumo_mensal)
+        avisar_painel(loja.pk)
+        return lancamentos
+
+
+# Maior valor que cabe nos campos (max_digits=10, decimal_places=2)
+VALOR_MAXIMO = Decimal('99999999.99')
+
+
+def ler_valor(texto):
+    """Converte o texto de uma célula ('1.234,56' ou '1234.56'); vazio vale zero"""
+    texto = str(texto or '').replace('R$', '').strip()
+    if not texto:
+        return Decimal('0.00')
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    try:
+        valor = Decimal(texto).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValidationError('Valor inválido.')
+    if not valor.is_finite():
+        raise ValidationError('Valor inválido.')
+    if valor < 0:
+        raise ValidationError('O valor não pode ser negativo.')
+    if valor > VALOR_MAXIMO:
+        raise ValidationError('Valor acima do permitido.')
+    return valor
+
+
+def gravar_grade(loja, celulas, versoes=None):
+    """Grava os totais digitados na grade de dias (substitui, não soma).
+
+    `celulas` é {(data, campo): texto}. Com qualquer célula inválida (ou dia
+    alterado num ano já arquivado) nada é gravado e o ValidationError traz as
+    mensagens por '<campo>_<AAAA-MM-DD>'. Só os dias novos ou alterados
+    entram, num único upsert em (loja, data). Retorna os lançamentos gravados.
+
+    `versoes` é {data: updated_at que a tela mostrou (None se o dia estava
+    vazio)}. Um dia a gravar que mudou desde então (outra tela, o caixa) é
+    um conflito: nada é gravado, para não apagar a alteração de outra pessoa.
+    """
+    por_dia = defaultdict(lambda: dict.fromkeys(CAMPOS_VALOR, Decimal('0.00')))
+    erros = {}
+    for (data, campo), texto in celulas.items():
+        try:
+            por_dia[data][campo] = ler_valor(texto)
+        except ValidationError as e:
+            erros[f'{campo}_{data.isoformat()}'] = e.messages
+    if erros:
+        raise ValidationError(erros)
+
+    # A transação do banco principal começa com o lock de escrita (IMMEDIATE):
+    # entre a conferência das versões e o upsert ninguém grava nesses dias
+    with transaction.atomic():
+        existentes = {l.data: l for l in Lancamento.objects.filter(loja=loja, data__in=list(por_dia))}
+        alterados = []
+        for data, totais in sorted(por_dia.items()):
+            atual = existentes.get(data)
+            if atual is None and not any(totais.values()):
+                continue  # dia em branco continua sem lançamento
+            if atual is not None and all(getattr(atual, campo) == valor for campo, valor in totais.items()):
+                continue
+            alterados.append(Lancamento(loja=loja, data=data, **totais))
+        if not alterados:
+            return []
+
+        arquivados = dias_arquivados(loja, [l.data for l in alterados])
+        if arquivados:
+            raise ValidationError({
+                f'{campo}_{data.isoformat()}': ['Dia em ano arquivado.'] for data in arquivados for campo in CAMPOS_VALOR
+            })
+        if versoes is not None:
+            conflitos = [
+                l.data for l in alterados
+                if versoes.get(l.data) != (existentes[l.data].updated_at if l.data in existentes else None)
+            ]
+            if conflitos:
+                raise ValidationError({
+                    f'{campo}_{data.isoformat()}': ['Alterado por outra pessoa; confira e grave de novo.']
+                    for data in conflitos for campo in CAMPOS_VALOR
+                })
+
+        Lancamento.objects.bulk_create(
+            alterados,
+            update_conflicts=True,
+            unique_fields=['loja', 'data'],
+            update_fields=[*CAMPOS_VALOR, 'updated_at'],
+        )
+        lancamentos = list(Lancamento.objects.filter(loja=loja, data__in=[l.data for l in alterados]))
+        registrar([
+            criacao(l, loja.pk) if l.data not in existentes else entrada(
+                Lancamento, l.pk, loja.pk, 'alteracao', diferencas(valores(existentes[l.data]), valores(l))
+            )
+            for l in lancamentos
+        ])
+        atualizar_lancamentos(l.pk for l in lancamentos)
+        transaction.on_commit(invalidar_resumo_mensal)
+        avisar_painel(loja.pk)
+        return lancamentos
+
+
+def adicionar_venda(loja, forma, valor, data=None):
+    """Atalho para registrar um único valor no total do dia"""
+    return registrar_vendas(loja, [{'forma': forma, 'valor': valor, 'data': data}])[0]
@@ -1,3 +1,236 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from arquivo.models import ResumoArquivado
+from auditoria.registro import historico
+from lojas.models import Loja, loja_padrao
+
+from .models import Lancamento
+from .services import adicionar_venda, gravar_grade, registrar_vendas, resumo_mensal
+
+
+class RegistrarVendasTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def test_cria_dia_e_soma_por_forma(self):
+        dia = date(2025, 3, 10)
+        registrar_vendas(self.loja, [
+            {'forma': 'pix', 'valor': '10.50', 'data': dia},
+            {'forma': 'pix', 'valor': '4.50', 'data': dia},
+            {'forma': 'credito', 'valor': 20, 'data': dia},
+        ])
+        lancamento = adicionar_venda(self.loja, 'dinheiro', '5', data=dia)
+
+        self.assertEqual(Lancamento.objects.count(), 1)
+        self.assertEqual(lancamento.pix, Decimal('15.00'))
+        self.assertEqual(lancamento.dinheiro, Decimal('5.00'))
+        self.assertEqual(lancamento.cartao_credito, Decimal('20.00'))
+        self.assertEqual(lancamento.total_vendas, Decimal('40.00'))
+
+    def test_rejeita_item_invalido_sem_gravar(self):
+        with self.assertRaises(ValidationError):
+            registrar_vendas(self.loja, [
+                {'forma': 'pix', 'valor': '10'},
+                {'forma': 'boleto', 'valor': '10'},
+            ])
+        self.assertFalse(Lancamento.objects.exists())
+
+    def test_rejeita_valor_nao_finito(self):
+        for valor in ('NaN', 'sNaN', 'Infinity', '-inf'):
+            with self.subTest(valor=valor), self.assertRaises(ValidationError):
+                registrar_vendas(self.loja, [{'forma': 'pix', 'valor': valor}])
+        self.assertFalse(Lancamento.objects.exists())
+
+    def test_mesmo_dia_em_lojas_diferentes(self):
+        dia = date(2025, 3, 10)
+        outra = Loja.objects.create(nome='Filial')
+        adicionar_venda(self.loja, 'pix', '10', data=dia)
+        adicionar_venda(outra, 'pix', '3', data=dia)
+
+        self.assertEqual(Lancamento.objects.get(loja=self.loja, data=dia).pix, Decimal('10.00'))
+        self.assertEqual(Lancamento.objects.get(loja=outra, data=dia).pix, Decimal('3.00'))
+
+    def test_endpoint_aceita_lote(self):
+        user = User.objects.create_user('caixa', password='senha')
+        self.client.force_login(user)
+        resposta = self.client.post(
+            reverse('api_lancamentos_registrar'),
+            data=json.dumps({'itens': [
+                {'forma': 'debito', 'valor': '7.25', 'data': '2025-03-10'},
+                {'forma': 'pix', 'valor': '2.75', 'data': '2025-03-11'},
+            ]}),
+            content_type='application/json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.json()['lancamentos']), 2)
+
+        resposta = self.client.post(
+            reverse('api_lancamentos_registrar'),
+            data=json.dumps({'forma': 'pix', 'valor': '-1'}),
+            content_type='application/json'
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+
+class GravarGradeTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+        self.dia = date(2025, 3, 10)
+
+    def test_substitui_o_dia_e_audita_a_diferenca(self):
+        adicionar_venda(self.loja, 'pix', '10', data=self.dia)
+        gravados = gravar_grade(self.loja, {(self.dia, 'pix'): '7,50', (self.dia, 'dinheiro'): ''})
+
+        self.assertEqual(gravados[0].pix, Decimal('7.50'))
+        self.assertEqual(
+            historico(gravados[0]).first().alteracoes, {'pix': ['10.00', '7.50']}
+        )
+
+    def test_dia_alterado_depois_de_aberto_e_conflito(self):
+        visto = adicionar_venda(self.loja, 'pix', '10', data=self.dia).updated_at
+        # O caixa soma uma venda enquanto a grade está aberta
+        adicionar_venda(self.loja, 'dinheiro', '4', data=self.dia)
+
+        with self.assertRaises(ValidationError) as erro:
+            gravar_grade(self.loja, {(self.dia, 'pix'): '12'}, {self.dia: visto})
+
+        self.assertIn(f'pix_{self.dia.isoformat()}', erro.exception.message_dict)
+        self.assertEqual(Lancamento.objects.get().dinheiro, Decimal('4.00'))
+
+    def test_dia_criado_depois_de_aberto_e_conflito(self):
+        adicionar_venda(self.loja, 'pix', '10', data=self.dia)
+        with self.assertRaises(ValidationError):
+            gravar_grade(self.loja, {(self.dia, 'pix'): '3'}, {self.dia: None})
+        self.assertEqual(Lancamento.objects.get().pix, Decimal('10.00'))
+
+    def test_tela_manda_a_versao_e_recarrega_o_dia_em_conflito(self):
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+        url = reverse('lancamentos_grade') + f'?inicio={self.dia.isoformat()}'
+        lancamento = adicionar_venda(self.loja, 'pix', '10', data=self.dia)
+        linha = next(l for l in self.client.get(url).context['linhas'] if l['data'] == self.dia)
+        self.assertEqual(linha['versao'], lancamento.updated_at.isoformat())
+
+        adicionar_venda(self.loja, 'pix', '1', data=self.dia)
+        resposta = self.client.post(url, {
+            f'versao_{self.dia.isoformat()}': linha['versao'], f'pix_{self.dia.isoformat()}': '50',
+        })
+
+        linha = next(l for l in resposta.context['linhas'] if l['data'] == self.dia)
+        self.assertEqual(linha['celulas'][0]['valor'], Decimal('11.00'))
+        self.assertTrue(linha['celulas'][0]['erro'])
+        self.assertEqual(Lancamento.objects.get().pix, Decimal('11.00'))
+
+    def test_tela_com_data_nos_limites_volta_para_a_semana_atual(self):
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+        for inicio in ('0001-01-01', '9999-12-31'):
+            for periodo in ('semana', 'mes'):
+                with self.subTest(inicio=inicio, periodo=periodo):
+                    resposta = self.client.get(reverse('lancamentos_grade'), {'inicio': inicio, 'periodo': periodo})
+                    self.assertEqual(resposta.status_code, 200)
+                    self.assertLessEqual(resposta.context['inicio'], date.today())
+
+
+class DiaArquivadoTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+        ResumoArquivado.objects.create(loja=self.loja, ano=2023, mes=12)
+
+    def test_registrar_vendas_recusa_dia_arquivado(self):
+        with self.assertRaises(ValidationError):
+            registrar_vendas(self.loja, [
+                {'forma': 'pix', 'valor': '10', 'data': '2024-01-02'},
+                {'forma': 'pix', 'valor': '10', 'data': '2023-12-31'},
+            ])
+        self.assertFalse(Lancamento.objects.exists())
+
+    def test_grade_marca_as_celulas_do_dia_arquivado(self):
+        with self.assertRaises(ValidationError) as erro:
+            gravar_grade(self.loja, {(date(2023, 12, 31), 'pix'): '10', (date(2024, 1, 1), 'pix'): '5'})
+        self.assertIn('pix_2023-12-31', erro.exception.message_dict)
+        self.assertNotIn('pix_2024-01-01', erro.exception.message_dict)
+        self.assertFalse(Lancamento.objects.exists())
+
+
+class RegistrarVendasConcorrenciaTests(TransactionTestCase):
+    THREADS = 16
+    VENDAS_POR_THREAD = 25
+
+    def test_caixas_simultaneos_nao_perdem_vendas(self):
+        dia = date(2025, 3, 10)
+        loja = loja_padrao()
+        inicio = threading.Barrier(self.THREADS)
+        erros = []
+
+        def caixa():
+            try:
+                inicio.wait()
+                for _ in range(self.VENDAS_POR_THREAD):
+                    registrar_vendas(loja, [
+                        {'forma': 'pix', 'valor': '1.00', 'data': dia},
+                        {'forma': 'dinheiro', 'valor': '0.50', 'data': dia},
+                    ])
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=caixa) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(erros, [])
+        lancamento = Lancamento.objects.get(loja=loja, data=dia)
+        total = self.THREADS * self.VENDAS_POR_THREAD
+        self.assertEqual(lancamento.pix, Decimal(total))
+        self.assertEqual(lancamento.dinheiro, Decimal(total) / 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResumoMensalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loja = loja_padrao()
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 2, 10), pix=Decimal('10'))
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), dinheiro=Decimal('5'))
+        self.client.force_login(User.objects.create_superuser('admin', password='senha'))
+
+    def test_resumo_fica_em_cache_ate_a_proxima_gravacao(self):
+        self.assertEqual(len(resumo_mensal()), 2)
+        with self.assertNumQueries(0):
+            resumo_mensal()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lancamento.objects.create(loja=self.loja, data=date(2025, 4, 10), pix=Decimal('1'))
+
+        self.assertEqual(len(resumo_mensal()), 3)
+
+    def test_listagem_do_admin_usa_o_resumo(self):
+        url = reverse('admin:lancamentos_lancamento_changelist')
+
+        resposta = self.client.get(url, {'data__year': 2025})
+
+        resumo = resposta.context['summary']
+        self.assertEqual((resumo['total_pix'], resumo['total_dinheiro'], resumo['count']), (10, 5, 2))
+        self.assertEqual(
+            [escolha['title'] for escolha in resposta.context['hierarquia']['choices']],
+            ['Fevereiro de 2025', 'Março de 2025'],
+        )
+
+    def test_filtro_fora_do_resumo_agrega_na_consulta(self):
+        resposta = self.client.get(
+            reverse('admin:lancamentos_lancamento_changelist'), {'data__gte': '2025-03-01'}
+        )
+        self.assertEqual(resposta.context['summary']['count'], 1)
+        self.assertNotIn('hierarquia', resposta.context)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.utils.html import format_html
+
+from .models import Loja
+
+
+@admin.register(Loja)
+class LojaAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'ativo_status', 'created_at']
+    list_filter = ['ativo']
+    search_fields = ['nome']
+
+    def ativo_status(self, obj):
+        if obj.ativo:
+            return format_html('<span style="color: #28a745;">✅ Ativo</span>')
+        return format_html('<span style="color: #dc3545;">❌ Inativo</span>')
+    ativo_status.short_description = "Status"
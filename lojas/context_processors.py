@@ -0,0 +1,11 @@
+from .models import Loja
+
+
+def lojas(request):
+    """Lojas para o seletor da barra lateral"""
+    if not getattr(request, 'user', None) or not request.user.is_authenticated:
+        return {}
+    return {
+        'loja_atual': getattr(request, 'loja', None),
+        'lojas_disponiveis': Loja.objects.filter(ativo=True),
+    }
@@ -0,0 +1,22 @@
+from decimal import Decimal, InvalidOperation
+
+
+def formatar_numero(valor):
+    """Valor monetário no formato brasileiro, sem símbolo: 1.234,56 (None vira 0,00)"""
+    if valor is None:
+        valor = 0
+    try:
+        texto = format(valor, ',.2f')
+    except (TypeError, ValueError):
+        # Texto vindo de JSON ou formulário
+        try:
+            texto = format(Decimal(valor), ',.2f')
+        except (InvalidOperation, TypeError, ValueError):
+            return ''
+    # 1,234.56 -> 1.234,56: os centavos são sempre os dois últimos dígitos
+    return f"{texto[:-3].replace(',', '.')},{texto[-2:]}"
+
+
+def formatar_valor(valor):
+    """R$ 1.234,56 — usado nas colunas de valor do admin"""
+    return f"R$ {formatar_numero(valor)}"
@@ -0,0 +1,27 @@
+from django.utils.functional import SimpleLazyObject
+
+from .models import Loja, loja_padrao
+
+SESSION_KEY = 'loja_id'
+
+
+def get_loja(request):
+    """Loja escolhida na sessão (ou a loja padrão)"""
+    if not hasattr(request, '_loja_cache'):
+        loja = None
+        loja_id = request.session.get(SESSION_KEY) if hasattr(request, 'session') else None
+        if loja_id:
+            loja = Loja.objects.filter(pk=loja_id, ativo=True).first()
+        request._loja_cache = loja or loja_padrao()
+    return request._loja_cache
+
+
+class LojaMiddleware:
+    """Disponibiliza request.loja; a consulta só acontece quando a view usa a loja"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.loja = SimpleLazyObject(lambda: get_loja(request))
+        return self.get_response(request)
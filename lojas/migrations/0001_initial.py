@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Loja',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(help_text='Nome ou endereço que identifica a loja', max_length=100, verbose_name='Nome da Loja')),
+                ('ativo', models.BooleanField(default=True, help_text='Loja disponível para novos lançamentos e compras', verbose_name='Ativo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': '🏬 Loja',
+                'verbose_name_plural': '🏬 Lojas',
+                'ordering': ['nome'],
+            },
+        ),
+    ]
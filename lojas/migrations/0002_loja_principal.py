@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:55
+
+from django.db import migrations
+
+
+def criar_loja_principal(apps, schema_editor):
+    # Os dados existentes (loja única) passam a pertencer à loja principal
+    Loja = apps.get_model('lojas', 'Loja')
+    if not Loja.objects.exists():
+        Loja.objects.create(nome='Loja Principal')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lojas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_loja_principal, migrations.RunPython.noop),
+    ]
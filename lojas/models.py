@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class Loja(models.Model):
+    nome = models.CharField(
+        max_length=100,
+        verbose_name="Nome da Loja",
+        help_text="Nome ou endereço que identifica a loja"
+    )
+    ativo = models.BooleanField(
+        default=True,
+        verbose_name="Ativo",
+        help_text="Loja disponível para novos lançamentos e compras"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "🏬 Loja"
+        verbose_name_plural = "🏬 Lojas"
+        ordering = ['nome']
+
+    def __str__(self):
+        return self.nome
+
+
+def loja_padrao():
+    """Primeira loja ativa (cria a loja principal se ainda não houver nenhuma)"""
+    loja = Loja.objects.filter(ativo=True).order_by('pk').first()
+    if loja is None:
+        loja, _ = Loja.objects.get_or_create(nome='Loja Principal')
+    return loja
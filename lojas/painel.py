@@ -0,0 +1,18 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+# O painel ao vivo só recalcula quando a marca da loja muda; qualquer
+# gravação de lançamento ou compra troca a marca (ver avisar_painel).
+CHAVE_MARCA = 'painel:marca:{}'
+
+
+def marca_painel(loja_id):
+    """Marca da última alteração nos dados do painel da loja"""
+    return cache.get_or_set(CHAVE_MARCA.format(loja_id), uuid.uuid4().hex, None)
+
+
+def avisar_painel(loja_id):
+    """Troca a marca da loja depois do commit para os painéis abertos recalcularem"""
+    transaction.on_commit(lambda: cache.set(CHAVE_MARCA.format(loja_id), uuid.uuid4().hex, None))
@@ -0,0 +1,11 @@
+from django import template
+
+from ..formatos import formatar_numero
+
+register = template.Library()
+
+
+@register.filter(is_safe=True)
+def moeda(valor):
+    """{{ valor|moeda }} -> 1.234,56 (o "R$" fica no template)"""
+    return formatar_numero(valor)
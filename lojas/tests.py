@@ -0,0 +1,80 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from compras.models import Compra, Fornecedor
+
+from .formatos import formatar_numero, formatar_valor
+from .middleware import SESSION_KEY
+from .models import Loja, loja_padrao
+
+
+class LojaTests(TestCase):
+    def setUp(self):
+        self.principal = loja_padrao()
+        self.filial = Loja.objects.create(nome='Filial Centro')
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def _compra(self, loja):
+        fornecedor = Fornecedor.objects.create(loja=loja, nome='Atacadão')
+        return Compra.objects.create(
+            loja=loja, fornecedor=fornecedor, descricao='Mercadoria', valor_total=Decimal('30'),
+            data_compra=date(2025, 3, 10), forma_pagamento='pix'
+        )
+
+    def test_loja_padrao_e_a_primeira_ativa(self):
+        self.assertEqual(loja_padrao(), self.principal)
+        Loja.objects.filter(pk=self.principal.pk).update(ativo=False)
+        self.assertEqual(loja_padrao(), self.filial)
+
+    def test_trocar_loja_muda_o_que_a_sessao_enxerga(self):
+        compra = self._compra(self.filial)
+        url = reverse('compra_edit', args=[compra.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        resposta = self.client.post(reverse('trocar_loja'), {'loja': self.filial.pk, 'next': url})
+
+        self.assertRedirects(resposta, url)
+        self.assertEqual(self.client.session[SESSION_KEY], self.filial.pk)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_nao_troca_para_loja_inativa(self):
+        self.filial.ativo = False
+        self.filial.save()
+
+        resposta = self.client.post(reverse('trocar_loja'), {'loja': self.filial.pk})
+
+        self.assertEqual(resposta.status_code, 404)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_next_de_outro_site_volta_para_o_painel(self):
+        resposta = self.client.post(
+            reverse('trocar_loja'), {'loja': self.filial.pk, 'next': 'https://exemplo.com/'}
+        )
+        self.assertRedirects(resposta, reverse('dashboard'), fetch_redirect_response=False)
+
+
+class FormatosTests(SimpleTestCase):
+    def test_formatar_numero(self):
+        casos = [
+            (Decimal('1234.5'), '1.234,50'),
+            (Decimal('-1234567.891'), '-1.234.567,89'),
+            (0, '0,00'),
+            (None, '0,00'),
+            ('12.3', '12,30'),
+            ('abc', ''),
+        ]
+        for valor, esperado in casos:
+            with self.subTest(valor=valor):
+                self.assertEqual(formatar_numero(valor), esperado)
+
+    def test_formatar_valor(self):
+        self.assertEqual(formatar_valor(Decimal('99.9')), 'R$ 99,90')
+
+    def test_filtro_moeda(self):
+        template = Template('{% load moeda %}R$ {{ valor|moeda }}')
+        self.assertEqual(template.render(Context({'valor': Decimal('1500')})), 'R$ 1.500,00')
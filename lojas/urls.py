@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('lojas/trocar/', views.trocar_loja, name='trocar_loja'),
+]
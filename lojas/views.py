@@ -0,0 +1,21 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+
+from .middleware import SESSION_KEY
+from .models import Loja
+
+
+@login_required
+@require_POST
+def trocar_loja(request):
+    loja = get_object_or_404(Loja, pk=request.POST.get('loja'), ativo=True)
+    request.session[SESSION_KEY] = loja.pk
+    messages.success(request, f'Loja alterada para {loja.nome}.')
+
+    proximo = request.POST.get('next')
+    if proximo and url_has_allowed_host_and_scheme(proximo, allowed_hosts={request.get_host()}):
+        return redirect(proximo)
+    return redirect('dashboard')
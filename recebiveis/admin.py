@@ -0,0 +1,27 @@
+from django.contrib import admin
+
+from .models import RegraRecebimento, Recebivel
+
+
+@admin.register(RegraRecebimento)
+class RegraRecebimentoAdmin(admin.ModelAdmin):
+    list_display = ['bandeira', 'forma', 'parcelas', 'prazo_dias', 'participacao', 'taxa_mdr', 'ativo', 'loja']
+    list_filter = ['forma', 'ativo', 'loja']
+    list_editable = ['ativo']
+    search_fields = ['bandeira']
+
+
+@admin.register(Recebivel)
+class RecebivelAdmin(admin.ModelAdmin):
+    list_display = ['data_prevista', 'regra', 'parcela', 'data_venda', 'valor_bruto', 'taxa', 'valor_liquido', 'loja']
+    list_filter = ['regra__forma', 'regra__bandeira', 'loja']
+    list_select_related = ['regra', 'loja']
+    date_hierarchy = 'data_prevista'
+    readonly_fields = [f.name for f in Recebivel._meta.fields]
+
+    # Gerados a partir dos lançamentos e regras; editar aqui seria sobrescrito
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
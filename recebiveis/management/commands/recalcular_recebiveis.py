@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from lojas.models import Loja
+from recebiveis.services import recalcular_recebiveis
+
+
+class Command(BaseCommand):
+    help = "Refaz a agenda de recebíveis do cartão a partir dos lançamentos e das regras ativas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loja', type=int, help="Id da loja (padrão: todas)")
+
+    def handle(self, *args, **options):
+        loja = Loja.objects.get(pk=options['loja']) if options['loja'] else None
+        total = recalcular_recebiveis(loja)
+        self.stdout.write(self.style.SUCCESS(f"{total} recebível(is) gerado(s)"))
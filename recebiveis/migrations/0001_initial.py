@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('lancamentos', '0004_updated_at'),
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegraRecebimento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bandeira', models.CharField(help_text='Ex.: Visa, Mastercard, Elo', max_length=50, verbose_name='Bandeira')),
+                ('forma', models.CharField(choices=[('cartao_debito', '💳 Débito'), ('cartao_credito', '🔄 Crédito')], default='cartao_credito', max_length=20, verbose_name='Forma')),
+                ('participacao', models.DecimalField(decimal_places=2, default=100, help_text='Parte das vendas da forma feita nesta bandeira/parcelamento', max_digits=5, verbose_name='Participação (%)')),
+                ('prazo_dias', models.PositiveSmallIntegerField(default=30, help_text='Dias entre a venda e o repasse da primeira parcela', verbose_name='Prazo (D+N)')),
+                ('parcelas', models.PositiveSmallIntegerField(default=1, help_text='Repasses a cada 30 dias a partir do prazo', verbose_name='Parcelas')),
+                ('taxa_mdr', models.DecimalField(decimal_places=2, default=0, help_text='Desconto da adquirente sobre o valor bruto', max_digits=5, verbose_name='Taxa MDR (%)')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='regras_recebimento', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '📐 Regra de Recebimento',
+                'verbose_name_plural': '📐 Regras de Recebimento',
+                'ordering': ['loja', 'forma', 'bandeira', 'parcelas'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Recebivel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_venda', models.DateField(verbose_name='📅 Data da Venda')),
+                ('data_prevista', models.DateField(verbose_name='📅 Previsão de Repasse')),
+                ('parcela', models.PositiveSmallIntegerField(verbose_name='Nº Parcela')),
+                ('valor_bruto', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor Bruto')),
+                ('taxa', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Taxa')),
+                ('valor_liquido', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor Líquido')),
+                ('lancamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recebiveis', to='lancamentos.lancamento', verbose_name='💰 Lançamento')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recebiveis', to='lojas.loja', verbose_name='🏬 Loja')),
+                ('regra', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recebiveis', to='recebiveis.regrarecebimento', verbose_name='📐 Regra')),
+            ],
+            options={
+                'verbose_name': '📥 Recebível',
+                'verbose_name_plural': '📥 Recebíveis',
+                'ordering': ['data_prevista', 'pk'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='regrarecebimento',
+            constraint=models.UniqueConstraint(fields=('loja', 'forma', 'bandeira', 'parcelas'), name='regra_recebimento_unica'),
+        ),
+        migrations.AddIndex(
+            model_name='recebivel',
+            index=models.Index(fields=['loja', 'data_prevista'], name='recebivel_loja_data_idx'),
+        ),
+    ]
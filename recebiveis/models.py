@@ -0,0 +1,143 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Sum
+
+from lancamentos.models import Lancamento
+from lojas.models import Loja
+
+
+class RegraRecebimento(models.Model):
+    """Como a adquirente repassa a parte das vendas no cartão de uma bandeira/plano.
+
+    O lançamento guarda só o total do dia por forma; a participação diz quanto
+    desse total costuma ser desta bandeira e deste número de parcelas.
+    """
+    FORMA_CHOICES = [
+        ('cartao_debito', '💳 Débito'),
+        ('cartao_credito', '🔄 Crédito'),
+    ]
+
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.CASCADE,
+        related_name='regras_recebimento',
+        verbose_name="🏬 Loja"
+    )
+    bandeira = models.CharField(
+        max_length=50,
+        verbose_name="Bandeira",
+        help_text="Ex.: Visa, Mastercard, Elo"
+    )
+    forma = models.CharField(
+        max_length=20,
+        choices=FORMA_CHOICES,
+        default='cartao_credito',
+        verbose_name="Forma"
+    )
+    participacao = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=100,
+        verbose_name="Participação (%)",
+        help_text="Parte das vendas da forma feita nesta bandeira/parcelamento"
+    )
+    prazo_dias = models.PositiveSmallIntegerField(
+        default=30,
+        verbose_name="Prazo (D+N)",
+        help_text="Dias entre a venda e o repasse da primeira parcela"
+    )
+    parcelas = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name="Parcelas",
+        help_text="Repasses a cada 30 dias a partir do prazo"
+    )
+    taxa_mdr = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0,
+        verbose_name="Taxa MDR (%)",
+        help_text="Desconto da adquirente sobre o valor bruto"
+    )
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "📐 Regra de Recebimento"
+        verbose_name_plural = "📐 Regras de Recebimento"
+        ordering = ['loja', 'forma', 'bandeira', 'parcelas']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['loja', 'forma', 'bandeira', 'parcelas'],
+                name='regra_recebimento_unica'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bandeira} {self.get_forma_display()} {self.parcelas}x (D+{self.prazo_dias})"
+
+    def clean(self):
+        if not self.parcelas:
+            raise ValidationError({'parcelas': 'Informe ao menos uma parcela.'})
+        if not 0 < self.participacao <= 100:
+            raise ValidationError({'participacao': 'A participação deve ficar entre 0 e 100%.'})
+        if not 0 <= self.taxa_mdr < 100:
+            raise ValidationError({'taxa_mdr': 'A taxa deve ficar entre 0 e 100%.'})
+
+        # As regras ativas da forma não podem repartir mais que o total vendido
+        if self.ativo and self.loja_id:
+            outras = RegraRecebimento.objects.filter(
+                loja_id=self.loja_id, forma=self.forma, ativo=True
+            ).exclude(pk=self.pk).aggregate(total=Sum('participacao'))['total'] or 0
+            if outras + Decimal(self.participacao) > 100:
+                raise ValidationError({
+                    'participacao': f'As regras ativas desta forma já somam {outras}%.'
+                })
+
+    def save(self, *args, **kwargs):
+        from .services import recalcular_regra
+        self.full_clean()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            recalcular_regra(self)
+
+
+class Recebivel(models.Model):
+    """Repasse previsto de uma parcela das vendas no cartão de um dia"""
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.CASCADE,
+        related_name='recebiveis',
+        verbose_name="🏬 Loja"
+    )
+    lancamento = models.ForeignKey(
+        Lancamento,
+        on_delete=models.CASCADE,
+        related_name='recebiveis',
+        verbose_name="💰 Lançamento"
+    )
+    regra = models.ForeignKey(
+        RegraRecebimento,
+        on_delete=models.CASCADE,
+        related_name='recebiveis',
+        verbose_name="📐 Regra"
+    )
+    data_venda = models.DateField(verbose_name="📅 Data da Venda")
+    data_prevista = models.DateField(verbose_name="📅 Previsão de Repasse")
+    parcela = models.PositiveSmallIntegerField(verbose_name="Nº Parcela")
+    valor_bruto = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor Bruto")
+    taxa = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Taxa")
+    valor_liquido = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor Líquido")
+
+    class Meta:
+        verbose_name = "📥 Recebível"
+        verbose_name_plural = "📥 Recebíveis"
+        ordering = ['data_prevista', 'pk']
+        indexes = [
+            # "Quanto entra nesta semana" é um intervalo neste índice
+            models.Index(fields=['loja', 'data_prevista'], name='recebivel_loja_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.regra.bandeira} {self.parcela}/{self.regra.parcelas} - {self.data_prevista:%d/%m/%Y} - R$ {self.valor_liquido}"
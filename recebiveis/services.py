@@ -0,0 +1,130 @@
+from datetime import timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from lancamentos.models import Lancamento
+
+from .models import RegraRecebimento, Recebivel
+
+CENTAVO = Decimal('0.01')
+# Parcelas do cartão caem a cada 30 dias depois do primeiro repasse
+INTERVALO_PARCELAS = 30
+TAMANHO_LOTE = 1000
+
+COLUNAS_LANCAMENTO = ('pk', 'loja_id', 'data', 'cartao_debito', 'cartao_credito')
+
+
+def _plano(regra):
+    """Prazos e proporções da regra, calculados uma vez para todos os dias"""
+    prazos = [timedelta(days=regra.prazo_dias + INTERVALO_PARCELAS * i) for i in range(regra.parcelas)]
+    return regra, regra.participacao / 100, regra.taxa_mdr / 100, prazos
+
+
+def expandir(linhas, regras):
+    """Recebíveis (ainda não gravados) das linhas de lançamento em cada regra.
+
+    `linhas` são tuplas no formato de COLUNAS_LANCAMENTO; só regras da loja
+    da linha são aplicadas. Centavos da divisão vão para a última parcela,
+    como nas parcelas de compra.
+    """
+    planos = {}
+    for regra in regras:
+        planos.setdefault(regra.loja_id, []).append(_plano(regra))
+
+    for pk, loja_id, data, cartao_debito, cartao_credito in linhas:
+        valores = {'cartao_debito': cartao_debito, 'cartao_credito': cartao_credito}
+        for regra, participacao, taxa_mdr, prazos in planos.get(loja_id, ()):
+            bruto = (valores[regra.forma] * participacao).quantize(CENTAVO)
+            if bruto <= 0:
+                continue
+            parcelas = len(prazos)
+            valor_parcela = (bruto / parcelas).quantize(CENTAVO, rounding=ROUND_DOWN)
+            for numero, prazo in enumerate(prazos, 1):
+                valor = valor_parcela if numero < parcelas else bruto - valor_parcela * (parcelas - 1)
+                taxa = (valor * taxa_mdr).quantize(CENTAVO)
+                yield Recebivel(
+                    loja_id=loja_id,
+                    lancamento_id=pk,
+                    regra=regra,
+                    data_venda=data,
+                    data_prevista=data + prazo,
+                    parcela=numero,
+                    valor_bruto=valor,
+                    taxa=taxa,
+                    valor_liquido=valor - taxa,
+                )
+
+
+def _gravar(recebiveis):
+    total = 0
+    lote = []
+    for recebivel in recebiveis:
+        lote.append(recebivel)
+        if len(lote) == TAMANHO_LOTE:
+            Recebivel.objects.bulk_create(lote)
+            total += len(lote)
+            lote = []
+    Recebivel.objects.bulk_create(lote)
+    return total + len(lote)
+
+
+def _com_cartao(lancamentos):
+    return lancamentos.filter(Q(cartao_debito__gt=0) | Q(cartao_credito__gt=0)) \
+        .order_by().values_list(*COLUNAS_LANCAMENTO)
+
+
+def recalcular_regra(regra):
+    """Refaz os recebíveis de uma regra sobre todos os lançamentos da loja"""
+    with transaction.atomic():
+        Recebivel.objects.filter(regra=regra).delete()
+        if not regra.ativo:
+            return 0
+        linhas = _com_cartao(Lancamento.objects.filter(loja_id=regra.loja_id)).iterator(chunk_size=TAMANHO_LOTE)
+        return _gravar(expandir(linhas, [regra]))
+
+
+def atualizar_lancamentos(lancamento_ids):
+    """Refaz só os recebíveis dos lançamentos alterados (chamado a cada gravação)"""
+    lancamento_ids = list(lancamento_ids)
+    if not lancamento_ids:
+        return 0
+    with transaction.atomic():
+        Recebivel.objects.filter(lancamento_id__in=lancamento_ids).delete()
+        linhas = list(_com_cartao(Lancamento.objects.filter(pk__in=lancamento_ids)))
+        if not linhas:
+            return 0
+        regras = RegraRecebimento.objects.filter(ativo=True, loja_id__in={linha[1] for linha in linhas})
+        return _gravar(expandir(linhas, regras))
+
+
+def recalcular_recebiveis(loja=None):
+    """Refaz todos os recebíveis (da loja ou de todas) a partir das regras ativas"""
+    regras = RegraRecebimento.objects.filter(ativo=True)
+    recebiveis = Recebivel.objects.all()
+    lancamentos = Lancamento.objects.all()
+    if loja is not None:
+        regras, recebiveis, lancamentos = (
+            regras.filter(loja=loja), recebiveis.filter(loja=loja), lancamentos.filter(loja=loja)
+        )
+    with transaction.atomic():
+        recebiveis.delete()
+        return _gravar(expandir(_com_cartao(lancamentos).iterator(chunk_size=TAMANHO_LOTE), list(regras)))
+
+
+def recebiveis_periodo(loja, inicio, fim):
+    """Repasses previstos por dia no intervalo, com os totais do período"""
+    dias = list(
+        Recebivel.objects.filter(loja=loja, data_prevista__range=(inicio, fim))
+        .values('data_prevista')
+        .annotate(bruto=Sum('valor_bruto'), taxa=Sum('taxa'), liquido=Sum('valor_liquido'))
+        .order_by('data_prevista')
+    )
+    totais = {'bruto': Decimal('0'), 'taxa': Decimal('0'), 'liquido': Decimal('0')}
+    for dia in dias:
+        for campo in totais:
+            # O SQLite devolve a soma de decimais com casas a mais
+            dia[campo] = dia[campo].quantize(CENTAVO)
+            totais[campo] += dia[campo]
+    return {'dias': dias, **totais}
@@ -0,0 +1,74 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from lancamentos.models import Lancamento
+from lancamentos.services import registrar_vendas
+from lojas.models import loja_padrao
+
+from .models import Recebivel, RegraRecebimento
+
+
+class RecebiveisTests(TestCase):
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def _regra(self, **campos):
+        return RegraRecebimento.objects.create(loja=self.loja, bandeira='Visa', **campos)
+
+    def test_regra_nova_gera_parcelas_com_taxa(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), cartao_credito=Decimal('100'))
+
+        self._regra(prazo_dias=30, parcelas=3, taxa_mdr=Decimal('2'))
+
+        recebiveis = list(Recebivel.objects.order_by('parcela'))
+        self.assertEqual(
+            [(r.data_prevista, r.valor_bruto, r.taxa, r.valor_liquido) for r in recebiveis],
+            [
+                (date(2025, 4, 9), Decimal('33.33'), Decimal('0.67'), Decimal('32.66')),
+                (date(2025, 5, 9), Decimal('33.33'), Decimal('0.67'), Decimal('32.66')),
+                (date(2025, 6, 8), Decimal('33.34'), Decimal('0.67'), Decimal('32.67')),
+            ],
+        )
+
+    def test_venda_registrada_refaz_os_recebiveis_do_dia(self):
+        self._regra(forma='cartao_debito', prazo_dias=1)
+        registrar_vendas(self.loja, [{'forma': 'debito', 'valor': '50', 'data': '2025-03-10'}])
+        registrar_vendas(self.loja, [{'forma': 'debito', 'valor': '25', 'data': '2025-03-10'}])
+
+        recebivel = Recebivel.objects.get()
+        self.assertEqual((recebivel.data_prevista, recebivel.valor_bruto), (date(2025, 3, 11), Decimal('75.00')))
+
+    def test_regras_da_forma_nao_passam_de_100(self):
+        self._regra(participacao=Decimal('70'))
+        with self.assertRaises(ValidationError):
+            RegraRecebimento.objects.create(
+                loja=self.loja, bandeira='Master', participacao=Decimal('40')
+            )
+
+    def test_regra_desativada_apaga_os_recebiveis(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), cartao_credito=Decimal('100'))
+        regra = self._regra()
+
+        regra.ativo = False
+        regra.save()
+
+        self.assertFalse(Recebivel.objects.exists())
+
+    def test_api_soma_por_dia(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), cartao_debito=Decimal('40'))
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 11), cartao_debito=Decimal('60'))
+        self._regra(forma='cartao_debito', prazo_dias=1, taxa_mdr=Decimal('1'))
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+        resposta = self.client.get(reverse('api_recebiveis'), {'inicio': '2025-03-11', 'fim': '2025-03-12'})
+
+        dados = resposta.json()
+        self.assertEqual((dados['bruto'], dados['taxa'], dados['liquido']), ('100.00', '1.00', '99.00'))
+        self.assertEqual([dia['data'] for dia in dados['dias']], ['2025-03-11', '2025-03-12'])
+        resposta = self.client.get(reverse('api_recebiveis'), {'inicio': '2025-03-12', 'fim': '2025-03-11'})
+        self.assertEqual(resposta.status_code, 400)
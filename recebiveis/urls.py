@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('api/recebiveis/', views.api_recebiveis, name='api_recebiveis'),
+]
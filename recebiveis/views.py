@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .services import recebiveis_periodo
+
+
+@login_required
+def api_recebiveis(request):
+    """Repasses previstos do cartão por dia (?inicio=2025-03-01&fim=2025-03-07; padrão: esta semana)"""
+    hoje = timezone.localdate()
+    try:
+        inicio = datetime.strptime(request.GET['inicio'], '%Y-%m-%d').date() \
+            if request.GET.get('inicio') else hoje - timedelta(days=hoje.weekday())
+        fim = datetime.strptime(request.GET['fim'], '%Y-%m-%d').date() \
+            if request.GET.get('fim') else inicio + timedelta(days=6)
+    except ValueError:
+        return JsonResponse({'erro': 'Datas inválidas.'}, status=400)
+    if fim < inicio:
+        return JsonResponse({'erro': 'O fim vem antes do início.'}, status=400)
+
+    periodo = recebiveis_periodo(request.loja, inicio, fim)
+    return JsonResponse({
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'bruto': str(periodo['bruto']),
+        'taxa': str(periodo['taxa']),
+        'liquido': str(periodo['liquido']),
+        'dias': [
+            {
+                'data': dia['data_prevista'].isoformat(),
+                'bruto': str(dia['bruto']),
+                'taxa': str(dia['taxa']),
+                'liquido': str(dia['liquido']),
+            }
+            for dia in periodo['dias']
+        ],
+    })
@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import DreGerado
+
+
+@admin.register(DreGerado)
+class DreGeradoAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'loja', 'gerado_em', 'versao']
+    list_filter = ['loja', 'ano']
+    list_select_related = ['loja']
+    exclude = ['html', 'pdf']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('html', 'pdf')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
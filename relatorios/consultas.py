@@ -0,0 +1,151 @@
+"""Comparativos de vendas e compras por período, calculados no banco.
+
+Cada série é um único GROUP BY (ano, posição no ano) com uma janela LAG
+particionada pela posição: o valor do mesmo mês/semana/dia da semana no
+ano anterior vem na mesma consulta, sem laços em Python.
+"""
+from datetime import date
+
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import (
+    ExtractIsoWeekDay, ExtractIsoYear, ExtractMonth, ExtractWeek, ExtractYear, Lag,
+)
+
+from arquivo.consultas import compras_arquivadas, lancamentos_arquivados
+from compras.models import Compra
+from lancamentos.models import Lancamento
+
+
+class _StrftimeSqlite:
+    """No SQLite usa o strftime nativo: o Extract padrão chama uma função
+    Python por linha, o que domina o tempo da consulta em anos de dados."""
+    formato = None
+    expressao = "CAST(strftime(%s, {}) AS INTEGER)"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return self.expressao.format(sql), [self.formato, *params]
+
+
+class Ano(_StrftimeSqlite, ExtractYear):
+    formato = '%Y'
+
+
+class Mes(_StrftimeSqlite, ExtractMonth):
+    formato = '%m'
+
+
+class AnoSemana(_StrftimeSqlite, ExtractIsoYear):
+    # SQLite < 3.46 não tem %G/%V: usa semanas começando na segunda (%W) do ano civil
+    formato = '%Y'
+
+
+class Semana(_StrftimeSqlite, ExtractWeek):
+    formato = '%W'
+
+
+class DiaSemana(_StrftimeSqlite, ExtractIsoWeekDay):
+    # %w conta domingo como 0; ISO vai de 1 (segunda) a 7 (domingo)
+    formato = '%w'
+    expressao = "((CAST(strftime(%s, {}) AS INTEGER) + 6) %% 7 + 1)"
+
+
+# granularidade -> (extrai o ano, extrai a posição no ano, rótulos da posição)
+GRANULARIDADES = {
+    'mes': (Ano, Mes,
+            ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']),
+    'semana': (AnoSemana, Semana, None),
+    'dia_semana': (Ano, DiaSemana, ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']),
+}
+
+TOTAL_VENDAS = F('pix') + F('dinheiro') + F('cartao_debito') + F('cartao_credito')
+
+
+def _serie(queryset, campo_data, valor, granularidade):
+    extrai_ano, extrai_chave, _ = GRANULARIDADES[granularidade]
+    janela = {'partition_by': F('chave'), 'order_by': F('ano').asc()}
+    return (
+        queryset
+        .annotate(ano=extrai_ano(campo_data), chave=extrai_chave(campo_data))
+        .values('ano', 'chave')
+        .annotate(total=Sum(valor), dias=Count(campo_data, distinct=True))
+        .annotate(
+            anterior=Window(Lag('total'), **janela),
+            ano_anterior=Window(Lag('ano'), **janela),
+        )
+        .order_by()
+    )
+
+
+def _rotulo(granularidade, chave):
+    rotulos = GRANULARIDADES[granularidade][2]
+    return rotulos[chave - 1] if rotulos else f"Sem {chave:02d}"
+
+
+def _variacao(atual, anterior):
+    if not anterior:
+        return None
+    return round(float((atual - anterior) / anterior * 100), 1)
+
+
+def comparativo(loja, granularidade, ano_inicio, ano_fim):
+    """Vendas e compras por período de ano_inicio a ano_fim, cada uma com o ano anterior.
+
+    Os anos arquivados entram pela mesma consulta rodando no banco de
+    arquivo; só nesse caso o ano anterior é refeito depois de somar as fontes.
+    """
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f"Granularidade inválida: {granularidade}")
+    if ano_inicio > ano_fim:
+        raise ValueError("O ano inicial não pode ser maior que o final.")
+
+    # Um ano a mais no começo para a janela ter com o que comparar
+    inicio, fim = date(ano_inicio - 1, 1, 1), date(ano_fim, 12, 31)
+    fontes = {
+        'vendas': (
+            'data', TOTAL_VENDAS,
+            [Lancamento.objects.filter(loja=loja, data__range=(inicio, fim)),
+             lancamentos_arquivados(loja, inicio, fim)],
+        ),
+        'compras': (
+            'data_compra', F('valor_total'),
+            [Compra.objects.filter(loja=loja, data_compra__range=(inicio, fim)),
+             compras_arquivadas(loja, inicio, fim)],
+        ),
+    }
+
+    linhas = {}
+    mesclar = False
+    for serie, (campo_data, valor, querysets) in fontes.items():
+        querysets = [qs for qs in querysets if qs is not None]
+        mesclar = mesclar or len(querysets) > 1
+        for queryset in querysets:
+            for r in _serie(queryset, campo_data, valor, granularidade):
+                linha = linhas.setdefault((r['ano'], r['chave']), {
+                    'ano': r['ano'], 'chave': r['chave'],
+                    'rotulo': _rotulo(granularidade, r['chave']),
+                    'vendas': 0, 'vendas_anterior': None, 'dias_vendas': 0,
+                    'compras': 0, 'compras_anterior': None, 'dias_compras': 0,
+                })
+                linha[serie] += r['total'] or 0
+                linha[f'dias_{serie}'] += r['dias']
+                # LAG pega a linha anterior da partição; só vale se for o ano imediatamente anterior
+                if r['ano_anterior'] == r['ano'] - 1:
+                    linha[f'{serie}_anterior'] = r['anterior']
+
+    if mesclar:
+        for (ano, chave), linha in linhas.items():
+            anterior = linhas.get((ano - 1, chave))
+            for serie in fontes:
+                linha[f'{serie}_anterior'] = anterior[serie] if anterior else None
+
+    resultado = []
+    for (ano, chave) in sorted(linhas, key=lambda k: (-k[0], k[1])):
+        if ano < ano_inicio:
+            continue
+        linha = linhas[(ano, chave)]
+        for serie in fontes:
+            linha[f'{serie}_variacao'] = _variacao(linha[serie], linha[f'{serie}_anterior'])
+        linha['media_vendas'] = linha['vendas'] / linha['dias_vendas'] if linha['dias_vendas'] else 0
+        resultado.append(linha)
+    return resultado
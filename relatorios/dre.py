@@ -0,0 +1,195 @@
+"""DRE mensal: receitas por forma, compras por fornecedor e cartão,
+parcelas do mês e resultado, em poucas consultas agregadas."""
+import calendar
+import hashlib
+from datetime import date
+
+from django.db.models import Count, F, Max, Q, Sum
+from django.template.loader import render_to_string
+
+from arquivo.consultas import compras_arquivadas, lancamentos_arquivados, parcelas_arquivadas
+from compras.models import CartaoCredito, Compra, Fornecedor, ParcelaCompra
+from lancamentos.models import Lancamento
+from lojas.formatos import formatar_valor
+
+from .models import DreGerado
+from .pdf import LARGURA, MARGEM, DocumentoPDF
+
+# Mude ao alterar o layout para invalidar os DREs já gerados
+VERSAO_LAYOUT = '1'
+
+MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+         'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+FORMAS_COMPRA = dict(Compra.FORMA_PAGAMENTO_CHOICES)
+
+
+def periodo(ano, mes):
+    return date(ano, mes, 1), date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+
+def _fontes(loja, inicio, fim):
+    """(lançamentos, compras, parcelas) do banco principal e, se houver, do arquivo"""
+    return (
+        [Lancamento.objects.filter(loja=loja, data__range=(inicio, fim)),
+         lancamentos_arquivados(loja, inicio, fim)],
+        [Compra.objects.filter(loja=loja, data_compra__range=(inicio, fim)),
+         compras_arquivadas(loja, inicio, fim)],
+        [ParcelaCompra.objects.filter(compra__loja=loja, data_vencimento__range=(inicio, fim)),
+         parcelas_arquivadas(loja, inicio, fim)],
+    )
+
+
+def versao_dados(loja, ano, mes):
+    """Impressão digital dos dados do mês: contagem e última alteração de cada fonte"""
+    inicio, fim = periodo(ano, mes)
+    lancamentos, compras, parcelas = _fontes(loja, inicio, fim)
+    partes = [VERSAO_LAYOUT]
+    for queryset in lancamentos + compras:
+        if queryset is not None:
+            partes.append(queryset.aggregate(n=Count('pk'), u=Max('updated_at')))
+    # Parcelas arquivadas não mudam; nomes de fornecedor/cartão aparecem no relatório
+    partes.append(parcelas[0].aggregate(n=Count('pk'), u=Max('updated_at')))
+    partes.append(Fornecedor.objects.filter(loja=loja).aggregate(u=Max('updated_at')))
+    partes.append(CartaoCredito.objects.filter(loja=loja).aggregate(u=Max('updated_at')))
+    return hashlib.sha1(repr(partes).encode()).hexdigest()
+
+
+def _somar(destino, chave, valores):
+    linha = destino.setdefault(chave, {campo: 0 for campo in valores})
+    for campo, valor in valores.items():
+        linha[campo] += valor or 0
+
+
+def calcular_dre(loja, ano, mes):
+    inicio, fim = periodo(ano, mes)
+    lancamentos, compras, parcelas = _fontes(loja, inicio, fim)
+
+    receitas = {}
+    for queryset in filter(None, lancamentos):
+        _somar(receitas, 'total', queryset.aggregate(
+            pix=Sum('pix'), dinheiro=Sum('dinheiro'),
+            debito=Sum('cartao_debito'), credito=Sum('cartao_credito'), dias=Count('pk'),
+        ))
+    receitas = receitas.get('total') or {'pix': 0, 'dinheiro': 0, 'debito': 0, 'credito': 0, 'dias': 0}
+    receitas['total'] = receitas['pix'] + receitas['dinheiro'] + receitas['debito'] + receitas['credito']
+
+    # O arquivo guarda o nome da época; no banco principal vem pelo JOIN
+    nome_fornecedor = [F('fornecedor__nome'), F('fornecedor_nome')]
+    nome_cartao = [F('cartao_credito__nome'), F('cartao_nome')]
+    por_fornecedor, por_forma = {}, {}
+    compras_vista = 0
+    for indice, queryset in enumerate(compras):
+        if queryset is None:
+            continue
+        for r in queryset.values(nome=nome_fornecedor[indice]).annotate(
+                total=Sum('valor_total'), quantidade=Count('pk')).order_by():
+            _somar(por_fornecedor, r['nome'], {'total': r['total'], 'quantidade': r['quantidade']})
+        for r in queryset.values('forma_pagamento', cartao=nome_cartao[indice]).annotate(
+                total=Sum('valor_total'), quantidade=Count('pk')).order_by():
+            rotulo = FORMAS_COMPRA.get(r['forma_pagamento'], r['forma_pagamento'])
+            if r['cartao']:
+                rotulo = f"{rotulo} - {r['cartao']}"
+            _somar(por_forma, rotulo, {'total': r['total'], 'quantidade': r['quantidade']})
+            if r['forma_pagamento'] != 'credito':
+                compras_vista += r['total'] or 0
+
+    nome_cartao_parcela = [F('compra__cartao_credito__nome'), F('compra__cartao_nome')]
+    por_cartao = {}
+    for indice, queryset in enumerate(parcelas):
+        if queryset is None:
+            continue
+        for r in queryset.values(cartao=nome_cartao_parcela[indice]).annotate(
+                total=Sum('valor_parcela'), pagas=Sum('valor_parcela', filter=Q(paga=True)),
+                quantidade=Count('pk')).order_by():
+            _somar(por_cartao, r['cartao'] or '-', {
+                'total': r['total'], 'pagas': r['pagas'], 'quantidade': r['quantidade'],
+            })
+
+    total_compras = sum(linha['total'] for linha in por_fornecedor.values())
+    total_parcelas = sum(linha['total'] for linha in por_cartao.values())
+
+    def ordenar(dados):
+        return sorted(({'nome': nome, **valores} for nome, valores in dados.items()),
+                      key=lambda linha: -linha['total'])
+
+    return {
+        'ano': ano,
+        'mes': mes,
+        'mes_nome': MESES[mes - 1],
+        'receitas': receitas,
+        'compras_por_fornecedor': ordenar(por_fornecedor),
+        'compras_por_forma': ordenar(por_forma),
+        'parcelas_por_cartao': ordenar(por_cartao),
+        'total_compras': total_compras,
+        'total_parcelas': total_parcelas,
+        # Competência: tudo o que foi vendido e comprado no mês
+        'resultado': receitas['total'] - total_compras,
+        # Caixa: compras à vista e parcelas que vencem no mês
+        'resultado_caixa': receitas['total'] - compras_vista - total_parcelas,
+    }
+
+
+def gerar_pdf(loja, dre):
+    titulo = f"DRE {dre['mes_nome']}/{dre['ano']} - {loja.nome}"
+    doc = DocumentoPDF(titulo)
+    direita = LARGURA - MARGEM
+
+    def secao(nome):
+        doc.linha([(nome, MARGEM, 'e')], corpo=12, negrito=True, espaco=10)
+        doc.separador()
+
+    def valor(rotulo, quantia, negrito=False, recuo=0):
+        doc.linha([(rotulo, MARGEM + recuo, 'e'), (formatar_valor(quantia), direita, 'd')], negrito=negrito)
+
+    doc.linha([(titulo, MARGEM, 'e')], corpo=16, negrito=True)
+
+    secao("Receitas")
+    receitas = dre['receitas']
+    for rotulo, campo in [("PIX", 'pix'), ("Dinheiro", 'dinheiro'),
+                          ("Cartão Débito", 'debito'), ("Cartão Crédito", 'credito')]:
+        valor(rotulo, receitas[campo], recuo=10)
+    valor("Receita bruta", receitas['total'], negrito=True)
+
+    secao("Compras por fornecedor")
+    for linha in dre['compras_por_fornecedor']:
+        valor(f"{linha['nome']} ({linha['quantidade']})", linha['total'], recuo=10)
+    valor("Total de compras", dre['total_compras'], negrito=True)
+
+    secao("Compras por forma de pagamento")
+    for linha in dre['compras_por_forma']:
+        valor(f"{linha['nome']} ({linha['quantidade']})", linha['total'], recuo=10)
+
+    secao("Parcelas com vencimento no mês")
+    for linha in dre['parcelas_por_cartao']:
+        valor(f"{linha['nome']} ({linha['quantidade']}, pagas {formatar_valor(linha['pagas'])})",
+              linha['total'], recuo=10)
+    valor("Total de parcelas", dre['total_parcelas'], negrito=True)
+
+    secao("Resultado")
+    valor("Resultado (competência)", dre['resultado'], negrito=True)
+    valor("Resultado de caixa", dre['resultado_caixa'], negrito=True)
+    return doc.gerar()
+
+
+def dre_em_cache(loja, ano, mes):
+    """DRE já gerado para a versão atual dos dados, ou None"""
+    return DreGerado.objects.filter(
+        loja=loja, ano=ano, mes=mes, versao=versao_dados(loja, ano, mes)
+    ).first()
+
+
+def gerar_dre(loja, ano, mes):
+    """Calcula e renderiza o DRE (HTML e PDF) e guarda para os próximos downloads"""
+    versao = versao_dados(loja, ano, mes)
+    existente = DreGerado.objects.filter(loja=loja, ano=ano, mes=mes, versao=versao).first()
+    if existente:
+        return existente
+
+    dre = calcular_dre(loja, ano, mes)
+    html = render_to_string('relatorios/dre_conteudo.html', {'dre': dre, 'loja': loja})
+    gerado, _ = DreGerado.objects.update_or_create(
+        loja=loja, ano=ano, mes=mes,
+        defaults={'versao': versao, 'html': html, 'pdf': gerar_pdf(loja, dre)},
+    )
+    return gerado
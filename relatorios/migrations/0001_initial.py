@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('lojas', '0002_loja_principal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DreGerado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField(verbose_name='Ano')),
+                ('mes', models.IntegerField(verbose_name='Mês')),
+                ('versao', models.CharField(max_length=40, verbose_name='Versão dos dados')),
+                ('html', models.TextField()),
+                ('pdf', models.BinaryField()),
+                ('gerado_em', models.DateTimeField(auto_now=True, verbose_name='Gerado em')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dres', to='lojas.loja', verbose_name='🏬 Loja')),
+            ],
+            options={
+                'verbose_name': '📑 DRE Gerado',
+                'verbose_name_plural': '📑 DREs Gerados',
+                'ordering': ['-ano', '-mes'],
+                'constraints': [models.UniqueConstraint(fields=('loja', 'ano', 'mes'), name='dre_loja_mes_unico')],
+            },
+        ),
+    ]
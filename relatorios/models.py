@@ -0,0 +1,30 @@
+from django.db import models
+
+from lojas.models import Loja
+
+
+class DreGerado(models.Model):
+    """DRE mensal já renderizado; vale enquanto a versão dos dados do mês não mudar"""
+    loja = models.ForeignKey(
+        Loja,
+        on_delete=models.CASCADE,
+        related_name='dres',
+        verbose_name="🏬 Loja"
+    )
+    ano = models.IntegerField(verbose_name="Ano")
+    mes = models.IntegerField(verbose_name="Mês")
+    versao = models.CharField(max_length=40, verbose_name="Versão dos dados")
+    html = models.TextField()
+    pdf = models.BinaryField()
+    gerado_em = models.DateTimeField(auto_now=True, verbose_name="Gerado em")
+
+    class Meta:
+        verbose_name = "📑 DRE Gerado"
+        verbose_name_plural = "📑 DREs Gerados"
+        ordering = ['-ano', '-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['loja', 'ano', 'mes'], name='dre_loja_mes_unico'),
+        ]
+
+    def __str__(self):
+        return f"DRE {self.mes:02d}/{self.ano}"
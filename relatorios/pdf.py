@@ -0,0 +1,107 @@
+"""Gerador mínimo de PDF (texto em Helvetica, A4), sem dependências externas.
+
+Suficiente para relatórios tabulares: cada linha é uma lista de células
+(texto, x em pontos, alinhamento) e as páginas quebram sozinhas.
+"""
+import zlib
+
+LARGURA, ALTURA = 595, 842  # A4 em pontos
+MARGEM = 50
+ENTRELINHA = 15
+
+# Larguras aproximadas da Helvetica (em milésimos do corpo) para alinhar à direita
+_LARGURA_MEDIA = 556
+_ESTREITOS = {c: 278 for c in ' .,:;!|il1I/()-[]'}
+
+
+def _largura(texto, corpo):
+    return sum(_ESTREITOS.get(c, _LARGURA_MEDIA) for c in texto) * corpo / 1000
+
+
+def _escapar(texto):
+    # Fontes padrão só têm Latin-1/WinAnsi: emojis dos rótulos são descartados
+    texto = texto.encode('cp1252', errors='ignore').decode('cp1252').strip()
+    texto = texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return texto.encode('cp1252')
+
+
+class DocumentoPDF:
+    def __init__(self, titulo=''):
+        self.titulo = titulo
+        self.paginas = []
+        self._nova_pagina()
+
+    def _nova_pagina(self):
+        self.paginas.append([])
+        self.y = ALTURA - MARGEM
+
+    def linha(self, celulas, corpo=10, negrito=False, espaco=0):
+        """celulas: [(texto, x, 'e'|'d')]; 'd' alinha o texto terminando em x"""
+        self.y -= espaco
+        if self.y < MARGEM:
+            self._nova_pagina()
+        fonte = b'/F2' if negrito else b'/F1'
+        for texto, x, alinhamento in celulas:
+            texto = str(texto)
+            if alinhamento == 'd':
+                x -= _largura(texto, corpo)
+            self.paginas[-1].append(
+                b'BT %s %d Tf %.1f %.1f Td (%s) Tj ET' % (fonte, corpo, x, self.y, _escapar(texto))
+            )
+        self.y -= ENTRELINHA * corpo / 10
+
+    def separador(self):
+        self.paginas[-1].append(
+            b'%d %.1f m %d %.1f l 0.5 w S' % (MARGEM, self.y + 10, LARGURA - MARGEM, self.y + 10)
+        )
+        self.y -= 4
+
+    def gerar(self):
+        """Retorna o PDF completo em bytes"""
+        objetos = []
+
+        def adicionar(conteudo):
+            objetos.append(conteudo)
+            return len(objetos)
+
+        catalogo = adicionar(None)
+        raiz_paginas = adicionar(None)
+        fonte = adicionar(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        fonte_negrito = adicionar(
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>'
+        )
+        recursos = b'<< /Font << /F1 %d 0 R /F2 %d 0 R >> >>' % (fonte, fonte_negrito)
+
+        paginas = []
+        for numero, comandos in enumerate(self.paginas, 1):
+            rodape = b'BT /F1 8 Tf %d %d Td (%s) Tj ET' % (
+                MARGEM, MARGEM // 2, _escapar(f"{self.titulo} - página {numero}/{len(self.paginas)}")
+            )
+            conteudo = zlib.compress(b'\n'.join(comandos + [rodape]))
+            fluxo = adicionar(
+                b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(conteudo), conteudo)
+            )
+            paginas.append(adicionar(
+                b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>'
+                % (raiz_paginas, LARGURA, ALTURA, recursos, fluxo)
+            ))
+
+        objetos[catalogo - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % raiz_paginas
+        objetos[raiz_paginas - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % p for p in paginas), len(paginas)
+        )
+
+        saida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        posicoes = []
+        for numero, conteudo in enumerate(objetos, 1):
+            posicoes.append(len(saida))
+            saida += b'%d 0 obj\n%s\nendobj\n' % (numero, conteudo)
+
+        inicio_xref = len(saida)
+        saida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+        for posicao in posicoes:
+            saida += b'%010d 00000 n \n' % posicao
+        saida += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objetos) + 1, catalogo, inicio_xref
+        )
+        return bytes(saida)
@@ -0,0 +1,179 @@
+"""Séries temporais de vendas e compras para os gráficos.
+
+Os totais são agrupados por dia, semana ou mês no banco; séries longas
+passam pelo LTTB (Largest-Triangle-Three-Buckets), que reduz a quantidade
+de pontos mantendo picos e vales. A resposta fica em cache até a próxima
+gravação de lançamento ou compra da loja (marca do painel).
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from arquivo.consultas import compras_arquivadas, lancamentos_arquivados
+from compras.models import Compra, _somar_meses
+from lancamentos.models import Lancamento
+from lojas.painel import marca_painel
+
+from .consultas import TOTAL_VENDAS
+
+PONTOS_PADRAO = 500
+PONTOS_MAXIMO = 5000
+# Período máximo de uma consulta: o eixo é montado balde a balde em Python
+ANOS_MAXIMO = 10
+TEMPO_CACHE = 60 * 60
+
+
+class _TruncSqlite:
+    """No SQLite usa date() nativo: o Trunc padrão chama uma função Python
+    por linha (como os Extract de consultas.py)"""
+    sqlite = None
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return self.sqlite.format(sql), params
+
+
+class BaldeSemana(_TruncSqlite, TruncWeek):
+    # 'weekday 0' avança até o domingo; seis dias antes é a segunda da semana
+    sqlite = "date({}, 'weekday 0', '-6 days')"
+
+
+class BaldeMes(_TruncSqlite, TruncMonth):
+    sqlite = "date({}, 'start of month')"
+
+
+def _seguinte_semana(data):
+    return data + timedelta(days=7)
+
+
+def _seguinte_dia(data):
+    return data + timedelta(days=1)
+
+
+def _seguinte_mes(data):
+    return _somar_meses(data, 1, 1)
+
+
+# balde -> (agrupamento no banco, início do balde de uma data, balde seguinte)
+BALDES = {
+    'dia': (F, lambda d: d, _seguinte_dia),
+    'semana': (BaldeSemana, lambda d: d - timedelta(days=d.weekday()), _seguinte_semana),
+    'mes': (BaldeMes, lambda d: d.replace(day=1), _seguinte_mes),
+}
+
+SERIES = {
+    'vendas': ('data', TOTAL_VENDAS, Lancamento, lancamentos_arquivados),
+    'compras': ('data_compra', F('valor_total'), Compra, compras_arquivadas),
+}
+
+
+def lttb(pontos, limite):
+    """Reduz [(x, y), ...] (x crescente) a `limite` pontos pelo LTTB.
+
+    O primeiro e o último ponto ficam; de cada balde intermediário fica o
+    ponto que forma o maior triângulo com o escolhido no balde anterior e a
+    média do balde seguinte. Uma passada só, O(n).
+    """
+    total = len(pontos)
+    if limite >= total or limite < 3:
+        return list(pontos)
+
+    xs = [float(x) for x, _ in pontos]
+    ys = [float(y) for _, y in pontos]
+    tamanho = (total - 2) / (limite - 2)
+    # Limites [inicio, fim) de cada balde intermediário
+    limites = [int(i * tamanho) + 1 for i in range(limite - 1)]
+    limites[-1] = total - 1
+
+    escolhidos = [pontos[0]]
+    a = 0
+    for i in range(limite - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Média do balde seguinte (o último ponto, no último balde)
+        proximo_inicio = fim
+        proximo_fim = limites[i + 2] if i + 2 < len(limites) else total
+        quantidade = proximo_fim - proximo_inicio
+        media_x = sum(xs[proximo_inicio:proximo_fim]) / quantidade
+        media_y = sum(ys[proximo_inicio:proximo_fim]) / quantidade
+
+        ax, ay = xs[a], ys[a]
+        dx, dy = media_x - ax, media_y - ay
+        maior, escolhido = -1.0, inicio
+        for j in range(inicio, fim):
+            # Dobro da área: o fator 1/2 não muda o máximo
+            area = abs(dx * (ys[j] - ay) - (xs[j] - ax) * dy)
+            if area > maior:
+                maior, escolhido = area, j
+        escolhidos.append(pontos[escolhido])
+        a = escolhido
+    escolhidos.append(pontos[-1])
+    return escolhidos
+
+
+def _totais(loja, serie, balde, inicio, fim):
+    campo_data, valor, modelo, arquivados = SERIES[serie]
+    agrupar = BALDES[balde][0]
+    querysets = [
+        modelo.objects.filter(loja=loja, **{f'{campo_data}__range': (inicio, fim)}),
+        arquivados(loja, inicio, fim),
+    ]
+    totais = {}
+    for queryset in querysets:
+        if queryset is None:
+            continue
+        linhas = (
+            queryset.annotate(balde=agrupar(campo_data))
+            .values('balde')
+            .annotate(total=Sum(valor))
+            .order_by()
+            .values_list('balde', 'total')
+        )
+        for dia, total in linhas:
+            totais[dia] = totais.get(dia, 0) + (total or 0)
+    return totais
+
+
+def serie_temporal(loja, series, balde, inicio, fim, pontos=PONTOS_PADRAO):
+    """{'vendas': [['AAAA-MM-DD', valor], ...], ...} com no máximo `pontos` por série.
+
+    Baldes sem movimento entram com zero, para todas as séries dividirem o
+    mesmo eixo.
+    """
+    if balde not in BALDES:
+        raise ValueError(f"Balde inválido: {balde}")
+    desconhecidas = set(series) - set(SERIES)
+    if desconhecidas or not series:
+        raise ValueError(f"Séries inválidas: {', '.join(sorted(desconhecidas)) or 'nenhuma'}")
+    if inicio > fim:
+        raise ValueError("A data inicial não pode ser maior que a final.")
+    if (fim - inicio).days > 366 * ANOS_MAXIMO:
+        raise ValueError(f"O período pode ter no máximo {ANOS_MAXIMO} anos.")
+    if not 3 <= pontos <= PONTOS_MAXIMO:
+        raise ValueError(f"Os pontos devem ficar entre 3 e {PONTOS_MAXIMO}.")
+
+    chave = f'relatorios:serie:{loja.pk}:{marca_painel(loja.pk)}:{",".join(series)}:{balde}:{inicio}:{fim}:{pontos}'
+    resultado = cache.get(chave)
+    if resultado is not None:
+        return resultado
+
+    _, primeiro_dia, seguinte = BALDES[balde]
+    # O primeiro balde começa inteiro, mesmo que `inicio` caia no meio dele
+    inicio = primeiro_dia(inicio)
+    eixo = []
+    dia = inicio
+    while dia <= fim:
+        eixo.append(dia)
+        dia = seguinte(dia)
+
+    resultado = {}
+    for serie in series:
+        totais = _totais(loja, serie, balde, inicio, fim)
+        pontos_serie = [(dia.toordinal(), totais.get(dia, 0)) for dia in eixo]
+        resultado[serie] = [
+            [date.fromordinal(x).isoformat(), round(float(y), 2)]
+            for x, y in lttb(pontos_serie, pontos)
+        ]
+    cache.set(chave, resultado, TEMPO_CACHE)
+    return resultado
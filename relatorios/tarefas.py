@@ -0,0 +1,11 @@
+from fila.registro import tarefa
+from lojas.models import Loja
+
+from .dre import gerar_dre as gerar
+
+
+@tarefa('relatorios.gerar_dre')
+def gerar_dre(tarefa, loja_id, ano, mes):
+    tarefa.atualizar_progresso(10, "Calculando DRE")
+    dre = gerar(Loja.objects.get(pk=loja_id), ano, mes)
+    return {'dre_id': dre.pk, 'versao': dre.versao}
@@ -0,0 +1,134 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from arquivo.services import arquivar_ano
+from fila.models import Tarefa
+from fila.registro import executar, reivindicar
+from lancamentos.models import Lancamento
+from lojas.models import loja_padrao
+
+from .consultas import comparativo
+from .dre import dre_em_cache
+from .tarefas import gerar_dre
+
+
+class SeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loja = loja_padrao()
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def _series(self, **parametros):
+        return self.client.get(reverse('api_relatorio_series'), parametros)
+
+    def test_reduz_a_serie_para_os_pontos_pedidos(self):
+        for dia in range(1, 29):
+            Lancamento.objects.create(loja=self.loja, data=date(2025, 2, dia), pix=Decimal(dia))
+
+        resposta = self._series(series='vendas', inicio='2025-02-01', fim='2025-02-28', pontos=10)
+
+        vendas = resposta.json()['series']['vendas']
+        self.assertEqual(len(vendas), 10)
+        self.assertEqual(vendas[0], ['2025-02-01', 1.0])
+        self.assertEqual(vendas[-1], ['2025-02-28', 28.0])
+
+    def test_periodo_longo_demais_e_recusado(self):
+        resposta = self._series(inicio='0001-01-01', fim='9999-12-31')
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_datas_nos_limites_devolvem_400(self):
+        for parametros in (
+            {'inicio': '9999-12-20', 'fim': '9999-12-31', 'balde': 'semana'},
+            {'inicio': '9999-12-01', 'fim': '9999-12-31', 'balde': 'mes'},
+            {'fim': '0002-01-01'},
+        ):
+            with self.subTest(**parametros):
+                self.assertEqual(self._series(**parametros).status_code, 400)
+
+
+class DreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loja = loja_padrao()
+        self.client.force_login(User.objects.create_user('gerente', password='senha'))
+
+    def test_ano_fora_do_intervalo_nao_quebra(self):
+        resposta = self.client.get(reverse('relatorio_dre'), {'ano': 0, 'mes': 1})
+        self.assertRedirects(resposta, reverse('relatorio_dre'), fetch_redirect_response=False)
+        resposta = self.client.get(reverse('relatorio_dre_pdf', args=[0, 1]))
+        self.assertEqual(resposta.status_code, 404)
+
+    def test_abrir_a_pagina_e_o_pdf_nao_enfileira(self):
+        self.client.get(reverse('relatorio_dre'), {'ano': 2025, 'mes': 3})
+        resposta = self.client.get(reverse('relatorio_dre_pdf', args=[2025, 3]))
+
+        self.assertEqual(resposta.status_code, 302)
+        self.assertFalse(Tarefa.objects.exists())
+
+    def test_post_enfileira_uma_vez(self):
+        for _ in range(2):
+            resposta = self.client.post(reverse('relatorio_dre'), {'ano': 2025, 'mes': 3})
+            self.assertEqual(resposta.status_code, 302)
+
+        tarefa = Tarefa.objects.get()
+        self.assertEqual(tarefa.parametros, {'loja_id': self.loja.pk, 'ano': 2025, 'mes': 3})
+        self.assertEqual(self.client.get(reverse('relatorio_dre'), {'ano': 2025, 'mes': 3}).context['tarefa'], tarefa)
+
+    def test_tarefa_gera_o_pdf_e_a_nova_versao_invalida_o_cache(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('100'))
+        tarefa = gerar_dre.enfileirar(loja_id=self.loja.pk, ano=2025, mes=3)
+        reivindicar(1)
+
+        self.assertEqual(executar(tarefa.pk), 'concluida')
+        resposta = self.client.get(reverse('relatorio_dre_pdf', args=[2025, 3]))
+        self.assertEqual(resposta['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(resposta).startswith(b'%PDF'))
+
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 11), pix=Decimal('5'))
+        self.assertIsNone(dre_em_cache(self.loja, 2025, 3))
+
+
+class ComparativoTests(TestCase):
+    databases = {'default', 'arquivo'}
+
+    def setUp(self):
+        self.loja = loja_padrao()
+
+    def test_mes_traz_o_mesmo_mes_do_ano_anterior(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2024, 3, 5), pix=Decimal('100'))
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 5), pix=Decimal('120'))
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 6), dinheiro=Decimal('30'))
+
+        linha, = comparativo(self.loja, 'mes', 2025, 2025)
+
+        self.assertEqual((linha['rotulo'], linha['vendas'], linha['vendas_anterior']), ('Mar', 150, 100))
+        self.assertEqual((linha['vendas_variacao'], linha['media_vendas']), (50.0, 75))
+
+    def test_ano_arquivado_entra_na_comparacao(self):
+        Lancamento.objects.create(loja=self.loja, data=date(2023, 3, 5), pix=Decimal('80'))
+        arquivar_ano(self.loja, 2023)
+        Lancamento.objects.create(loja=self.loja, data=date(2024, 3, 5), pix=Decimal('100'))
+
+        linha, = comparativo(self.loja, 'mes', 2024, 2024)
+
+        self.assertEqual((linha['vendas'], linha['vendas_anterior'], linha['vendas_variacao']), (100, 80, 25.0))
+
+    def test_dia_da_semana_segue_a_iso(self):
+        # 10/03/2025 é segunda, 16/03/2025 é domingo
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 10), pix=Decimal('1'))
+        Lancamento.objects.create(loja=self.loja, data=date(2025, 3, 16), pix=Decimal('2'))
+
+        linhas = comparativo(self.loja, 'dia_semana', 2025, 2025)
+
+        self.assertEqual([(l['chave'], l['rotulo'], l['vendas']) for l in linhas], [(1, 'Seg', 1), (7, 'Dom', 2)])
+
+    def test_parametros_invalidos(self):
+        with self.assertRaises(ValueError):
+            comparativo(self.loja, 'trimestre', 2025, 2025)
+        with self.assertRaises(ValueError):
+            comparativo(self.loja, 'mes', 2025, 2024)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('relatorios/periodos/', views.relatorio_periodos, name='relatorio_periodos'),
+    path('relatorios/dre/', views.relatorio_dre, name='relatorio_dre'),
+    path('relatorios/dre/<int:ano>/<int:mes>.pdf', views.relatorio_dre_pdf, name='relatorio_dre_pdf'),
+    path('api/relatorios/series/', views.api_relatorio_series, name='api_relatorio_series'),
+]
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.db import transaction
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils import timezone
+
+from fila.models import Tarefa
+
+from .consultas import comparativo
+from .series import PONTOS_PADRAO, serie_temporal
+from .dre import MESES, dre_em_cache
+from .tarefas import gerar_dre
+
+GRANULARIDADE_CHOICES = [
+    ('mes', 'Mês'),
+    ('semana', 'Semana'),
+    ('dia_semana', 'Dia da semana'),
+]
+
+
+@login_required
+def relatorio_periodos(request):
+    """Comparativo ano a ano por mês, semana ou dia da semana (?formato=json para a API)"""
+    ano_atual = timezone.localdate().year
+    granularidade = request.GET.get('granularidade') or 'mes'
+    linhas, erro = [], None
+    try:
+        ano_inicio = int(request.GET.get('ano_inicio') or ano_atual)
+        ano_fim = int(request.GET.get('ano_fim') or ano_inicio)
+    except ValueError:
+        ano_inicio = ano_fim = ano_atual
+        erro = "Ano inválido."
+    else:
+        try:
+            linhas = comparativo(request.loja, granularidade, ano_inicio, ano_fim)
+        except ValueError as e:
+            erro = str(e)
+
+    if request.GET.get('formato') == 'json':
+        if erro:
+            return JsonResponse({'erro': erro}, status=400)
+        return JsonResponse({
+            'granularidade': granularidade,
+            'ano_inicio': ano_inicio,
+            'ano_fim': ano_fim,
+            'linhas': linhas,
+        })
+
+    context = {
+        'linhas': linhas,
+        'erro': erro,
+        'GRANULARIDADE_CHOICES': GRANULARIDADE_CHOICES,
+        'filtros': {
+            'granularidade': granularidade,
+            'ano_inicio': ano_inicio,
+            'ano_fim': ano_fim,
+        },
+    }
+    return render(request, 'relatorios/periodos.html', context)
+
+
+@login_required
+def api_relatorio_series(request):
+    """Ex.: ?series=vendas,compras&balde=semana&inicio=2023-01-01&fim=2025-12-31&pontos=300"""
+    hoje = timezone.localdate()
+    try:
+        fim = datetime.strptime(request.GET['fim'], '%Y-%m-%d').date() if request.GET.get('fim') else hoje
+        inicio = (
+            datetime.strptime(request.GET['inicio'], '%Y-%m-%d').date() if request.GET.get('inicio')
+            else fim.replace(year=fim.year - 3, day=1)
+        )
+        pontos = int(request.GET.get('pontos') or PONTOS_PADRAO)
+    except ValueError:
+        return JsonResponse({'erro': 'Data ou quantidade de pontos inválida.'}, status=400)
+
+    series = [s for s in (request.GET.get('series') or 'vendas,compras').split(',') if s]
+    balde = request.GET.get('balde') or 'dia'
+    try:
+        dados = serie_temporal(request.loja, series, balde, inicio, fim, pontos)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+    except OverflowError:
+        # Baldes que começam antes de 01/01/0001 ou terminam depois de 31/12/9999
+        return JsonResponse({'erro': 'Período fora das datas aceitas.'}, status=400)
+
+    return JsonResponse({
+        'balde': balde,
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'series': dados,
+    })
+
+
+# O DRE começa no primeiro ano com movimento possível no sistema
+ANO_MINIMO = 2000
+
+
+def _validar_mes(ano, mes):
+    if not ANO_MINIMO <= ano <= timezone.localdate().year:
+        raise ValueError("Ano inválido.")
+    if not 1 <= mes <= 12:
+        raise ValueError("Mês inválido.")
+
+
+def _mes_escolhido(dados):
+    """(ano, mes) dos parâmetros; por padrão o último mês fechado"""
+    anterior = timezone.localdate().replace(day=1) - timedelta(days=1)
+    ano = int(dados.get('ano') or anterior.year)
+    mes = int(dados.get('mes') or anterior.month)
+    _validar_mes(ano, mes)
+    return ano, mes
+
+
+def _tarefa_dre(loja, ano, mes):
+    """Tarefa de geração pendente ou em execução para o mês (None se não houver)"""
+    return Tarefa.objects.filter(
+        nome=gerar_dre.nome_tarefa, status__in=['pendente', 'executando'],
+        parametros__loja_id=loja.pk, parametros__ano=ano, parametros__mes=mes,
+    ).first()
+
+
+@login_required
+def relatorio_dre(request):
+    """DRE do mês; a geração só é pedida por POST (abrir a página não cria tarefa)"""
+    try:
+        ano, mes = _mes_escolhido(request.POST if request.method == 'POST' else request.GET)
+    except ValueError:
+        messages.error(request, 'Período inválido.')
+        return redirect('relatorio_dre')
+
+    if request.method == 'POST':
+        # BEGIN IMMEDIATE: dois cliques seguidos não enfileiram a mesma geração duas vezes
+        with transaction.atomic():
+            if dre_em_cache(request.loja, ano, mes) is None and _tarefa_dre(request.loja, ano, mes) is None:
+                gerar_dre.enfileirar(loja_id=request.loja.pk, ano=ano, mes=mes)
+        return redirect(f"{reverse('relatorio_dre')}?ano={ano}&mes={mes}")
+
+    gerado = dre_em_cache(request.loja, ano, mes)
+    context = {
+        'dre': gerado,
+        'tarefa': None if gerado else _tarefa_dre(request.loja, ano, mes),
+        'MESES': list(enumerate(MESES, 1)),
+        'filtros': {'ano': ano, 'mes': mes},
+    }
+    return render(request, 'relatorios/dre.html', context)
+
+
+@login_required
+def relatorio_dre_pdf(request, ano, mes):
+    try:
+        _validar_mes(ano, mes)
+    except ValueError:
+        raise Http404
+
+    gerado = dre_em_cache(request.loja, ano, mes)
+    if gerado is None:
+        messages.info(request, 'Gere o DRE do mês para baixar o PDF.')
+        return redirect(f"{reverse('relatorio_dre')}?ano={ano}&mes={mes}")
+
+    # A versão só muda quando os dados do mês mudam: o navegador pode reaproveitar o arquivo
+    etag = f'"{gerado.versao}"'
+    if request.headers.get('If-None-Match') == etag:
+        return HttpResponseNotModified()
+
+    response = HttpResponse(bytes(gerado.pdf), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="dre-{ano}-{mes:02d}.pdf"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,61 @@
+{% load static estaticos %}// Service worker do caixa: guarda a tela e os arquivos estáticos para abrir sem rede.
+// As operações ficam no IndexedDB da página; aqui só tratamos o cache.
+const CACHE = 'caixa-v2';
+const PAGINA = '{% url "caixa" %}';
+const CDN = 'https://cdnjs.cloudflare.com/';
+const STATIC = '{% get_static_prefix %}';
+const ESTATICOS = [
+    '{% vendor "bootstrap/5.3.0/css/bootstrap.min.css" %}',
+    '{% vendor "font-awesome/6.4.0/css/all.min.css" %}',
+    '{% vendor "bootstrap/5.3.0/js/bootstrap.bundle.min.js" %}',
+    '{% static "domcorleone/css/base.css" %}',
+    '{% static "domcorleone/js/base.js" %}',
+];
+
+self.addEventListener('install', evento => {
+    evento.waitUntil(
+        caches.open(CACHE).then(cache => cache.addAll(ESTATICOS)).then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', evento => {
+    evento.waitUntil(
+        caches.keys()
+            .then(nomes => Promise.all(nomes.filter(nome => nome !== CACHE).map(nome => caches.delete(nome))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', evento => {
+    const pedido = evento.request;
+    if (pedido.method !== 'GET') {
+        return;
+    }
+    const url = new URL(pedido.url);
+
+    // Tela do caixa: rede primeiro (dados frescos), cópia guardada sem conexão
+    if (pedido.mode === 'navigate' && url.pathname === PAGINA) {
+        evento.respondWith(
+            fetch(pedido).then(resposta => {
+                // Redirecionamento para o login não substitui a tela guardada
+                if (resposta.ok && !resposta.redirected) {
+                    const copia = resposta.clone();
+                    caches.open(CACHE).then(cache => cache.put(PAGINA, copia));
+                }
+                return resposta;
+            }).catch(() => caches.match(PAGINA))
+        );
+        return;
+    }
+
+    // CSS, JS e fontes têm versão ou hash na URL: cache primeiro
+    if (pedido.url.startsWith(CDN) || (url.origin === self.location.origin && url.pathname.startsWith(STATIC))) {
+        evento.respondWith(
+            caches.match(pedido).then(guardada => guardada || fetch(pedido).then(resposta => {
+                const copia = resposta.clone();
+                caches.open(CACHE).then(cache => cache.put(pedido, copia));
+                return resposta;
+            }))
+        );
+    }
+});